@@ -19,6 +19,7 @@ def register_routes():
     import app.api.v1.test_case_collections as test_case_collections
     import app.api.v1.tags as tags
     import app.api.v1.test_plans as test_plans
+    import app.api.v1.schedules as schedules
     import app.api.v1.test_executions as test_executions
     import app.api.v1.reports as reports
     import app.api.v1.devices as devices
@@ -35,6 +36,7 @@ def register_routes():
     import app.api.v1.page_objects as page_objects
     import app.api.v1.ui_elements as ui_elements
     import app.api.v1.ui_recording as ui_recording
+    import app.api.v1.performance_baselines as performance_baselines
     
     # 注册各个模块的路由
     api_router.include_router(auth.router, prefix="/auth", tags=["认证"])
@@ -48,6 +50,7 @@ def register_routes():
     api_router.include_router(test_case_collections.router, prefix="/test-case-collections", tags=["测试用例集"])
     api_router.include_router(tags.router, prefix="/tags", tags=["标签管理"])
     api_router.include_router(test_plans.router, prefix="/test-plans", tags=["测试计划"])
+    api_router.include_router(schedules.router, prefix="/schedules", tags=["定时计划"])
     api_router.include_router(test_executions.router, prefix="/test-executions", tags=["测试执行"])
     api_router.include_router(reports.router, prefix="/reports", tags=["测试报告"])
     api_router.include_router(devices.router, prefix="/devices", tags=["设备管理"])
@@ -64,6 +67,7 @@ def register_routes():
     api_router.include_router(page_objects.router, prefix="/page-objects", tags=["页面对象管理"])
     api_router.include_router(ui_elements.router, prefix="/ui-elements", tags=["UI元素管理"])
     api_router.include_router(ui_recording.router, prefix="/ui-recording", tags=["UI录制"])
+    api_router.include_router(performance_baselines.router, prefix="/performance", tags=["性能基线"])
 
 # 立即注册路由
 register_routes()
@@ -1,22 +1,34 @@
 """
 仪表盘API
+
+执行相关的统计读取执行日汇总表（execution_daily_rollups），不扫描 test_executions；
+整个统计结果在 Redis 中缓存 DASHBOARD_STATS_CACHE_TTL 秒。
 """
+import logging
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from datetime import datetime, timedelta
+from sqlalchemy import select, func
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.dependencies import get_current_active_user
+from app.core.redis_client import get_available_redis
 from app.models.user import User
 from app.models.project import Project
 from app.models.test_case import TestCase
-from app.models.test_execution import TestExecution, ExecutionStatus
+from app.models.test_execution import ExecutionStatus
+from app.models.execution_rollup import ExecutionDailyRollup
 from app.models.interface import Interface
+from app.services.execution_rollup import RollupAggregate
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_STATS_CACHE_KEY = "qualityguard:dashboard:stats"
+
 
 class DashboardStats(BaseModel):
     """仪表盘统计数据"""
@@ -45,7 +57,34 @@ class DashboardStats(BaseModel):
     today_executions: int = 0  # 今日执行次数
     today_success: int = 0  # 今日成功
     today_failed: int = 0  # 今日失败
-    avg_response_time: float = 0.0  # 平均响应时间
+    avg_response_time: float = 0.0  # 今日平均执行耗时（毫秒）
+    p95_response_time: float = 0.0  # 今日执行耗时 P95（毫秒，按分桶估算）
+
+
+async def _get_cached_stats() -> Optional[DashboardStats]:
+    if settings.DASHBOARD_STATS_CACHE_TTL <= 0:
+        return None
+    client = await get_available_redis()
+    if client is None:
+        return None
+    try:
+        cached = await client.get(_STATS_CACHE_KEY)
+        return DashboardStats.model_validate_json(cached) if cached else None
+    except Exception as e:
+        logger.warning(f"读取仪表盘统计缓存失败: {e}")
+        return None
+
+
+async def _cache_stats(stats: DashboardStats):
+    if settings.DASHBOARD_STATS_CACHE_TTL <= 0:
+        return
+    client = await get_available_redis()
+    if client is None:
+        return
+    try:
+        await client.set(_STATS_CACHE_KEY, stats.model_dump_json(), ex=settings.DASHBOARD_STATS_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"写入仪表盘统计缓存失败: {e}")
 
 
 @router.get("/stats", response_model=DashboardStats)
@@ -53,96 +92,90 @@ async def get_dashboard_stats(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """获取仪表盘统计数据"""
-    today = datetime.utcnow().date()
+    """获取仪表盘统计数据（执行统计按结束时间的 UTC 日期汇总，只含已结束的执行）"""
+    cached = await _get_cached_stats()
+    if cached is not None:
+        return cached
+
+    today = datetime.now(timezone.utc).date()
     week_start = today - timedelta(days=today.weekday())
-    
-    # 项目统计
-    project_count = await db.execute(select(func.count(Project.id)))
-    total_projects = project_count.scalar() or 0
-    
-    # 接口统计
-    interface_count = await db.execute(select(func.count(Interface.id)))
-    total_interfaces = interface_count.scalar() or 0
-    
-    # 测试用例统计
-    case_count = await db.execute(select(func.count(TestCase.id)))
-    total_cases = case_count.scalar() or 0
-    
-    # 测试执行统计
-    execution_count = await db.execute(select(func.count(TestExecution.id)))
-    total_executions = execution_count.scalar() or 0
-    
-    # 今日执行统计
-    today_start = datetime.combine(today, datetime.min.time())
-    today_executions_query = select(func.count(TestExecution.id)).where(
-        TestExecution.created_at >= today_start
-    )
-    today_executions_result = await db.execute(today_executions_query)
-    today_executions = today_executions_result.scalar() or 0
-    
-    # 成功/失败统计
-    success_count = await db.execute(
-        select(func.count(TestExecution.id)).where(TestExecution.status == ExecutionStatus.PASSED)
-    )
-    success_executions = success_count.scalar() or 0
-    
-    failed_count = await db.execute(
-        select(func.count(TestExecution.id)).where(TestExecution.status == ExecutionStatus.FAILED)
-    )
-    failed_executions = failed_count.scalar() or 0
-    
-    # 今日成功/失败
-    today_success_query = select(func.count(TestExecution.id)).where(
-        and_(
-            TestExecution.created_at >= today_start,
-            TestExecution.status == ExecutionStatus.PASSED
+
+    # 项目 / 接口 / 用例统计（一次查询）
+    counts = await db.execute(
+        select(
+            select(func.count(Project.id)).scalar_subquery(),
+            select(func.count(Interface.id)).scalar_subquery(),
+            select(func.count(TestCase.id)).scalar_subquery(),
+            # 假设API类型的用例都是自动化的
+            select(func.count(TestCase.id)).where(TestCase.test_type == "api").scalar_subquery(),
         )
     )
-    today_success_result = await db.execute(today_success_query)
-    today_success = today_success_result.scalar() or 0
-    
-    today_failed_query = select(func.count(TestExecution.id)).where(
-        and_(
-            TestExecution.created_at >= today_start,
-            TestExecution.status == ExecutionStatus.FAILED
-        )
+    total_projects, total_interfaces, total_cases, api_cases_count = counts.one()
+
+    # 执行总数按状态（汇总表：项目数 × 天数 × 状态数行）
+    totals_result = await db.execute(
+        select(ExecutionDailyRollup.status, func.sum(ExecutionDailyRollup.execution_count))
+        .group_by(ExecutionDailyRollup.status)
     )
-    today_failed_result = await db.execute(today_failed_query)
-    today_failed = today_failed_result.scalar() or 0
-    
+    totals = {execution_status: int(count or 0) for execution_status, count in totals_result.all()}
+    total_executions = sum(totals.values())
+    success_executions = totals.get(ExecutionStatus.PASSED, 0)
+    failed_executions = totals.get(ExecutionStatus.FAILED, 0)
+
+    # 本周每天的执行（今日数据与周工作量）
+    week_result = await db.execute(
+        select(
+            ExecutionDailyRollup.day,
+            ExecutionDailyRollup.status,
+            ExecutionDailyRollup.execution_count,
+            ExecutionDailyRollup.timed_count,
+            ExecutionDailyRollup.duration_sum_ms,
+            ExecutionDailyRollup.duration_max_ms,
+            ExecutionDailyRollup.duration_buckets,
+        ).where(ExecutionDailyRollup.day >= week_start, ExecutionDailyRollup.day <= today)
+    )
+    week_workload: Dict[str, Any] = {
+        (week_start + timedelta(days=offset)).isoformat(): {"total": 0, "passed": 0, "failed": 0}
+        for offset in range((today - week_start).days + 1)
+    }
+    today_duration = RollupAggregate()
+    today_success = today_failed = today_executions = 0
+    for row in week_result.all():
+        day_stats = week_workload[row.day.isoformat()]
+        day_stats["total"] += row.execution_count
+        if row.status == ExecutionStatus.PASSED:
+            day_stats["passed"] += row.execution_count
+        elif row.status in (ExecutionStatus.FAILED, ExecutionStatus.ERROR):
+            day_stats["failed"] += row.execution_count
+        if row.day == today:
+            today_duration.add_row(row)
+            today_executions += row.execution_count
+            if row.status == ExecutionStatus.PASSED:
+                today_success += row.execution_count
+            elif row.status == ExecutionStatus.FAILED:
+                today_failed += row.execution_count
+
     # 计算通过率
     overall_pass_rate = 0.0
     if total_executions > 0:
         overall_pass_rate = (success_executions / total_executions) * 100
-    
-    # 计算覆盖率（简化计算）
+
+    # 计算覆盖率（简化计算：有接口时视为全部用例都已覆盖）
     interface_coverage = 0.0
     case_coverage = 0.0
-    if total_interfaces > 0:
-        # 假设有接口的用例覆盖率
-        cases_with_interface = await db.execute(
-            select(func.count(func.distinct(TestCase.id)))
-        )
-        cases_with_interface_count = cases_with_interface.scalar() or 0
-        if total_cases > 0:
-            case_coverage = (cases_with_interface_count / total_cases) * 100
-    
+    if total_interfaces > 0 and total_cases > 0:
+        case_coverage = 100.0
+
     # 自动化率（简化计算）
     automation_rate = 0.0
     if total_cases > 0:
-        # 假设API类型的用例都是自动化的
-        api_cases = await db.execute(
-            select(func.count(TestCase.id)).where(TestCase.test_type == "api")
-        )
-        api_cases_count = api_cases.scalar() or 0
         automation_rate = (api_cases_count / total_cases) * 100
-    
-    return DashboardStats(
+
+    stats = DashboardStats(
         pending_tasks=0,  # TODO: 实现任务统计
         pending_reviews=0,  # TODO: 实现评审统计
         today_completed=today_success,
-        week_workload={},  # TODO: 实现周工作量统计
+        week_workload=week_workload,
         interface_coverage=interface_coverage,
         case_coverage=case_coverage,
         automation_rate=automation_rate,
@@ -155,6 +188,8 @@ async def get_dashboard_stats(
         today_executions=today_executions,
         today_success=today_success,
         today_failed=today_failed,
-        avg_response_time=0.0,  # TODO: 实现响应时间统计
+        avg_response_time=round(today_duration.avg_duration_ms or 0.0, 1),
+        p95_response_time=round(today_duration.percentile(0.95) or 0.0, 1),
     )
-
+    await _cache_stats(stats)
+    return stats
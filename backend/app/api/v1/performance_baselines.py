@@ -0,0 +1,98 @@
+"""
+性能基线 API
+"""
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_active_user
+from app.models.performance_run import PerformanceRun
+from app.models.user import User
+from app.schemas.performance import PerformanceRunResponse, PerformanceRunUpdate
+from app.services.performance_baseline import baseline_overview, compare_with_baseline, load_baseline_runs
+
+router = APIRouter()
+
+
+async def _get_run(db: AsyncSession, run_id: int) -> PerformanceRun:
+    run = await db.get(PerformanceRun, run_id)
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="性能测试运行记录不存在",
+        )
+    return run
+
+
+@router.get("/runs", response_model=List[PerformanceRunResponse])
+async def list_performance_runs(
+    test_case_id: int = Query(..., description="测试用例ID"),
+    environment: Optional[str] = Query(None, description="环境标识，不传时返回所有环境"),
+    limit: int = Query(50, ge=1, le=500, description="返回的最近运行数"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """获取性能测试运行记录（按时间倒序）"""
+    query = select(PerformanceRun).where(PerformanceRun.test_case_id == test_case_id)
+    if environment:
+        query = query.where(PerformanceRun.environment == environment)
+    query = query.order_by(PerformanceRun.id.desc()).limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+@router.get("/runs/{run_id}/comparison")
+async def compare_performance_run(
+    run_id: int,
+    window: Optional[int] = Query(None, ge=1, le=100, description="基线运行数，默认 PERF_BASELINE_WINDOW"),
+    threshold: Optional[float] = Query(None, gt=0, description="相对变化阈值，默认 PERF_BASELINE_REGRESSION_THRESHOLD"),
+    confidence: Optional[float] = Query(None, gt=0.5, lt=1, description="单侧置信度，默认 PERF_BASELINE_CONFIDENCE"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Dict[str, Any]:
+    """将一次运行与它之前的滚动基线重新对比（可调整窗口、阈值与置信度）"""
+    run = await _get_run(db, run_id)
+    if run.status == "error":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="执行出错的运行没有可对比的指标",
+        )
+    baseline = await load_baseline_runs(db, run.test_case_id, run.environment, before_id=run.id, window=window)
+    comparison = compare_with_baseline(run.summary, run.histogram, baseline, threshold=threshold, confidence=confidence)
+    return {"run_id": run.id, "summary": run.summary, **comparison}
+
+
+@router.patch("/runs/{run_id}", response_model=PerformanceRunResponse)
+async def update_performance_run(
+    run_id: int,
+    payload: PerformanceRunUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """设置运行是否计入基线（例如确认回归是预期变化后计入，或排除受干扰的运行）"""
+    run = await _get_run(db, run_id)
+    if payload.include_in_baseline and run.status == "error":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="执行出错的运行不能计入基线",
+        )
+    run.include_in_baseline = payload.include_in_baseline
+    await db.commit()
+    await db.refresh(run)
+    return run
+
+
+@router.get("/baseline")
+async def get_performance_baseline(
+    test_case_id: int = Query(..., description="测试用例ID"),
+    environment: Optional[str] = Query(None, description="环境标识，不传时为未指定环境的运行"),
+    window: Optional[int] = Query(None, ge=1, le=100, description="基线运行数，默认 PERF_BASELINE_WINDOW"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Dict[str, Any]:
+    """获取当前滚动基线概况"""
+    baseline = await load_baseline_runs(db, test_case_id, environment, window=window)
+    return {"test_case_id": test_case_id, "environment": environment, **baseline_overview(baseline)}
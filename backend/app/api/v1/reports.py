@@ -26,6 +26,7 @@ async def get_reports(
     project_id: Optional[int] = Query(None, description="项目ID"),
     skip: int = Query(0, ge=0, description="偏移量"),
     limit: int = Query(20, ge=1, le=100, description="返回数量"),
+    cursor: Optional[str] = Query(None, description="键集分页游标（上一页最后一条的 cursor），传入时忽略 skip"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> List[dict]:
@@ -36,12 +37,18 @@ async def get_reports(
     - 以已完成的测试执行为基础，动态生成报告摘要列表
     - 报告 ID == 执行 ID
     """
-    reports = await service.get_report_list(
-        db=db,
-        project_id=project_id,
-        limit=limit,
-        offset=skip,
-    )
+    from fastapi import HTTPException
+
+    try:
+        reports = await service.get_report_list(
+            db=db,
+            project_id=project_id,
+            limit=limit,
+            offset=skip,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return reports
 
 
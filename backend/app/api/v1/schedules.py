@@ -0,0 +1,253 @@
+"""
+定时计划管理API
+"""
+from datetime import datetime, timezone
+from typing import Optional, List
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.dependencies import get_current_active_user
+from app.models.schedule import Schedule
+from app.models.test_execution import TestExecution, ExecutionStatus
+from app.models.user import User
+from app.schemas.schedule import (
+    ScheduleCreate, ScheduleUpdate, ScheduleResponse, SchedulePreviewResponse, SchedulerMetricsResponse,
+)
+from app.schemas.test_execution import TestExecutionListItem
+from app.services.report_service import LIST_COLUMNS
+from app.services.scheduled_execution_scheduler import (
+    get_scheduler, plan_schedule_next_run, build_schedule_execution, launch_schedule_targets, MISFIRE_POLICIES,
+)
+from app.utils.cron import CronError, parse_cron, get_timezone
+
+router = APIRouter()
+
+# 需要重新计算下次触发时间的字段
+_TIMING_FIELDS = {"cron_expression", "timezone", "start_at", "end_at", "enabled", "jitter_seconds"}
+
+
+async def _validate_schedule(db: AsyncSession, schedule: Schedule):
+    """校验 Cron 表达式、时区与执行目标，无效时抛出 400 / 404"""
+    try:
+        parse_cron(schedule.cron_expression)
+        get_timezone(schedule.timezone)
+    except CronError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if bool(schedule.test_case_id) == bool(schedule.test_plan_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="test_case_id 与 test_plan_id 必须且只能指定一个")
+    if schedule.start_at and schedule.end_at and schedule.start_at > schedule.end_at:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="生效时间不能晚于失效时间")
+    if schedule.misfire_policy is not None and schedule.misfire_policy not in MISFIRE_POLICIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"错过触发策略无效，可选值: {', '.join(MISFIRE_POLICIES)}",
+        )
+
+    from app.models.project import Project
+    from app.models.test_case import TestCase
+    from app.models.test_plan import TestPlan
+    if not await db.get(Project, schedule.project_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="项目不存在")
+    if schedule.test_case_id and not await db.get(TestCase, schedule.test_case_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="测试用例不存在")
+    if schedule.test_plan_id and not await db.get(TestPlan, schedule.test_plan_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="测试计划不存在")
+
+
+async def _get_schedule_or_404(db: AsyncSession, schedule_id: int) -> Schedule:
+    schedule = await db.get(Schedule, schedule_id)
+    if not schedule:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="定时计划不存在")
+    return schedule
+
+
+@router.get("/preview", response_model=SchedulePreviewResponse)
+async def preview_schedule(
+    cron_expression: str = Query(..., description="Cron 表达式"),
+    timezone_name: Optional[str] = Query(None, alias="timezone", description="IANA 时区"),
+    count: int = Query(5, ge=1, le=50, description="预览的触发次数"),
+):
+    """预览 Cron 表达式接下来的触发时间"""
+    timezone_name = timezone_name or settings.SCHEDULER_DEFAULT_TIMEZONE
+    try:
+        expression = parse_cron(cron_expression)
+        fire_times_iter = expression.iter_after(datetime.now(timezone.utc), get_timezone(timezone_name))
+    except CronError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    fire_times = []
+    for fire_time in fire_times_iter:
+        fire_times.append(fire_time)
+        if len(fire_times) >= count:
+            break
+    return SchedulePreviewResponse(cron_expression=cron_expression, timezone=timezone_name, fire_times=fire_times)
+
+
+@router.get("/metrics", response_model=SchedulerMetricsResponse)
+async def get_scheduler_metrics(db: AsyncSession = Depends(get_db)):
+    """调度延迟与错过触发统计
+
+    触发 / 补执行 / 跳过 / 顺延次数与延迟分位数为本进程的统计（只有主节点有数据）；
+    积压数与最大积压时长从数据库查询，任意进程结果一致。
+    """
+    scheduler = await get_scheduler()
+    now = datetime.now(timezone.utc)
+    schedule_result = await db.execute(
+        select(func.count(Schedule.id), func.min(Schedule.next_run_at))
+        .where(Schedule.enabled.is_(True), Schedule.next_run_at.isnot(None), Schedule.next_run_at <= now)
+    )
+    overdue_schedules, oldest_schedule = schedule_result.one()
+    execution_result = await db.execute(
+        select(func.count(TestExecution.id), func.min(TestExecution.next_run_at))
+        .where(
+            TestExecution.status == ExecutionStatus.PENDING,
+            TestExecution.next_run_at.isnot(None),
+            TestExecution.next_run_at <= now,
+        )
+    )
+    overdue_executions, oldest_execution = execution_result.one()
+    oldest = min((value for value in (oldest_schedule, oldest_execution) if value is not None), default=None)
+
+    return SchedulerMetricsResponse(
+        is_leader=scheduler.is_leader,
+        heap_size=scheduler.heap_size,
+        misfire_policy=settings.SCHEDULER_MISFIRE_POLICY,
+        misfire_grace_seconds=settings.SCHEDULER_MISFIRE_GRACE_SECONDS,
+        catchup_rate=settings.SCHEDULER_CATCHUP_RATE,
+        overdue_schedules=overdue_schedules,
+        overdue_executions=overdue_executions,
+        max_overdue_seconds=round((now - oldest).total_seconds(), 3) if oldest is not None else 0.0,
+        **scheduler.metrics.snapshot(),
+    )
+
+
+@router.get("/", response_model=List[ScheduleResponse])
+async def get_schedules(
+    project_id: Optional[int] = None,
+    enabled: Optional[bool] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取定时计划列表"""
+    query = select(Schedule)
+    if project_id:
+        query = query.where(Schedule.project_id == project_id)
+    if enabled is not None:
+        query = query.where(Schedule.enabled.is_(enabled))
+    query = query.order_by(Schedule.id.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+@router.post("/", response_model=ScheduleResponse, status_code=status.HTTP_201_CREATED)
+async def create_schedule(
+    schedule_in: ScheduleCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """创建定时计划"""
+    data = schedule_in.dict()
+    data["timezone"] = data.get("timezone") or settings.SCHEDULER_DEFAULT_TIMEZONE
+    schedule = Schedule(**data, created_by=current_user.id)
+    await _validate_schedule(db, schedule)
+
+    db.add(schedule)
+    # 抖动偏移按计划ID计算，先 flush 拿到ID
+    await db.flush()
+    plan_schedule_next_run(schedule, datetime.now(timezone.utc))
+    await db.commit()
+    await db.refresh(schedule)
+    scheduler = await get_scheduler()
+    scheduler.notify_schedule(schedule.id, schedule.next_run_at)
+    return schedule
+
+
+@router.get("/{schedule_id}", response_model=ScheduleResponse)
+async def get_schedule(schedule_id: int, db: AsyncSession = Depends(get_db)):
+    """获取定时计划详情"""
+    return await _get_schedule_or_404(db, schedule_id)
+
+
+@router.put("/{schedule_id}", response_model=ScheduleResponse)
+async def update_schedule(
+    schedule_id: int,
+    schedule_in: ScheduleUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """更新定时计划（修改 Cron / 时区 / 生效区间 / 启用状态后重新计算下次触发时间）"""
+    schedule = await _get_schedule_or_404(db, schedule_id)
+    update_data = schedule_in.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(schedule, field, value)
+    if not schedule.timezone:
+        schedule.timezone = settings.SCHEDULER_DEFAULT_TIMEZONE
+    await _validate_schedule(db, schedule)
+    if _TIMING_FIELDS & update_data.keys():
+        plan_schedule_next_run(schedule, datetime.now(timezone.utc))
+
+    await db.commit()
+    await db.refresh(schedule)
+    scheduler = await get_scheduler()
+    scheduler.notify_schedule(schedule.id, schedule.next_run_at)
+    return schedule
+
+
+@router.delete("/{schedule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_schedule(
+    schedule_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """删除定时计划（已创建的测试执行保留）"""
+    schedule = await _get_schedule_or_404(db, schedule_id)
+    await db.delete(schedule)
+    await db.commit()
+
+
+@router.post("/{schedule_id}/run", response_model=ScheduleResponse, status_code=status.HTTP_202_ACCEPTED)
+async def run_schedule_now(
+    schedule_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """立即触发一次（不影响下次触发时间）"""
+    schedule = await _get_schedule_or_404(db, schedule_id)
+    executions = []
+    if schedule.test_case_id:
+        execution = build_schedule_execution(schedule)
+        db.add(execution)
+        await db.flush()
+        schedule.last_execution_id = execution.id
+        executions.append((execution.id, schedule.project_id))
+    schedule.last_run_at = datetime.now(timezone.utc)
+    await db.commit()
+    await db.refresh(schedule)
+    await launch_schedule_targets(executions, [schedule.id] if schedule.test_plan_id else [])
+    await db.refresh(schedule)
+    return schedule
+
+
+@router.get("/{schedule_id}/executions")
+async def get_schedule_executions(
+    schedule_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取定时计划触发的测试执行"""
+    await _get_schedule_or_404(db, schedule_id)
+    result = await db.execute(
+        select(TestExecution)
+        .options(load_only(*LIST_COLUMNS))
+        .where(TestExecution.schedule_id == schedule_id)
+        .order_by(TestExecution.created_at.desc(), TestExecution.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return {"items": [TestExecutionListItem.model_validate(execution) for execution in result.scalars().all()]}
@@ -1,24 +1,43 @@
 """
 测试执行管理API
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, delete
+from sqlalchemy import select, and_, func, delete, update
 from typing import Optional, List, Any, Dict, Tuple
-from datetime import datetime
+from datetime import datetime, timezone
 import json
-import httpx
-import copy
 import asyncio
 
+from app.core.config import settings
 from app.core.database import get_db, AsyncSessionLocal
-from app.core.dependencies import get_current_active_user
+from app.core.http_client import HttpClientRegistry, get_http_client_registry
+from app.core.dependencies import get_current_active_user, get_current_active_user_allow_query, authenticate_access_token
 from app.models.test_execution import TestExecution, ExecutionStatus
-from app.models.test_data_config import TestDataConfig, TestCaseTestDataConfig
 from app.models.user import User
 from app.models.environment import Environment
-from app.schemas.test_execution import TestExecutionCreate, TestExecutionResponse
-from app.services.report_service import ReportService
+from app.models.schedule import Schedule
+from app.schemas.test_execution import TestExecutionCreate, TestExecutionResponse, TestExecutionCreateResponse, TestExecutionListItem
+from app.schemas.schedule import ScheduleResponse
+from app.utils.pagination import encode_cursor, keyset_before
+from sqlalchemy.orm import load_only
+from app.services.report_service import ReportService, LIST_COLUMNS, build_execution_summary
+from app.services.execution_rollup import rollup_finished_executions, unroll_executions
+from app.services.execution_plan import ExecutionPlan, get_execution_plan, auto_convert_type
+from app.services.execution_log import ExecutionLogWriter, read_execution_logs
+from app.services.execution_events import ExecutionProgress, get_execution_event_bus, FINISHED
+from app.services.step_result_store import StepResultWriter, list_step_results, get_step_detail, step_summary_dict
+from app.services.concurrency_control import ConcurrencyConfig, AdaptiveConcurrencyController, target_host, run_worker_pool
+from app.services.test_data_rows import TestDataRows
+from app.services.scheduled_execution_scheduler import (
+    get_scheduler, compute_next_run_at, plan_schedule_next_run, legacy_schedule_fields,
+)
+from app.services.token_auth import obtain_token
+from app.services.variable_extractors import process_extractors
+from app.services.workflow_engine import WorkflowDefinition, WorkflowRun
+from app.utils import json_path
+from app.utils.template import render as render_template, render_string as render_template_string
 from pydantic import BaseModel
 from sqlalchemy import select
 
@@ -96,37 +115,108 @@ def _infer_json_path(field_name: str, response_template: Optional[Dict[str, Any]
     return path
 
 
+async def _execute_workflow_rows(
+    workflow: WorkflowDefinition,
+    data_rows: TestDataRows,
+    base_url: str,
+    variable_pool: Dict[str, Any],
+    lines: List[str],
+    http_clients: HttpClientRegistry,
+    progress: ExecutionProgress,
+    step_results: StepResultWriter,
+    workers: int,
+) -> Tuple[int, int]:
+    """多接口用例：每行数据按 DAG 执行一次流程，返回 (通过行数, 失败行数)"""
+    counts = {"passed": 0, "failed": 0}
+    total_rows = data_rows.total
+
+    async def run_row(item):
+        index, test_data = item
+        label = f"[数据 {index}] " if total_rows > 1 else ""
+        # 与数据驱动单接口执行一致，逐行容错：进度发布、步骤结果写入失败只记为该行失败，不中止执行池
+        try:
+            status = await execute_row(index, test_data, label)
+        except Exception as e:
+            lines.append(f"{label}执行出错: {str(e)}")
+            status = "failed"
+        counts["passed" if status == "passed" else "failed"] += 1
+
+    async def execute_row(index: int, test_data: Dict[str, Any], label: str) -> str:
+        await progress.row_started(index)
+        try:
+            outcome = await WorkflowRun(
+                workflow,
+                base_url,
+                {**variable_pool, **test_data},
+                http_clients,
+                evaluate_assertions=_evaluate_assertions,
+                lines=lines,
+                label=label,
+            ).run()
+        except Exception as e:
+            lines.append(f"{label}执行出错: {str(e)}")
+            outcome = {"status": "failed", "steps": [], "error": str(e)}
+
+        executed = [step for step in outcome["steps"] if step.get("request")]
+        # 步骤结果表的摘要列取第一个失败的步骤（全部通过时取最后一个步骤）
+        focus = next((step for step in executed if step["status"] != "passed"), executed[-1] if executed else {})
+        status = outcome["status"]
+        lines.append(
+            f"{label}流程执行结果: {status}，耗时 {outcome.get('elapsed_ms', 0)}ms"
+            f"（步骤耗时合计 {outcome.get('serial_ms', 0)}ms，复用缓存响应 {outcome.get('cache_hits', 0)} 次）"
+        )
+        await progress.row_finished(index, status)
+        await step_results.add(index, {
+            "data_index": index,
+            "name": f"流程执行 [{index}/{total_rows}]",
+            "status": status,
+            "test_data": {k: v for k, v in test_data.items() if not k.startswith('__')},
+            "steps": outcome["steps"],
+            "request": focus.get("request"),
+            "response": focus.get("response"),
+            "assertions": [a for step in outcome["steps"] for a in step.get("assertions") or []],
+            "error": outcome.get("error") or focus.get("error"),
+            "elapsed_ms": outcome.get("elapsed_ms"),
+            "cache_hits": outcome.get("cache_hits", 0),
+        })
+        return status
+
+    await run_worker_pool(data_rows, run_row, workers=workers, queue_size=settings.EXECUTION_ROW_QUEUE_SIZE)
+    return counts["passed"], counts["failed"]
+
+
 async def _execute_single_data_driven_test(
     test_data: Dict[str, Any],
     data_index: int,
-    request_info_template: Dict[str, Any],
-    assertions_cfg: List[Dict[str, Any]],
+    plan: ExecutionPlan,
     base_url: str,
     lines: List[str],
-    extractors_cfg: Optional[List[Dict[str, Any]]] = None,
     variable_pool: Optional[Dict[str, Any]] = None,
     token_config: Optional[Dict[str, Any]] = None,
     token_lock: Optional[asyncio.Lock] = None,
-    skip_token_check: bool = False  # 是否跳过Token检查（并发执行前已统一获取时使用）
+    skip_token_check: bool = False,  # 是否跳过Token检查（并发执行前已统一获取时使用）
+    http_clients: Optional[HttpClientRegistry] = None,
 ) -> Dict[str, Any]:
     """执行单个数据驱动测试
     
     Args:
         test_data: 测试数据
         data_index: 数据索引
-        request_info_template: 请求信息模板
-        assertions_cfg: 断言配置
+        plan: 测试用例执行计划（请求模板、断言、提取器）
         base_url: 基础URL
         lines: 日志行列表
-        extractors_cfg: 提取器配置（可选）
         variable_pool: 变量池（可选），用于存储提取的变量
         token_config: Token 配置（可选），用于自动刷新 token
+        http_clients: HTTP 客户端注册表（可选），同一次执行的所有数据行共享连接池
     
     Returns:
         执行结果
     """
     import asyncio
     
+    if http_clients is None:
+        http_clients = get_http_client_registry()
+    
     # 如果配置了 token_config 且变量池中没有 token，先获取 token
     # 在并发执行时，如果已经在执行前统一获取了Token，则跳过检查
     if not skip_token_check:
@@ -149,7 +239,7 @@ async def _execute_single_data_driven_test(
                         # 再次检查，可能其他任务已经获取了Token
                         if token_name not in variable_pool:
                             lines.append(f"\n🔑 首次获取 Token ({token_name})...")
-                            success, message = await _refresh_token(token_config, base_url, variable_pool, lines)
+                            success, message = await obtain_token(token_config, base_url, variable_pool, lines, http_clients)
                             if success:
                                 lines.append(f"✓ {message}")
                             else:
@@ -159,7 +249,7 @@ async def _execute_single_data_driven_test(
                 else:
                     # 串行执行模式：直接获取
                     lines.append(f"\n🔑 首次获取 Token ({token_name})...")
-                    success, message = await _refresh_token(token_config, base_url, variable_pool, lines)
+                    success, message = await obtain_token(token_config, base_url, variable_pool, lines, http_clients)
                     if success:
                         lines.append(f"✓ {message}")
                     else:
@@ -181,156 +271,12 @@ async def _execute_single_data_driven_test(
         test_data = merged_data
     
     # 新的数据驱动逻辑：每行数据包含 request 和 assertions
-    test_request = test_data.get("request") or test_data.get("request_params")
-    test_assertions = test_data.get("assertions")
-    
-    # 确定使用的请求配置
-    if test_request:
-        if isinstance(test_request, str):
-            try:
-                test_request = json.loads(test_request)
-            except:
-                test_request = {}
-        request_info = copy.deepcopy(request_info_template)
-        if test_request.get("body") is not None:
-            # 如果test_request中有body字段，使用它
-            request_info["body"] = test_request["body"]
-        elif test_request:
-            # 如果test_request中没有body字段，但有其他字段，深度合并到模板body中
-            def deep_merge_body(template_body, data):
-                """深度合并：将数据字段更新到模板body的嵌套结构中，保持模板字段的类型"""
-                if not isinstance(template_body, dict):
-                    return template_body
-                result = copy.deepcopy(template_body)
-                
-                # 类型转换函数：根据模板类型转换数据值
-                def convert_to_template_type(template_value, data_value):
-                    """根据模板值的类型，转换数据值"""
-                    # 如果模板是数组
-                    if isinstance(template_value, list):
-                        if isinstance(data_value, list):
-                            return data_value
-                        elif isinstance(data_value, str):
-                            if data_value.strip() == "":
-                                return []
-                            elif data_value.startswith('['):
-                                try:
-                                    parsed = json.loads(data_value)
-                                    return parsed if isinstance(parsed, list) else [data_value]
-                                except:
-                                    return [data_value]
-                            else:
-                                return [data_value]
-                        elif data_value is None or data_value == "":
-                            return []
-                        else:
-                            return [data_value]
-                    # 如果模板是数字
-                    elif isinstance(template_value, (int, float)):
-                        if isinstance(data_value, (int, float)):
-                            return data_value
-                        elif isinstance(data_value, str):
-                            try:
-                                return int(data_value) if '.' not in str(data_value) else float(data_value)
-                            except:
-                                return template_value
-                        else:
-                            return template_value
-                    # 如果模板是布尔值
-                    elif isinstance(template_value, bool):
-                        if isinstance(data_value, bool):
-                            return data_value
-                        elif isinstance(data_value, str):
-                            if data_value.lower() in ('true', '1', 'yes'):
-                                return True
-                            elif data_value.lower() in ('false', '0', 'no', ''):
-                                return False
-                            else:
-                                return template_value
-                        elif isinstance(data_value, (int, float)):
-                            return bool(data_value)
-                        else:
-                            return template_value
-                    # 如果模板是字符串
-                    elif isinstance(template_value, str):
-                        return str(data_value) if data_value is not None else ""
-                    # 其他类型，直接使用数据值
-                    else:
-                        return data_value
-                
-                def update_nested(obj, data_dict):
-                    if not isinstance(obj, dict):
-                        return obj
-                    for key, value in obj.items():
-                        if isinstance(value, dict):
-                            obj[key] = update_nested(value, data_dict)
-                            for data_key, data_value in data_dict.items():
-                                if data_key in obj[key]:
-                                    # 根据模板类型转换后再赋值
-                                    obj[key][data_key] = convert_to_template_type(
-                                        obj[key][data_key], 
-                                        data_value
-                                    )
-                        elif key in data_dict:
-                            # 根据模板类型转换后更新
-                            obj[key] = convert_to_template_type(value, data_dict[key])
-                    return obj
-                result = update_nested(result, data)
-                return result
-            template_body = request_info_template.get("body")
-            if isinstance(template_body, dict):
-                request_info["body"] = deep_merge_body(template_body, test_request)
-            else:
-                request_info["body"] = test_request
-        # 合并其他字段
-        if test_request.get("headers"):
-            request_info["headers"] = {**request_info.get("headers", {}), **test_request["headers"]}
-        if test_request.get("params"):
-            request_info["params"] = {**request_info.get("params", {}), **test_request["params"]}
-        if test_request.get("path"):
-            request_info["path"] = test_request["path"]
-        if test_request.get("method"):
-            request_info["method"] = test_request["method"]
-    else:
-        request_info = _apply_test_data(request_info_template, test_data)
-    
-    # 确定使用的断言配置
-    current_assertions = assertions_cfg
-    if test_assertions:
-        if isinstance(test_assertions, str):
-            try:
-                current_assertions = json.loads(test_assertions)
-            except:
-                current_assertions = assertions_cfg
-        elif isinstance(test_assertions, list):
-            current_assertions = test_assertions
-        else:
-            current_assertions = assertions_cfg
-    else:
-        # 尝试从expected_*字段自动生成断言
-        auto_generated_assertions = _generate_assertions_from_data(test_data)
-        if auto_generated_assertions:
-            if assertions_cfg:
-                has_status_code = any(a.get('type') == 'status_code' for a in auto_generated_assertions)
-                if has_status_code:
-                    current_assertions = [a for a in assertions_cfg if a.get('type') != 'status_code']
-                else:
-                    current_assertions = list(assertions_cfg)
-                current_assertions.extend(auto_generated_assertions)
-            else:
-                current_assertions = auto_generated_assertions
+    request_info, _ = plan.bind_request(test_data)
+    current_assertions, _ = _resolve_row_assertions(plan, test_data)
+    extractors_cfg = plan.extractors
     
     # 构建URL
-    path = request_info.get("path") or ""
-    if isinstance(path, str) and "${" in path:
-        import re
-        def replacer(match):
-            key = match.group(1)
-            value = test_data.get(key)
-            if value is None:
-                return match.group(0)
-            return str(value)
-        path = re.sub(r'\$\{(\w+)\}', replacer, path)
+    path = render_template_string(request_info.get("path") or "", test_data)
     
     url = f"{base_url}{path}" if base_url and not path.startswith("http") else path
     
@@ -342,125 +288,106 @@ async def _execute_single_data_driven_test(
     http_status: Optional[int] = None
     response_json: Any = None
     response_text: str = ""
+    latency_ms: Optional[int] = None
     error_message: Optional[str] = None
     max_retries = 1  # Token 刷新后最多重试 1 次
     retry_count = 0
     
-    # 辅助函数：替换变量
-    def replace_variables_in_value(value: Any, var_pool: Dict[str, Any]) -> Any:
-        """在值中替换变量"""
-        import re
-        if isinstance(value, dict):
-            return {k: replace_variables_in_value(v, var_pool) for k, v in value.items()}
-        elif isinstance(value, list):
-            return [replace_variables_in_value(item, var_pool) for item in value]
-        elif isinstance(value, str) and "${" in value:
-            def replacer(match):
-                key = match.group(1)
-                return str(var_pool.get(key, match.group(0)))
-            return re.sub(r'\$\{(\w+)\}', replacer, value)
-        else:
-            return value
-    
     while retry_count <= max_retries:
         try:
-            async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
-                # 每次请求前，如果有变量池，需要应用变量（第一次请求和重试都需要）
-                if variable_pool:
-                    # 重新构建请求头、参数、body，应用变量
-                    headers = request_info.get("headers", {})
-                    params = request_info.get("params", {})
-                    body = request_info.get("body")
+            client = http_clients.get_client(verify=False)
+            # 每次请求前，如果有变量池，需要应用变量（第一次请求和重试都需要）
+            if variable_pool:
+                # 重新构建请求头、参数、body，应用变量
+                headers = request_info.get("headers", {})
+                params = request_info.get("params", {})
+                body = request_info.get("body")
                     
-                    # 调试：检查变量池中的token
-                    token_vars = {k: "已设置" for k in variable_pool.keys() if 'token' in k.lower() or 'auth' in k.lower()}
-                    if token_vars:
-                        lines.append(f"[调试] 变量池中的Token变量: {list(token_vars.keys())}")
-                    else:
-                        lines.append(f"[调试] 变量池中没有Token变量，当前变量: {list(variable_pool.keys())}")
+                # 调试：检查变量池中的token
+                token_vars = {k: "已设置" for k in variable_pool.keys() if 'token' in k.lower() or 'auth' in k.lower()}
+                if token_vars:
+                    lines.append(f"[调试] 变量池中的Token变量: {list(token_vars.keys())}")
+                else:
+                    lines.append(f"[调试] 变量池中没有Token变量，当前变量: {list(variable_pool.keys())}")
                     
-                    # 替换 headers 中的变量
-                    if isinstance(headers, dict):
-                        # 检查headers中是否有变量占位符
-                        has_vars = any(isinstance(v, str) and "${" in v for v in headers.values())
-                        if has_vars:
-                            lines.append(f"[调试] 检测到headers中有变量占位符，开始替换...")
-                        headers = replace_variables_in_value(headers, variable_pool)
-                        # 检查替换后的headers
-                        if has_vars:
-                            still_has_vars = any(isinstance(v, str) and "${" in v for v in headers.values())
-                            if still_has_vars:
-                                lines.append(f"[警告] headers中仍有未替换的变量: {[k for k, v in headers.items() if isinstance(v, str) and '${' in v]}")
-                            else:
-                                lines.append(f"[调试] headers变量替换成功")
+                # 替换 headers 中的变量
+                if isinstance(headers, dict):
+                    # 检查headers中是否有变量占位符
+                    has_vars = any(isinstance(v, str) and "${" in v for v in headers.values())
+                    if has_vars:
+                        lines.append(f"[调试] 检测到headers中有变量占位符，开始替换...")
+                    headers = render_template(headers, variable_pool, typed=False)
+                    # 检查替换后的headers
+                    if has_vars:
+                        still_has_vars = any(isinstance(v, str) and "${" in v for v in headers.values())
+                        if still_has_vars:
+                            lines.append(f"[警告] headers中仍有未替换的变量: {[k for k, v in headers.items() if isinstance(v, str) and '${' in v]}")
+                        else:
+                            lines.append(f"[调试] headers变量替换成功")
                     
-                    # 替换 params 中的变量
-                    if isinstance(params, dict):
-                        params = replace_variables_in_value(params, variable_pool)
+                # 替换 params 中的变量
+                if isinstance(params, dict):
+                    params = render_template(params, variable_pool, typed=False)
                     
-                    # 替换 body 中的变量
-                    if body is not None:
-                        body = replace_variables_in_value(body, variable_pool)
+                # 替换 body 中的变量
+                if body is not None:
+                    body = render_template(body, variable_pool, typed=False)
                     
-                    # 替换 URL 中的变量
-                    if isinstance(url, str) and "${" in url:
-                        import re
-                        def replacer(match):
-                            key = match.group(1)
-                            return str(variable_pool.get(key, match.group(0)))
-                        url = re.sub(r'\$\{(\w+)\}', replacer, url)
+                # 替换 URL 中的变量
+                url = render_template_string(url, variable_pool)
                 
-                method = (request_info.get("method") or "GET").upper()
-                # 记录请求信息（仅在并发执行时，避免日志过多）
-                lines.append(f"\n[数据 {data_index}] 发送 {method} 请求: {url}")
-                if method in ("GET", "DELETE"):
-                    resp = await client.request(method, url, headers=headers, params=params)
-                else:
-                    resp = await client.request(
-                        method, url, headers=headers, params=params, json=body
-                    )
+            method = (request_info.get("method") or "GET").upper()
+            # 记录请求信息（仅在并发执行时，避免日志过多）
+            lines.append(f"\n[数据 {data_index}] 发送 {method} 请求: {url}")
+            if method in ("GET", "DELETE"):
+                resp = await client.request(method, url, headers=headers, params=params)
+            else:
+                resp = await client.request(
+                    method, url, headers=headers, params=params, json=body
+                )
                 
-                http_status = resp.status_code
-                response_text = resp.text
-                lines.append(f"[数据 {data_index}] 响应状态码: {http_status}")
+            http_status = resp.status_code
+            response_text = resp.text
+            latency_ms = int(resp.elapsed.total_seconds() * 1000)
+            lines.append(f"[数据 {data_index}] 响应状态码: {http_status}")
                 
-                try:
-                    response_json = resp.json()
-                except:
-                    response_json = None
+            try:
+                response_json = resp.json()
+            except:
+                response_json = None
                 
-                # 检查是否需要刷新 Token
-                if token_config and variable_pool is not None:
-                    retry_status_codes = token_config.get("retry_status_codes", [401, 403])
-                    if http_status in retry_status_codes and retry_count < max_retries:
-                        lines.append(f"\n⚠ 检测到状态码 {http_status}，尝试刷新 Token...")
-                        success, message = await _refresh_token(token_config, base_url, variable_pool, lines)
-                        if success:
-                            lines.append(f"✓ {message}")
-                            retry_count += 1
-                            continue  # 重试请求
-                        else:
-                            lines.append(f"✗ {message}")
-                            error_message = f"Token 刷新失败: {message}"
-                            break
+            # 检查是否需要刷新 Token
+            if token_config and variable_pool is not None:
+                retry_status_codes = token_config.get("retry_status_codes", [401, 403])
+                if http_status in retry_status_codes and retry_count < max_retries:
+                    lines.append(f"\n⚠ 检测到状态码 {http_status}，尝试刷新 Token...")
+                    success, message = await obtain_token(token_config, base_url, variable_pool, lines, http_clients, force_refresh=True)
+                    if success:
+                        lines.append(f"✓ {message}")
+                        retry_count += 1
+                        continue  # 重试请求
+                    else:
+                        lines.append(f"✗ {message}")
+                        error_message = f"Token 刷新失败: {message}"
+                        break
                 
-                # 处理变量提取（仅在第一次请求成功时）
-                if retry_count == 0 and extractors_cfg and variable_pool is not None:
-                    updated_pool, extract_logs = _process_extractors(
-                        extractors_cfg, 
-                        response_json, 
-                        response_text,
-                        variable_pool
-                    )
-                    # 更新变量池
-                    variable_pool.update(updated_pool)
-                    # 将提取日志添加到测试日志中
-                    if extract_logs:
-                        lines.append("\n== 变量提取 ==")
-                        lines.extend(extract_logs)
+            # 处理变量提取（仅在第一次请求成功时）
+            if retry_count == 0 and extractors_cfg and variable_pool is not None:
+                updated_pool, extract_logs = process_extractors(
+                    extractors_cfg, 
+                    response_json, 
+                    response_text,
+                    variable_pool
+                )
+                # 更新变量池
+                variable_pool.update(updated_pool)
+                # 将提取日志添加到测试日志中
+                if extract_logs:
+                    lines.append("\n== 变量提取 ==")
+                    lines.extend(extract_logs)
                 
-                # 请求成功，退出循环
-                break
+            # 请求成功，退出循环
+            break
         
         except Exception as e:
             error_message = f"HTTP请求失败: {str(e)}"
@@ -503,7 +430,8 @@ async def _execute_single_data_driven_test(
         "response": {
             "status_code": http_status,
             "body": response_json,
-            "text": response_text[:1000] if response_text else None
+            "text": response_text[:1000] if response_text else None,
+            "latency_ms": latency_ms,
         },
         "assertions": assertion_results,
         "error": error_message
@@ -609,7 +537,7 @@ def _generate_assertions_from_data(test_data: Dict[str, Any], response_template:
             else:
                 # 完整配置：使用传统的 JSONPath 断言
                 json_path = _infer_json_path(field_name, response_template)
-                expected_value = _auto_convert_type(value)
+                expected_value = auto_convert_type(value)
                 
                 assertions.append({
                     "type": "json_path",
@@ -621,218 +549,25 @@ def _generate_assertions_from_data(test_data: Dict[str, Any], response_template:
     return assertions
 
 
-def _parse_array_field(value: str, delimiter: str = ',') -> List[Any]:
-    """解析数组字段值，支持分隔符和JSON格式
-    
-    Args:
-        value: 字段值，可以是分隔符分隔的字符串或JSON数组字符串
-        delimiter: 分隔符，默认为逗号
-    
-    Returns:
-        解析后的数组
-    """
-    if not isinstance(value, str):
-        return [value]
-    
-    value = value.strip()
-    if not value:
-        return []
-    
-    # 尝试作为JSON数组解析
-    if value.startswith('['):
-        try:
-            parsed = json.loads(value)
-            if isinstance(parsed, list):
-                return parsed
-        except json.JSONDecodeError:
-            pass
-    
-    # 使用分隔符分隔
-    items = [item.strip() for item in value.split(delimiter)]
-    
-    # 尝试类型转换
-    result = []
-    for item in items:
-        if not item:
-            continue
-        # 尝试转换为数字
-        try:
-            if '.' in item:
-                result.append(float(item))
-            else:
-                result.append(int(item))
-        except ValueError:
-            # 尝试转换为布尔值
-            if item.lower() == 'true':
-                result.append(True)
-            elif item.lower() == 'false':
-                result.append(False)
-            elif item.lower() == 'null':
-                result.append(None)
-            else:
-                result.append(item)
-    
-    return result
+def _resolve_row_assertions(
+    plan: ExecutionPlan, test_data: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+    """确定数据行使用的断言配置
 
+    数据行中的 assertions 字段优先；否则根据 expected_* 字段自动生成断言，
+    并与用例配置中的断言合并（自动生成的状态码断言覆盖用例配置中的状态码断言）。
 
-def _auto_convert_type(value: Any) -> Any:
-    """自动转换值的类型
-    
-    Args:
-        value: 原始值
-    
     Returns:
-        转换后的值
-    """
-    if not isinstance(value, str):
-        return value
-    
-    value = value.strip()
-    
-    # 空字符串
-    if not value:
-        return value
-    
-    # 布尔值
-    if value.lower() == 'true':
-        return True
-    elif value.lower() == 'false':
-        return False
-    elif value.lower() == 'null':
-        return None
-    
-    # 尝试JSON解析
-    if value.startswith(('{', '[')):
-        try:
-            return json.loads(value)
-        except json.JSONDecodeError:
-            pass
-    
-    # 尝试数字
-    try:
-        if '.' in value:
-            return float(value)
-        else:
-            return int(value)
-    except ValueError:
-        pass
-    
-    # 保持字符串
-    return value
-
-
-def _apply_test_data(template: Dict[str, Any], test_data: Dict[str, Any]) -> Dict[str, Any]:
-    """将测试数据应用到请求模板中，支持在URL、headers、params、body等位置使用变量替换
-    
-    增强功能：
-    - 支持数组字段处理（分隔符、JSON格式）
-    - 支持类型自动转换（数字、布尔值、null）
-    - 支持嵌套对象和数组
-    - 支持字段名后缀识别（如 user_ids_1, user_ids_2 合并为数组）
+        (断言配置, 数据行中显式配置的断言；未配置时为 None)
     """
-    import copy
-    import re
-    import json
-    result = copy.deepcopy(template)
-    
-    # 预处理测试数据：识别并合并数组字段（如 user_ids_1, user_ids_2 -> user_ids: [...]）
-    processed_test_data = {}
-    array_fields = {}  # {base_name: [value1, value2, ...]}
-    
-    for key, value in test_data.items():
-        # 检查是否是数组字段后缀格式（如 user_ids_1）
-        match = re.match(r'^(.+)_(\d+)$', key)
-        if match:
-            base_name = match.group(1)
-            index = int(match.group(2))
-            if base_name not in array_fields:
-                array_fields[base_name] = {}
-            array_fields[base_name][index] = value
-        else:
-            processed_test_data[key] = value
-    
-    # 合并数组字段
-    for base_name, values_dict in array_fields.items():
-        # 按索引排序并合并
-        sorted_values = [values_dict[i] for i in sorted(values_dict.keys())]
-        # 过滤空值
-        sorted_values = [v for v in sorted_values if v is not None and v != '']
-        if sorted_values:
-            processed_test_data[base_name] = sorted_values
-    
-    # 递归替换函数，支持 ${key} 格式的变量替换
-    def replace_vars(obj: Any, template_value: Any = None) -> Any:
-        if isinstance(obj, dict):
-            return {k: replace_vars(v, template_value.get(k) if isinstance(template_value, dict) else None) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [replace_vars(item) for item in obj]
-        elif isinstance(obj, str):
-            # 检查是否整个字符串就是一个变量（如 "${user_ids}"）
-            full_var_match = re.fullmatch(r'\$\{(\w+)\}', obj)
-            if full_var_match:
-                key = full_var_match.group(1)
-                value = processed_test_data.get(key)
-                if value is not None:
-                    # 检查模板中该位置是否应该是数组
-                    if isinstance(template_value, list) and isinstance(value, str):
-                        # 模板是数组，尝试将值解析为数组
-                        return _parse_array_field(value)
-                    elif isinstance(value, list):
-                        # 值本身是数组，直接返回
-                        return value
-                    else:
-                        # 自动类型转换
-                        return _auto_convert_type(value)
-                return match.group(0)  # 变量不存在，保持原样
-            
-            # 支持 ${key} 格式的部分变量替换（如 "user_${id}"）
-            def replacer(match):
-                key = match.group(1)
-                value = processed_test_data.get(key)
-                if value is None:
-                    return match.group(0)  # 如果变量不存在，保持原样
-                # 如果值是对象或数组，转换为JSON字符串
-                if isinstance(value, (dict, list)):
-                    return json.dumps(value, ensure_ascii=False)
-                return str(value)
-            return re.sub(r'\$\{(\w+)\}', replacer, obj)
-        else:
-            return obj
-    
-    # 替换所有位置的变量
-    result = replace_vars(result, template)
-    
-    # 特殊处理：如果path中包含变量，需要替换
-    if isinstance(result.get("path"), str):
-        result["path"] = replace_vars(result["path"])
-    
-    # 特殊处理：如果body是字符串且包含JSON，尝试解析后替换
-    if isinstance(result.get("body"), str):
-        try:
-            # 先替换变量
-            body_str = replace_vars(result["body"])
-            # 尝试解析为JSON
-            parsed_body = json.loads(body_str)
-            result["body"] = replace_vars(parsed_body, template.get("body") if isinstance(template, dict) else None)
-        except (json.JSONDecodeError, TypeError):
-            # 如果解析失败，直接使用替换后的字符串
-            result["body"] = body_str
-    
-    # 如果body是字典，只替换其中的变量，不要直接合并测试数据
-    # 测试数据应该通过 ${key} 格式在body中引用，而不是直接合并
-    if isinstance(result.get("body"), dict):
-        # 只替换body中的变量，不合并测试数据
-        result["body"] = replace_vars(result["body"], template.get("body") if isinstance(template, dict) else None)
-    elif result.get("body") is None and test_data:
-        # 如果body为空，直接使用测试数据作为body（排除expected_*字段）
-        filtered_data = {k: v for k, v in processed_test_data.items() if not k.startswith('expected_')}
-        result["body"] = filtered_data
-    
-    return result
+    row_assertions = plan.row_assertions(test_data)
+    if row_assertions is not None:
+        return row_assertions, row_assertions
+    return plan.merge_generated_assertions(_generate_assertions_from_data(test_data)), None
 
 
 def _find_field_in_response(data: Any, field_name: str) -> Any:
-    """递归搜索响应中的字段，返回第一个匹配的值
+    """递归搜索响应中的字段（等价于 $..field_name），返回第一个非 None 的值
     
     Args:
         data: 响应数据（dict 或 list）
@@ -847,25 +582,7 @@ def _find_field_in_response(data: Any, field_name: str) -> Any:
     """
     if data is None:
         return None
-    
-    # 如果是字典，检查是否包含目标字段
-    if isinstance(data, dict):
-        if field_name in data:
-            return data[field_name]
-        # 递归搜索所有子字段
-        for value in data.values():
-            result = _find_field_in_response(value, field_name)
-            if result is not None:
-                return result
-    
-    # 如果是数组，递归搜索每个元素
-    elif isinstance(data, list):
-        for item in data:
-            result = _find_field_in_response(item, field_name)
-            if result is not None:
-                return result
-    
-    return None
+    return json_path.find_first(data, field_name)
 
 
 def _smart_match(actual: Any, expected: str) -> bool:
@@ -932,499 +649,66 @@ def _smart_match(actual: Any, expected: str) -> bool:
     return False
 
 
-def _normalize_token(token: str, add_bearer: bool = True) -> str:
-    """规范化 token，自动添加 Bearer 前缀（如果需要）
-    
-    Args:
-        token: 原始 token 字符串
-        add_bearer: 是否自动添加 Bearer 前缀（如果还没有）
+def _extract_json_path(data: Any, path: str) -> Any:
+    """按 JSONPath 取值（路径编译后缓存，见 app.utils.json_path）
     
-    Returns:
-        规范化后的 token
+    单值路径（如 $.a.b[0].c）返回该值；包含通配符、过滤、切片、递归下降的路径返回匹配列表。
+    路径无效或没有匹配时返回 None。
     """
-    if not token:
-        return token
-    
-    token = token.strip()
-    
-    # 如果配置了自动添加 Bearer，且 token 还没有 Bearer 前缀
-    if add_bearer and not token.lower().startswith('bearer '):
-        return f"Bearer {token}"
-    
-    return token
+    return json_path.extract(data, path)
 
 
-async def _refresh_token(
-    token_config: Dict[str, Any],
-    base_url: str,
-    variable_pool: Dict[str, Any],
-    lines: Optional[List[str]] = None
-) -> Tuple[bool, str]:
-    """刷新 Token
+def _replace_template_variables(template: Any, test_data: Dict[str, Any]) -> Any:
+    """在模板中递归替换变量
     
     Args:
-        token_config: Token 配置，格式：
-            {
-                "url": "/api/auth/login",  # Token 接口 URL
-                "method": "POST",           # 请求方法
-                "headers": {...},           # 请求头
-                "body": {...},              # 请求体
-                "extractors": [             # 提取器配置
-                    {"name": "token", "type": "json", "path": "$.data.token"}
-                ],
-                "retry_status_codes": [401, 403]  # 触发刷新的状态码
-            }
-        base_url: 基础 URL
-        variable_pool: 变量池，用于存储提取的 token
-        lines: 日志列表（可选）
+        template: 模板对象（可以是dict、list、str等）
+        test_data: 测试数据
     
     Returns:
-        (是否成功, 错误信息)
+        替换后的对象
     """
-    # 检查是否需要自动添加 Bearer 前缀（默认启用）
-    add_bearer_prefix = token_config.get("add_bearer_prefix", True)
-    
-    try:
-        url = token_config.get("url", "")
-        if not url:
-            return False, "Token 配置缺少 url 字段"
-        
-        # 构造完整 URL
-        if not url.startswith("http"):
-            if not url.startswith("/"):
-                url = "/" + url
-            url = f"{base_url}{url}"
-        
-        method = token_config.get("method", "POST").upper()
-        headers = token_config.get("headers", {})
-        body = token_config.get("body", {})
-        params = token_config.get("params", {})
-        
-        # 检查 Content-Type，决定使用 json 还是 data（表单数据）
-        content_type = ""
-        if isinstance(headers, dict):
-            for key, value in headers.items():
-                if key.lower() == "content-type":
-                    content_type = str(value).lower()
-                    break
-        
-        # 发送请求获取 token（跟随重定向）
-        async with httpx.AsyncClient(timeout=30.0, verify=False, follow_redirects=True) as client:
-            if method in ("GET", "DELETE"):
-                resp = await client.request(method, url, headers=headers, params=params)
-            else:
-                # 如果是表单数据格式，使用 data；否则使用 json
-                if content_type and "application/x-www-form-urlencoded" in content_type:
-                    # 表单数据格式
-                    resp = await client.request(
-                        method, url, headers=headers, params=params, data=body
-                    )
-                else:
-                    # JSON 格式（默认）
-                    resp = await client.request(
-                        method, url, headers=headers, params=params, json=body
-                    )
-            
-            # 接受 2xx 状态码（包括 200, 201, 302 重定向后的最终响应等）
-            if not (200 <= resp.status_code < 300):
-                # 记录响应信息以便调试
-                response_preview = resp.text[:500] if resp.text else "(空响应)"
-                return False, f"Token 接口返回非 2xx 状态码: {resp.status_code}，响应预览: {response_preview}"
-            
-            # 解析响应
-            response_text = resp.text
-            response_json = None
-            try:
-                response_json = resp.json()
-            except:
-                # 如果不是 JSON，记录响应信息
-                pass
-            
-            # 记录响应信息（用于调试）
-            response_headers = dict(resp.headers)
-            if lines is not None:
-                lines.append(f"[调试] Token 接口响应状态码: {resp.status_code}")
-                lines.append(f"[调试] Token 接口响应头: {json.dumps(response_headers, ensure_ascii=False)}")
-                if response_json:
-                    lines.append(f"[调试] Token 接口响应 JSON: {json.dumps(response_json, ensure_ascii=False)}")
-                else:
-                    lines.append(f"[调试] Token 接口响应文本（前500字符）: {response_text[:500]}")
-            
-            # 提取 token
-            extractors = token_config.get("extractors", [])
-            if not extractors:
-                return False, "Token 配置缺少 extractors 字段"
-            
-            token_name = extractors[0].get("name", "token")
-            
-            # 如果响应是 JSON，使用 JSONPath 提取
-            if response_json is not None:
-                updated_pool, extract_logs = _process_extractors(
-                    extractors,
-                    response_json,
-                    response_text,
-                    variable_pool
-                )
-                
-                # 更新变量池
-                variable_pool.update(updated_pool)
-                
-                # 检查是否成功提取了 token，并规范化（添加 Bearer 前缀）
-                if token_name in variable_pool:
-                    variable_pool[token_name] = _normalize_token(variable_pool[token_name], add_bearer_prefix)
-                    return True, f"Token 刷新成功: {token_name}"
-            
-            # 如果 JSON 提取失败，尝试从响应头（Cookie）中提取
-            if token_name not in variable_pool:
-                # 检查 Set-Cookie 头
-                set_cookie = resp.headers.get("Set-Cookie", "")
-                if set_cookie:
-                    if lines is not None:
-                        lines.append(f"[调试] 尝试从 Set-Cookie 中提取 token: {set_cookie[:200]}")
-                    # 尝试从 Cookie 中提取 token（格式：token=xxx; 或 access_token=xxx;）
-                    import re
-                    cookie_patterns = [
-                        r'["\']?token["\']?\s*=\s*([^;,\s]+)',
-                        r'["\']?access_token["\']?\s*=\s*([^;,\s]+)',
-                        r'["\']?accessToken["\']?\s*=\s*([^;,\s]+)',
-                    ]
-                    for pattern in cookie_patterns:
-                        match = re.search(pattern, set_cookie, re.IGNORECASE)
-                        if match:
-                            extracted_token = match.group(1)
-                            if lines is not None:
-                                lines.append(f"[调试] 从 Set-Cookie 中提取到 token")
-                            variable_pool[token_name] = _normalize_token(extracted_token, add_bearer_prefix)
-                            return True, f"Token 已从 Set-Cookie 中提取: {token_name}"
-                
-                # 检查 httpx 的 cookies 对象（可能包含多个 cookie）
-                if hasattr(resp, 'cookies') and resp.cookies:
-                    if lines is not None:
-                        lines.append(f"[调试] 检查 httpx cookies: {dict(resp.cookies)}")
-                    import re
-                    # 尝试从 cookies 中查找 token
-                    for cookie_name, cookie_value in resp.cookies.items():
-                        cookie_name_lower = cookie_name.lower()
-                        if 'token' in cookie_name_lower or 'auth' in cookie_name_lower:
-                            if lines is not None:
-                                lines.append(f"[调试] 从 cookies 中找到可能的 token: {cookie_name}={cookie_value[:50]}...")
-                            variable_pool[token_name] = _normalize_token(str(cookie_value), add_bearer_prefix)
-                            return True, f"Token 已从 cookies 中提取: {cookie_name}"
-                
-                # 检查最终 URL（重定向后的 URL 可能包含 token）
-                final_url = str(resp.url)
-                if lines is not None:
-                    lines.append(f"[调试] 最终 URL: {final_url}")
-                # 从 URL 参数中提取 token（支持 Token、token、access_token）
-                import re
-                from urllib.parse import unquote
-                url_token_match = re.search(r'(?:Token|token|access_token)=([^&]+)', final_url, re.IGNORECASE)
-                if url_token_match:
-                    extracted_token = url_token_match.group(1)
-                    # URL 解码
-                    try:
-                        extracted_token = unquote(extracted_token)
-                    except:
-                        pass
-                    if lines is not None:
-                        lines.append(f"[调试] 从最终 URL 参数中提取到 token")
-                    variable_pool[token_name] = _normalize_token(extracted_token, add_bearer_prefix)
-                    return True, f"Token 已从最终 URL 参数中提取: {token_name}"
-            
-            # 如果 JSON 和 Cookie 都失败，尝试从响应文本中提取
-            if token_name not in variable_pool and response_text:
-                import re
-                from urllib.parse import unquote
-                
-                # 优先处理 HTML 重定向链接中的 token（如 <a href="/Help?Token=xxx">）
-                # 这是 ASP.NET 常见的重定向方式
-                href_patterns = [
-                    r'<a[^>]*href=["\']([^"\']*[?&]Token=([^&"\']+))["\']',  # <a href="/Help?Token=xxx">
-                    r'<a[^>]*href=["\']([^"\']*[?&]token=([^&"\']+))["\']',  # <a href="/Help?token=xxx">
-                    r'<a[^>]*href=["\']([^"\']*[?&]access_token=([^&"\']+))["\']',  # <a href="/Help?access_token=xxx">
-                ]
-                for pattern in href_patterns:
-                    match = re.search(pattern, response_text, re.IGNORECASE)
-                    if match:
-                        extracted_token = match.group(2)  # 提取 token 参数值
-                        # URL 解码
-                        try:
-                            extracted_token = unquote(extracted_token)
-                        except:
-                            pass
-                        if lines is not None:
-                            lines.append(f"[调试] 从 HTML 重定向链接中提取到 token（使用模式 {pattern}）")
-                        variable_pool[token_name] = _normalize_token(extracted_token, add_bearer_prefix)
-                        return True, f"Token 已从 HTML 重定向链接中提取: {token_name}"
-                
-                # 常见的 token 格式：token: "xxx", "token": "xxx", token=xxx
-                # 也支持 HTML 中的 script 标签、隐藏字段等
-                token_patterns = [
-                    # JSON 格式：{"token": "xxx"}, token: "xxx"
-                    r'["\']?token["\']?\s*[:=]\s*["\']([^"\']+)["\']',
-                    r'["\']?access_token["\']?\s*[:=]\s*["\']([^"\']+)["\']',
-                    r'["\']?accessToken["\']?\s*[:=]\s*["\']([^"\']+)["\']',
-                    # HTML 隐藏字段：<input type="hidden" name="token" value="xxx">
-                    r'<input[^>]*name=["\']?token["\']?[^>]*value=["\']([^"\']+)["\']',
-                    # JavaScript 变量：var token = "xxx"; const token = "xxx"; let token = "xxx"
-                    r'(?:var|const|let)\s+token\s*=\s*["\']([^"\']+)["\']',
-                    r'(?:var|const|let)\s+accessToken\s*=\s*["\']([^"\']+)["\']',
-                    # URL 参数格式：token=xxx（在文本中）
-                    r'(?:^|[?&])Token=([^&\s"\']+)',  # 注意：Token 首字母大写（ASP.NET 常见）
-                    r'(?:^|[?&])token=([^&\s"\']+)',
-                    r'(?:^|[?&])access_token=([^&\s"\']+)',
-                ]
-                for pattern in token_patterns:
-                    match = re.search(pattern, response_text, re.IGNORECASE)
-                    if match:
-                        extracted_token = match.group(1)
-                        # URL 解码（如果是 URL 编码的）
-                        try:
-                            extracted_token = unquote(extracted_token)
-                        except:
-                            pass
-                        if lines is not None:
-                            lines.append(f"[调试] 从响应文本中提取到 token（使用模式 {pattern}）")
-                        variable_pool[token_name] = _normalize_token(extracted_token, add_bearer_prefix)
-                        return True, f"Token 已从响应文本中提取: {token_name}"
-            
-            # 如果所有方法都失败，返回错误
-            return False, f"Token 提取失败。已尝试：JSONPath、Set-Cookie、响应文本。状态码: {resp.status_code}"
-                
-    except Exception as e:
-        return False, f"Token 刷新失败: {str(e)}"
-
-
-def _extract_json_path(data: Any, path: str) -> Any:
-    """非常轻量的 JSONPath 支持，只处理 $.a.b[0].c 这类常见写法。"""
-    if not path or not isinstance(data, (dict, list)):
-        return None
-    # 兼容两种常见前缀：$.field 和 $[0].field
-    if path.startswith("$."):
-        path = path[2:]
-    elif path.startswith("$["):
-        # 去掉开头的 $，保留数组下标部分
-        path = path[1:]
-    parts = path.split(".")
-    current: Any = data
-    for part in parts:
-        if current is None:
-            return None
-        # 处理 a[0] 这种
-        if "[" in part and part.endswith("]"):
-            name, index_part = part.split("[", 1)
-            index_str = index_part[:-1]
-            if name:
-                if not isinstance(current, dict) or name not in current:
-                    return None
-                current = current.get(name)
-            if not isinstance(current, list):
-                return None
-            try:
-                idx = int(index_str)
-            except ValueError:
-                return None
-            if idx < 0 or idx >= len(current):
-                return None
-            current = current[idx]
-        else:
-            if not isinstance(current, dict) or part not in current:
-                return None
-            current = current.get(part)
-    return current
+    if test_data is None:
+        return template
+    # 结果可能与模板共享不含占位符的子结构，调用方只读使用
+    return render_template(template, test_data, typed=False)
 
 
-def _extract_variable_by_json(response_data: Any, path: str) -> Any:
-    """通过 JSONPath 从响应中提取数据
+def _evaluate_node_assertion(
+    assertion: Dict[str, Any],
+    response_json: Any,
+    test_data: Optional[Dict[str, Any]] = None,
+) -> Tuple[bool, List[Dict[str, Any]]]:
+    """评估节点断言
     
     Args:
-        response_data: 响应数据（通常是字典）
-        path: JSONPath 表达式，如 "$.data.token"
+        assertion: 节点断言配置
+        response_json: 响应JSON数据
+        test_data: 测试数据（可选），用于变量替换
     
     Returns:
-        提取到的数据，如果路径不存在则返回 None
+        (是否通过, 详细结果列表)
     """
-    return _extract_json_path(response_data, path)
-
-
-def _extract_variable_by_regex(response_text: str, pattern: str) -> Optional[str]:
-    """通过正则表达式从响应文本中提取数据
+    path = assertion.get("path", "$")
+    mode = assertion.get("mode", "all_fields")
+    expected = assertion.get("expected", {})
+    template = assertion.get("template", {})
+    config = assertion.get("config", {})
+    operator = assertion.get("operator", "equals")
     
-    Args:
-        response_text: 响应文本
-        pattern: 正则表达式，需要包含捕获组，如 r"token=(\\w+)"
+    results = []
+    all_passed = True
     
-    Returns:
-        提取到的第一个捕获组的值，如果匹配失败则返回 None
-    """
-    import re
-    match = re.search(pattern, response_text)
-    if match:
-        # 返回第一个捕获组
-        if match.groups():
-            return match.group(1)
-        # 如果没有捕获组，返回整个匹配
-        return match.group(0)
-    return None
-
-
-def _process_extractors(
-    extractors: List[Dict[str, Any]], 
-    response_json: Any, 
-    response_text: str,
-    variable_pool: Dict[str, Any]
-) -> Tuple[Dict[str, Any], List[str]]:
-    """处理提取器配置，从响应中提取变量
+    # 提取节点值
+    node_value = _extract_json_path(response_json, path)
     
-    Args:
-        extractors: 提取器配置列表，格式：
-            [
-                {"name": "token", "type": "json", "path": "$.data.token"},
-                {"name": "userId", "type": "regex", "pattern": "userId=(\\d+)"}
-            ]
-        response_json: 响应的 JSON 数据
-        response_text: 响应的文本数据
-        variable_pool: 变量池（会被修改）
-    
-    Returns:
-        (更新后的变量池, 提取日志列表)
-    """
-    logs = []
-    
-    for extractor in extractors:
-        if not isinstance(extractor, dict):
-            logs.append(f"[警告] 提取器配置格式错误: {extractor}")
-            continue
-        
-        name = extractor.get("name")
-        extract_type = extractor.get("type", "json")
-        
-        if not name:
-            logs.append(f"[警告] 提取器缺少 'name' 字段: {extractor}")
-            continue
-        
-        extracted_value = None
-        
-        try:
-            if extract_type == "json":
-                path = extractor.get("path")
-                if not path:
-                    logs.append(f"[警告] JSON 提取器 '{name}' 缺少 'path' 字段")
-                    continue
-                extracted_value = _extract_variable_by_json(response_json, path)
-                
-            elif extract_type == "regex":
-                pattern = extractor.get("pattern")
-                if not pattern:
-                    logs.append(f"[警告] 正则提取器 '{name}' 缺少 'pattern' 字段")
-                    continue
-                extracted_value = _extract_variable_by_regex(response_text, pattern)
-                
-            elif extract_type == "header":
-                # 从响应头中提取
-                header_name = extractor.get("header")
-                if not header_name:
-                    logs.append(f"[警告] Header 提取器 '{name}' 缺少 'header' 字段")
-                    continue
-                # 注意：这里需要从实际的响应对象中获取 headers
-                # 暂时标记为不支持，后续可以扩展
-                logs.append(f"[警告] Header 提取器暂未实现: '{name}'")
-                continue
-                
-            else:
-                logs.append(f"[警告] 不支持的提取类型 '{extract_type}' for '{name}'")
-                continue
-            
-            if extracted_value is not None:
-                variable_pool[name] = extracted_value
-                # 限制日志长度
-                value_str = str(extracted_value)
-                if len(value_str) > 100:
-                    value_str = value_str[:100] + "..."
-                logs.append(f"✓ 提取变量 '{name}' = {value_str}")
-            else:
-                logs.append(f"✗ 提取变量 '{name}' 失败：未找到匹配的数据")
-                
-        except Exception as e:
-            logs.append(f"✗ 提取变量 '{name}' 失败：{str(e)}")
-    
-    return variable_pool, logs
-
-
-def _replace_template_variables(template: Any, test_data: Dict[str, Any]) -> Any:
-    """在模板中递归替换变量
-    
-    Args:
-        template: 模板对象（可以是dict、list、str等）
-        test_data: 测试数据
-    
-    Returns:
-        替换后的对象
-    """
-    import re
-    import copy
-    
-    if test_data is None:
-        return template
-    
-    def replace_value(value: Any) -> Any:
-        """递归替换变量"""
-        if isinstance(value, dict):
-            return {k: replace_value(v) for k, v in value.items()}
-        elif isinstance(value, list):
-            return [replace_value(item) for item in value]
-        elif isinstance(value, str) and "${" in value:
-            def replacer(match):
-                key = match.group(1)
-                var_value = test_data.get(key)
-                if var_value is None:
-                    return match.group(0)  # 变量不存在，保持原样
-                # 如果值是对象或数组，转换为JSON字符串
-                if isinstance(var_value, (dict, list)):
-                    return json.dumps(var_value, ensure_ascii=False)
-                return str(var_value)
-            return re.sub(r'\$\{(\w+)\}', replacer, value)
-        else:
-            return value
-    
-    return replace_value(copy.deepcopy(template))
-
-
-def _evaluate_node_assertion(
-    assertion: Dict[str, Any],
-    response_json: Any,
-    test_data: Optional[Dict[str, Any]] = None,
-) -> Tuple[bool, List[Dict[str, Any]]]:
-    """评估节点断言
-    
-    Args:
-        assertion: 节点断言配置
-        response_json: 响应JSON数据
-        test_data: 测试数据（可选），用于变量替换
-    
-    Returns:
-        (是否通过, 详细结果列表)
-    """
-    path = assertion.get("path", "$")
-    mode = assertion.get("mode", "all_fields")
-    expected = assertion.get("expected", {})
-    template = assertion.get("template", {})
-    config = assertion.get("config", {})
-    operator = assertion.get("operator", "equals")
-    
-    results = []
-    all_passed = True
-    
-    # 提取节点值
-    node_value = _extract_json_path(response_json, path)
-    
-    if node_value is None:
-        return False, [{
-            "type": "node",
-            "path": path,
-            "passed": False,
-            "message": f"节点 {path} 不存在"
-        }]
+    if node_value is None:
+        return False, [{
+            "type": "node",
+            "path": path,
+            "passed": False,
+            "message": f"节点 {path} 不存在"
+        }]
     
     # 处理不同的模式
     if mode == "all_fields":
@@ -1657,22 +941,14 @@ def _evaluate_assertions(
     # 变量替换函数，支持在断言中使用 ${变量名} 引用测试数据
     def replace_vars_in_assertion(value: Any) -> Any:
         """在断言值中替换变量"""
-        if test_data is None:
-            return value
-        if isinstance(value, str) and "${" in value:
-            import re
-            def replacer(match):
-                key = match.group(1)
-                var_value = test_data.get(key)
-                if var_value is None:
-                    return match.group(0)  # 变量不存在，保持原样
-                # 如果值是对象或数组，转换为JSON字符串
-                if isinstance(var_value, (dict, list)):
-                    import json
-                    return json.dumps(var_value, ensure_ascii=False)
-                return str(var_value)
-            return re.sub(r'\$\{(\w+)\}', replacer, value)
-        return value
+        return render_template_string(value, test_data)
+
+    # 先替换路径中的变量，再一次遍历求出所有 JSONPath 断言的实际值
+    assertion_paths: Dict[int, str] = {}
+    for item in assertions:
+        if (item or {}).get("type") in ("response_body", "json_path"):
+            assertion_paths[id(item)] = replace_vars_in_assertion(item.get("path") or "")
+    path_values = json_path.extract_many(response_json, assertion_paths.values())
 
     for item in assertions:
         a_type = (item or {}).get("type")
@@ -1704,9 +980,8 @@ def _evaluate_assertions(
                 all_passed = False
 
         elif a_type == "response_body":
-            path_raw = item.get("path") or ""
             # 支持在path中使用变量
-            path = replace_vars_in_assertion(path_raw)
+            path = assertion_paths[id(item)]
             operator = item.get("operator") or "equal"
             expected_raw = item.get("expected")
             # 支持在expected中使用变量
@@ -1727,7 +1002,7 @@ def _evaluate_assertions(
                         expected = False
                     elif expected.lower() == "null":
                         expected = None
-            actual = _extract_json_path(response_json, path)
+            actual = path_values.get(path)
 
             if operator == "equal":
                 # 如果expected是字符串且actual是对象/数组，使用智能匹配
@@ -1783,8 +1058,7 @@ def _evaluate_assertions(
 
         elif a_type == "json_path":
             # json_path 断言（与 response_body 逻辑相同）
-            path_raw = item.get("path") or ""
-            path = replace_vars_in_assertion(path_raw)
+            path = assertion_paths[id(item)]
             expected_raw = item.get("expected")
             expected = replace_vars_in_assertion(expected_raw)
             operator = item.get("operator") or "equal"
@@ -1805,7 +1079,7 @@ def _evaluate_assertions(
                     elif expected.lower() == "null":
                         expected = None
             
-            actual = _extract_json_path(response_json, path)
+            actual = path_values.get(path)
             
             # 如果路径不存在，尝试递归搜索字段
             if actual is None:
@@ -1953,10 +1227,16 @@ async def get_test_executions(
     search: Optional[str] = Query(None, description="搜索关键词（支持执行ID、用例ID、环境）"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="键集分页游标（上一页返回的 next_cursor），传入时忽略 skip"),
+    include_total: bool = Query(True, description="是否统计总数（深度翻页时可关闭）"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """获取测试执行列表（支持分页和搜索）"""
+    """获取测试执行列表（支持分页和搜索）
+
+    列表只读取摘要列（不含 result / logs），按 (created_at, id) 倒序；
+    传入 cursor 时使用键集分页，翻页深度不影响查询耗时。
+    """
     conditions = []
     
     if project_id:
@@ -1993,36 +1273,57 @@ async def get_test_executions(
             conditions.append(TestExecution.environment.ilike(f'%{search_term}%'))
     
     # 计算总数
-    count_query = select(func.count(TestExecution.id))
-    if conditions:
-        count_query = count_query.where(and_(*conditions))
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-    
-    # 查询列表
-    query = select(TestExecution)
+    total = None
+    if include_total:
+        count_query = select(func.count(TestExecution.id))
+        if conditions:
+            count_query = count_query.where(and_(*conditions))
+        total_result = await db.execute(count_query)
+        total = total_result.scalar() or 0
+    
+    # 查询列表（只加载列表需要的列）
+    query = select(TestExecution).options(load_only(*LIST_COLUMNS))
+    if cursor:
+        try:
+            conditions.append(keyset_before(TestExecution.created_at, TestExecution.id, cursor))
+        except ValueError as e:
+            # 参数 status 遮蔽了 fastapi.status，这里直接使用状态码
+            raise HTTPException(status_code=400, detail=str(e))
     if conditions:
         query = query.where(and_(*conditions))
-    query = query.offset(skip).limit(limit).order_by(TestExecution.created_at.desc())
+    query = query.order_by(TestExecution.created_at.desc(), TestExecution.id.desc()).limit(limit)
+    if not cursor:
+        query = query.offset(skip)
     
     result = await db.execute(query)
     executions = result.scalars().all()
     
+    next_cursor = None
+    if len(executions) == limit:
+        next_cursor = encode_cursor(executions[-1].created_at, executions[-1].id)
+    
     return {
-        "items": [TestExecutionResponse.model_validate(exec) for exec in executions],
+        "items": [TestExecutionListItem.model_validate(exec) for exec in executions],
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor,
     }
 
 
-@router.post("/", response_model=TestExecutionResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=TestExecutionCreateResponse, status_code=status.HTTP_202_ACCEPTED)
 async def create_test_execution(
     execution: TestExecutionCreate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """创建测试执行"""
+    """创建测试执行
+
+    立即执行的任务放入执行队列后直接返回（状态为pending），
+    由执行节点领取并运行，前端通过详情/日志接口轮询进度。
+    周期定时配置（daily / weekly / time_range）创建为定时计划，到点时才创建测试执行。
+    响应中 execution 与 schedule 只有一个非空。
+    """
     # 检查测试用例是否存在
     from app.models.test_case import TestCase
     case_result = await db.execute(select(TestCase).where(TestCase.id == execution.test_case_id))
@@ -2043,106 +1344,53 @@ async def create_test_execution(
             detail="项目不存在"
         )
 
-    # 检查是否启用数据驱动
-    # 优先从关联的TestDataConfig读取，向后兼容旧的data_driver字段
-    is_data_driven = test_case.is_data_driven or False
-    test_data_list: List[Dict[str, Any]] = []
-    
-    if is_data_driven:
-        # 1. 优先从关联的TestDataConfig读取
-        test_data_config_relations_result = await db.execute(
-            select(TestCaseTestDataConfig).where(
-                TestCaseTestDataConfig.test_case_id == test_case.id
-            )
-        )
-        test_data_config_relations = test_data_config_relations_result.scalars().all()
-        
-        if test_data_config_relations:
-            # 如果有关联的配置，合并所有配置的数据
-            for relation in test_data_config_relations:
-                config = await db.get(TestDataConfig, relation.test_data_config_id)
-                if config and config.is_active and config.data:
-                    # 转换配置数据格式（确保是字典格式）
-                    for data_item in config.data:
-                        if isinstance(data_item, dict):
-                            test_data_list.append(data_item)
-        else:
-            # 2. 向后兼容：从旧的data_driver字段读取
-            data_driver_config = test_case.data_driver or {}
-            if data_driver_config:
-                # 支持多种数据源：直接数组、数据模板、数据源ID
-                if isinstance(data_driver_config.get("data"), list):
-                    test_data_list = data_driver_config["data"]
-                elif data_driver_config.get("data_template_id"):
-                    # TODO: 从数据模板加载数据
-                    test_data_list = []
-                elif data_driver_config.get("data_source_id"):
-                    # TODO: 从数据源加载数据
-                    test_data_list = []
-                else:
-                    test_data_list = []
-    
-    # 如果没有数据驱动或数据为空，使用空字典作为默认数据
-    if not test_data_list:
-        test_data_list = [{}]
-
-    # 从测试用例配置中提取请求信息，用于真实请求及日志展示
-    request_info_template: Dict[str, Any] = {}
-    request_cfg: Dict[str, Any] = {}
-    assertions_cfg: List[Dict[str, Any]] = []
-    extractors_cfg: List[Dict[str, Any]] = []
-    token_config: Optional[Dict[str, Any]] = None
-    if isinstance(test_case.config, dict):
-        request_cfg = test_case.config.get("request") or {}
-        interface_cfg = test_case.config.get("interface") or {}
-        raw_assertions = test_case.config.get("assertions") or []
-        if isinstance(raw_assertions, list):
-            assertions_cfg = raw_assertions
-        
-        # 提取 extractors 配置
-        raw_extractors = test_case.config.get("extractors") or []
-        if isinstance(raw_extractors, list):
-            extractors_cfg = raw_extractors
-        
-        # 提取 token_config 配置
-        token_config = test_case.config.get("token_config")
-
-        method = interface_cfg.get("method") or request_cfg.get("method") or "GET"
-        path = interface_cfg.get("path") or request_cfg.get("path") or ""
-
-        request_info_template = {
-            "method": method,
-            "path": path,
-            "headers": request_cfg.get("headers") or {},
-            "params": request_cfg.get("params") or {},
-            "path_params": request_cfg.get("path_params") or {},
-            "body": request_cfg.get("body") or request_cfg.get("data") or None,
-        }
-    
-    # 初始化变量池，用于存储提取的变量
-    variable_pool: Dict[str, Any] = {}
+    # 数据驱动：统计数据行数（与执行节点共用同一解析逻辑，执行时再流式读取数据）
+    data_rows = await TestDataRows.for_test_case(db, test_case)
 
     # 检查是否为定时执行
     scheduling = execution.config.get("scheduling", {}) if execution.config else {}
     is_scheduled = scheduling.get("mode") == "schedule"
-    
+
+    # 周期定时：创建定时计划，不创建占位的执行记录
+    schedule_fields = legacy_schedule_fields(scheduling)
+    if schedule_fields is not None:
+        schedule = Schedule(
+            name=f"{test_case.name} 定时执行",
+            project_id=execution.project_id,
+            test_case_id=execution.test_case_id,
+            environment=execution.environment,
+            config={key: value for key, value in execution.config.items() if key != "scheduling"},
+            enabled=True,
+            created_by=current_user.id,
+            **schedule_fields,
+        )
+        db.add(schedule)
+        await db.flush()
+        plan_schedule_next_run(schedule, datetime.now(timezone.utc))
+        await db.commit()
+        await db.refresh(schedule)
+        scheduler = await get_scheduler()
+        scheduler.notify_schedule(schedule.id, schedule.next_run_at)
+        return TestExecutionCreateResponse(schedule=ScheduleResponse.model_validate(schedule))
+
     # 创建测试执行
     if is_scheduled:
-        # 定时执行：状态设为pending，不立即执行
+        # 单次定时执行：状态设为pending，不立即执行，由调度器在 next_run_at 触发
         new_execution = TestExecution(
             **execution.dict(),
             status=ExecutionStatus.PENDING,
             started_at=None,
+            next_run_at=compute_next_run_at(scheduling),
             logs="定时任务已创建，等待执行",
             result=None,
         )
     else:
-        # 立即执行：状态设为running，立即执行
+        # 立即执行：状态设为pending，放入执行队列，由执行节点领取后运行
         new_execution = TestExecution(
             **execution.dict(),
-            status=ExecutionStatus.RUNNING,
-            started_at=datetime.utcnow(),
-            logs="测试执行已启动",
+            status=ExecutionStatus.PENDING,
+            started_at=None,
+            logs=f"测试执行已加入队列，等待执行节点领取（共 {data_rows.total} 组测试数据）",
             result=None,
         )
     
@@ -2150,14 +1398,17 @@ async def create_test_execution(
     await db.commit()
     await db.refresh(new_execution)
     
-    # 如果是定时执行，直接返回，不执行
+    # 如果是定时执行，入堆后直接返回，由定时任务调度器负责执行
     if is_scheduled:
-        return TestExecutionResponse.model_validate(new_execution)
+        scheduler = await get_scheduler()
+        scheduler.notify_scheduled(new_execution.id, new_execution.next_run_at)
+        return TestExecutionCreateResponse(execution=TestExecutionResponse.model_validate(new_execution))
 
-    # 执行测试（立即执行）
-    await _execute_pending_test_execution(new_execution, db)
-    await db.refresh(new_execution)
-    return TestExecutionResponse.model_validate(new_execution)
+    # 立即执行：入队后直接返回
+    from app.services.execution_queue import get_execution_queue
+    queue = await get_execution_queue()
+    await queue.enqueue(new_execution.id, new_execution.project_id)
+    return TestExecutionCreateResponse(execution=TestExecutionResponse.model_validate(new_execution))
 
 
 async def _execute_pending_test_execution(execution: TestExecution, db: AsyncSession):
@@ -2170,6 +1421,8 @@ async def _execute_pending_test_execution(execution: TestExecution, db: AsyncSes
         execution.status = ExecutionStatus.ERROR
         execution.logs = "测试用例不存在"
         execution.finished_at = datetime.utcnow()
+        execution.summary = build_execution_summary(None, execution.status, execution.started_at, execution.finished_at)
+        await rollup_finished_executions(db, [execution.id])
         await db.commit()
         return
     
@@ -2179,6 +1432,12 @@ async def _execute_pending_test_execution(execution: TestExecution, db: AsyncSes
         await _execute_ui_test_case(execution, test_case, db)
         return
     
+    # 性能测试：压测后保存运行记录并与滚动基线对比
+    if test_case.test_type == TestType.PERFORMANCE:
+        from app.api.v1.test_executions_performance import _execute_performance_test_case
+        await _execute_performance_test_case(execution, test_case, db)
+        return
+    
     # 获取项目
     from app.models.project import Project
     project_result = await db.execute(select(Project).where(Project.id == execution.project_id))
@@ -2187,89 +1446,35 @@ async def _execute_pending_test_execution(execution: TestExecution, db: AsyncSes
         execution.status = ExecutionStatus.ERROR
         execution.logs = "项目不存在"
         execution.finished_at = datetime.utcnow()
+        execution.summary = build_execution_summary(None, execution.status, execution.started_at, execution.finished_at)
+        await rollup_finished_executions(db, [execution.id])
         await db.commit()
         return
 
     # 检查是否启用数据驱动
     is_data_driven = test_case.is_data_driven or False
-    test_data_list: List[Dict[str, Any]] = []
-    
-    if is_data_driven:
-        # 1. 优先从关联的TestDataConfig读取
-        test_data_config_relations_result = await db.execute(
-            select(TestCaseTestDataConfig).where(
-                TestCaseTestDataConfig.test_case_id == test_case.id
-            )
-        )
-        test_data_config_relations = test_data_config_relations_result.scalars().all()
-        
-        if test_data_config_relations:
-            for relation in test_data_config_relations:
-                config = await db.get(TestDataConfig, relation.test_data_config_id)
-                if config and config.is_active and config.data:
-                    for data_item in config.data:
-                        if isinstance(data_item, dict):
-                            test_data_list.append(data_item)
-        else:
-            # 2. 向后兼容：从旧的data_driver字段读取
-            data_driver_config = test_case.data_driver or {}
-            if data_driver_config:
-                if isinstance(data_driver_config.get("data"), list):
-                    test_data_list = data_driver_config["data"]
-                elif data_driver_config.get("data_template_id"):
-                    test_data_list = []
-                elif data_driver_config.get("data_source_id"):
-                    test_data_list = []
-                else:
-                    test_data_list = []
-    
-    if not test_data_list:
-        test_data_list = [{}]
-
-    # 从测试用例配置中提取请求信息
-    request_info_template: Dict[str, Any] = {}
-    request_cfg: Dict[str, Any] = {}
-    assertions_cfg: List[Dict[str, Any]] = []
-    extractors_cfg: List[Dict[str, Any]] = []
-    token_config: Optional[Dict[str, Any]] = None
-    
-    if isinstance(test_case.config, dict):
-        request_cfg = test_case.config.get("request") or {}
-        interface_cfg = test_case.config.get("interface") or {}
-        raw_assertions = test_case.config.get("assertions") or []
-        if isinstance(raw_assertions, list):
-            assertions_cfg = raw_assertions
-        
-        raw_extractors = test_case.config.get("extractors") or []
-        if isinstance(raw_extractors, list):
-            extractors_cfg = raw_extractors
-        
-        token_config = test_case.config.get("token_config")
-        
-        # 从execution.config中获取token_config_id，如果存在则从TokenConfig表获取
-        if execution.config and execution.config.get("token_config_id"):
-            from app.models.token_config import TokenConfig
-            token_config_obj = await db.get(TokenConfig, execution.config.get("token_config_id"))
-            if token_config_obj and token_config_obj.is_active:
-                token_config = token_config_obj.config
-
-        method = interface_cfg.get("method") or request_cfg.get("method") or "GET"
-        path = interface_cfg.get("path") or request_cfg.get("path") or ""
-
-        request_info_template = {
-            "method": method,
-            "path": path,
-            "headers": request_cfg.get("headers") or {},
-            "params": request_cfg.get("params") or {},
-            "path_params": request_cfg.get("path_params") or {},
-            "body": request_cfg.get("body") or request_cfg.get("data") or None,
-        }
+    # 数据行按需流式读取，这里只统计行数
+    data_rows = await TestDataRows.for_test_case(db, test_case)
+    total_rows = data_rows.total
+
+    # 执行计划：用例配置只解析一次，按 (用例ID, 更新时间) 缓存
+    plan = get_execution_plan(test_case)
+    extractors_cfg = plan.extractors
+    token_config: Optional[Dict[str, Any]] = plan.token_config
+    
+    # 从execution.config中获取token_config_id，如果存在则从TokenConfig表获取
+    if plan.has_config and execution.config and execution.config.get("token_config_id"):
+        from app.models.token_config import TokenConfig
+        token_config_obj = await db.get(TokenConfig, execution.config.get("token_config_id"))
+        if token_config_obj and token_config_obj.is_active:
+            token_config = token_config_obj.config
     
     # 初始化变量池
     variable_pool: Dict[str, Any] = {}
 
     # 构造真实 HTTP 请求（当前同步执行单接口请求）
-    lines = []
+    # 日志追加写入日志表，执行记录的 logs 字段只保留最近的部分
+    lines = ExecutionLogWriter(execution.id)
     lines.append("== 测试执行已启动 ==")
     lines.append(f"执行ID: {execution.id}")
     lines.append(f"项目: {project.id} - {project.name}")
@@ -2277,7 +1482,7 @@ async def _execute_pending_test_execution(execution: TestExecution, db: AsyncSes
     if execution.environment:
         lines.append(f"执行环境: {execution.environment}")
     if is_data_driven:
-        lines.append(f"数据驱动模式: 启用，共 {len(test_data_list)} 组测试数据")
+        lines.append(f"数据驱动模式: 启用，共 {total_rows} 组测试数据")
     lines.append("")
     
     # 调试：显示 config 的完整内容（用于排查 token_config 问题）
@@ -2314,493 +1519,321 @@ async def _execute_pending_test_execution(execution: TestExecution, db: AsyncSes
             base_url = env_obj.base_url.rstrip("/")
 
     # 数据驱动：支持并发执行
-    all_details: List[Dict[str, Any]] = []
+    # 步骤明细逐行写入步骤结果表，不在内存中累积所有行的完整响应
+    step_results = StepResultWriter(execution.id)
     total_passed = 0
     total_failed = 0
     
-    # 判断是否使用并发执行（数据量>10时启用并发）
-    use_concurrent = len(test_data_list) > 10
-    concurrency_limit = 20  # 并发数限制
-    
-    if use_concurrent:
-        lines.append(f"== 并发执行模式 ==")
-        lines.append(f"总数据量: {len(test_data_list)}，并发数: {concurrency_limit}")
-        lines.append("")
+    # HTTP 连接池：同一次执行的所有数据行复用连接（可配置为按环境在进程内共享，测试计划内的执行总是共享）
+    shared_http_clients = isinstance(execution.config, dict) and execution.config.get("shared_http_clients")
+    if (settings.HTTP_CLIENT_SHARED_PER_ENVIRONMENT and execution.environment) or shared_http_clients:
+        http_clients = get_http_client_registry(f"env:{execution.environment or ''}")
+        owns_http_clients = False
+    else:
+        http_clients = HttpClientRegistry(name=f"execution:{execution.id}")
+        owns_http_clients = True
+    
+    await lines.start()
+    await step_results.start()
+    # 实时进度事件（SSE / WebSocket 订阅）
+    progress = ExecutionProgress(await get_execution_event_bus(), execution.id, total_rows)
+    await progress.start()
+    try:
+        # 并发控制配置：全局 < 环境 < 用例 < 本次执行
+        concurrency_cfg = ConcurrencyConfig.resolve(
+            (env_obj.execution_config or {}).get("concurrency") if env_obj and isinstance(env_obj.execution_config, dict) else None,
+            plan.concurrency,
+            (execution.config or {}).get("concurrency") if isinstance(execution.config, dict) else None,
+        )
+        # 判断是否使用并发执行（数据量超过 min_rows 时启用并发）
+        use_concurrent = total_rows > concurrency_cfg.min_rows
+    
+        # 多接口用例：按流程编排执行
+        workflow: Optional[WorkflowDefinition] = None
+        if test_case.is_multi_interface and test_case.workflow:
+            workflow = WorkflowDefinition(test_case.workflow)
+            await workflow.load_interfaces(db)
+
+        if workflow is not None:
+            lines.append(f"== 流程编排模式 ==")
+            lines.append(f"共 {len(workflow.steps)} 个步骤，{total_rows} 组测试数据，无依赖关系的步骤并发执行")
+            lines.append("")
+            if token_config and variable_pool is not None and token_config.get("extractors"):
+                success, message = await obtain_token(token_config, base_url, variable_pool, lines, http_clients)
+                lines.append(f"✓ {message}" if success else f"⚠ {message}")
+            passed_rows, failed_rows = await _execute_workflow_rows(
+                workflow,
+                data_rows,
+                base_url,
+                variable_pool,
+                lines,
+                http_clients,
+                progress,
+                step_results,
+                workers=concurrency_cfg.initial if use_concurrent else 1,
+            )
+            total_passed += passed_rows
+            total_failed += failed_rows
+
+        elif use_concurrent:
+            lines.append(f"== 并发执行模式 ==")
+            lines.append(f"总数据量: {total_rows}，并发控制: {concurrency_cfg.describe()}")
+            lines.append("")
         
-        # 在并发执行开始前，先统一获取Token（如果配置了token_config）
-        # 这样可以避免多个任务同时尝试获取Token导致的竞态条件
-        token_pre_fetched = False  # 标记是否已在执行前统一获取Token
-        if token_config and variable_pool is not None:
-            extractors = token_config.get("extractors", [])
-            if extractors:
-                token_name = extractors[0].get("name", "token")
-                if token_name not in variable_pool:
-                    lines.append(f"\n🔑 并发执行前统一获取 Token ({token_name})...")
-                    success, message = await _refresh_token(token_config, base_url, variable_pool, lines)
-                    if success:
-                        lines.append(f"✓ {message}")
-                        token_pre_fetched = True  # Token已成功获取
+            # 在并发执行开始前，先统一获取Token（如果配置了token_config）
+            # 这样可以避免多个任务同时尝试获取Token导致的竞态条件
+            token_pre_fetched = False  # 标记是否已在执行前统一获取Token
+            if token_config and variable_pool is not None:
+                extractors = token_config.get("extractors", [])
+                if extractors:
+                    token_name = extractors[0].get("name", "token")
+                    if token_name not in variable_pool:
+                        lines.append(f"\n🔑 并发执行前统一获取 Token ({token_name})...")
+                        success, message = await obtain_token(token_config, base_url, variable_pool, lines, http_clients)
+                        if success:
+                            lines.append(f"✓ {message}")
+                            token_pre_fetched = True  # Token已成功获取
+                        else:
+                            lines.append(f"⚠ {message}（将在请求失败时重试）")
+                            # Token获取失败，不跳过检查，让每个任务在需要时重试
                     else:
-                        lines.append(f"⚠ {message}（将在请求失败时重试）")
-                        # Token获取失败，不跳过检查，让每个任务在需要时重试
-                else:
-                    lines.append(f"[调试] Token ({token_name}) 已存在于变量池中，无需重新获取")
-                    token_pre_fetched = True  # Token已存在
+                        lines.append(f"[调试] Token ({token_name}) 已存在于变量池中，无需重新获取")
+                        token_pre_fetched = True  # Token已存在
         
-        # 使用asyncio.gather进行并发执行，但限制并发数
-        import asyncio
-        semaphore = asyncio.Semaphore(concurrency_limit)
-        completed_count = 0
-        progress_lock = asyncio.Lock()  # 用于保护进度更新的锁
-        token_lock = asyncio.Lock()  # 用于保护Token获取的锁（作为备用保护）
+            # 数据行流式送入有界工作池执行，并发数由自适应控制器调整
+            import asyncio
+            controller = AdaptiveConcurrencyController(concurrency_cfg)
+            request_host = target_host(base_url, plan.request_url)
+            token_lock = asyncio.Lock()  # 用于保护Token获取的锁（作为备用保护）
         
-        async def execute_with_limit_and_progress(test_data: Dict[str, Any], index: int):
-            nonlocal completed_count
-            async with semaphore:
-                result = await _execute_single_data_driven_test(
-                    test_data=test_data,
-                    data_index=index,
-                    request_info_template=request_info_template,
-                    assertions_cfg=assertions_cfg,
-                    base_url=base_url,
-                    lines=lines,
-                    extractors_cfg=extractors_cfg,
-                    variable_pool=variable_pool,
-                    token_config=token_config,
-                    token_lock=token_lock,  # 传递Token获取锁
-                    skip_token_check=token_pre_fetched  # 如果已在执行前统一获取Token，则跳过检查
-                )
+            row_status_counts = {"passed": 0, "failed": 0}
+
+            async def execute_with_limit_and_progress(item):
+                index, test_data = item
+                try:
+                    status = await execute_row(test_data, index)
+                except Exception as e:
+                    lines.append(f"执行出错: {str(e)}")
+                    status = "failed"
+                row_status_counts["passed" if status == "passed" else "failed"] += 1
+
+            async def execute_row(test_data: Dict[str, Any], index: int):
+                async with controller.slot(request_host) as slot:
+                    await progress.row_started(index)
+                    try:
+                        result = await _execute_single_data_driven_test(
+                            test_data=test_data,
+                            data_index=index,
+                            plan=plan,
+                            base_url=base_url,
+                            lines=lines,
+                            variable_pool=variable_pool,
+                            token_config=token_config,
+                            token_lock=token_lock,  # 传递Token获取锁
+                            skip_token_check=token_pre_fetched,  # 如果已在执行前统一获取Token，则跳过检查
+                            http_clients=http_clients,
+                        )
+                    except Exception:
+                        await progress.row_finished(index, "failed")
+                        raise
+                    response_info = result.get("response") or {}
+                    slot.record(response_info.get("latency_ms"), response_info.get("status_code"))
+                    await progress.row_finished(index, result["status"])
+                    await step_results.add(index, result)
                 
-                # 使用锁保护计数和进度更新
-                async with progress_lock:
-                    completed_count += 1
-                    
-                    # 更新进度（每完成5%更新一次，避免频繁更新）
-                    if completed_count % max(1, len(test_data_list) // 20) == 0 or completed_count == len(test_data_list):
-                        progress_percent = int((completed_count / len(test_data_list)) * 100)
+                    # 实时进度通过事件推送，数据库只在检查点写入（按时间间隔节流）
+                    if progress.completed < progress.total and progress.checkpoint_due():
+                        snapshot = progress.snapshot()
                         # 使用独立的数据库会话更新进度，避免事务冲突
                         async with AsyncSessionLocal() as progress_db:
                             try:
-                                # 重新查询执行记录
-                                result_obj = await progress_db.execute(
-                                    select(TestExecution).where(TestExecution.id == execution.id)
+                                await progress_db.execute(
+                                    update(TestExecution)
+                                    .where(TestExecution.id == execution.id)
+                                    .values(logs=lines.tail_text() + f"\n\n进度: {snapshot['completed']}/{snapshot['total']} ({snapshot['percent']}%)")
                                 )
-                                execution_obj = result_obj.scalar_one()
-                                
-                                # 更新日志
-                                execution_obj.logs = "\n".join(lines) + f"\n\n进度: {completed_count}/{len(test_data_list)} ({progress_percent}%)"
                                 await progress_db.commit()
                             except Exception as e:
                                 # 如果更新失败，记录错误但不影响测试执行
                                 lines.append(f"[警告] 更新进度失败: {str(e)}")
                                 await progress_db.rollback()
                 
-                return result
-        
-        # 创建所有任务
-        tasks = [
-            execute_with_limit_and_progress(test_data, index)
-            for index, test_data in enumerate(test_data_list, start=1)
-        ]
+                    return result["status"]
         
-        # 并发执行
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+            # 工作协程数取并发上限，实际并发由控制器限制；结果不在内存中累积
+            await run_worker_pool(
+                data_rows,
+                execute_with_limit_and_progress,
+                workers=concurrency_cfg.max,
+                queue_size=settings.EXECUTION_ROW_QUEUE_SIZE,
+            )
+            controller_stats = controller.stats()
+            lines.append(
+                f"[并发控制] 最终并发 {controller_stats['current']}，峰值 {controller_stats['peak']}，"
+                f"调整 {controller_stats['adjustments']} 次，基线延迟 {controller_stats['baseline_latency_ms']}ms"
+            )
         
-        # 处理结果
-        for result in results:
-            if isinstance(result, Exception):
-                lines.append(f"执行出错: {str(result)}")
-                total_failed += 1
-                continue
-            
-            all_details.append(result)
-            if result["status"] == "passed":
-                total_passed += 1
-            else:
-                total_failed += 1
+            total_passed += row_status_counts["passed"]
+            total_failed += row_status_counts["failed"]
     
-    else:
-        # 串行执行（数据量较小时）
-        lines.append(f"== 串行执行模式 ==")
-        lines.append(f"即将执行 {len(test_data_list)} 组测试数据")
-        lines.append("")
+        else:
+            # 串行执行（数据量较小时）
+            lines.append(f"== 串行执行模式 ==")
+            lines.append(f"即将执行 {total_rows} 组测试数据")
+            lines.append("")
         
-        # 在串行执行开始前，如果配置了 token_config 且变量池中没有 token，先获取 token
-        lines.append(f"[调试] token_config 检查: {token_config is not None}, variable_pool: {variable_pool is not None}")
-        if token_config:
-            lines.append(f"[调试] token_config 内容: {json.dumps(token_config, ensure_ascii=False)}")
-        if token_config and variable_pool is not None:
-            extractors = token_config.get("extractors", [])
-            lines.append(f"[调试] extractors: {extractors}")
-            if extractors:
-                token_name = extractors[0].get("name", "token")
-                lines.append(f"[调试] token_name: {token_name}, variable_pool 中是否有: {token_name in variable_pool}")
-                if token_name not in variable_pool:
-                    lines.append(f"\n🔑 首次获取 Token ({token_name})...")
-                    success, message = await _refresh_token(token_config, base_url, variable_pool, lines)
-                    if success:
-                        lines.append(f"✓ {message}")
+            # 在串行执行开始前，如果配置了 token_config 且变量池中没有 token，先获取 token
+            lines.append(f"[调试] token_config 检查: {token_config is not None}, variable_pool: {variable_pool is not None}")
+            if token_config:
+                lines.append(f"[调试] token_config 内容: {json.dumps(token_config, ensure_ascii=False)}")
+            if token_config and variable_pool is not None:
+                extractors = token_config.get("extractors", [])
+                lines.append(f"[调试] extractors: {extractors}")
+                if extractors:
+                    token_name = extractors[0].get("name", "token")
+                    lines.append(f"[调试] token_name: {token_name}, variable_pool 中是否有: {token_name in variable_pool}")
+                    if token_name not in variable_pool:
+                        lines.append(f"\n🔑 首次获取 Token ({token_name})...")
+                        success, message = await obtain_token(token_config, base_url, variable_pool, lines, http_clients)
+                        if success:
+                            lines.append(f"✓ {message}")
+                        else:
+                            lines.append(f"⚠ {message}（将在请求失败时重试）")
                     else:
-                        lines.append(f"⚠ {message}（将在请求失败时重试）")
+                        lines.append(f"[调试] Token ({token_name}) 已存在于变量池中")
                 else:
-                    lines.append(f"[调试] Token ({token_name}) 已存在于变量池中")
+                    lines.append(f"[警告] token_config 存在但 extractors 为空，无法获取 token")
             else:
-                lines.append(f"[警告] token_config 存在但 extractors 为空，无法获取 token")
-        else:
-            if not token_config:
-                lines.append(f"[调试] token_config 未配置")
-            if variable_pool is None:
-                lines.append(f"[警告] variable_pool 为 None")
+                if not token_config:
+                    lines.append(f"[调试] token_config 未配置")
+                if variable_pool is None:
+                    lines.append(f"[警告] variable_pool 为 None")
         
-        for data_index, test_data in enumerate(test_data_list, start=1):
-            lines.append(f"[调试] 开始执行第 {data_index}/{len(test_data_list)} 组数据")
+            async for data_index, test_data in data_rows:
+                await progress.row_started(data_index)
+                lines.append(f"[调试] 开始执行第 {data_index}/{total_rows} 组数据")
             
-            # 合并变量池到测试数据中，使提取的变量可以在请求中使用
-            if variable_pool:
-                merged_data = {**variable_pool, **test_data}
-                test_data = merged_data
+                # 合并变量池到测试数据中，使提取的变量可以在请求中使用
+                if variable_pool:
+                    merged_data = {**variable_pool, **test_data}
+                    test_data = merged_data
             
-            # 新的数据驱动逻辑：每行数据包含 request 和 assertions
-            # 如果测试数据中有 request 字段，使用它作为请求参数（可以覆盖模板）
-            # 如果测试数据中有 assertions 字段，使用它作为断言配置（优先级高于用例配置）
-            test_request = test_data.get("request") or test_data.get("request_params")
-            test_assertions = test_data.get("assertions")
+                # 新的数据驱动逻辑：每行数据包含 request 和 assertions
+                # 如果测试数据中有 request 字段，使用它作为请求参数（可以覆盖模板）
+                # 如果测试数据中有 assertions 字段，使用它作为断言配置（优先级高于用例配置）
+                request_info, test_request = plan.bind_request(test_data)
+                current_assertions, test_assertions = _resolve_row_assertions(plan, test_data)
             
-            # 确定使用的请求配置
-            if test_request:
-                # 如果测试数据中有request字段，使用它
-                if isinstance(test_request, str):
-                    try:
-                        test_request = json.loads(test_request)
-                    except:
-                        test_request = {}
-                # 将test_request合并到request_info_template中
-                request_info = copy.deepcopy(request_info_template)
-                if isinstance(test_request, dict):
-                    # 合并headers、params、body等
-                    if test_request.get("headers"):
-                        request_info["headers"] = {**request_info.get("headers", {}), **test_request["headers"]}
-                    if test_request.get("params"):
-                        request_info["params"] = {**request_info.get("params", {}), **test_request["params"]}
-                    if test_request.get("body") is not None:
-                        # 如果test_request中有body字段，使用它
-                        request_info["body"] = test_request["body"]
-                    elif test_request:
-                        # 如果test_request中没有body字段，但有其他字段
-                        # 尝试深度合并到模板的body中
-                        def deep_merge_body(template_body, data):
-                            """深度合并：将数据字段更新到模板body的嵌套结构中，保持模板字段的类型"""
-                            if not isinstance(template_body, dict):
-                                return template_body
-                            
-                            result = copy.deepcopy(template_body)
-                            
-                            # 类型转换函数：根据模板类型转换数据值
-                            def convert_to_template_type(template_value, data_value):
-                                """根据模板值的类型，转换数据值"""
-                                # 如果模板是数组
-                                if isinstance(template_value, list):
-                                    if isinstance(data_value, list):
-                                        return data_value  # 已经是数组，直接使用
-                                    elif isinstance(data_value, str):
-                                        # 字符串转数组
-                                        if data_value.strip() == "":
-                                            return []  # 空字符串 -> 空数组
-                                        elif data_value.startswith('['):
-                                            # 尝试解析JSON数组
-                                            try:
-                                                parsed = json.loads(data_value)
-                                                return parsed if isinstance(parsed, list) else [data_value]
-                                            except:
-                                                return [data_value]
-                                        else:
-                                            return [data_value]  # 单个值 -> 单元素数组
-                                    elif data_value is None or data_value == "":
-                                        return []  # null/空值 -> 空数组
-                                    else:
-                                        return [data_value]  # 其他类型 -> 单元素数组
-                                
-                                # 如果模板是数字
-                                elif isinstance(template_value, (int, float)):
-                                    if isinstance(data_value, (int, float)):
-                                        return data_value
-                                    elif isinstance(data_value, str):
-                                        try:
-                                            return int(data_value) if '.' not in str(data_value) else float(data_value)
-                                        except:
-                                            return template_value  # 转换失败，保持模板值
-                                    else:
-                                        return template_value
-                                
-                                # 如果模板是布尔值
-                                elif isinstance(template_value, bool):
-                                    if isinstance(data_value, bool):
-                                        return data_value
-                                    elif isinstance(data_value, str):
-                                        if data_value.lower() in ('true', '1', 'yes'):
-                                            return True
-                                        elif data_value.lower() in ('false', '0', 'no', ''):
-                                            return False
-                                        else:
-                                            return template_value
-                                    elif isinstance(data_value, (int, float)):
-                                        return bool(data_value)
-                                    else:
-                                        return template_value
-                                
-                                # 如果模板是字符串
-                                elif isinstance(template_value, str):
-                                    return str(data_value) if data_value is not None else ""
-                                
-                                # 如果模板是None或其他类型，直接使用数据值
-                                else:
-                                    return data_value
-                            
-                            # 递归查找并更新匹配的字段
-                            def update_nested(obj, data_dict):
-                                if not isinstance(obj, dict):
-                                    return obj
-                                for key, value in obj.items():
-                                    if isinstance(value, dict):
-                                        # 递归处理嵌套对象
-                                        obj[key] = update_nested(value, data_dict)
-                                        # 检查data_dict中是否有与嵌套对象字段匹配的值
-                                        for data_key, data_value in data_dict.items():
-                                            if data_key in obj[key]:
-                                                # 根据模板类型转换后再赋值
-                                                obj[key][data_key] = convert_to_template_type(
-                                                    obj[key][data_key], 
-                                                    data_value
-                                                )
-                                    elif key in data_dict:
-                                        # 如果当前字段在data_dict中，根据模板类型转换后更新
-                                        obj[key] = convert_to_template_type(value, data_dict[key])
-                                return obj
-                            
-                            result = update_nested(result, data)
-                            return result
-                        
-                        template_body = request_info.get("body")
-                        if isinstance(template_body, dict):
-                            request_info["body"] = deep_merge_body(template_body, test_request)
-                        else:
-                            # 如果模板没有body，直接使用test_request
-                            request_info["body"] = test_request
-                    if test_request.get("path"):
-                        request_info["path"] = test_request["path"]
-                    if test_request.get("method"):
-                        request_info["method"] = test_request["method"]
-            else:
-                # 如果没有request字段，使用原有的变量替换逻辑
-                request_info = _apply_test_data(request_info_template, test_data)
-        
-            # 确定使用的断言配置
-            current_assertions = assertions_cfg
-            if test_assertions:
-                # 如果测试数据中有assertions字段，使用它（优先级更高）
-                if isinstance(test_assertions, str):
-                    try:
-                        current_assertions = json.loads(test_assertions)
-                    except:
-                        current_assertions = assertions_cfg
-                elif isinstance(test_assertions, list):
-                    current_assertions = test_assertions
-                else:
-                    current_assertions = assertions_cfg
-            else:
-                # 如果测试数据中没有assertions字段，尝试从expected_*字段自动生成断言
-                auto_generated_assertions = _generate_assertions_from_data(test_data)
-                if auto_generated_assertions:
-                    # 如果自动生成了断言，与用例配置中的断言合并
-                    # 自动生成的断言优先级更高（覆盖用例配置中的同类型断言）
-                    if assertions_cfg:
-                        # 合并断言：去除用例配置中的status_code断言（如果自动生成了）
-                        has_status_code = any(a.get('type') == 'status_code' for a in auto_generated_assertions)
-                        if has_status_code:
-                            current_assertions = [a for a in assertions_cfg if a.get('type') != 'status_code']
-                        else:
-                            current_assertions = list(assertions_cfg)
-                        current_assertions.extend(auto_generated_assertions)
-                    else:
-                        current_assertions = auto_generated_assertions
-            
-            # 构建URL，支持变量替换
-            path = request_info.get("path") or ""
-            # 如果path中包含变量，需要再次替换（因为可能有嵌套的变量）
-            if isinstance(path, str) and "${" in path:
-                import re
-                def replacer(match):
-                    key = match.group(1)
-                    value = test_data.get(key)
-                    if value is None:
-                        return match.group(0)
-                    return str(value)
-                path = re.sub(r'\$\{(\w+)\}', replacer, path)
+                # 构建URL，支持变量替换
+                # 如果path中包含变量，需要再次替换（因为可能有嵌套的变量）
+                path = render_template_string(request_info.get("path") or "", test_data)
             
-            if path and not path.startswith("http"):
-                if not path.startswith("/"):
-                    path = "/" + path
-                if base_url:
-                    # base_url也可能包含变量
-                    if isinstance(base_url, str) and "${" in base_url:
-                        import re
-                        def replacer(match):
-                            key = match.group(1)
-                            value = test_data.get(key)
-                            if value is None:
-                                return match.group(0)
-                            return str(value)
-                        base_url = re.sub(r'\$\{(\w+)\}', replacer, base_url)
-                    url = base_url + path
-                else:
-                    # 如果没有配置环境 base_url，尝试使用请求配置里的 full_url 或原始 path
-                    url_template = request_cfg.get("url") or path
-                    if isinstance(url_template, str) and "${" in url_template:
-                        import re
-                        def replacer(match):
-                            key = match.group(1)
-                            value = test_data.get(key)
-                            if value is None:
-                                return match.group(0)
-                            return str(value)
-                        url = re.sub(r'\$\{(\w+)\}', replacer, url_template)
+                if path and not path.startswith("http"):
+                    if not path.startswith("/"):
+                        path = "/" + path
+                    if base_url:
+                        # base_url也可能包含变量
+                        base_url = render_template_string(base_url, test_data)
+                        url = base_url + path
                     else:
-                        url = url_template
-            else:
-                url = path or request_cfg.get("url") or ""
-
-            # 合并 headers / params（环境默认 + 用例配置）
-            headers: Dict[str, Any] = {}
-            params: Dict[str, Any] = {}
-            if env_obj and isinstance(env_obj.default_headers, dict):
-                headers.update(env_obj.default_headers)
-            if env_obj and isinstance(env_obj.default_params, dict):
-                params.update(env_obj.default_params)
-            if request_info.get("headers"):
-                headers.update(request_info["headers"])
-            if request_info.get("params"):
-                params.update(request_info["params"])
-
-            body = request_info.get("body")
+                        # 如果没有配置环境 base_url，尝试使用请求配置里的 full_url 或原始 path
+                        url = render_template_string(plan.request_url or path, test_data)
+                else:
+                    url = path or plan.request_url or ""
+
+                # 合并 headers / params（环境默认 + 用例配置）
+                headers: Dict[str, Any] = {}
+                params: Dict[str, Any] = {}
+                if env_obj and isinstance(env_obj.default_headers, dict):
+                    headers.update(env_obj.default_headers)
+                if env_obj and isinstance(env_obj.default_params, dict):
+                    params.update(env_obj.default_params)
+                if request_info.get("headers"):
+                    headers.update(request_info["headers"])
+                if request_info.get("params"):
+                    params.update(request_info["params"])
+
+                body = request_info.get("body")
             
-            # 应用变量池中的变量到 headers、params、body、url
-            if variable_pool:
-                # 辅助函数：替换变量
-                def replace_vars_in_value(value: Any, var_pool: Dict[str, Any]) -> Any:
-                    """在值中替换变量"""
-                    import re
-                    if isinstance(value, dict):
-                        return {k: replace_vars_in_value(v, var_pool) for k, v in value.items()}
-                    elif isinstance(value, list):
-                        return [replace_vars_in_value(item, var_pool) for item in value]
-                    elif isinstance(value, str) and "${" in value:
-                        def replacer(match):
-                            key = match.group(1)
-                            return str(var_pool.get(key, match.group(0)))
-                        return re.sub(r'\$\{(\w+)\}', replacer, value)
-                    else:
-                        return value
-                
-                # 替换 headers 中的变量
-                if isinstance(headers, dict):
-                    headers = replace_vars_in_value(headers, variable_pool)
+                # 应用变量池中的变量到 headers、params、body、url
+                if variable_pool:
+                    # 替换 headers 中的变量
+                    if isinstance(headers, dict):
+                        headers = render_template(headers, variable_pool, typed=False)
                 
-                # 替换 params 中的变量
-                if isinstance(params, dict):
-                    params = replace_vars_in_value(params, variable_pool)
+                    # 替换 params 中的变量
+                    if isinstance(params, dict):
+                        params = render_template(params, variable_pool, typed=False)
                 
-                # 替换 body 中的变量
-                if body is not None:
-                    body = replace_vars_in_value(body, variable_pool)
+                    # 替换 body 中的变量
+                    if body is not None:
+                        body = render_template(body, variable_pool, typed=False)
                 
-                # 替换 URL 中的变量
-                if isinstance(url, str) and "${" in url:
-                    import re
-                    def replacer(match):
-                        key = match.group(1)
-                        return str(variable_pool.get(key, match.group(0)))
-                    url = re.sub(r'\$\{(\w+)\}', replacer, url)
-
-            if is_data_driven:
-                lines.append(f"== 数据驱动执行 [{data_index}/{len(test_data_list)}] ==")
-                # 显示测试数据（排除内部字段）
-                display_data = {k: v for k, v in test_data.items() if not k.startswith('__')}
-                lines.append(f"测试数据: {json.dumps(display_data, ensure_ascii=False, indent=2)}")
-                if test_request:
-                    lines.append("✓ 使用测试数据中的请求参数")
-                if test_assertions:
-                    lines.append("✓ 使用测试数据中的断言配置")
-                lines.append("")
+                    # 替换 URL 中的变量
+                    url = render_template_string(url, variable_pool)
+
+                if is_data_driven:
+                    lines.append(f"== 数据驱动执行 [{data_index}/{total_rows}] ==")
+                    # 显示测试数据（排除内部字段）
+                    display_data = {k: v for k, v in test_data.items() if not k.startswith('__')}
+                    lines.append(f"测试数据: {json.dumps(display_data, ensure_ascii=False, indent=2)}")
+                    if test_request:
+                        lines.append("✓ 使用测试数据中的请求参数")
+                    if test_assertions:
+                        lines.append("✓ 使用测试数据中的断言配置")
+                    lines.append("")
             
-            # 显示变量池信息（调试用）
-            if variable_pool:
-                lines.append("== 变量池信息 ==")
-                # 只显示token相关的变量，避免泄露敏感信息
-                token_vars = {k: ("***已设置***" if k in variable_pool else "未设置") for k in variable_pool.keys() if 'token' in k.lower() or 'auth' in k.lower()}
-                if token_vars:
-                    lines.append(f"Token相关变量: {json.dumps(token_vars, ensure_ascii=False, indent=2)}")
-                else:
-                    lines.append(f"变量池中的变量: {list(variable_pool.keys())}")
-                lines.append("")
+                # 显示变量池信息（调试用）
+                if variable_pool:
+                    lines.append("== 变量池信息 ==")
+                    # 只显示token相关的变量，避免泄露敏感信息
+                    token_vars = {k: ("***已设置***" if k in variable_pool else "未设置") for k in variable_pool.keys() if 'token' in k.lower() or 'auth' in k.lower()}
+                    if token_vars:
+                        lines.append(f"Token相关变量: {json.dumps(token_vars, ensure_ascii=False, indent=2)}")
+                    else:
+                        lines.append(f"变量池中的变量: {list(variable_pool.keys())}")
+                    lines.append("")
             
-            if request_info:
-                lines.append("== 请求信息 ==")
-                lines.append(f"请求方法: {request_info.get('method')}")
-                lines.append(f"请求URL: {url or (request_info.get('path') or '')}")
-                # 显示替换后的headers（实际发送的headers）
-                if headers:
-                    lines.append("请求头（已应用变量替换）:")
-                    lines.append(json.dumps(headers, ensure_ascii=False, indent=2))
-                elif request_info.get("headers"):
-                    lines.append("请求头（原始，未替换）:")
-                    lines.append(json.dumps(request_info["headers"], ensure_ascii=False, indent=2))
-                if params:
-                    lines.append("Query 参数（已应用变量替换）:")
-                    lines.append(json.dumps(params, ensure_ascii=False, indent=2))
-                elif request_info.get("params"):
-                    lines.append("Query 参数（原始，未替换）:")
-                    lines.append(json.dumps(request_info["params"], ensure_ascii=False, indent=2))
-                if request_info.get("path_params"):
-                    lines.append("Path 参数:")
-                    lines.append(json.dumps(request_info["path_params"], ensure_ascii=False, indent=2))
-                if body is not None:
-                    lines.append("请求 Body（已应用变量替换）:")
-                    lines.append(json.dumps(body, ensure_ascii=False, indent=2))
-                lines.append("")
-
-            # 执行 HTTP 请求（支持 Token 自动刷新）
-            http_status: Optional[int] = None
-            response_text: Optional[str] = None
-            response_json: Optional[Any] = None
-            error_message: Optional[str] = None
-            max_retries = 1  # Token 刷新后最多重试 1 次
-            retry_count = 0
+                if request_info:
+                    lines.append("== 请求信息 ==")
+                    lines.append(f"请求方法: {request_info.get('method')}")
+                    lines.append(f"请求URL: {url or (request_info.get('path') or '')}")
+                    # 显示替换后的headers（实际发送的headers）
+                    if headers:
+                        lines.append("请求头（已应用变量替换）:")
+                        lines.append(json.dumps(headers, ensure_ascii=False, indent=2))
+                    elif request_info.get("headers"):
+                        lines.append("请求头（原始，未替换）:")
+                        lines.append(json.dumps(request_info["headers"], ensure_ascii=False, indent=2))
+                    if params:
+                        lines.append("Query 参数（已应用变量替换）:")
+                        lines.append(json.dumps(params, ensure_ascii=False, indent=2))
+                    elif request_info.get("params"):
+                        lines.append("Query 参数（原始，未替换）:")
+                        lines.append(json.dumps(request_info["params"], ensure_ascii=False, indent=2))
+                    if request_info.get("path_params"):
+                        lines.append("Path 参数:")
+                        lines.append(json.dumps(request_info["path_params"], ensure_ascii=False, indent=2))
+                    if body is not None:
+                        lines.append("请求 Body（已应用变量替换）:")
+                        lines.append(json.dumps(body, ensure_ascii=False, indent=2))
+                    lines.append("")
+
+                # 执行 HTTP 请求（支持 Token 自动刷新）
+                http_status: Optional[int] = None
+                response_text: Optional[str] = None
+                response_json: Optional[Any] = None
+                latency_ms: Optional[int] = None
+                error_message: Optional[str] = None
+                max_retries = 1  # Token 刷新后最多重试 1 次
+                retry_count = 0
             
-            while retry_count <= max_retries:
-                try:
-                    async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
+                while retry_count <= max_retries:
+                    try:
+                        client = http_clients.get_client(verify=False)
                         # 每次请求前，如果有变量池，需要应用变量（第一次请求和重试都需要）
                         # 因为第一次请求时，headers等可能还没有被替换，或者重试时token已更新
                         if variable_pool:
-                            # 辅助函数：替换变量
-                            def replace_vars_in_value(value: Any, var_pool: Dict[str, Any]) -> Any:
-                                """在值中替换变量"""
-                                import re
-                                if isinstance(value, dict):
-                                    return {k: replace_vars_in_value(v, var_pool) for k, v in value.items()}
-                                elif isinstance(value, list):
-                                    return [replace_vars_in_value(item, var_pool) for item in value]
-                                elif isinstance(value, str) and "${" in value:
-                                    def replacer(match):
-                                        key = match.group(1)
-                                        val = var_pool.get(key)
-                                        if val is None:
-                                            return match.group(0)  # 变量不存在，保持原样
-                                        return str(val)
-                                    return re.sub(r'\$\{(\w+)\}', replacer, value)
-                                else:
-                                    return value
-                            
                             # 应用变量替换（确保使用最新的变量池）
                             # 注意：headers、params、body、url 在第一次请求前已经在2112-2147行替换过了
                             # 但这里再次替换可以确保使用最新的变量池（特别是重试时token已更新）
@@ -2817,7 +1850,7 @@ async def _execute_pending_test_execution(execution: TestExecution, db: AsyncSes
                                 has_vars = any(isinstance(v, str) and "${" in v for v in headers.values())
                                 if has_vars:
                                     lines.append(f"[调试] 检测到headers中有变量占位符，开始替换...")
-                                headers = replace_vars_in_value(headers, variable_pool)
+                                headers = render_template(headers, variable_pool, typed=False)
                                 # 检查替换后的headers
                                 if has_vars:
                                     still_has_vars = any(isinstance(v, str) and "${" in v for v in headers.values())
@@ -2826,18 +1859,10 @@ async def _execute_pending_test_execution(execution: TestExecution, db: AsyncSes
                                     else:
                                         lines.append(f"[调试] headers变量替换成功")
                             if isinstance(params, dict):
-                                params = replace_vars_in_value(params, variable_pool)
+                                params = render_template(params, variable_pool, typed=False)
                             if body is not None:
-                                body = replace_vars_in_value(body, variable_pool)
-                            if isinstance(url, str) and "${" in url:
-                                import re
-                                def replacer(match):
-                                    key = match.group(1)
-                                    val = variable_pool.get(key)
-                                    if val is None:
-                                        return match.group(0)
-                                    return str(val)
-                                url = re.sub(r'\$\{(\w+)\}', replacer, url)
+                                body = render_template(body, variable_pool, typed=False)
+                            url = render_template_string(url, variable_pool)
                         
                         method = (request_info.get("method") or "GET").upper()
                         if method in ("GET", "DELETE"):
@@ -2850,149 +1875,164 @@ async def _execute_pending_test_execution(execution: TestExecution, db: AsyncSes
                                 params=params,
                                 json=body,
                             )
-                    http_status = resp.status_code
-                    response_text = resp.text
-                    try:
-                        response_json = resp.json()
-                    except Exception:
-                        response_json = None
+                        http_status = resp.status_code
+                        response_text = resp.text
+                        latency_ms = int(resp.elapsed.total_seconds() * 1000)
+                        try:
+                            response_json = resp.json()
+                        except Exception:
+                            response_json = None
                     
-                    # 检查是否需要刷新 Token
-                    if token_config and variable_pool is not None:
-                        retry_status_codes = token_config.get("retry_status_codes", [401, 403])
-                        if http_status in retry_status_codes and retry_count < max_retries:
-                            lines.append(f"\n⚠ 检测到状态码 {http_status}，尝试刷新 Token...")
-                            success, message = await _refresh_token(token_config, base_url, variable_pool, lines)
-                            if success:
-                                lines.append(f"✓ {message}")
-                                retry_count += 1
-                                continue  # 重试请求
-                            else:
-                                lines.append(f"✗ {message}")
-                                error_message = f"Token 刷新失败: {message}"
-                                break
+                        # 检查是否需要刷新 Token
+                        if token_config and variable_pool is not None:
+                            retry_status_codes = token_config.get("retry_status_codes", [401, 403])
+                            if http_status in retry_status_codes and retry_count < max_retries:
+                                lines.append(f"\n⚠ 检测到状态码 {http_status}，尝试刷新 Token...")
+                                success, message = await obtain_token(token_config, base_url, variable_pool, lines, http_clients, force_refresh=True)
+                                if success:
+                                    lines.append(f"✓ {message}")
+                                    retry_count += 1
+                                    continue  # 重试请求
+                                else:
+                                    lines.append(f"✗ {message}")
+                                    error_message = f"Token 刷新失败: {message}"
+                                    break
                     
-                    # 请求成功，退出循环
-                    break
-
-                except Exception as exc:  # noqa: BLE001
-                    error_message = str(exc)
-                    if retry_count >= max_retries:
-                        lines.append("== 请求执行失败 ==")
-                        lines.append(f"错误信息: {error_message}")
+                        # 请求成功，退出循环
                         break
-                    retry_count += 1
+
+                    except Exception as exc:  # noqa: BLE001
+                        error_message = str(exc)
+                        if retry_count >= max_retries:
+                            lines.append("== 请求执行失败 ==")
+                            lines.append(f"错误信息: {error_message}")
+                            break
+                        retry_count += 1
             
-            # 处理变量提取（仅在第一次请求成功时）
-            if retry_count == 0 and extractors_cfg and variable_pool is not None and http_status and http_status < 400:
-                updated_pool, extract_logs = _process_extractors(
-                    extractors_cfg, 
-                    response_json, 
-                    response_text or "",
-                    variable_pool
-                )
-                # 更新变量池
-                variable_pool.update(updated_pool)
-                # 将提取日志添加到测试日志中
-                if extract_logs:
-                    lines.append("\n== 变量提取 ==")
-                    lines.extend(extract_logs)
+                # 处理变量提取（仅在第一次请求成功时）
+                if retry_count == 0 and extractors_cfg and variable_pool is not None and http_status and http_status < 400:
+                    updated_pool, extract_logs = process_extractors(
+                        extractors_cfg, 
+                        response_json, 
+                        response_text or "",
+                        variable_pool
+                    )
+                    # 更新变量池
+                    variable_pool.update(updated_pool)
+                    # 将提取日志添加到测试日志中
+                    if extract_logs:
+                        lines.append("\n== 变量提取 ==")
+                        lines.extend(extract_logs)
             
-            lines.append("== 响应信息（真实请求） ==")
-            lines.append(f"HTTP 状态码: {http_status}")
-            if response_json is not None:
-                lines.append("响应 Body(JSON):")
-                lines.append(json.dumps(response_json, ensure_ascii=False, indent=2))
-            else:
-                lines.append("响应 Body(文本):")
-                lines.append(response_text or "")
+                lines.append("== 响应信息（真实请求） ==")
+                lines.append(f"HTTP 状态码: {http_status}")
+                if response_json is not None:
+                    lines.append("响应 Body(JSON):")
+                    lines.append(json.dumps(response_json, ensure_ascii=False, indent=2))
+                else:
+                    lines.append("响应 Body(文本):")
+                    lines.append(response_text or "")
 
-            # 基于断言 & HTTP 结果计算执行状态
-            assertions_passed = True
-            assertion_results: List[Dict[str, Any]] = []
+                # 基于断言 & HTTP 结果计算执行状态
+                assertions_passed = True
+                assertion_results: List[Dict[str, Any]] = []
 
-            lines.append("")
-            lines.append("== 断言配置检查 ==")
-            if test_assertions:
-                lines.append(f"使用测试数据中的断言配置，数量: {len(current_assertions)}")
-            else:
-                lines.append(f"使用用例配置中的断言，数量: {len(current_assertions)}")
-            if current_assertions:
-                lines.append("断言配置详情:")
-                for idx, a in enumerate(current_assertions, start=1):
-                    lines.append(f"  [{idx}] {json.dumps(a, ensure_ascii=False)}")
-                
-                # 传递测试数据给断言评估函数，支持在断言中使用变量
-                # 注意：这里使用current_assertions而不是assertions_cfg
-                assertions_passed, assertion_results = _evaluate_assertions(
-                    current_assertions, http_status, response_json, test_data=test_data
-                )
                 lines.append("")
-                lines.append("== 断言执行结果 ==")
-                for idx, ar in enumerate(assertion_results, start=1):
-                    status_text = "通过" if ar.get("passed") else "失败"
-                    a_type = ar.get("type", "unknown")
-                    expected = ar.get("expected", "N/A")
-                    actual = ar.get("actual", "N/A")
-                    path = ar.get("path", "")
-                    operator = ar.get("operator", "")
+                lines.append("== 断言配置检查 ==")
+                if test_assertions:
+                    lines.append(f"使用测试数据中的断言配置，数量: {len(current_assertions)}")
+                else:
+                    lines.append(f"使用用例配置中的断言，数量: {len(current_assertions)}")
+                if current_assertions:
+                    lines.append("断言配置详情:")
+                    for idx, a in enumerate(current_assertions, start=1):
+                        lines.append(f"  [{idx}] {json.dumps(a, ensure_ascii=False)}")
+                
+                    # 传递测试数据给断言评估函数，支持在断言中使用变量
+                    # 注意：这里使用current_assertions而不是assertions_cfg
+                    assertions_passed, assertion_results = _evaluate_assertions(
+                        current_assertions, http_status, response_json, test_data=test_data
+                    )
+                    lines.append("")
+                    lines.append("== 断言执行结果 ==")
+                    for idx, ar in enumerate(assertion_results, start=1):
+                        status_text = "通过" if ar.get("passed") else "失败"
+                        a_type = ar.get("type", "unknown")
+                        expected = ar.get("expected", "N/A")
+                        actual = ar.get("actual", "N/A")
+                        path = ar.get("path", "")
+                        operator = ar.get("operator", "")
                     
-                    lines.append(f"[{idx}] 类型={a_type} 结果={status_text}")
-                    if path:
-                        lines.append(f"    路径: {path}")
-                    if operator:
-                        lines.append(f"    运算符: {operator}")
-                    lines.append(f"    期望值: {expected}")
-                    lines.append(f"    实际值: {actual}")
-                    if ar.get("message"):
-                        lines.append(f"    说明: {ar['message']}")
+                        lines.append(f"[{idx}] 类型={a_type} 结果={status_text}")
+                        if path:
+                            lines.append(f"    路径: {path}")
+                        if operator:
+                            lines.append(f"    运算符: {operator}")
+                        lines.append(f"    期望值: {expected}")
+                        lines.append(f"    实际值: {actual}")
+                        if ar.get("message"):
+                            lines.append(f"    说明: {ar['message']}")
                 
-                lines.append("")
-                lines.append(f"断言整体结果: {'全部通过' if assertions_passed else '存在失败'}")
-            else:
-                lines.append("未配置断言，使用默认判断逻辑（HTTP状态码 < 400 视为通过）")
-                # 未配置断言时，保持原有行为：HTTP < 400 视为通过
-                if http_status is not None and http_status < 400 and not error_message:
-                    assertions_passed = True
+                    lines.append("")
+                    lines.append(f"断言整体结果: {'全部通过' if assertions_passed else '存在失败'}")
                 else:
-                    assertions_passed = False
+                    lines.append("未配置断言，使用默认判断逻辑（HTTP状态码 < 400 视为通过）")
+                    # 未配置断言时，保持原有行为：HTTP < 400 视为通过
+                    if http_status is not None and http_status < 400 and not error_message:
+                        assertions_passed = True
+                    else:
+                        assertions_passed = False
 
-            # 记录本次执行结果
-            step_status = "passed" if (assertions_passed and not error_message) else "failed"
-            if step_status == "passed":
-                total_passed += 1
-            else:
-                total_failed += 1
+                # 记录本次执行结果
+                step_status = "passed" if (assertions_passed and not error_message) else "failed"
+                if step_status == "passed":
+                    total_passed += 1
+                else:
+                    total_failed += 1
+                await progress.row_finished(data_index, step_status)
             
-            all_details.append({
-                "data_index": data_index,
-                "test_data": {k: v for k, v in test_data.items() if not k.startswith('__')},
-                "step": data_index,
-                "name": f"数据驱动执行 [{data_index}/{len(test_data_list)}]",
-                "status": step_status,
-                "test_data": test_data,
-                "request": {
-                    "url": url,
-                    "method": request_info.get("method") if request_info else None,
-                    "headers": headers,
-                    "params": params,
-                    "body": body,
-                },
-                "response": {
-                    "status_code": http_status,
-                    "body_json": response_json,
-                    "body_text": response_text,
-                    "error": error_message,
-                },
-                "assertions": assertion_results,
-            })
+                await step_results.add(data_index, {
+                    "data_index": data_index,
+                    "test_data": {k: v for k, v in test_data.items() if not k.startswith('__')},
+                    "step": data_index,
+                    "name": f"数据驱动执行 [{data_index}/{total_rows}]",
+                    "status": step_status,
+                    "test_data": test_data,
+                    "request": {
+                        "url": url,
+                        "method": request_info.get("method") if request_info else None,
+                        "headers": headers,
+                        "params": params,
+                        "body": body,
+                    },
+                    "response": {
+                        "status_code": http_status,
+                        "body_json": response_json,
+                        "body_text": response_text,
+                        "error": error_message,
+                        "latency_ms": latency_ms,
+                    },
+                    "assertions": assertion_results,
+                })
             
-            lines.append("")
-            lines.append(f"== 数据 [{data_index}/{len(test_data_list)}] 执行结果: {step_status} ==")
-            lines.append("")
+                lines.append("")
+                lines.append(f"== 数据 [{data_index}/{total_rows}] 执行结果: {step_status} ==")
+                lines.append("")
+    except BaseException:
+        await lines.close()
+        await step_results.close()
+        raise
+    finally:
+        http_stats = http_clients.get_stats()
+        lines.append(
+            f"[连接池] 请求 {http_stats['requests']} 次，新建连接 {http_stats['new_connections']} 个，"
+            f"复用 {http_stats['reused_requests']} 次，HTTP/2: {'是' if http_clients.http2 else '否'}"
+        )
+        if owns_http_clients:
+            await http_clients.aclose()
 
     # 组装最终执行结果摘要
-    total_count = len(test_data_list)
+    total_count = total_rows
     summary = {
         "total": total_count,
         "passed": total_passed,
@@ -3007,7 +2047,9 @@ async def _execute_pending_test_execution(execution: TestExecution, db: AsyncSes
 
     result_payload = {
         "summary": summary,
-        "details": all_details,
+        # 完整步骤明细见步骤结果接口，这里只保留第一个步骤（报告页展示）
+        "details": [step_results.first_detail] if step_results.first_detail else [],
+        "step_count": step_results.count,
     }
 
     lines.append("")
@@ -3017,13 +2059,20 @@ async def _execute_pending_test_execution(execution: TestExecution, db: AsyncSes
         f"failed={summary['failed']}, skipped={summary['skipped']}"
     )
 
-    execution.logs = "\n".join(lines)
+    await lines.close()
+    await step_results.close()
+    # 已计入日汇总的执行（如被重新执行）先按原状态扣除，再按新状态计入
+    await unroll_executions(db, [execution.id])
+    execution.logs = lines.tail_text()
     execution.status = status_value
     execution.finished_at = datetime.utcnow()
     execution.result = result_payload
+    execution.summary = build_execution_summary(summary, status_value, execution.started_at, execution.finished_at)
+    await rollup_finished_executions(db, [execution.id])
 
     await db.commit()
     await db.refresh(execution)
+    await progress.finish(status_value.value, summary)
     
     # 生成对应的报告视图（当前实现为基于执行记录的动态报告，不单独落库）
     report_service = ReportService()
@@ -3052,12 +2101,22 @@ async def get_test_execution(
 @router.get("/{execution_id}/logs")
 async def get_execution_logs(
     execution_id: int,
+    after: Optional[int] = Query(None, ge=0, description="只返回序号大于该值的日志，从头分页或追尾时传上次返回的 next_seq"),
+    limit: int = Query(500, ge=1, le=5000, description="最多返回条数"),
+    tail: Optional[int] = Query(None, ge=1, le=5000, description="返回最近的 N 条日志（忽略 after）"),
+    level: Optional[str] = Query(None, description="最低日志级别：DEBUG/INFO/WARNING/ERROR"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """获取测试执行日志"""
-    result = await db.execute(select(TestExecution).where(TestExecution.id == execution_id))
-    execution = result.scalar_one_or_none()
+    """获取测试执行日志（按序号分页/追尾）
+
+    不传 after 与 tail 时返回最近 limit 条；has_earlier 表示更早的日志未返回，
+    需要完整日志时从 after=0 开始按 next_seq 分页读取。
+    """
+    result = await db.execute(
+        select(TestExecution.id, TestExecution.status, TestExecution.logs).where(TestExecution.id == execution_id)
+    )
+    execution = result.one_or_none()
     
     if not execution:
         raise HTTPException(
@@ -3065,13 +2124,211 @@ async def get_execution_logs(
             detail="测试执行不存在"
         )
     
+    if after is None and not tail:
+        tail = limit
+    entries = await read_execution_logs(
+        db, execution_id, after=after, limit=limit, tail=tail, min_level=level
+    )
+    if not entries and after is None:
+        # 日志表上线前的历史执行：只有 logs 字段
+        return {
+            "execution_id": execution_id,
+            "logs": execution.logs or "",
+            "status": execution.status,
+            "entries": [],
+            "next_seq": after or 0,
+            "has_more": False,
+            "has_earlier": False,
+        }
+    
+    return {
+        "execution_id": execution_id,
+        "logs": "\n".join(entry.message for entry in entries),
+        "status": execution.status,
+        "entries": [
+            {
+                "seq": entry.seq,
+                "level": entry.level,
+                "message": entry.message,
+                "created_at": entry.created_at,
+            }
+            for entry in entries
+        ],
+        "next_seq": entries[-1].seq if entries else (after or 0),
+        "has_more": not tail and len(entries) >= limit,
+        # 追尾读取返回满 tail 条且首条不是第 1 条时，还有更早的日志
+        "has_earlier": bool(tail) and len(entries) >= tail and entries[0].seq > 1,
+    }
+
+
+@router.get("/{execution_id}/steps")
+async def get_execution_steps(
+    execution_id: int,
+    step_status: Optional[str] = Query(None, alias="status", description="按步骤状态过滤：passed/failed"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取执行步骤摘要列表（不含请求/响应明细）"""
+    exists = await db.execute(select(TestExecution.id).where(TestExecution.id == execution_id))
+    if exists.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="测试执行不存在"
+        )
+    
+    total, steps = await list_step_results(db, execution_id, status=step_status, offset=skip, limit=limit)
+    return {
+        "execution_id": execution_id,
+        "total": total,
+        "items": [step_summary_dict(step) for step in steps],
+    }
+
+
+@router.get("/{execution_id}/steps/{step_index}")
+async def get_execution_step_detail(
+    execution_id: int,
+    step_index: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取单个步骤的完整明细（请求、响应、断言）"""
+    detail = await get_step_detail(db, execution_id, step_index)
+    if detail is None:
+        # 步骤结果表上线前的历史执行：明细在 result["details"] 中
+        result = await db.execute(select(TestExecution.result).where(TestExecution.id == execution_id))
+        execution_result = result.scalar_one_or_none()
+        details = execution_result.get("details") if isinstance(execution_result, dict) else None
+        if isinstance(details, list):
+            detail = next(
+                (d for d in details if isinstance(d, dict) and d.get("data_index", d.get("step")) == step_index),
+                None,
+            )
+    if detail is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="执行步骤不存在"
+        )
+    return {"execution_id": execution_id, "step_index": step_index, "detail": detail}
+
+
+_TERMINAL_STATUSES = (
+    ExecutionStatus.PASSED, ExecutionStatus.FAILED, ExecutionStatus.ERROR, ExecutionStatus.CANCELLED,
+)
+
+
+async def _load_execution_state(execution_id: int) -> Optional[Tuple[ExecutionStatus, Dict[str, Any]]]:
+    """读取执行状态与结果摘要（使用独立会话，避免长连接占用请求会话）"""
+    async with AsyncSessionLocal() as state_db:
+        result = await state_db.execute(
+            select(TestExecution.status, TestExecution.result).where(TestExecution.id == execution_id)
+        )
+        row = result.one_or_none()
+    if row is None:
+        return None
+    summary = row.result.get("summary", {}) if isinstance(row.result, dict) else {}
+    return row.status, summary
+
+
+def _finished_event(execution_id: int, execution_status: ExecutionStatus, summary: Dict[str, Any]) -> Dict[str, Any]:
     return {
+        "type": FINISHED,
         "execution_id": execution_id,
-        "logs": execution.logs or "",
-        "status": execution.status
+        "status": execution_status.value if isinstance(execution_status, ExecutionStatus) else execution_status,
+        "summary": summary,
     }
 
 
+async def _iter_execution_events(execution_id: int):
+    """执行事件流：先推送当前进度快照，再转发实时事件，执行结束后停止
+
+    等待超时时产出 None，调用方据此发送心跳。
+    """
+    state = await _load_execution_state(execution_id)
+    if state is None:
+        return
+    if state[0] in _TERMINAL_STATUSES:
+        yield _finished_event(execution_id, *state)
+        return
+
+    bus = await get_execution_event_bus()
+    async with bus.subscribe(execution_id) as subscription:
+        # 订阅建立之前执行可能刚好结束，订阅后再确认一次
+        state = await _load_execution_state(execution_id)
+        if state is None or state[0] in _TERMINAL_STATUSES:
+            if state is not None:
+                yield _finished_event(execution_id, *state)
+            return
+        snapshot = await bus.snapshot(execution_id)
+        if snapshot:
+            yield snapshot
+
+        while True:
+            event = await subscription.get(timeout=settings.EXECUTION_STREAM_HEARTBEAT_SECONDS)
+            if event is None:
+                # 长时间没有事件：确认执行是否已结束（执行节点异常退出时不会发布结束事件）
+                state = await _load_execution_state(execution_id)
+                if state is None or state[0] in _TERMINAL_STATUSES:
+                    if state is not None:
+                        yield _finished_event(execution_id, *state)
+                    return
+                yield None
+                continue
+            yield event
+            if event.get("type") == FINISHED:
+                return
+
+
+@router.get("/{execution_id}/stream")
+async def stream_execution_events_sse(
+    execution_id: int,
+    current_user: User = Depends(get_current_active_user_allow_query)
+):
+    """实时执行进度（Server-Sent Events）"""
+    if await _load_execution_state(execution_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="测试执行不存在"
+        )
+
+    async def event_source():
+        async for event in _iter_execution_events(execution_id):
+            if event is None:
+                yield ": ping\n\n"
+            else:
+                payload = json.dumps(event, ensure_ascii=False, default=str)
+                yield f"event: {event.get('type', 'message')}\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{execution_id}/stream")
+async def stream_execution_events_ws(websocket: WebSocket, execution_id: int, token: Optional[str] = None):
+    """实时执行进度（WebSocket，令牌通过查询参数 token 传递）"""
+    async with AsyncSessionLocal() as auth_db:
+        user = await authenticate_access_token(token, auth_db)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    if await _load_execution_state(execution_id) is None:
+        await websocket.send_json({"type": "error", "execution_id": execution_id, "message": "测试执行不存在"})
+        await websocket.close()
+        return
+    try:
+        async for event in _iter_execution_events(execution_id):
+            await websocket.send_text(json.dumps(event or {"type": "ping"}, ensure_ascii=False, default=str))
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
 @router.delete("/batch", status_code=status.HTTP_204_NO_CONTENT)
 async def batch_delete_test_executions(
     request: BatchDeleteExecutionRequest = Body(...),
@@ -3086,6 +2343,8 @@ async def batch_delete_test_executions(
             detail="请提供要删除的测试执行ID列表"
         )
     
+    # 已计入日汇总的执行同一事务内从汇总中扣除
+    await unroll_executions(db, execution_ids)
     result = await db.execute(
         delete(TestExecution).where(TestExecution.id.in_(execution_ids))
     )
@@ -3099,6 +2358,7 @@ async def delete_test_execution(
     current_user: User = Depends(get_current_active_user)
 ):
     """删除单个测试执行"""
+    await unroll_executions(db, [execution_id])
     result = await db.execute(
         delete(TestExecution).where(TestExecution.id == execution_id)
     )
@@ -3141,6 +2401,7 @@ async def delete_test_execution(
     current_user: User = Depends(get_current_active_user)
 ):
     """删除单个测试执行"""
+    await unroll_executions(db, [execution_id])
     result = await db.execute(
         delete(TestExecution).where(TestExecution.id == execution_id)
     )
@@ -0,0 +1,117 @@
+"""
+性能测试执行逻辑
+"""
+from typing import Dict, Any
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.models.test_execution import TestExecution, ExecutionStatus
+from app.models.test_case import TestCase
+from app.models.environment import Environment
+from app.engines.engine_factory import EngineFactory
+from app.services.report_service import build_execution_summary
+from app.services.execution_rollup import rollup_finished_executions
+from app.services.performance_baseline import NO_CHANGE, REGRESSION, record_performance_run
+
+
+async def _execute_performance_test_case(execution: TestExecution, test_case: TestCase, db: AsyncSession):
+    """执行性能测试用例，结果保存为性能运行记录并与滚动基线对比"""
+    try:
+        execution.status = ExecutionStatus.RUNNING
+        execution.started_at = datetime.utcnow()
+        execution.logs = "性能测试执行已启动\n"
+        await db.commit()
+
+        execution.logs += f"测试用例: {test_case.name}\n"
+        execution.logs += "测试类型: 性能\n\n"
+
+        # 压测配置：执行环境作为默认环境，相对地址拼接环境的 base_url
+        config: Dict[str, Any] = dict(test_case.config or {})
+        environment = config.get("environment") or execution.environment or None
+        if environment:
+            config["environment"] = environment
+        url = config.get("url")
+        if url and not str(url).startswith("http") and environment:
+            env_result = await db.execute(select(Environment).where(Environment.key == environment))
+            env = env_result.scalar_one_or_none()
+            if env and env.base_url:
+                config["url"] = env.base_url.rstrip("/") + "/" + str(url).lstrip("/")
+
+        performance_engine = EngineFactory.create_engine("performance", {})
+
+        is_valid = await performance_engine.validate(config)
+        if not is_valid:
+            execution.status = ExecutionStatus.ERROR
+            execution.logs += "❌ 性能测试配置无效：需要 url 或 scenarios，并检查阶段、模式与压测节点配置\n"
+            execution.finished_at = datetime.utcnow()
+            execution.summary = build_execution_summary(None, execution.status, execution.started_at, execution.finished_at)
+            await rollup_finished_executions(db, [execution.id])
+            await db.commit()
+            return
+
+        execution.logs += "开始压测...\n"
+        await db.commit()
+
+        result = await performance_engine.execute(config)
+
+        # 保存运行记录并与基线对比（直方图只保存在运行记录中）
+        baseline_config = config.get("baseline") if isinstance(config.get("baseline"), dict) else {}
+        run = await record_performance_run(
+            db, execution.project_id, test_case.id, environment, result,
+            execution_id=execution.id, baseline_config=baseline_config,
+        )
+        metrics = result.get("metrics")
+        if metrics:
+            result["metrics"] = {key: value for key, value in metrics.items() if key != "latency_histogram"}
+        result["baseline"] = run.verdict
+        result["performance_run_id"] = run.id
+
+        execution.result = result
+        execution.logs += "\n执行完成\n"
+        execution.logs += f"状态: {result.get('status', 'unknown')}\n"
+        if metrics:
+            execution.logs += (
+                f"请求数: {metrics.get('total_requests', 0)}，错误率: {metrics.get('error_rate', 0):.4f}，"
+                f"吞吐量: {metrics.get('rps', 0):.2f}/s\n"
+            )
+        for failure in result.get("threshold_failures") or []:
+            execution.logs += f"   阈值未满足: {failure}\n"
+
+        verdict = run.verdict["verdict"] if run.verdict else None
+        if verdict:
+            execution.logs += f"基线对比: {verdict}（基线运行 {run.verdict['baseline_runs']} 次）\n"
+            for item in run.verdict["metrics"]:
+                if item["verdict"] != NO_CHANGE:
+                    execution.logs += f"   {item['metric']}: {item['baseline']} → {item['current']}（{item['verdict']}）\n"
+
+        if result.get("status") == "passed":
+            execution.status = ExecutionStatus.PASSED
+        elif result.get("status") == "failed":
+            execution.status = ExecutionStatus.FAILED
+        else:
+            execution.status = ExecutionStatus.ERROR
+            execution.logs += f"⚠️ 执行错误: {result.get('error', '未知错误')}\n"
+        if verdict == REGRESSION and baseline_config.get("fail_on_regression") and execution.status == ExecutionStatus.PASSED:
+            execution.status = ExecutionStatus.FAILED
+            execution.logs += "❌ 相对基线出现性能回归\n"
+        elif execution.status == ExecutionStatus.PASSED:
+            execution.logs += "✅ 测试通过\n"
+        elif execution.status == ExecutionStatus.FAILED:
+            execution.logs += "❌ 测试失败\n"
+
+        execution.finished_at = datetime.utcnow()
+        execution.summary = build_execution_summary(None, execution.status, execution.started_at, execution.finished_at)
+        await rollup_finished_executions(db, [execution.id])
+        await db.commit()
+
+    except Exception as e:
+        execution.status = ExecutionStatus.ERROR
+        execution.logs += f"\n❌ 执行异常: {str(e)}\n"
+        execution.finished_at = datetime.utcnow()
+        execution.result = {
+            "status": "error",
+            "error": str(e)
+        }
+        execution.summary = build_execution_summary(None, execution.status, execution.started_at, execution.finished_at)
+        await rollup_finished_executions(db, [execution.id])
+        await db.commit()
@@ -9,6 +9,8 @@ from app.models.test_execution import TestExecution, ExecutionStatus
 from app.models.test_case import TestCase
 from app.models.project import Project
 from app.engines.engine_factory import EngineFactory
+from app.services.report_service import build_execution_summary
+from app.services.execution_rollup import rollup_finished_executions
 import json
 
 
@@ -60,6 +62,8 @@ async def _execute_ui_test_case(execution: TestExecution, test_case: TestCase, d
             execution.status = ExecutionStatus.ERROR
             execution.logs += "❌ 测试用例配置无效：缺少必需的steps字段\n"
             execution.finished_at = datetime.utcnow()
+            execution.summary = build_execution_summary(None, execution.status, execution.started_at, execution.finished_at)
+            await rollup_finished_executions(db, [execution.id])
             await db.commit()
             return
         
@@ -98,6 +102,16 @@ async def _execute_ui_test_case(execution: TestExecution, test_case: TestCase, d
             execution.logs += f"\n截图数量: {len(result.get('screenshots', []))}\n"
         
         execution.finished_at = datetime.utcnow()
+        step_results = result.get("results") or []
+        execution.summary = build_execution_summary(
+            {
+                "total": len(step_results),
+                "passed": sum(1 for r in step_results if r.get("status") == "passed"),
+                "failed": sum(1 for r in step_results if r.get("status") != "passed"),
+            } if step_results else None,
+            execution.status, execution.started_at, execution.finished_at,
+        )
+        await rollup_finished_executions(db, [execution.id])
         await db.commit()
         
         # 生成报告
@@ -117,5 +131,7 @@ async def _execute_ui_test_case(execution: TestExecution, test_case: TestCase, d
             "status": "error",
             "error": str(e)
         }
+        execution.summary = build_execution_summary(None, execution.status, execution.started_at, execution.finished_at)
+        await rollup_finished_executions(db, [execution.id])
         await db.commit()
 
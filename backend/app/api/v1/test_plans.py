@@ -1,42 +1,119 @@
 """
 测试计划管理API
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
-from pydantic import BaseModel
+from sqlalchemy import select
 from typing import Optional, List
+from app.core.database import get_db
+from app.core.dependencies import get_current_active_user
+from app.models.test_plan import TestPlan
+from app.models.test_plan_run import TestPlanRun
+from app.models.user import User
+from app.schemas.test_plan import TestPlanCreate, TestPlanResponse, TestPlanExecuteRequest, TestPlanRunResponse
+from app.services.test_plan_executor import start_plan_run, build_case_states, resolve_run_config
 
 router = APIRouter()
 
 
-class TestPlanCreate(BaseModel):
-    name: str
-    description: Optional[str] = None
-    project_id: int
-    test_case_ids: List[int] = []
-
-
 @router.get("/")
 async def get_test_plans(
     project_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
     db: AsyncSession = Depends(get_db)
 ):
     """获取测试计划列表"""
-    # TODO: 实现获取测试计划列表逻辑
-    return {"test_plans": []}
+    query = select(TestPlan)
+    if project_id:
+        query = query.where(TestPlan.project_id == project_id)
+    query = query.order_by(TestPlan.created_at.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return {"test_plans": [TestPlanResponse.model_validate(plan) for plan in result.scalars().all()]}
 
 
-@router.post("/")
+@router.post("/", response_model=TestPlanResponse, status_code=status.HTTP_201_CREATED)
 async def create_test_plan(test_plan: TestPlanCreate, db: AsyncSession = Depends(get_db)):
     """创建测试计划"""
-    # TODO: 实现创建测试计划逻辑
-    return {"id": 1, **test_plan.dict()}
+    from app.models.project import Project
+    project_result = await db.execute(select(Project).where(Project.id == test_plan.project_id))
+    if not project_result.scalar_one_or_none():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="项目不存在"
+        )
+
+    new_plan = TestPlan(**test_plan.dict())
+    # 依赖配置在创建时校验，避免执行时才发现循环依赖
+    try:
+        build_case_states(new_plan, resolve_run_config(new_plan))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    db.add(new_plan)
+    await db.commit()
+    await db.refresh(new_plan)
+    return new_plan
+
+
+@router.get("/{test_plan_id}", response_model=TestPlanResponse)
+async def get_test_plan(test_plan_id: int, db: AsyncSession = Depends(get_db)):
+    """获取测试计划详情"""
+    plan = await db.get(TestPlan, test_plan_id)
+    if not plan:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="测试计划不存在")
+    return plan
 
 
-@router.post("/{test_plan_id}/execute")
-async def execute_test_plan(test_plan_id: int, db: AsyncSession = Depends(get_db)):
-    """执行测试计划"""
-    # TODO: 实现执行测试计划逻辑
-    return {"execution_id": 1, "status": "running"}
+@router.post("/{test_plan_id}/execute", response_model=TestPlanRunResponse, status_code=status.HTTP_202_ACCEPTED)
+async def execute_test_plan(
+    test_plan_id: int,
+    request: Optional[TestPlanExecuteRequest] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """执行测试计划
+
+    计划中的用例拆成测试执行放入执行队列，按依赖与并发上限分批启动，
+    立即返回运行记录（状态为running），通过运行详情接口查看进度。
+    """
+    plan = await db.get(TestPlan, test_plan_id)
+    if not plan:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="测试计划不存在")
+    if not plan.test_case_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="测试计划中没有测试用例")
+
+    overrides = request.dict(exclude_none=True) if request else {}
+    environment = overrides.pop("environment", None)
+    try:
+        run = await start_plan_run(db, plan, executed_by=current_user.id, environment=environment, overrides=overrides)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return run
+
+
+@router.get("/{test_plan_id}/runs", response_model=List[TestPlanRunResponse])
+async def get_test_plan_runs(
+    test_plan_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取测试计划的运行记录"""
+    result = await db.execute(
+        select(TestPlanRun)
+        .where(TestPlanRun.test_plan_id == test_plan_id)
+        .order_by(TestPlanRun.created_at.desc(), TestPlanRun.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
 
+@router.get("/{test_plan_id}/runs/{run_id}", response_model=TestPlanRunResponse)
+async def get_test_plan_run(test_plan_id: int, run_id: int, db: AsyncSession = Depends(get_db)):
+    """获取测试计划运行详情（每个用例的状态与执行ID）"""
+    run = await db.get(TestPlanRun, run_id)
+    if not run or run.test_plan_id != test_plan_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="运行记录不存在")
+    return run
@@ -53,7 +53,101 @@ class Settings(BaseSettings):
     # 测试引擎配置
     TEST_TIMEOUT: int = 3600  # 测试超时时间（秒）
     MAX_CONCURRENT_TESTS: int = 10  # 最大并发测试数
-    
+
+    # HTTP客户端连接池配置
+    HTTP_CLIENT_TIMEOUT: float = 30.0  # 请求超时时间（秒）
+    HTTP_POOL_MAX_CONNECTIONS: int = 100  # 单个客户端最大连接数
+    HTTP_POOL_MAX_KEEPALIVE: int = 20  # 最大保活连接数
+    HTTP_POOL_KEEPALIVE_EXPIRY: float = 30.0  # 保活连接空闲过期时间（秒）
+    HTTP2_ENABLED: bool = True  # 是否启用HTTP/2（需安装h2）
+    HTTP_CLIENT_SHARED_PER_ENVIRONMENT: bool = False  # 是否按环境在进程内共享连接池（否则按执行创建）
+
+    # 被测系统 Token 缓存配置（token_config 登录结果在执行之间共享）
+    TOKEN_CACHE_BACKEND: str = "redis"  # redis / memory（Redis不可用时自动退回memory）
+    TOKEN_CACHE_DEFAULT_TTL: int = 300  # 非 JWT Token 的缓存时间（秒），可被 token_config.cache_ttl 覆盖
+    TOKEN_CACHE_REFRESH_BEFORE_SECONDS: int = 60  # 剩余有效期低于该值时后台主动刷新
+    TOKEN_CACHE_LOCK_SECONDS: int = 30  # 跨进程登录锁时长，其他进程最多等待该时间
+
+    # 执行队列配置
+    EXECUTION_QUEUE_BACKEND: str = "redis"  # redis / memory（Redis不可用时自动退回memory）
+    EXECUTION_WORKER_MODE: str = "embedded"  # embedded：API进程内消费；external：由独立执行节点进程消费
+    EXECUTION_WORKER_PROCESSES: int = 2  # 独立执行节点的进程数
+    EXECUTION_WORKER_CONCURRENCY: int = 4  # 每个执行节点进程的并发执行数
+    EXECUTION_WORKER_POLL_INTERVAL: float = 1.0  # 队列为空时的轮询间隔（秒）
+    EXECUTION_JOB_LEASE_SECONDS: int = 60  # 任务租约时长（秒），超时未续约视为节点崩溃
+    EXECUTION_JOB_HEARTBEAT_SECONDS: int = 15  # 心跳续约间隔（秒）
+    EXECUTION_JOB_MAX_ATTEMPTS: int = 3  # 节点崩溃后的最大重试次数
+    EXECUTION_PLAN_CACHE_SIZE: int = 256  # 编译后的用例执行计划缓存数量
+    TEST_PLAN_MAX_PARALLEL: int = 10  # 测试计划单次运行同时在途的用例数（可被计划配置 max_parallel 覆盖）
+    SCHEDULER_RESYNC_SECONDS: int = 300  # 定时调度器从数据库重建到期时间堆的间隔（秒），兜底其他进程创建的定时任务
+    SCHEDULER_LEADER_BACKEND: str = "redis"  # 调度主节点选举：redis / postgres（Redis不可用时退回Postgres advisory lock）
+    SCHEDULER_LEADER_TTL_SECONDS: int = 15  # 主节点租约时长（秒），主节点崩溃后最迟在此时间后被接管
+    SCHEDULER_LEADER_RENEW_SECONDS: int = 5  # 主节点续约 / 非主节点竞选间隔（秒）
+    SCHEDULER_CLAIM_BATCH: int = 100  # 调度器单次领取的到期定时任务数
+    SCHEDULER_DEFAULT_TIMEZONE: str = "Asia/Shanghai"  # 定时计划默认时区，也用于解析旧版定时配置中的本地时间
+    SCHEDULER_MISFIRE_POLICY: str = "run_once"  # 错过触发的默认处理：run_once 合并补执行一次 / skip 跳过 / run_all 逐个补执行
+    SCHEDULER_MISFIRE_GRACE_SECONDS: int = 60  # 超过计划触发时间多少秒视为错过触发（之内照常触发）
+    SCHEDULER_CATCHUP_MAX_RUNS: int = 10  # run_all 策略最多补执行最近的多少次触发，更早的跳过
+    SCHEDULER_CATCHUP_RATE: float = 1.0  # 补执行的全局速率（次/秒），超出的顺延触发；0 表示不限速
+    SCHEDULER_CATCHUP_BURST: int = 10  # 补执行允许的突发次数
+    SCHEDULER_JITTER_SECONDS: int = 0  # 定时计划默认的触发抖动窗口（秒），同一时刻到期的计划分散在窗口内触发
+
+    # 执行日志配置
+    EXECUTION_LOG_LEVEL: str = "INFO"  # 写入日志表的最低级别：DEBUG / INFO / WARNING / ERROR
+    EXECUTION_LOG_MAX_LINE_CHARS: int = 4000  # 单条日志最大字符数，超出部分截断
+    EXECUTION_LOG_MAX_LINES: int = 50000  # 单次执行最多写入的日志条数
+    EXECUTION_LOG_FLUSH_INTERVAL: float = 1.0  # 日志批量写入间隔（秒）
+    EXECUTION_LOG_FLUSH_BATCH: int = 500  # 单批写入的最大条数
+    EXECUTION_LOG_TAIL_LINES: int = 200  # 执行记录 logs 字段只保留最近的日志条数
+
+    # 执行实时进度配置
+    EXECUTION_EVENTS_BACKEND: str = "redis"  # redis / memory（Redis不可用时自动退回memory）
+    EXECUTION_PROGRESS_EVENT_INTERVAL: float = 0.5  # progress 事件最小发布间隔（秒）
+    EXECUTION_PROGRESS_CHECKPOINT_SECONDS: float = 10.0  # 进度写回数据库的最小间隔（秒）
+    EXECUTION_STREAM_HEARTBEAT_SECONDS: float = 15.0  # SSE/WebSocket 心跳间隔（秒）
+
+    # 执行步骤结果配置
+    EXECUTION_STEP_FLUSH_BATCH: int = 200  # 步骤结果批量写入条数
+    EXECUTION_STEP_PAYLOAD_COMPRESS_LEVEL: int = 6  # 步骤明细 zlib 压缩级别（1-9）
+
+    # 数据驱动并发控制（可被环境/用例/执行配置中的 concurrency 覆盖）
+    EXECUTION_CONCURRENCY_MIN_ROWS: int = 10  # 数据行数超过该值时并发执行
+    EXECUTION_CONCURRENCY_INITIAL: int = 10  # 初始并发数
+    EXECUTION_CONCURRENCY_MIN: int = 1  # 自适应下限
+    EXECUTION_CONCURRENCY_MAX: int = 100  # 自适应上限
+    EXECUTION_CONCURRENCY_PER_HOST: int = 100  # 进程内单个目标主机的并发上限（0表示不限制）
+    EXECUTION_RATE_LIMIT_RPS: float = 0.0  # 每秒请求数上限（0表示不限速）
+    EXECUTION_LATENCY_TARGET_MS: int = 0  # 目标平均延迟（毫秒），0表示相对基线判断
+    EXECUTION_LATENCY_TOLERANCE: float = 2.0  # 平均延迟超过基线的倍数时降低并发
+    EXECUTION_ERROR_RATE_THRESHOLD: float = 0.1  # 错误率（5xx/连接失败）超过该值时降低并发
+    EXECUTION_CONCURRENCY_DECREASE_FACTOR: float = 0.7  # 降低并发时的乘数
+    EXECUTION_DATA_STREAM_BATCH: int = 500  # 测试数据行流式读取的批大小
+    EXECUTION_DATA_CACHE_SIZE: int = 512  # 测试数据配置缓存数量（按配置ID+更新时间）
+    EXECUTION_DATA_CACHE_MAX_ROWS: int = 1000  # 行数不超过该值的配置缓存数据本身
+    EXECUTION_ROW_QUEUE_SIZE: int = 0  # 待执行数据行队列长度（0表示取并发上限的2倍）
+
+    # 性能测试配置
+    PERF_MAX_PROCESSES: int = 8  # 单次性能测试最多使用的压测进程数（processes 超出时取该值）
+    PERF_DEFAULT_MAX_IN_FLIGHT: int = 1000  # 开放模型默认的在途请求上限，超出时丢弃迭代
+    PERF_POOL_MAX_CONNECTIONS: int = 1000  # 单个压测进程连接池的最大连接数
+    PERF_PROCESS_START_TIMEOUT: int = 60  # 等待压测子进程就绪的超时（秒）
+    PERF_METRICS_INTERVAL_SECONDS: float = 1.0  # 性能指标时间序列的统计间隔（秒），用例可用 metrics_interval 覆盖
+    PERF_SCENARIO_MAX_ROWS: int = 10000  # 压测场景预渲染的数据行上限（环形缓冲区大小），超出的数据行不参与压测
+    PERF_MAX_AGENTS: int = 32  # 分布式压测单次最多使用的压测节点数
+    PERF_AGENT_ADDRESSES: List[str] = []  # 默认的远程压测节点地址（host:port），用例 agents 为 "remote" 时使用
+    PERF_AGENT_PORT: int = 7100  # 独立压测节点默认监听端口
+    PERF_AGENT_TOKEN: str = ""  # 压测节点共享密钥；为空时节点只接受本机连接（本地拉起的节点使用随机密钥）
+    PERF_AGENT_REPORT_INTERVAL: float = 1.0  # 压测节点上报增量统计的间隔（秒）
+    PERF_AGENT_MAX_MESSAGE_BYTES: int = 64 * 1024 * 1024  # 控制端与节点之间单条消息的最大字节数
+    PERF_BASELINE_WINDOW: int = 10  # 滚动基线包含的最近运行次数（同一用例与环境），用例 baseline.window 可覆盖
+    PERF_BASELINE_MIN_RUNS: int = 3  # 基线运行数少于该值时不做回归判定
+    PERF_BASELINE_REGRESSION_THRESHOLD: float = 0.1  # 指标相对基线中位数的变化超过该比例（且统计显著）才判定为回归 / 改善
+    PERF_BASELINE_CONFIDENCE: float = 0.95  # 回归判定的单侧置信度
+    PERF_BASELINE_ERROR_RATE_DELTA: float = 0.01  # 错误率绝对升幅超过该值（且统计显著）才判定为回归
+
+    # 仪表盘配置
+    DASHBOARD_STATS_CACHE_TTL: int = 30  # 仪表盘统计在 Redis 中的缓存时间（秒），0 表示不缓存
+
     # 文件存储
     UPLOAD_DIR: str = "./uploads"
     REPORT_DIR: str = "./reports"
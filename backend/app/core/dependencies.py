@@ -1,7 +1,7 @@
 """
 依赖项：认证和权限相关
 """
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, status, Query
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
@@ -12,6 +12,7 @@ from app.models.user import User
 from app.services.auth_service import AuthService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
 
 async def get_current_user(
@@ -76,3 +77,33 @@ async def get_current_superuser(
         )
     return current_user
 
+
+
+async def authenticate_access_token(token: Optional[str], db: AsyncSession) -> Optional[User]:
+    """校验访问令牌，返回激活的用户；无效时返回None（用于 WebSocket 等无法走标准依赖的场景）"""
+    if not token:
+        return None
+    payload = decode_token(token)
+    if payload is None or payload.get("type") != "access" or payload.get("sub") is None:
+        return None
+    auth_service = AuthService(db)
+    user = await auth_service.get_user_by_id(int(payload.get("sub")))
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+async def get_current_active_user_allow_query(
+    header_token: Optional[str] = Depends(oauth2_scheme_optional),
+    token: Optional[str] = Query(None, description="访问令牌（EventSource 无法设置请求头时使用）"),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """获取当前激活的用户，令牌可以放在请求头或查询参数 token 中"""
+    user = await authenticate_access_token(header_token or token, db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="无法验证凭据",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
@@ -0,0 +1,152 @@
+"""
+HTTP客户端连接池
+
+数据驱动执行、Token 刷新和 APIEngine 共用 httpx.AsyncClient，
+同一目标地址的请求复用 keep-alive 连接（安装 h2 时启用 HTTP/2），
+避免每行数据都重新进行 TCP/TLS 握手。
+"""
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # h2 未安装时退回 HTTP/1.1
+    HTTP2_AVAILABLE = False
+
+
+class HttpClientStats:
+    """连接复用统计"""
+
+    def __init__(self):
+        self.requests = 0  # 已完成的请求数
+        self.new_connections = 0  # 新建的TCP连接数
+        self.http2_responses = 0  # 通过HTTP/2返回的响应数
+
+    @property
+    def reused_requests(self) -> int:
+        """复用已有连接完成的请求数"""
+        return max(0, self.requests - self.new_connections)
+
+    def to_dict(self) -> Dict[str, Any]:
+        reuse_rate = self.reused_requests / self.requests if self.requests else 0.0
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_requests": self.reused_requests,
+            "reuse_rate": round(reuse_rate, 4),
+            "http2_responses": self.http2_responses,
+        }
+
+
+class HttpClientRegistry:
+    """httpx.AsyncClient 注册表
+
+    按 (verify, follow_redirects) 维度缓存客户端，同一注册表内的请求共享连接池。
+    既可以按单次执行创建（执行结束后 aclose），也可以按环境常驻进程内共享。
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+    ):
+        self.name = name
+        self.timeout = timeout if timeout is not None else settings.HTTP_CLIENT_TIMEOUT
+        self.limits = httpx.Limits(
+            max_connections=max_connections or settings.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive_connections or settings.HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=keepalive_expiry if keepalive_expiry is not None else settings.HTTP_POOL_KEEPALIVE_EXPIRY,
+        )
+        use_http2 = settings.HTTP2_ENABLED if http2 is None else http2
+        self.http2 = bool(use_http2 and HTTP2_AVAILABLE)
+        self._clients: Dict[Tuple[bool, bool], httpx.AsyncClient] = {}
+        self.stats = HttpClientStats()
+
+    def get_client(self, verify: bool = False, follow_redirects: bool = False) -> httpx.AsyncClient:
+        """获取（必要时创建）共享客户端"""
+        key = (verify, follow_redirects)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                verify=verify,
+                follow_redirects=follow_redirects,
+                limits=self.limits,
+                http2=self.http2,
+                event_hooks={
+                    "request": [self._on_request],
+                    "response": [self._on_response],
+                },
+            )
+            self._clients[key] = client
+        return client
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        """httpcore 追踪回调：统计新建连接"""
+        if event_name == "connection.connect_tcp.complete":
+            self.stats.new_connections += 1
+
+    async def _on_request(self, request: httpx.Request):
+        request.extensions["trace"] = self._trace
+
+    async def _on_response(self, response: httpx.Response):
+        self.stats.requests += 1
+        if response.http_version == "HTTP/2":
+            self.stats.http2_responses += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取连接复用统计"""
+        return {"name": self.name, "http2": self.http2, **self.stats.to_dict()}
+
+    async def aclose(self):
+        """关闭注册表中的所有客户端"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"关闭HTTP客户端失败({self.name}): {e}")
+
+    async def __aenter__(self) -> "HttpClientRegistry":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+
+# 进程级共享注册表（按作用域区分，例如 default、env:<环境标识>）
+_shared_registries: Dict[str, HttpClientRegistry] = {}
+
+
+def get_http_client_registry(scope: str = "default") -> HttpClientRegistry:
+    """获取进程级共享的客户端注册表"""
+    registry = _shared_registries.get(scope)
+    if registry is None:
+        registry = HttpClientRegistry(name=scope)
+        _shared_registries[scope] = registry
+    return registry
+
+
+def get_all_http_client_stats() -> Dict[str, Dict[str, Any]]:
+    """获取所有共享注册表的连接复用统计"""
+    return {scope: registry.get_stats() for scope, registry in _shared_registries.items()}
+
+
+async def close_http_clients():
+    """关闭所有共享客户端（应用关闭时调用）"""
+    registries = list(_shared_registries.values())
+    _shared_registries.clear()
+    for registry in registries:
+        await registry.aclose()
@@ -1,11 +1,20 @@
 """
 Redis客户端
 """
+import time
+import logging
+from typing import Optional
 import redis.asyncio as redis
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 redis_client: redis.Redis = None
 
+# 最近一次可用性检查结果：(检查时间, 是否可用)
+_availability: Optional[tuple] = None
+_AVAILABILITY_TTL = 30  # 可用性检查结果缓存时间（秒）
+
 
 async def init_redis():
     """初始化Redis连接"""
@@ -30,3 +39,23 @@ async def get_redis() -> redis.Redis:
     """获取Redis客户端"""
     return redis_client
 
+
+async def get_available_redis() -> Optional[redis.Redis]:
+    """获取可用的Redis客户端，Redis未初始化或不可达时返回None
+
+    检查结果缓存一段时间，供需要在Redis不可用时退回进程内实现的模块使用。
+    """
+    global _availability
+    if redis_client is None:
+        return None
+    now = time.monotonic()
+    if _availability is not None and now - _availability[0] < _AVAILABILITY_TTL:
+        return redis_client if _availability[1] else None
+    try:
+        await redis_client.ping()
+        available = True
+    except Exception as e:
+        logger.warning(f"Redis不可用，将使用进程内实现: {e}")
+        available = False
+    _availability = (now, available)
+    return redis_client if available else None
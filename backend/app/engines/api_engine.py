@@ -3,6 +3,8 @@ API测试引擎
 """
 from typing import Dict, Any
 import httpx
+from app.core.http_client import get_http_client_registry
+from app.utils.json_path import extract as extract_json_path
 from app.engines.base_engine import BaseTestEngine, TestStatus
 
 
@@ -17,44 +19,45 @@ class APIEngine(BaseTestEngine):
         """执行API测试用例"""
         self.status = TestStatus.RUNNING
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                self.client = client
+            # 使用进程级共享连接池，多次执行复用 keep-alive 连接
+            client = get_http_client_registry().get_client(verify=self.config.get("verify_ssl", True))
+            self.client = client
                 
-                # 执行API请求
-                method = test_case.get("method", "GET").upper()
-                url = test_case.get("url")
-                headers = test_case.get("headers", {})
-                params = test_case.get("params", {})
-                body = test_case.get("body")
+            # 执行API请求
+            method = test_case.get("method", "GET").upper()
+            url = test_case.get("url")
+            headers = test_case.get("headers", {})
+            params = test_case.get("params", {})
+            body = test_case.get("body")
                 
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    params=params,
-                    json=body if body else None
-                )
+            response = await client.request(
+                method=method,
+                url=url,
+                headers=headers,
+                params=params,
+                json=body if body else None
+            )
                 
-                # 验证响应
-                assertions = test_case.get("assertions", [])
-                assertion_results = []
+            # 验证响应
+            assertions = test_case.get("assertions", [])
+            assertion_results = []
                 
-                for assertion in assertions:
-                    result = self._validate_assertion(response, assertion)
-                    assertion_results.append(result)
+            for assertion in assertions:
+                result = self._validate_assertion(response, assertion)
+                assertion_results.append(result)
                 
-                all_passed = all(r.get("passed") for r in assertion_results)
-                self.status = TestStatus.PASSED if all_passed else TestStatus.FAILED
+            all_passed = all(r.get("passed") for r in assertion_results)
+            self.status = TestStatus.PASSED if all_passed else TestStatus.FAILED
                 
-                return {
-                    "status": self.status.value,
-                    "response": {
-                        "status_code": response.status_code,
-                        "headers": dict(response.headers),
-                        "body": response.text[:1000]  # 限制响应体长度
-                    },
-                    "assertions": assertion_results
-                }
+            return {
+                "status": self.status.value,
+                "response": {
+                    "status_code": response.status_code,
+                    "headers": dict(response.headers),
+                    "body": response.text[:1000]  # 限制响应体长度
+                },
+                "assertions": assertion_results
+            }
                 
         except Exception as e:
             self.status = TestStatus.ERROR
@@ -87,11 +90,15 @@ class APIEngine(BaseTestEngine):
                 }
             
             elif assertion_type == "json_path":
-                # TODO: 实现JSON路径断言
+                path = assertion.get("path", "")
+                actual = extract_json_path(response.json(), path)
+                passed = actual == expected
                 return {
                     "type": assertion_type,
-                    "passed": False,
-                    "error": "Not implemented"
+                    "path": path,
+                    "expected": expected,
+                    "actual": actual,
+                    "passed": passed
                 }
             
             else:
@@ -114,7 +121,6 @@ class APIEngine(BaseTestEngine):
         return all(field in test_case for field in required_fields)
     
     async def cleanup(self):
-        """清理资源"""
-        if self.client:
-            await self.client.aclose()
+        """清理资源（共享连接池由应用关闭时统一释放）"""
+        self.client = None
 
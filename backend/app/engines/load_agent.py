@@ -0,0 +1,184 @@
+"""
+分布式压测节点（load agent）
+
+独立进程运行，监听 TCP 端口，由压测控制端（app.engines.load_controller）连接下发压测份额：
+
+    python -m app.engines.load_agent --host 0.0.0.0 --port 7100 --token <PERF_AGENT_TOKEN>
+
+协议为逐行 JSON（每条消息一行）：
+- 控制端 → 节点：prepare {token, config}、start、stop
+- 节点 → 控制端：ready {agent_id}、report {stats}（每 PERF_AGENT_REPORT_INTERVAL 秒的增量统计）、
+  done {stats}（最后一段增量统计）、error {message}
+
+节点同一时间只接受一次压测；与控制端的连接断开时立即停止压测，不会留下无人管理的负载。
+本机调试或控制端自行拉起节点时使用 --once：完成一次压测后退出。
+"""
+import os
+import sys
+import json
+import uuid
+import socket
+import asyncio
+import logging
+import argparse
+import ipaddress
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.engines.load_generator import LoadGenerator
+
+logger = logging.getLogger(__name__)
+
+# 本地节点启动后输出到标准输出的监听地址行前缀，控制端据此得知端口
+LISTENING_PREFIX = "LOAD_AGENT_LISTENING"
+
+
+async def send_message(writer: asyncio.StreamWriter, message: Dict[str, Any]):
+    writer.write(json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode() + b"\n")
+    await writer.drain()
+
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """读取一条消息，连接关闭时返回 None"""
+    line = await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def _is_loopback(writer: asyncio.StreamWriter) -> bool:
+    peer = writer.get_extra_info("peername")
+    try:
+        return bool(peer) and ipaddress.ip_address(peer[0]).is_loopback
+    except ValueError:
+        return False
+
+
+class LoadAgent:
+    """压测节点：接受控制端连接并运行下发的压测份额"""
+
+    def __init__(self, token: Optional[str] = None, once: bool = False):
+        self.token = token if token is not None else settings.PERF_AGENT_TOKEN
+        self.once = once
+        self.agent_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.report_interval = settings.PERF_AGENT_REPORT_INTERVAL
+        self._busy = False
+        self._started = asyncio.Event()
+        self._finished = asyncio.Event()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(
+            self._handle, host, port, limit=settings.PERF_AGENT_MAX_MESSAGE_BYTES,
+        )
+        bound_host, bound_port = server.sockets[0].getsockname()[:2]
+        # 控制端拉起的本地节点从这一行得知实际端口（--port 0 时由系统分配）
+        print(f"{LISTENING_PREFIX} {bound_host} {bound_port}", flush=True)
+        logger.info(f"压测节点 {self.agent_id} 监听 {bound_host}:{bound_port}")
+        if not self.token:
+            logger.warning("未配置 PERF_AGENT_TOKEN，只接受本机控制端连接")
+        async with server:
+            if self.once:
+                # 控制端拉起后迟迟没有连接（控制端已退出）时不再等待
+                try:
+                    await asyncio.wait_for(self._started.wait(), timeout=settings.PERF_PROCESS_START_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.warning("等待压测控制端连接超时，节点退出")
+                    return
+                await self._finished.wait()
+            else:
+                await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            if self._busy:
+                await send_message(writer, {"type": "error", "message": f"压测节点 {self.agent_id} 正在执行其他压测"})
+                return
+            self._busy = True
+            self._started.set()
+            try:
+                await self._session(reader, writer)
+            finally:
+                self._busy = False
+                if self.once:
+                    self._finished.set()
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.warning(f"压测控制端连接中断: {e}")
+        except Exception as e:
+            logger.error(f"压测节点处理失败: {e}", exc_info=True)
+        finally:
+            writer.close()
+
+    def _authorized(self, message: Dict[str, Any], writer: asyncio.StreamWriter) -> bool:
+        if self.token:
+            return message.get("token") == self.token
+        return _is_loopback(writer)
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """一次压测：prepare → ready → start → report… → done"""
+        message = await read_message(reader)
+        if message is None or message.get("type") != "prepare":
+            return
+        if not self._authorized(message, writer):
+            await send_message(writer, {"type": "error", "message": "压测节点认证失败"})
+            return
+        try:
+            generator = LoadGenerator(message["config"])
+        except Exception as e:
+            await send_message(writer, {"type": "error", "message": f"{type(e).__name__}: {e}"})
+            return
+        await send_message(writer, {"type": "ready", "agent_id": self.agent_id})
+
+        message = await read_message(reader)
+        if message is None or message.get("type") != "start":
+            await generator.http_clients.aclose()
+            return
+
+        run = asyncio.create_task(generator.run())
+        control = asyncio.create_task(self._watch_control(reader, generator))
+        try:
+            while not run.done():
+                await asyncio.wait({run}, timeout=self.report_interval)
+                if not run.done():
+                    await send_message(writer, {"type": "report", "stats": generator.take_stats().to_dict()})
+            await run
+            await send_message(writer, {"type": "done", "stats": generator.take_stats().to_dict()})
+        except Exception as e:
+            # 控制端断开等异常：停止压测，不留下无人管理的负载
+            generator.stop()
+            await asyncio.gather(run, return_exceptions=True)
+            if not isinstance(e, ConnectionError):
+                await send_message(writer, {"type": "error", "message": f"{type(e).__name__}: {e}"})
+            raise
+        finally:
+            control.cancel()
+
+    @staticmethod
+    async def _watch_control(reader: asyncio.StreamReader, generator: LoadGenerator):
+        """压测期间的控制消息：收到 stop 或连接关闭时停止"""
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None or message.get("type") == "stop":
+                    generator.stop()
+                    return
+        except (ConnectionError, ValueError):
+            generator.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="QualityGuard 分布式压测节点")
+    parser.add_argument("--host", default="0.0.0.0", help="监听地址")
+    parser.add_argument("--port", type=int, default=settings.PERF_AGENT_PORT, help="监听端口（0 表示由系统分配）")
+    parser.add_argument("--token", default=None, help="共享密钥（默认取 PERF_AGENT_TOKEN）")
+    parser.add_argument("--once", action="store_true", help="完成一次压测后退出")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stderr,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    # httpx 在 INFO 级别逐条记录请求，压测时会拖慢节点
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(LoadAgent(token=args.token, once=args.once).serve(args.host, args.port))
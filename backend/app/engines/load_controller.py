@@ -0,0 +1,240 @@
+"""
+分布式压测控制端
+
+由 API 进程（性能测试引擎）运行，协调多个压测节点（app.engines.load_agent）共同施压：
+- 用例 agents 为整数时在本机拉起对应数量的节点进程（python -m app.engines.load_agent --once），
+  用随机密钥认证，压测结束后节点自行退出；
+  为 "host:port" 列表时连接已部署的远程节点（共享密钥 PERF_AGENT_TOKEN），为 "remote" 时使用
+  PERF_AGENT_ADDRESSES
+- 虚拟用户数 / 到达率按节点数拆分（与多进程压测相同的 split_config），全部节点 ready 后同时下发 start
+- 节点每 PERF_AGENT_REPORT_INTERVAL 秒上报增量统计，控制端实时合并直方图与时间序列（live），
+  可通过 on_report 回调获取实时汇总
+- 任一节点出错或断开、超时、控制端被取消时向所有节点发送 stop，一起停止
+
+    {"url": "...", "mode": "open", "rps": 2000, "duration": 60, "agents": 4}
+    {"url": "...", "vus": 500, "duration": 300, "agents": ["10.0.0.11:7100", "10.0.0.12:7100"]}
+"""
+import os
+import sys
+import time
+import asyncio
+import inspect
+import logging
+import secrets
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.engines.load_generator import LoadStats, StageCurve, build_stages, split_config
+from app.engines.load_agent import LISTENING_PREFIX, send_message, read_message
+
+logger = logging.getLogger(__name__)
+
+# backend 目录（本地节点以 python -m app.engines.load_agent 启动的工作目录）
+_BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+class AgentError(Exception):
+    """压测节点出错"""
+
+
+def resolve_agents(config: Dict[str, Any]) -> Tuple[int, List[Tuple[str, int]]]:
+    """解析用例的 agents 配置，返回 (本地节点数, 远程节点地址列表)，配置无效时抛出 ValueError"""
+    agents = config.get("agents")
+    if agents == "remote":
+        agents = list(settings.PERF_AGENT_ADDRESSES)
+        if not agents:
+            raise ValueError("未配置远程压测节点地址 PERF_AGENT_ADDRESSES")
+    if isinstance(agents, bool):
+        raise ValueError(f"压测节点配置无效: {agents}")
+    if isinstance(agents, int):
+        if agents < 1 or agents > settings.PERF_MAX_AGENTS:
+            raise ValueError(f"压测节点数须在 1-{settings.PERF_MAX_AGENTS} 之间")
+        return agents, []
+    if not isinstance(agents, list) or not agents:
+        raise ValueError(f"压测节点配置无效: {agents}")
+    if len(agents) > settings.PERF_MAX_AGENTS:
+        raise ValueError(f"压测节点数不能超过 {settings.PERF_MAX_AGENTS}")
+    addresses = []
+    for address in agents:
+        host, _, port = str(address).rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(f"压测节点地址无效（应为 host:port）: {address}")
+        addresses.append((host.strip("[]"), int(port)))
+    return 0, addresses
+
+
+class AgentConnection:
+    """与一个压测节点的连接"""
+
+    def __init__(self, index: int, address: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.index = index
+        self.address = address
+        self.reader = reader
+        self.writer = writer
+        self.agent_id: Optional[str] = None
+        self.stats: Optional[LoadStats] = None  # 该节点的累计统计
+        self.finished = False
+
+    async def send(self, message: Dict[str, Any]):
+        await send_message(self.writer, message)
+
+    async def receive(self) -> Dict[str, Any]:
+        message = await read_message(self.reader)
+        if message is None:
+            raise AgentError(f"压测节点 {self.address} 断开连接")
+        if message.get("type") == "error":
+            raise AgentError(f"压测节点 {self.address}: {message.get('message')}")
+        return message
+
+    def close(self):
+        self.writer.close()
+
+
+class LoadController:
+    """分布式压测控制端"""
+
+    def __init__(self, config: Dict[str, Any], on_report: Optional[Callable[[LoadStats], Any]] = None):
+        self.config = config
+        self.on_report = on_report
+        self.local_agents, self.addresses = resolve_agents(config)
+        self.agent_count = self.local_agents or len(self.addresses)
+        self.timeout = float(config.get("timeout") or settings.HTTP_CLIENT_TIMEOUT)
+        self.total_duration = StageCurve(build_stages(config)).total_duration
+        # 本地节点使用一次性随机密钥，远程节点使用共享密钥
+        self.token = secrets.token_hex(16) if self.local_agents else settings.PERF_AGENT_TOKEN
+        self.live = LoadStats(config.get("metrics_interval"))  # 实时合并的汇总
+        self.live.processes = self.agent_count
+        self.connections: List[AgentConnection] = []
+        self.errors: List[str] = []
+        self._processes: List[asyncio.subprocess.Process] = []
+        self._stopping = False
+
+    async def run(self) -> LoadStats:
+        shares = split_config({key: value for key, value in self.config.items() if key != "agents"}, self.agent_count)
+        try:
+            await self._connect_all()
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                connection.send({"type": "prepare", "token": self.token, "config": share})
+                for connection, share in zip(self.connections, shares)
+            ))
+            for connection in self.connections:
+                message = await asyncio.wait_for(connection.receive(), timeout=settings.PERF_PROCESS_START_TIMEOUT)
+                connection.agent_id = message.get("agent_id")
+            # 全部就绪后同时开始
+            await asyncio.gather(*(connection.send({"type": "start"}) for connection in self.connections))
+            logger.info(f"分布式压测开始：{self.agent_count} 个节点，准备耗时 {time.perf_counter() - started:.2f}s")
+
+            tasks = [asyncio.create_task(self._collect(connection)) for connection in self.connections]
+            _, pending = await asyncio.wait(tasks, timeout=self.total_duration + self.timeout + 30)
+            if pending:
+                self.errors.append("等待压测节点结束超时")
+                await self.stop()
+                _, pending = await asyncio.wait(pending, timeout=self.timeout + 5)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            await self._shutdown()
+
+        if self.errors:
+            if self.live.requests == 0:
+                raise RuntimeError("; ".join(self.errors))
+            logger.warning(f"部分压测节点失败: {self.errors}")
+            self.live.errors.update({error: self.live.errors.get(error, 0) + 1 for error in self.errors})
+        return self.live
+
+    async def stop(self):
+        """通知所有节点停止（正在进行的请求完成后各节点上报最后的统计）"""
+        if self._stopping:
+            return
+        self._stopping = True
+        for connection in self.connections:
+            if connection.finished:
+                continue
+            try:
+                await connection.send({"type": "stop"})
+            except (ConnectionError, RuntimeError):
+                pass
+
+    async def _connect_all(self):
+        addresses = self.addresses
+        if self.local_agents:
+            addresses = await asyncio.gather(*(self._spawn_local_agent() for _ in range(self.local_agents)))
+        for index, (host, port) in enumerate(addresses):
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, limit=settings.PERF_AGENT_MAX_MESSAGE_BYTES),
+                timeout=settings.PERF_PROCESS_START_TIMEOUT,
+            )
+            self.connections.append(AgentConnection(index, f"{host}:{port}", reader, writer))
+
+    async def _spawn_local_agent(self) -> Tuple[str, int]:
+        """在本机拉起一个一次性压测节点，返回其监听地址"""
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "app.engines.load_agent", "--host", "127.0.0.1", "--port", "0", "--once",
+            stdout=asyncio.subprocess.PIPE,
+            cwd=str(_BACKEND_DIR),
+            env=dict(os.environ, PERF_AGENT_TOKEN=self.token),
+        )
+        self._processes.append(process)
+
+        async def wait_listening() -> Tuple[str, int]:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    raise RuntimeError(f"本地压测节点启动失败（exitcode={process.returncode}）")
+                parts = line.decode(errors="replace").split()
+                if len(parts) == 3 and parts[0] == LISTENING_PREFIX:
+                    return parts[1], int(parts[2])
+
+        return await asyncio.wait_for(wait_listening(), timeout=settings.PERF_PROCESS_START_TIMEOUT)
+
+    async def _collect(self, connection: AgentConnection):
+        """接收一个节点的上报直到结束；节点出错时让所有节点一起停止"""
+        try:
+            while True:
+                message = await connection.receive()
+                if message.get("type") not in ("report", "done"):
+                    continue
+                self._merge(connection, LoadStats.from_dict(message["stats"]))
+                if message["type"] == "done":
+                    connection.finished = True
+                    return
+                if self.on_report is not None:
+                    result = self.on_report(self.live)
+                    if inspect.isawaitable(result):
+                        await result
+        except (AgentError, ConnectionError, ValueError) as e:
+            connection.finished = True
+            self.errors.append(str(e))
+            logger.warning(f"压测节点异常，停止所有节点: {e}")
+            await self.stop()
+
+    def _merge(self, connection: AgentConnection, delta: LoadStats):
+        """合并节点的增量统计：节点内按先后合并，节点之间峰值并发相加"""
+        if connection.stats is None:
+            connection.stats = LoadStats(delta.interval_seconds)
+        connection.stats.merge(delta, concurrent=False)
+        self.live.merge(delta, concurrent=False)
+        self.live.peak_concurrency = sum(
+            item.stats.peak_concurrency for item in self.connections if item.stats is not None
+        )
+
+    async def _shutdown(self):
+        """关闭连接并回收本地节点进程（未结束的节点先通知停止）"""
+        if any(not connection.finished for connection in self.connections):
+            await self.stop()
+        for connection in self.connections:
+            connection.close()
+        for process in self._processes:
+            try:
+                await asyncio.wait_for(process.wait(), timeout=self.timeout + 5)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+
+
+async def run_distributed(config: Dict[str, Any], on_report: Optional[Callable[[LoadStats], Any]] = None) -> LoadStats:
+    """运行一次分布式压测，返回合并后的统计"""
+    return await LoadController(config, on_report).run()
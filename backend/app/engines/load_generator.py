@@ -0,0 +1,514 @@
+"""
+负载生成器
+
+性能测试引擎的压测核心：
+- 闭合模型（closed）：虚拟用户循环「请求 → 思考时间 think_time」，虚拟用户数随阶段曲线变化
+- 开放模型（open）：按目标到达率（每秒请求数）发起请求，不等待前一个响应；在途请求达到
+  max_in_flight 时丢弃本次迭代并计数（说明被测系统或压测端已饱和）
+- 阶段：stages = [{"duration": 秒, "target": 目标}]，目标在阶段内从上一阶段的目标线性变化到
+  本阶段目标（起点为 0）；也可以用 ramp_up / duration / ramp_down 简写
+- 计时使用 time.perf_counter_ns，延迟记入可合并的直方图（app.utils.histogram），并按
+  metrics_interval 秒分段形成时间序列，内存不随请求数增长
+- 同一进程内的请求共享一个连接池；processes > 1 时按份额拆到多个子进程（spawn）同时压测，
+  子进程全部就绪后同时开始，结束后合并统计
+
+压测配置（即性能测试用例）：
+
+    {
+        "url": "https://example.com/api", "method": "POST",
+        "headers": {...}, "params": {...}, "body": {...},
+        "mode": "closed",                 # closed / open
+        "vus": 50, "think_time": 0.1,     # 闭合模型（兼容旧字段 concurrent_users）
+        "rps": 500, "max_in_flight": 1000,  # 开放模型
+        "ramp_up": 10, "duration": 60, "ramp_down": 5,  # 或 "stages": [...]
+        "processes": 4,
+        "metrics_interval": 1,            # 时间序列统计间隔（秒）
+        "timeout": 30
+    }
+
+也可以用 scenarios 按权重混合多个场景代替 url（见 app.engines.load_scenarios），统计按场景分别汇总。
+"""
+import time
+import queue
+import asyncio
+import logging
+import multiprocessing
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.http_client import HttpClientRegistry
+from app.engines.load_scenarios import ScenarioMix, build_scenario_mix
+from app.utils.histogram import Histogram, percentiles_in_ms
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+
+# 控制循环的间隔（秒）：开放模型按此粒度补齐应发请求数，闭合模型按此粒度调整虚拟用户数
+_TICK_SECONDS = 0.01
+# 每种错误信息单独计数的上限，超出的归入 "other"
+_MAX_ERROR_KINDS = 20
+
+
+def build_stages(config: Dict[str, Any]) -> List[Tuple[float, float]]:
+    """解析阶段曲线 [(持续秒数, 目标)]，配置无效时抛出 ValueError"""
+    if config.get("stages"):
+        stages = [(float(stage["duration"]), float(stage["target"])) for stage in config["stages"]]
+    else:
+        if config.get("mode", CLOSED) == OPEN:
+            target = float(config.get("rps") or 0)
+        else:
+            target = float(config.get("vus") or config.get("concurrent_users") or 1)
+        stages = [
+            (float(config.get("ramp_up") or 0), target),
+            (float(config.get("duration", 60)), target),
+            (float(config.get("ramp_down") or 0), 0.0),
+        ]
+        # 没有爬坡 / 下降时直接跳到目标、到点直接结束
+        stages = [stage for index, stage in enumerate(stages) if stage[0] > 0 or index == 0]
+    if not stages or any(duration < 0 or target < 0 for duration, target in stages):
+        raise ValueError(f"压测阶段配置无效: {stages}")
+    if sum(duration for duration, _ in stages) <= 0:
+        raise ValueError("压测总时长必须大于0")
+    return stages
+
+
+class StageCurve:
+    """分段线性的目标曲线（虚拟用户数或每秒请求数）"""
+
+    def __init__(self, stages: List[Tuple[float, float]]):
+        self.stages = stages
+        self.total_duration = sum(duration for duration, _ in stages)
+
+    def target_at(self, elapsed: float) -> float:
+        start, previous = 0.0, 0.0
+        for duration, target in self.stages:
+            if elapsed < start + duration:
+                return previous + (target - previous) * (elapsed - start) / duration
+            start, previous = start + duration, target
+        return previous
+
+    def integral(self, elapsed: float) -> float:
+        """0 到 elapsed 的积分（开放模型：到此刻应发出的请求数）"""
+        total, start, previous = 0.0, 0.0, 0.0
+        for duration, target in self.stages:
+            if elapsed <= start:
+                break
+            span = min(duration, elapsed - start)
+            if duration > 0:
+                end_value = previous + (target - previous) * span / duration
+                total += (previous + end_value) / 2 * span
+            start, previous = start + duration, target
+        return total
+
+    @property
+    def peak(self) -> float:
+        return max(target for _, target in self.stages)
+
+
+class LoadStats:
+    """压测统计（计数与延迟直方图，可跨进程合并）
+
+    延迟以微秒记入 Histogram；另按 interval_seconds 分段记录每段的请求数、失败数和延迟直方图，
+    作为时间序列。内存只与时长和直方图桶数有关，与请求数无关。
+    """
+
+    def __init__(self, interval_seconds: Optional[float] = None):
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.dropped = 0  # 开放模型因在途请求已满丢弃的迭代
+        self.latency = Histogram()  # 微秒
+        self.interval_seconds = float(interval_seconds or settings.PERF_METRICS_INTERVAL_SECONDS)
+        # 时间序列：分段序号 → [请求数, 失败数, 延迟直方图]
+        self.intervals: Dict[int, List[Any]] = {}
+        # 按场景的统计：场景名 → [请求数, 失败数, 延迟直方图]
+        self.scenarios: Dict[str, List[Any]] = {}
+        self.status_codes: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.peak_concurrency = 0  # 峰值虚拟用户数（闭合）/ 在途请求数（开放）
+        self.duration_seconds = 0.0
+        self.processes = 1
+        self._started_ns = time.perf_counter_ns()
+        self._interval_ns = max(1, int(self.interval_seconds * 1e9))
+
+    def start(self):
+        """压测开始：时间序列从此刻起分段"""
+        self._started_ns = time.perf_counter_ns()
+
+    def record(self, latency_ns: int, status_code: Optional[int] = None, error: Optional[str] = None,
+               finished_ns: Optional[int] = None, scenario: Optional[str] = None):
+        failed = not (error is None and status_code is not None and 200 <= status_code < 300)
+        latency_us = latency_ns // 1000
+        self.requests += 1
+        if failed:
+            self.failures += 1
+        else:
+            self.successes += 1
+        self.latency.record(latency_us)
+
+        # 按请求完成时刻分段
+        finished_ns = finished_ns if finished_ns is not None else time.perf_counter_ns()
+        index = max(0, (finished_ns - self._started_ns) // self._interval_ns)
+        interval = self.intervals.get(index)
+        if interval is None:
+            interval = self.intervals[index] = [0, 0, Histogram()]
+        interval[0] += 1
+        if failed:
+            interval[1] += 1
+        interval[2].record(latency_us)
+
+        if scenario is not None:
+            entry = self.scenarios.get(scenario)
+            if entry is None:
+                entry = self.scenarios[scenario] = [0, 0, Histogram()]
+            entry[0] += 1
+            if failed:
+                entry[1] += 1
+            entry[2].record(latency_us)
+
+        if status_code is not None:
+            key = str(status_code)
+            self.status_codes[key] = self.status_codes.get(key, 0) + 1
+        if error is not None:
+            key = error if error in self.errors or len(self.errors) < _MAX_ERROR_KINDS else "other"
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    @property
+    def error_rate(self) -> float:
+        return self.failures / self.requests if self.requests else 0.0
+
+    def time_series(self) -> List[Dict[str, Any]]:
+        """按分段输出的时间序列（t 为分段起点秒数，延迟单位毫秒）"""
+        series = []
+        for index in sorted(self.intervals):
+            requests, failures, histogram = self.intervals[index]
+            point = {
+                "t": round(index * self.interval_seconds, 3),
+                "requests": requests,
+                "failures": failures,
+                "rps": round(requests / self.interval_seconds, 2),
+                "error_rate": round(failures / requests, 4) if requests else 0.0,
+            }
+            point.update({f"{key}_ms": value for key, value in percentiles_in_ms(histogram, (50, 95, 99)).items()})
+            point["max_ms"] = round(histogram.max / 1000, 3) if histogram.max is not None else None
+            series.append(point)
+        return series
+
+    def to_dict(self) -> Dict[str, Any]:
+        """可 pickle / JSON 序列化的形式（子进程回传结果使用）"""
+        data = {key: value for key, value in self.__dict__.items() if not key.startswith("_")}
+        data["latency"] = self.latency.to_dict()
+        data["intervals"] = [
+            [index, requests, failures, histogram.to_dict()]
+            for index, (requests, failures, histogram) in sorted(self.intervals.items())
+        ]
+        data["scenarios"] = [
+            [name, requests, failures, histogram.to_dict()]
+            for name, (requests, failures, histogram) in self.scenarios.items()
+        ]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LoadStats":
+        stats = cls(data.get("interval_seconds"))
+        stats.__dict__.update({
+            key: value for key, value in data.items() if key not in ("latency", "intervals", "scenarios")
+        })
+        if data.get("latency"):
+            stats.latency = Histogram.from_dict(data["latency"])
+        stats.intervals = {
+            index: [requests, failures, Histogram.from_dict(histogram)]
+            for index, requests, failures, histogram in data.get("intervals", [])
+        }
+        stats.scenarios = {
+            name: [requests, failures, Histogram.from_dict(histogram)]
+            for name, requests, failures, histogram in data.get("scenarios", [])
+        }
+        return stats
+
+    def merge(self, other: "LoadStats", concurrent: bool = True):
+        """合并统计，直方图与时间序列按桶 / 分段相加
+
+        concurrent=True：其他进程的统计（各进程同时开始，时长取最大值，峰值并发相加）；
+        concurrent=False：同一进程先后的增量统计（峰值并发取最大值）。
+        """
+        self.requests += other.requests
+        self.successes += other.successes
+        self.failures += other.failures
+        self.dropped += other.dropped
+        self.latency.merge(other.latency)
+        for target, source in ((self.intervals, other.intervals), (self.scenarios, other.scenarios)):
+            for key, (requests, failures, histogram) in source.items():
+                entry = target.get(key)
+                if entry is None:
+                    entry = target[key] = [0, 0, Histogram()]
+                entry[0] += requests
+                entry[1] += failures
+                entry[2].merge(histogram)
+        for key, count in other.status_codes.items():
+            self.status_codes[key] = self.status_codes.get(key, 0) + count
+        for key, count in other.errors.items():
+            self.errors[key] = self.errors.get(key, 0) + count
+        if concurrent:
+            self.peak_concurrency += other.peak_concurrency
+        else:
+            self.peak_concurrency = max(self.peak_concurrency, other.peak_concurrency)
+        self.duration_seconds = max(self.duration_seconds, other.duration_seconds)
+
+
+class LoadGenerator:
+    """单进程负载生成器"""
+
+    def __init__(self, config: Dict[str, Any], scenarios: Optional[ScenarioMix] = None):
+        self.config = config
+        self.mode = config.get("mode", CLOSED)
+        if self.mode not in (CLOSED, OPEN):
+            raise ValueError(f"未知的压测模式: {self.mode}")
+        self.curve = StageCurve(build_stages(config))
+        self.think_time = float(config.get("think_time") or 0)
+        self.max_in_flight = int(config.get("max_in_flight") or settings.PERF_DEFAULT_MAX_IN_FLIGHT)
+        self.timeout = float(config.get("timeout") or settings.HTTP_CLIENT_TIMEOUT)
+        # 场景混合（预渲染数据行）；未配置 scenarios 时压测单个 url
+        self.scenarios = scenarios if scenarios is not None else build_scenario_mix(config)
+        self.request = self._build_request(config) if self.scenarios is None else None
+        self.stats = LoadStats(config.get("metrics_interval"))
+        self._stopping = False
+        # 连接池按峰值并发设置，所有虚拟用户共享
+        concurrency = self.max_in_flight if self.mode == OPEN else int(self.curve.peak + 0.999)
+        pool_size = max(1, min(concurrency, settings.PERF_POOL_MAX_CONNECTIONS))
+        self.http_clients = HttpClientRegistry(
+            name="performance", timeout=self.timeout,
+            max_connections=pool_size, max_keepalive_connections=pool_size,
+        )
+
+    @staticmethod
+    def _build_request(config: Dict[str, Any]) -> Dict[str, Any]:
+        request: Dict[str, Any] = {"method": str(config.get("method") or "GET").upper(), "url": config["url"]}
+        if config.get("headers"):
+            request["headers"] = config["headers"]
+        if config.get("params"):
+            request["params"] = config["params"]
+        body = config.get("body")
+        if isinstance(body, (dict, list)):
+            request["json"] = body
+        elif body is not None:
+            request["content"] = str(body)
+        return request
+
+    def stop(self):
+        """提前结束（正在进行的请求完成后退出）"""
+        self._stopping = True
+
+    def take_stats(self) -> LoadStats:
+        """取出上次取出以来的增量统计（分布式压测节点定期上报），之后的请求记入新的统计"""
+        stats = self.stats
+        self.stats = LoadStats(stats.interval_seconds)
+        self.stats._started_ns = stats._started_ns
+        self.stats.peak_concurrency = stats.peak_concurrency
+        return stats
+
+    async def run(self) -> LoadStats:
+        client = self.http_clients.get_client(verify=bool(self.config.get("verify_ssl", False)))
+        if self.scenarios is not None:
+            for scenario in self.scenarios.scenarios:
+                await scenario.prepare(self.http_clients)
+        started = time.perf_counter()
+        self.stats.start()
+        try:
+            if self.mode == OPEN:
+                await self._run_open(client, started)
+            else:
+                await self._run_closed(client, started)
+        finally:
+            self.stats.duration_seconds = time.perf_counter() - started
+            await self.http_clients.aclose()
+        return self.stats
+
+    async def _send(self, client):
+        scenario = self.scenarios.pick() if self.scenarios is not None else None
+        request = scenario.next_request() if scenario is not None else self.request
+        name = scenario.name if scenario is not None else None
+        started = time.perf_counter_ns()
+        try:
+            response = await client.request(**request)
+            finished = time.perf_counter_ns()
+            self.stats.record(finished - started, status_code=response.status_code, finished_ns=finished, scenario=name)
+        except Exception as e:
+            finished = time.perf_counter_ns()
+            self.stats.record(
+                finished - started, error=f"{type(e).__name__}: {e}"[:200], finished_ns=finished, scenario=name,
+            )
+            return
+        if scenario is not None:
+            scenario.handle_response(response, self.http_clients)
+
+    def _finished(self, started: float) -> bool:
+        return self._stopping or time.perf_counter() - started >= self.curve.total_duration
+
+    async def _run_closed(self, client, started: float):
+        """闭合模型：编号小于当前目标的虚拟用户循环发请求，目标下降时编号大的虚拟用户结束"""
+        vus: Dict[int, asyncio.Task] = {}
+        target = previous = 0
+
+        async def virtual_user(index: int):
+            while not self._finished(started) and index < target:
+                await self._send(client)
+                if self.think_time > 0:
+                    await asyncio.sleep(self.think_time)
+
+        while not self._finished(started):
+            target = int(self.curve.target_at(time.perf_counter() - started) + 0.5)
+            if target > previous:
+                # 之前因目标下降退出的虚拟用户重新启动
+                for index in range(target):
+                    task = vus.get(index)
+                    if task is None or task.done():
+                        vus[index] = asyncio.create_task(virtual_user(index))
+            previous = target
+            self.stats.peak_concurrency = max(self.stats.peak_concurrency, target)
+            await asyncio.sleep(_TICK_SECONDS)
+        await self._drain(list(vus.values()))
+
+    async def _run_open(self, client, started: float):
+        """开放模型：按目标曲线的积分补齐应发的请求数，与响应快慢无关"""
+        in_flight: set = set()
+        issued = 0
+        while not self._finished(started):
+            due = int(self.curve.integral(time.perf_counter() - started))
+            while issued < due:
+                issued += 1
+                if len(in_flight) >= self.max_in_flight:
+                    self.stats.dropped += 1
+                    continue
+                task = asyncio.create_task(self._send(client))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            self.stats.peak_concurrency = max(self.stats.peak_concurrency, len(in_flight))
+            await asyncio.sleep(_TICK_SECONDS)
+        await self._drain(list(in_flight))
+
+    async def _drain(self, tasks: List[asyncio.Task]):
+        """等待在途请求完成（最多一个请求超时时间），仍未完成的取消"""
+        tasks = [task for task in tasks if not task.done()]
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=self.timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def split_config(config: Dict[str, Any], processes: int) -> List[Dict[str, Any]]:
+    """按进程数拆分压测配置：虚拟用户数按整数拆分（余数给前面的进程），到达率与在途上限均分"""
+    stages = build_stages(config)
+    mode = config.get("mode", CLOSED)
+    shares = []
+    for index in range(processes):
+        share_stages = []
+        for duration, target in stages:
+            if mode == OPEN:
+                share_target = target / processes
+            else:
+                whole = int(target + 0.5)
+                share_target = whole // processes + (1 if index < whole % processes else 0)
+            share_stages.append({"duration": duration, "target": share_target})
+        share = dict(config, stages=share_stages, processes=1)
+        if mode == OPEN:
+            max_in_flight = int(config.get("max_in_flight") or settings.PERF_DEFAULT_MAX_IN_FLIGHT)
+            share["max_in_flight"] = max(1, max_in_flight // processes)
+        shares.append(share)
+    return shares
+
+
+def _load_process_main(config: Dict[str, Any], index: int, results, start_event, stop_event):
+    """压测子进程：就绪后等待统一开始信号，运行结束后把统计放回结果队列"""
+    async def main():
+        generator = LoadGenerator(config, scenarios)
+
+        async def watch_stop():
+            while True:
+                if stop_event.is_set():
+                    generator.stop()
+                    return
+                await asyncio.sleep(0.1)
+
+        watcher = asyncio.create_task(watch_stop())
+        try:
+            return await generator.run()
+        finally:
+            watcher.cancel()
+
+    try:
+        # 场景数据行在就绪前预渲染，不占用压测时间
+        scenarios = build_scenario_mix(config)
+        results.put(("ready", index, None))
+        start_event.wait()
+        stats = asyncio.run(main())
+        results.put(("done", index, stats.to_dict()))
+    except Exception as e:
+        results.put(("error", index, f"{type(e).__name__}: {e}"))
+
+
+async def _queue_get(results, timeout: float):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lambda: results.get(timeout=timeout))
+
+
+async def run_load(config: Dict[str, Any]) -> LoadStats:
+    """运行一次压测：单进程直接在当前事件循环运行，多进程时启动子进程并合并统计"""
+    processes = max(1, min(int(config.get("processes") or 1), settings.PERF_MAX_PROCESSES))
+    if processes == 1:
+        return await LoadGenerator(config).run()
+
+    shares = split_config(config, processes)
+    # 先在父进程解析一遍，配置无效时不启动子进程
+    for share in shares:
+        StageCurve(build_stages(share))
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    start_event, stop_event = ctx.Event(), ctx.Event()
+    workers = [
+        ctx.Process(target=_load_process_main, args=(share, index, results, start_event, stop_event), daemon=True)
+        for index, share in enumerate(shares)
+    ]
+    for worker in workers:
+        worker.start()
+
+    merged = LoadStats(config.get("metrics_interval"))
+    merged.processes = processes
+    errors: List[str] = []
+    try:
+        ready = 0
+        while ready < processes:
+            kind, index, payload = await _queue_get(results, settings.PERF_PROCESS_START_TIMEOUT)
+            if kind == "error":
+                raise RuntimeError(f"压测进程 {index} 启动失败: {payload}")
+            ready += 1
+        start_event.set()
+
+        # 所有进程同时开始，最晚在总时长 + 请求超时 + 余量内结束
+        deadline = StageCurve(build_stages(config)).total_duration + float(config.get("timeout") or settings.HTTP_CLIENT_TIMEOUT) + 30
+        for _ in range(processes):
+            kind, index, payload = await _queue_get(results, deadline)
+            if kind == "done":
+                merged.merge(LoadStats.from_dict(payload))
+            else:
+                errors.append(f"压测进程 {index}: {payload}")
+    except queue.Empty:
+        raise RuntimeError("等待压测进程超时")
+    finally:
+        stop_event.set()
+        loop = asyncio.get_running_loop()
+        for worker in workers:
+            await loop.run_in_executor(None, worker.join, 5)
+            if worker.is_alive():
+                worker.terminate()
+
+    if errors:
+        if merged.requests == 0:
+            raise RuntimeError("; ".join(errors))
+        logger.warning(f"部分压测进程失败: {errors}")
+        merged.errors.update({error: merged.errors.get(error, 0) + 1 for error in errors})
+    return merged
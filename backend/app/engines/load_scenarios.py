@@ -0,0 +1,171 @@
+"""
+压测场景（加权混合负载）
+
+性能测试用例可以用 scenarios 代替单个 url，按权重混合多个场景，每个场景复用 API 用例的配置格式：
+
+    "scenarios": [
+        {"name": "查询订单", "weight": 3, "test_case_id": 12, "environment": "staging",
+         "threshold": {"max_p95_ms": 300}},
+        {"name": "下单", "weight": 1,
+         "config": {"request": {"method": "POST", "path": "/orders", "body": {...}},
+                    "token_config": {...}, "extractors": [...]},
+         "rows": [{"sku": "A1"}, {"sku": "B2"}], "base_url": "https://example.com"}
+    ]
+
+引用 test_case_id 的场景由 app.services.load_scenario_resolver 在 API 进程中展开为内联场景（用例配置、
+数据行、环境地址与默认请求头、预先获取的 Token 变量），压测进程 / 节点只处理内联场景。
+
+- 数据行在压测开始前按执行计划（app.services.execution_plan）逐行绑定并预渲染，放入环形缓冲区循环取用，
+  压测期间不再做模板渲染；只有引用运行期变量（Token、提取器结果）的请求在发送时用预编译模板替换这些变量
+- 运行期变量池按场景在进程内共享：开始前登录（或使用控制端下发的 Token），响应命中 retry_status_codes
+  时在后台刷新 Token；配置了提取器时每个响应都会提取变量写入变量池
+"""
+import json
+import random
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.execution_plan import ExecutionPlan
+from app.services.token_auth import obtain_token
+from app.services.variable_extractors import process_extractors
+from app.utils.template import Template, render_string
+
+logger = logging.getLogger(__name__)
+
+
+class LoadScenario:
+    """一个压测场景：预渲染的请求环形缓冲区 + 运行期变量池"""
+
+    def __init__(self, spec: Dict[str, Any], index: int = 0):
+        self.name = str(spec.get("name") or f"scenario_{index + 1}")
+        self.weight = float(spec.get("weight", 1))
+        if self.weight <= 0:
+            raise ValueError(f"场景 {self.name} 的权重必须大于0")
+        config = spec.get("config")
+        if not isinstance(config, dict) or not isinstance(config.get("request"), dict):
+            raise ValueError(f"场景 {self.name} 缺少请求配置 config.request")
+        self.plan = ExecutionPlan(spec.get("test_case_id") or 0, None, config)
+        self.base_url = (spec.get("base_url") or "").rstrip("/")
+        self.default_headers: Dict[str, Any] = spec.get("default_headers") or {}
+        self.default_params: Dict[str, Any] = spec.get("default_params") or {}
+        self.token_config: Optional[Dict[str, Any]] = self.plan.token_config or None
+        self.extractors = self.plan.extractors
+        self.retry_status_codes = (
+            set(self.token_config.get("retry_status_codes", [401, 403])) if self.token_config else set()
+        )
+        self.variables: Dict[str, Any] = dict(spec.get("variables") or {})
+        self._refreshing: Optional[asyncio.Task] = None
+
+        rows = [row if isinstance(row, dict) else {} for row in (spec.get("rows") or [{}])]
+        self._ring: List[Tuple[Dict[str, Any], Optional[Template]]] = [
+            self._prerender(row) for row in rows[:max(1, settings.PERF_SCENARIO_MAX_ROWS)]
+        ]
+        self._position = 0
+
+    def _prerender(self, row: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Template]]:
+        """绑定一行数据，得到 httpx 请求参数；仍含运行期变量占位符时附带预编译模板"""
+        request_info, _ = self.plan.bind_request(row)
+        path = render_string(request_info.get("path") or "", row)
+        if path and not path.startswith("http"):
+            if not path.startswith("/"):
+                path = "/" + path
+            url = self.base_url + path if self.base_url else render_string(self.plan.request_url or path, row)
+        else:
+            url = path or self.plan.request_url or ""
+
+        method = str(request_info.get("method") or "GET").upper()
+        request: Dict[str, Any] = {"method": method, "url": url}
+        headers = {**self.default_headers, **(request_info.get("headers") or {})}
+        params = {**self.default_params, **(request_info.get("params") or {})}
+        if headers:
+            request["headers"] = headers
+        if params:
+            request["params"] = params
+        body = request_info.get("body")
+        if body is not None and method not in ("GET", "DELETE"):
+            request["json"] = body
+        template = Template(request)
+        return request, None if template.is_static else template
+
+    def next_request(self) -> Dict[str, Any]:
+        """环形缓冲区中的下一个请求"""
+        request, template = self._ring[self._position]
+        self._position = (self._position + 1) % len(self._ring)
+        if template is None:
+            return request
+        return template.render(self.variables, typed=False)
+
+    @property
+    def token_name(self) -> Optional[str]:
+        if not self.token_config:
+            return None
+        extractors = self.token_config.get("extractors") or [{}]
+        return extractors[0].get("name", "token")
+
+    async def prepare(self, http_clients):
+        """压测开始前获取 Token（控制端已下发时直接使用）"""
+        if not self.token_config or self.token_name in self.variables:
+            return
+        success, message = await obtain_token(self.token_config, self.base_url, self.variables, None, http_clients)
+        if not success:
+            logger.warning(f"压测场景 {self.name} 获取 Token 失败（将在请求被拒绝时重试）: {message}")
+
+    def handle_response(self, response, http_clients):
+        """处理响应：提取变量，Token 失效时在后台刷新（同一时间只刷新一次）"""
+        if self.extractors:
+            try:
+                response_json = response.json()
+            except ValueError:
+                response_json = None
+            process_extractors(self.extractors, response_json, response.text, self.variables)
+        if response.status_code in self.retry_status_codes and (self._refreshing is None or self._refreshing.done()):
+            self._refreshing = asyncio.create_task(self._refresh_token(http_clients))
+
+    async def _refresh_token(self, http_clients):
+        try:
+            success, message = await obtain_token(
+                self.token_config, self.base_url, self.variables, None, http_clients, force_refresh=True,
+            )
+            if not success:
+                logger.warning(f"压测场景 {self.name} 刷新 Token 失败: {message}")
+        except Exception as e:
+            logger.warning(f"压测场景 {self.name} 刷新 Token 失败: {e}")
+
+
+class ScenarioMix:
+    """按权重随机选择场景"""
+
+    def __init__(self, scenarios: List[LoadScenario]):
+        self.scenarios = scenarios
+        self._cum_weights: List[float] = []
+        total = 0.0
+        for scenario in scenarios:
+            total += scenario.weight
+            self._cum_weights.append(total)
+
+    def pick(self) -> LoadScenario:
+        if len(self.scenarios) == 1:
+            return self.scenarios[0]
+        return random.choices(self.scenarios, cum_weights=self._cum_weights)[0]
+
+
+def build_scenario_mix(config: Dict[str, Any]) -> Optional[ScenarioMix]:
+    """解析压测配置中的内联场景，未配置 scenarios 时返回 None，配置无效时抛出 ValueError"""
+    specs = config.get("scenarios")
+    if not specs:
+        return None
+    if not isinstance(specs, list):
+        raise ValueError("scenarios 必须是列表")
+    scenarios = []
+    for index, spec in enumerate(specs):
+        if not isinstance(spec, dict):
+            raise ValueError(f"场景配置无效: {json.dumps(spec, ensure_ascii=False)[:200]}")
+        if spec.get("test_case_id") and not spec.get("config"):
+            raise ValueError(f"场景 {spec.get('name') or index + 1} 引用的用例 {spec['test_case_id']} 尚未展开")
+        scenarios.append(LoadScenario(spec, index))
+    names = [scenario.name for scenario in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError(f"场景名称重复: {names}")
+    return ScenarioMix(scenarios)
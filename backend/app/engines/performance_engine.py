@@ -1,140 +1,194 @@
 """
 性能测试引擎
+
+压测由 app.engines.load_generator 完成（闭合 / 开放模型、阶段曲线、共享连接池、多进程）；
+用例配置 agents 时由 app.engines.load_controller 协调多个压测节点分布式施压；
+配置 scenarios 时按权重混合多个场景（app.engines.load_scenarios），引用的 API 用例先在这里展开。
+这里负责汇总指标（含延迟分位数、时间序列、分场景指标）与阈值判断。
 """
-from typing import Dict, Any
+from typing import Dict, Any, List
 from app.engines.base_engine import BaseTestEngine, TestStatus
-import asyncio
-import time
-import httpx
+from app.engines.load_generator import LoadStats, build_stages, run_load, CLOSED, OPEN
+from app.engines.load_controller import resolve_agents, run_distributed
+from app.engines.load_scenarios import build_scenario_mix
+from app.utils.histogram import DEFAULT_PERCENTILES, Histogram, percentile_key, percentiles_in_ms
 
 
 class PerformanceEngine(BaseTestEngine):
     """性能测试引擎"""
-    
-    def __init__(self, config: Dict[str, Any]):
-        super().__init__(config)
-        self.metrics = []
-    
+
     async def execute(self, test_case: Dict[str, Any]) -> Dict[str, Any]:
         """执行性能测试"""
         self.status = TestStatus.RUNNING
         try:
-            # 性能测试配置
-            concurrent_users = test_case.get("concurrent_users", 1)
-            duration = test_case.get("duration", 60)  # 秒
-            url = test_case.get("url")
-            method = test_case.get("method", "GET").upper()
-            
-            # 执行负载测试
-            start_time = time.time()
-            tasks = []
-            
-            for _ in range(concurrent_users):
-                task = self._run_load_test(url, method, duration)
-                tasks.append(task)
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
+            if any(isinstance(spec, dict) and spec.get("test_case_id") for spec in test_case.get("scenarios") or []):
+                from app.core.database import AsyncSessionLocal
+                from app.services.load_scenario_resolver import resolve_load_scenarios
+                async with AsyncSessionLocal() as db:
+                    test_case = await resolve_load_scenarios(db, test_case)
+
+            if test_case.get("agents"):
+                stats = await run_distributed(test_case)
+            else:
+                stats = await run_load(test_case)
+
             # 收集指标
-            metrics = self._collect_metrics(results, start_time)
-            
+            metrics = self._collect_metrics(stats)
+            metrics["mode"] = test_case.get("mode", CLOSED)
+
             # 判断是否通过
             threshold = test_case.get("threshold", {})
-            passed = self._check_thresholds(metrics, threshold)
-            
+            threshold_failures = self._threshold_failures(metrics, threshold)
+            # 场景各自的阈值
+            for index, spec in enumerate(test_case.get("scenarios") or []):
+                name = spec.get("name") or f"scenario_{index + 1}"
+                scenario_metrics = metrics.get("scenarios", {}).get(name)
+                if spec.get("threshold") and scenario_metrics is not None:
+                    threshold_failures.extend(
+                        f"[{name}] {failure}"
+                        for failure in self._threshold_failures(scenario_metrics, spec["threshold"])
+                    )
+            passed = not threshold_failures
+
             self.status = TestStatus.PASSED if passed else TestStatus.FAILED
-            
+
             return {
                 "status": self.status.value,
                 "metrics": metrics,
-                "threshold": threshold
+                "threshold": threshold,
+                "threshold_failures": threshold_failures
             }
-            
+
         except Exception as e:
             self.status = TestStatus.ERROR
             return {
                 "status": self.status.value,
                 "error": str(e)
             }
-    
-    async def _run_load_test(self, url: str, method: str, duration: int):
-        """运行负载测试"""
-        end_time = time.time() + duration
-        results = []
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            while time.time() < end_time:
-                start = time.time()
-                try:
-                    response = await client.request(method=method, url=url)
-                    elapsed = time.time() - start
-                    results.append({
-                        "status_code": response.status_code,
-                        "response_time": elapsed,
-                        "success": 200 <= response.status_code < 300
-                    })
-                except Exception as e:
-                    elapsed = time.time() - start
-                    results.append({
-                        "error": str(e),
-                        "response_time": elapsed,
-                        "success": False
-                    })
-                
-                await asyncio.sleep(0.1)  # 避免过于频繁的请求
-        
-        return results
-    
-    def _collect_metrics(self, results: list, start_time: float) -> Dict[str, Any]:
-        """收集性能指标"""
-        all_results = []
-        for result in results:
-            if isinstance(result, list):
-                all_results.extend(result)
-            elif isinstance(result, Exception):
-                continue
-        
-        if not all_results:
+
+    def _collect_metrics(self, stats: LoadStats) -> Dict[str, Any]:
+        """收集性能指标（*_response_time 单位为秒，与旧版一致；percentiles / time_series 单位为毫秒）"""
+        if not stats.requests:
             return {}
-        
-        response_times = [r.get("response_time", 0) for r in all_results]
-        successful = sum(1 for r in all_results if r.get("success", False))
-        total = len(all_results)
-        
+
+        total = stats.requests
+        latency = stats.latency
         return {
             "total_requests": total,
-            "successful_requests": successful,
-            "failed_requests": total - successful,
-            "success_rate": successful / total if total > 0 else 0,
-            "avg_response_time": sum(response_times) / len(response_times) if response_times else 0,
-            "min_response_time": min(response_times) if response_times else 0,
-            "max_response_time": max(response_times) if response_times else 0,
-            "duration": time.time() - start_time
+            "successful_requests": stats.successes,
+            "failed_requests": stats.failures,
+            "success_rate": stats.successes / total,
+            "error_rate": stats.error_rate,
+            "avg_response_time": latency.mean / 1e6,
+            "min_response_time": (latency.min or 0) / 1e6,
+            "max_response_time": (latency.max or 0) / 1e6,
+            "percentiles": percentiles_in_ms(latency, DEFAULT_PERCENTILES),
+            "time_series": stats.time_series(),
+            "metrics_interval": stats.interval_seconds,
+            "duration": stats.duration_seconds,
+            "rps": total / stats.duration_seconds if stats.duration_seconds else 0,
+            "dropped_iterations": stats.dropped,
+            "peak_concurrency": stats.peak_concurrency,
+            "status_codes": stats.status_codes,
+            "errors": stats.errors,
+            "processes": stats.processes,
+            "scenarios": {
+                name: self._scenario_metrics(requests, failures, histogram, stats.duration_seconds)
+                for name, (requests, failures, histogram) in stats.scenarios.items()
+            },
+            # 合并后的直方图，供基线对比等后续分析使用
+            "latency_histogram": latency.to_dict(),
         }
-    
-    def _check_thresholds(self, metrics: Dict[str, Any], threshold: Dict[str, Any]) -> bool:
-        """检查是否满足阈值要求"""
+
+    @staticmethod
+    def _scenario_metrics(requests: int, failures: int, histogram: Histogram, duration: float) -> Dict[str, Any]:
+        """单个场景的指标（键名与整体指标一致，可直接套用阈值检查）"""
+        return {
+            "total_requests": requests,
+            "successful_requests": requests - failures,
+            "failed_requests": failures,
+            "success_rate": (requests - failures) / requests if requests else 0,
+            "error_rate": failures / requests if requests else 0,
+            "avg_response_time": (histogram.mean or 0) / 1e6,
+            "max_response_time": (histogram.max or 0) / 1e6,
+            "percentiles": percentiles_in_ms(histogram, DEFAULT_PERCENTILES),
+            "rps": requests / duration if duration else 0,
+        }
+
+    def _threshold_failures(self, metrics: Dict[str, Any], threshold: Dict[str, Any]) -> List[str]:
+        """未满足的阈值说明列表
+
+        支持的阈值：
+        - success_rate：最低成功率；max_error_rate：最高错误率（0-1）
+        - max_avg_response_time：最高平均响应时间（秒）
+        - min_rps：最低吞吐量
+        - max_p50_ms / max_p90_ms / max_p95_ms / max_p99_ms / max_p99.9_ms：分位数延迟上限（毫秒）
+        """
+        failures = []
         if not threshold:
-            return True
-        
-        # 检查成功率
+            return failures
+
+        # 检查成功率 / 错误率
         if "success_rate" in threshold:
             if metrics.get("success_rate", 0) < threshold["success_rate"]:
-                return False
-        
+                failures.append(f"成功率 {metrics.get('success_rate', 0):.4f} 低于 {threshold['success_rate']}")
+        if "max_error_rate" in threshold:
+            if metrics.get("error_rate", 1) > threshold["max_error_rate"]:
+                failures.append(f"错误率 {metrics.get('error_rate', 1):.4f} 高于 {threshold['max_error_rate']}")
+
         # 检查平均响应时间
         if "max_avg_response_time" in threshold:
             if metrics.get("avg_response_time", 0) > threshold["max_avg_response_time"]:
-                return False
-        
-        return True
-    
+                failures.append(
+                    f"平均响应时间 {metrics.get('avg_response_time', 0):.3f}s 高于 {threshold['max_avg_response_time']}s"
+                )
+
+        # 检查吞吐量
+        if "min_rps" in threshold:
+            if metrics.get("rps", 0) < threshold["min_rps"]:
+                failures.append(f"吞吐量 {metrics.get('rps', 0):.2f} 低于 {threshold['min_rps']}")
+
+        # 检查分位数延迟
+        percentiles = metrics.get("percentiles") or {}
+        for percentile in DEFAULT_PERCENTILES:
+            key = percentile_key(percentile)
+            limit = threshold.get(f"max_{key}_ms")
+            if limit is None:
+                continue
+            value = percentiles.get(key)
+            if value is None or value > limit:
+                failures.append(f"{key} 延迟 {value}ms 高于 {limit}ms")
+
+        return failures
+
+    def _check_thresholds(self, metrics: Dict[str, Any], threshold: Dict[str, Any]) -> bool:
+        """检查是否满足阈值要求"""
+        return not self._threshold_failures(metrics, threshold)
+
     async def validate(self, test_case: Dict[str, Any]) -> bool:
         """验证测试用例配置"""
-        required_fields = ["url"]
-        return all(field in test_case for field in required_fields)
-    
+        scenarios = test_case.get("scenarios")
+        if not scenarios and "url" not in test_case:
+            return False
+        if test_case.get("mode", CLOSED) not in (CLOSED, OPEN):
+            return False
+        try:
+            build_stages(test_case)
+            if test_case.get("metrics_interval") is not None and float(test_case["metrics_interval"]) <= 0:
+                return False
+            if test_case.get("agents"):
+                resolve_agents(test_case)
+            if scenarios:
+                if not isinstance(scenarios, list) or not all(isinstance(spec, dict) for spec in scenarios):
+                    return False
+                # 引用用例的场景在执行时展开，这里只校验内联场景
+                inline = [spec for spec in scenarios if not spec.get("test_case_id") or spec.get("config")]
+                if inline:
+                    build_scenario_mix({"scenarios": inline})
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
     async def cleanup(self):
         """清理资源"""
         pass
-
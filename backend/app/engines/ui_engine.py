@@ -3,6 +3,7 @@ UI自动化测试引擎
 """
 from typing import Dict, Any, List, Optional
 from app.engines.base_engine import BaseTestEngine, TestStatus
+from app.utils.template import render_string
 from playwright.async_api import async_playwright, Browser, Page, TimeoutError as PlaywrightTimeoutError
 import base64
 import json
@@ -334,17 +335,8 @@ class UIEngine(BaseTestEngine):
             return {"status": "failed", "error": str(e), "name": step_name}
     
     def _resolve_variable(self, value: Any) -> Any:
-        """解析变量"""
-        if isinstance(value, str):
-            # 简单的变量替换：${variable_name}
-            import re
-            pattern = r'\$\{(\w+)\}'
-            matches = re.findall(pattern, value)
-            for var_name in matches:
-                if var_name in self.variables:
-                    value = value.replace(f"${{{var_name}}}", str(self.variables[var_name]))
-            return value
-        return value
+        """解析变量：${variable_name}"""
+        return render_string(value, self.variables)
     
     def _resolve_selector(self, selector: Any) -> str:
         """解析选择器（支持变量）"""
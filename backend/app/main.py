@@ -44,6 +44,7 @@ async def startup_event():
     """应用启动时初始化"""
     from app.core.redis_client import init_redis
     from app.services.scheduled_execution_scheduler import get_scheduler
+    from app.services.execution_worker import start_embedded_worker
     await init_db()
     await init_redis()
     # 启动定时任务调度器
@@ -53,16 +54,25 @@ async def startup_event():
         logger.info("定时任务调度器启动成功")
     except Exception as e:
         logger.error(f"启动定时任务调度器失败: {e}", exc_info=True)
+    # 启动进程内执行节点（external 模式下由独立进程消费队列）
+    try:
+        await start_embedded_worker()
+    except Exception as e:
+        logger.error(f"启动执行节点失败: {e}", exc_info=True)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭时清理"""
     from app.core.redis_client import close_redis
+    from app.core.http_client import close_http_clients
     from app.services.scheduled_execution_scheduler import get_scheduler
+    from app.services.execution_worker import stop_embedded_worker
     # 停止定时任务调度器
     scheduler = await get_scheduler()
     await scheduler.stop()
+    await stop_embedded_worker()
+    await close_http_clients()
     await close_redis()
 
 
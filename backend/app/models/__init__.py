@@ -7,7 +7,13 @@ from app.models.test_case import TestCase, TestType
 from app.models.test_case_collection import TestCaseCollection
 from app.models.tag import Tag
 from app.models.test_plan import TestPlan
+from app.models.test_plan_run import TestPlanRun
+from app.models.schedule import Schedule
 from app.models.test_execution import TestExecution, ExecutionStatus
+from app.models.execution_rollup import ExecutionDailyRollup
+from app.models.performance_run import PerformanceRun
+from app.models.test_execution_log import TestExecutionLog
+from app.models.execution_step_result import ExecutionStepResult
 from app.models.device import Device, DeviceType, DeviceStatus
 from app.models.interface import Interface, HttpMethod, InterfaceStatus
 from app.models.module import Module
@@ -30,8 +36,14 @@ __all__ = [
     "TestCaseCollection",
     "Tag",
     "TestPlan",
+    "TestPlanRun",
+    "Schedule",
     "TestExecution",
     "ExecutionStatus",
+    "ExecutionDailyRollup",
+    "PerformanceRun",
+    "TestExecutionLog",
+    "ExecutionStepResult",
     "Device",
     "DeviceType",
     "DeviceStatus",
@@ -22,6 +22,7 @@ class Environment(Base):
     default_headers = Column(JSON, nullable=True)
     default_params = Column(JSON, nullable=True)
     variables = Column(JSON, nullable=True)  # 业务变量，如 tenantId、locale 等
+    execution_config = Column(JSON, nullable=True)  # 执行配置，如并发控制 {"concurrency": {"max": 50, "rps": 100}}
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -0,0 +1,33 @@
+"""
+测试执行日汇总模型
+"""
+from sqlalchemy import Column, Integer, BigInteger, Date, DateTime, ForeignKey, Enum, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.models.test_execution import ExecutionStatus
+
+
+class ExecutionDailyRollup(Base):
+    """按 项目 / 日期（UTC，按结束时间）/ 状态 汇总的执行次数与耗时
+
+    执行结束时在同一事务内增量累加（见 app.services.execution_rollup），
+    仪表盘只读这张表，不再扫描 test_executions。耗时按固定分桶计数，用于估算分位数。
+    """
+    __tablename__ = "execution_daily_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    status = Column(Enum(ExecutionStatus), nullable=False)
+    execution_count = Column(Integer, nullable=False, default=0)  # 执行次数
+    timed_count = Column(Integer, nullable=False, default=0)  # 有耗时的执行次数（开始、结束时间都有）
+    duration_sum_ms = Column(BigInteger, nullable=False, default=0)  # 耗时总和（毫秒）
+    duration_max_ms = Column(Integer)  # 最大耗时（毫秒）
+    duration_buckets = Column(ARRAY(Integer))  # 耗时分桶计数，分桶上界见 DURATION_BUCKETS_MS
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("project_id", "day", "status", name="uq_execution_daily_rollups_project_day_status"),
+        Index("idx_execution_daily_rollups_day", "day"),
+    )
@@ -0,0 +1,38 @@
+"""
+执行步骤结果模型
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Index, LargeBinary
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class ExecutionStepResult(Base):
+    """单个步骤（数据驱动的一行数据）的执行结果
+
+    列表/报告只读取摘要列；完整的请求、响应与断言明细压缩后存放在 payload 中，
+    打开某个步骤时才加载。
+    """
+    __tablename__ = "execution_step_results"
+
+    id = Column(BigInteger, primary_key=True)
+    execution_id = Column(Integer, ForeignKey("test_executions.id", ondelete="CASCADE"), nullable=False)
+    step_index = Column(Integer, nullable=False)  # 步骤序号（数据驱动时为数据行序号，从1开始）
+    name = Column(String(200))
+    status = Column(String(20), nullable=False)  # passed / failed
+    method = Column(String(10))
+    url = Column(Text)
+    status_code = Column(Integer)  # HTTP状态码
+    latency_ms = Column(Integer)  # 请求耗时（毫秒）
+    response_size = Column(Integer)  # 响应体大小（字节）
+    request_body_hash = Column(String(64))  # 请求体 SHA-256
+    response_body_hash = Column(String(64))  # 响应体 SHA-256
+    assertions_total = Column(Integer, default=0)
+    assertions_failed = Column(Integer, default=0)
+    error = Column(Text)
+    payload = Column(LargeBinary)  # zlib 压缩的完整步骤明细（JSON）
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("uq_execution_step_results_execution_step", "execution_id", "step_index", unique=True),
+        Index("idx_execution_step_results_execution_status", "execution_id", "status"),
+    )
@@ -0,0 +1,32 @@
+"""
+性能测试运行记录模型
+"""
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class PerformanceRun(Base):
+    """一次性能测试的紧凑结果，按 (用例, 环境) 形成时间序列，作为滚动基线的样本
+
+    summary 只保留汇总指标（请求数、错误率、吞吐量、延迟分位数），histogram 为合并后的延迟直方图
+    （app.utils.histogram 的紧凑形式，微秒），verdict 为与之前基线对比的回归判定（见 app.services.performance_baseline）。
+    """
+    __tablename__ = "performance_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False)
+    execution_id = Column(Integer, ForeignKey("test_executions.id", ondelete="SET NULL"), nullable=True)
+    environment = Column(String(100), nullable=True)  # 环境标识，为空表示未指定环境
+    status = Column(String(20), nullable=False)  # passed / failed / error
+    summary = Column(JSON, nullable=False)  # 汇总指标
+    histogram = Column(JSON)  # 延迟直方图
+    verdict = Column(JSON)  # 与基线对比的回归判定
+    include_in_baseline = Column(Boolean, nullable=False, default=True)  # 是否作为后续运行的基线样本
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_performance_runs_case_env", "test_case_id", "environment", "id"),
+        Index("idx_performance_runs_execution", "execution_id"),
+    )
@@ -0,0 +1,55 @@
+"""
+定时计划模型
+"""
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, ForeignKey, Boolean, Float, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func, text
+from app.core.database import Base
+
+
+class Schedule(Base):
+    """定时计划
+
+    按 Cron 表达式（在 timezone 时区下匹配）周期触发，到点时才为目标
+    （单个测试用例或测试计划）创建测试执行；next_fire_at 为下次 Cron 时间，
+    next_run_at 为下次实际派发时间（UTC，调度器按它排序）。
+    """
+    __tablename__ = "schedules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(200), nullable=False)
+    description = Column(Text)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=True)  # 触发时执行的测试用例
+    test_plan_id = Column(Integer, ForeignKey("test_plans.id", ondelete="CASCADE"), nullable=True)  # 触发时运行的测试计划
+    environment = Column(String(100))  # 执行环境
+    config = Column(JSON)  # 传给测试执行的配置
+    cron_expression = Column(String(100), nullable=False)  # Cron 表达式（5 段或 6 段）
+    timezone = Column(String(64), nullable=False)  # IANA 时区，如 Asia/Shanghai
+    start_at = Column(DateTime(timezone=True))  # 生效时间，之前不触发
+    end_at = Column(DateTime(timezone=True))  # 失效时间，之后不再触发
+    enabled = Column(Boolean, default=True, nullable=False)
+    misfire_policy = Column(String(20))  # 错过触发的处理：run_once / skip / run_all，为空使用系统配置
+    misfire_grace_seconds = Column(Integer)  # 超过触发时间多少秒视为错过，为空使用系统配置
+    jitter_seconds = Column(Integer)  # 触发抖动窗口（秒），为空使用系统配置
+    next_fire_at = Column(DateTime(timezone=True))  # 下次触发对应的 Cron 时间（UTC）
+    next_run_at = Column(DateTime(timezone=True))  # 下次实际派发时间（UTC，Cron 时间 + 抖动 / 补执行顺延），为空表示不再触发
+    last_run_at = Column(DateTime(timezone=True))  # 上次触发时间
+    last_lag_seconds = Column(Float)  # 上次触发相对 Cron 时间的延迟（秒）
+    last_execution_id = Column(Integer)  # 上次触发创建的测试执行（运行测试计划时为空）
+    last_plan_run_id = Column(Integer)  # 上次触发创建的测试计划运行
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # 关系
+    project = relationship("Project", backref="schedules")
+
+    __table_args__ = (
+        # 调度器按到期时间加载启用的定时计划
+        Index(
+            "idx_schedules_enabled_next_run_at", "next_run_at",
+            postgresql_where=text("enabled AND next_run_at IS NOT NULL"),
+        ),
+        Index("idx_schedules_project_id", "project_id"),
+    )
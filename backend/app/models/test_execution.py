@@ -1,9 +1,9 @@
 """
 测试执行模型
 """
-from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import enum
 from app.core.database import Base
 
@@ -24,15 +24,20 @@ class TestExecution(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     test_plan_id = Column(Integer, ForeignKey("test_plans.id"), nullable=True)
+    plan_run_id = Column(Integer, ForeignKey("test_plan_runs.id", ondelete="SET NULL"), nullable=True, index=True)  # 所属测试计划运行
+    schedule_id = Column(Integer, ForeignKey("schedules.id", ondelete="SET NULL"), nullable=True, index=True)  # 触发本次执行的定时计划
     test_case_id = Column(Integer, ForeignKey("test_cases.id"), nullable=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
     status = Column(Enum(ExecutionStatus), default=ExecutionStatus.PENDING)
     result = Column(JSON)  # 执行结果
+    summary = Column(JSON)  # 结果摘要（total/passed/failed/skipped/duration_ms），执行结束时写入，列表只读这一列
     logs = Column(Text)  # 执行日志
     config = Column(JSON)  # 执行配置
     environment = Column(String(100))  # 执行环境
     started_at = Column(DateTime(timezone=True))
     finished_at = Column(DateTime(timezone=True))
+    next_run_at = Column(DateTime(timezone=True), nullable=True)  # 定时执行的下次执行时间（UTC），由 config.scheduling 计算
+    rolled_up_at = Column(DateTime(timezone=True), nullable=True)  # 计入执行日汇总的时间，非空表示已计入（避免重复计数）
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # 关系
@@ -40,3 +45,14 @@ class TestExecution(Base):
     test_case = relationship("TestCase", backref="executions")
     project = relationship("Project", backref="executions")
 
+    __table_args__ = (
+        # 列表按 (created_at, id) 倒序键集分页
+        Index("idx_test_executions_created_at_id", "created_at", "id"),
+        Index("idx_test_executions_project_created_at_id", "project_id", "created_at", "id"),
+        # 调度器启动时按到期时间加载待执行的定时任务
+        Index(
+            "idx_test_executions_pending_next_run_at", "next_run_at",
+            postgresql_where=text("status = 'PENDING' AND next_run_at IS NOT NULL"),
+        ),
+    )
+
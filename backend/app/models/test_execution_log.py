@@ -0,0 +1,22 @@
+"""
+测试执行日志模型
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class TestExecutionLog(Base):
+    """测试执行日志（追加写入，按执行ID + 序号分页读取）"""
+    __tablename__ = "test_execution_logs"
+
+    id = Column(BigInteger, primary_key=True)
+    execution_id = Column(Integer, ForeignKey("test_executions.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)  # 执行内递增序号，从1开始
+    level = Column(String(10), nullable=False, default="INFO")  # DEBUG / INFO / WARNING / ERROR
+    message = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("uq_test_execution_logs_execution_seq", "execution_id", "seq", unique=True),
+    )
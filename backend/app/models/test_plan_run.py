@@ -0,0 +1,38 @@
+"""
+测试计划运行记录模型
+"""
+from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, Enum, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.models.test_execution import ExecutionStatus
+
+
+class TestPlanRun(Base):
+    """测试计划的一次运行
+
+    计划中的每个用例对应一条测试执行（test_executions.plan_run_id），
+    case_states 记录每个用例的状态，summary 为汇总结果。
+    """
+    __tablename__ = "test_plan_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    test_plan_id = Column(Integer, ForeignKey("test_plans.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    status = Column(Enum(ExecutionStatus), default=ExecutionStatus.PENDING)
+    environment = Column(String(100))  # 执行环境
+    config = Column(JSON)  # 本次运行的配置快照（max_parallel / fail_fast / dependencies）
+    # 用例状态：[{"test_case_id", "execution_id", "status", "depends_on"}]，按计划中的顺序
+    case_states = Column(JSON)
+    summary = Column(JSON)  # total/passed/failed/error/skipped/cancelled/duration_ms
+    executed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # 关系
+    test_plan = relationship("TestPlan", backref="runs")
+
+    __table_args__ = (
+        Index("idx_test_plan_runs_plan_created_at", "test_plan_id", "created_at"),
+    )
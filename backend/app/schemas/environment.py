@@ -22,6 +22,9 @@ class EnvironmentBase(BaseModel):
   variables: Optional[Dict[str, Any]] = Field(
     default=None, description="环境变量/业务变量，例如 tenantId、locale 等"
   )
+  execution_config: Optional[Dict[str, Any]] = Field(
+    default=None, description="执行配置，例如并发控制 {\"concurrency\": {\"max\": 50, \"rps\": 100}}"
+  )
 
 
 class EnvironmentCreate(EnvironmentBase):
@@ -39,6 +42,7 @@ class EnvironmentUpdate(BaseModel):
   default_headers: Optional[Dict[str, Any]] = None
   default_params: Optional[Dict[str, Any]] = None
   variables: Optional[Dict[str, Any]] = None
+  execution_config: Optional[Dict[str, Any]] = None
 
 
 class EnvironmentResponse(EnvironmentBase):
@@ -0,0 +1,28 @@
+"""
+性能测试运行记录与基线相关的 Pydantic 模型
+"""
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+
+class PerformanceRunResponse(BaseModel):
+    """性能测试运行记录响应模型（不含延迟直方图）"""
+    id: int
+    project_id: int
+    test_case_id: int
+    execution_id: Optional[int] = None
+    environment: Optional[str] = None
+    status: str
+    summary: Dict[str, Any]
+    verdict: Optional[Dict[str, Any]] = None
+    include_in_baseline: bool
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PerformanceRunUpdate(BaseModel):
+    """更新性能测试运行记录模型"""
+    include_in_baseline: bool = Field(..., description="是否作为后续运行的基线样本")
@@ -0,0 +1,96 @@
+"""
+定时计划相关的 Pydantic 模型
+"""
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+
+
+class ScheduleBase(BaseModel):
+    """定时计划基础模型"""
+    name: str = Field(..., min_length=1, max_length=200, description="计划名称")
+    description: Optional[str] = Field(None, description="描述")
+    project_id: int = Field(..., description="项目ID")
+    test_case_id: Optional[int] = Field(None, description="触发时执行的测试用例（与 test_plan_id 二选一）")
+    test_plan_id: Optional[int] = Field(None, description="触发时运行的测试计划（与 test_case_id 二选一）")
+    environment: Optional[str] = Field(None, description="执行环境")
+    config: Optional[Dict[str, Any]] = Field(default={}, description="传给测试执行的配置")
+    cron_expression: str = Field(..., min_length=1, max_length=100, description="Cron 表达式：分 时 日 月 周，或 秒 分 时 日 月 周")
+    timezone: Optional[str] = Field(None, description="IANA 时区，如 Asia/Shanghai，默认使用系统配置")
+    start_at: Optional[datetime] = Field(None, description="生效时间")
+    end_at: Optional[datetime] = Field(None, description="失效时间")
+    enabled: bool = Field(default=True, description="是否启用")
+    misfire_policy: Optional[str] = Field(None, description="错过触发的处理：run_once 合并补执行一次 / skip 跳过 / run_all 逐个补执行，默认使用系统配置")
+    misfire_grace_seconds: Optional[int] = Field(None, ge=0, description="超过触发时间多少秒视为错过触发，默认使用系统配置")
+    jitter_seconds: Optional[int] = Field(None, ge=0, description="触发抖动窗口（秒），默认使用系统配置")
+
+
+class ScheduleCreate(ScheduleBase):
+    """创建定时计划模型"""
+    pass
+
+
+class ScheduleUpdate(BaseModel):
+    """更新定时计划模型"""
+    name: Optional[str] = Field(None, min_length=1, max_length=200)
+    description: Optional[str] = None
+    test_case_id: Optional[int] = None
+    test_plan_id: Optional[int] = None
+    environment: Optional[str] = None
+    config: Optional[Dict[str, Any]] = None
+    cron_expression: Optional[str] = Field(None, min_length=1, max_length=100)
+    timezone: Optional[str] = None
+    start_at: Optional[datetime] = None
+    end_at: Optional[datetime] = None
+    enabled: Optional[bool] = None
+    misfire_policy: Optional[str] = None
+    misfire_grace_seconds: Optional[int] = Field(None, ge=0)
+    jitter_seconds: Optional[int] = Field(None, ge=0)
+
+
+class ScheduleResponse(ScheduleBase):
+    """定时计划响应模型"""
+    id: int
+    timezone: str
+    config: Optional[Dict[str, Any]] = None
+    next_fire_at: Optional[datetime] = None
+    next_run_at: Optional[datetime] = None
+    last_run_at: Optional[datetime] = None
+    last_lag_seconds: Optional[float] = None
+    last_execution_id: Optional[int] = None
+    last_plan_run_id: Optional[int] = None
+    created_by: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SchedulePreviewResponse(BaseModel):
+    """Cron 表达式预览：接下来的触发时间"""
+    cron_expression: str
+    timezone: str
+    fire_times: List[datetime] = Field(default=[], description="接下来的触发时间（UTC）")
+
+
+class SchedulerMetricsResponse(BaseModel):
+    """调度延迟与错过触发统计"""
+    is_leader: bool = Field(..., description="本进程是否为调度主节点（进程内统计只在主节点上累计）")
+    heap_size: int = Field(..., description="内存中待触发的任务数")
+    misfire_policy: str = Field(..., description="默认错过触发策略")
+    misfire_grace_seconds: int = Field(..., description="默认错过触发宽限时间（秒）")
+    catchup_rate: float = Field(..., description="补执行全局速率（次/秒），0 表示不限速")
+    fired: int = Field(..., description="触发次数")
+    caught_up: int = Field(..., description="其中错过触发后的补执行次数")
+    skipped: int = Field(..., description="按 skip 策略跳过的错过触发次数")
+    deferred: int = Field(..., description="补执行超出速率被顺延的次数")
+    last_fired_at: Optional[datetime] = None
+    lag_avg_seconds: Optional[float] = Field(None, description="最近触发的平均延迟（秒）")
+    lag_p50_seconds: Optional[float] = None
+    lag_p95_seconds: Optional[float] = None
+    lag_p99_seconds: Optional[float] = None
+    lag_max_seconds: float = Field(..., description="进程启动以来的最大延迟（秒）")
+    overdue_schedules: int = Field(..., description="已到期尚未触发的定时计划数")
+    overdue_executions: int = Field(..., description="已到期尚未触发的单次定时执行数")
+    max_overdue_seconds: float = Field(..., description="最早到期的积压任务已等待的秒数")
@@ -5,6 +5,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
 from datetime import datetime
 from app.models.test_execution import ExecutionStatus
+from app.schemas.schedule import ScheduleResponse
 
 
 class TestExecutionBase(BaseModel):
@@ -24,13 +25,38 @@ class TestExecutionResponse(TestExecutionBase):
     id: int
     status: ExecutionStatus
     result: Optional[Dict[str, Any]] = None
+    summary: Optional[Dict[str, Any]] = None
     logs: Optional[str] = None
     config: Dict[str, Any] = {}
     environment: Optional[str] = None
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
+    schedule_id: Optional[int] = None
+    next_run_at: Optional[datetime] = None
     created_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
 
+
+class TestExecutionCreateResponse(BaseModel):
+    """创建测试执行的响应：立即/单次定时执行返回 execution，周期定时返回创建的 schedule"""
+    execution: Optional[TestExecutionResponse] = None
+    schedule: Optional[ScheduleResponse] = None
+
+
+class TestExecutionListItem(TestExecutionBase):
+    """测试执行列表项（不含 result / logs 大字段）"""
+    id: int
+    status: ExecutionStatus
+    summary: Optional[Dict[str, Any]] = None
+    config: Optional[Dict[str, Any]] = None
+    environment: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    schedule_id: Optional[int] = None
+    next_run_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,64 @@
+"""
+测试计划相关的 Pydantic 模型
+"""
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from app.models.test_execution import ExecutionStatus
+
+
+class TestPlanBase(BaseModel):
+    """测试计划基础模型"""
+    name: str = Field(..., description="计划名称")
+    description: Optional[str] = Field(None, description="描述")
+    project_id: int = Field(..., description="项目ID")
+    test_case_ids: List[int] = Field(default=[], description="测试用例ID列表")
+    config: Optional[Dict[str, Any]] = Field(
+        default={},
+        description="执行配置：environment / max_parallel / fail_fast / dependencies（{用例ID: [前置用例ID]}）/ execution_config",
+    )
+
+
+class TestPlanCreate(TestPlanBase):
+    """创建测试计划模型"""
+    pass
+
+
+class TestPlanResponse(TestPlanBase):
+    """测试计划响应模型"""
+    id: int
+    test_case_ids: Optional[List[int]] = None
+    config: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TestPlanExecuteRequest(BaseModel):
+    """执行测试计划（覆盖计划配置）"""
+    environment: Optional[str] = Field(None, description="执行环境")
+    max_parallel: Optional[int] = Field(None, ge=1, description="同时在途的用例数")
+    fail_fast: Optional[bool] = Field(None, description="任一用例失败后停止启动新用例")
+    dependencies: Optional[Dict[str, List[int]]] = Field(None, description="用例依赖：{用例ID: [前置用例ID]}")
+    execution_config: Optional[Dict[str, Any]] = Field(None, description="传给每条测试执行的配置")
+
+
+class TestPlanRunResponse(BaseModel):
+    """测试计划运行响应模型"""
+    id: int
+    test_plan_id: int
+    project_id: int
+    status: ExecutionStatus
+    environment: Optional[str] = None
+    config: Optional[Dict[str, Any]] = None
+    case_states: Optional[List[Dict[str, Any]]] = None
+    summary: Optional[Dict[str, Any]] = None
+    executed_by: Optional[int] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
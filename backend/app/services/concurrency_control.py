@@ -0,0 +1,360 @@
+"""
+数据驱动执行的自适应并发控制
+
+- AIMD：每完成约「当前并发数」个请求评估一次，错误率/延迟正常时并发 +1，
+  出现限流（429/503）、错误率超过阈值或延迟明显升高时按比例下降；
+  下降之前发出的请求的结果不再参与判断，同一批在途请求被限流只下降一次
+- 单主机上限：同一进程内所有执行对同一目标主机的并发总数不超过 per_host
+- 限速：可选的每秒请求数上限（令牌桶）
+
+配置优先级（后者覆盖前者）：全局配置 < 环境 execution_config.concurrency
+< 用例 config.concurrency < 执行 config.concurrency。
+concurrency 可以是对象，也可以是整数（表示固定并发数，不做自适应调整）。
+"""
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 视为被限流的状态码：立即减半
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+class ConcurrencyConfig:
+    """并发控制参数"""
+
+    FIELDS = (
+        "initial", "min", "max", "per_host", "rps",
+        "latency_target_ms", "latency_tolerance", "error_rate_threshold",
+        "decrease_factor", "min_rows",
+    )
+
+    def __init__(self):
+        self.initial = settings.EXECUTION_CONCURRENCY_INITIAL
+        self.min = settings.EXECUTION_CONCURRENCY_MIN
+        self.max = settings.EXECUTION_CONCURRENCY_MAX
+        self.per_host = settings.EXECUTION_CONCURRENCY_PER_HOST
+        self.rps = settings.EXECUTION_RATE_LIMIT_RPS
+        self.latency_target_ms = settings.EXECUTION_LATENCY_TARGET_MS
+        self.latency_tolerance = settings.EXECUTION_LATENCY_TOLERANCE
+        self.error_rate_threshold = settings.EXECUTION_ERROR_RATE_THRESHOLD
+        self.decrease_factor = settings.EXECUTION_CONCURRENCY_DECREASE_FACTOR
+        self.min_rows = settings.EXECUTION_CONCURRENCY_MIN_ROWS
+
+    @classmethod
+    def resolve(cls, *overrides: Any) -> "ConcurrencyConfig":
+        """按顺序合并覆盖配置（None 跳过）"""
+        cfg = cls()
+        for override in overrides:
+            cfg.apply(override)
+        cfg.min = max(1, int(cfg.min))
+        cfg.max = max(cfg.min, int(cfg.max))
+        cfg.initial = min(cfg.max, max(cfg.min, int(cfg.initial)))
+        cfg.per_host = max(0, int(cfg.per_host or 0))
+        return cfg
+
+    def apply(self, override: Any):
+        if override is None or isinstance(override, bool):
+            return
+        if isinstance(override, (int, float)):
+            # 固定并发数
+            self.initial = self.min = self.max = int(override)
+            return
+        if not isinstance(override, dict):
+            return
+        for field in self.FIELDS:
+            value = override.get(field)
+            if value is not None:
+                try:
+                    setattr(self, field, type(getattr(self, field))(value))
+                except (TypeError, ValueError):
+                    logger.warning(f"忽略无效的并发配置 {field}={value!r}")
+
+    @property
+    def adaptive(self) -> bool:
+        return self.min < self.max
+
+    def describe(self) -> str:
+        parts = [f"初始 {self.initial}"]
+        if self.adaptive:
+            parts.append(f"自适应范围 [{self.min}, {self.max}]")
+        else:
+            parts.append("固定并发")
+        if self.per_host:
+            parts.append(f"单主机上限 {self.per_host}")
+        if self.rps:
+            parts.append(f"限速 {self.rps:g} 请求/秒")
+        return "，".join(parts)
+
+
+class TokenBucket:
+    """令牌桶限速器"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst or rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def reserve(self) -> float:
+        """预占一个令牌（不等待），返回还需等待的秒数；令牌不足时透支，后来者依次顺延"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class HostSlots:
+    """同一进程内按目标主机限制并发总数（多个执行共享）"""
+
+    def __init__(self):
+        self._in_flight: Dict[str, int] = {}
+        self._cond = asyncio.Condition()
+
+    async def acquire(self, host: str, cap: int):
+        if not cap:
+            return
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight.get(host, 0) < cap)
+            self._in_flight[host] = self._in_flight.get(host, 0) + 1
+
+    async def release(self, host: str, cap: int):
+        if not cap:
+            return
+        async with self._cond:
+            remaining = self._in_flight.get(host, 1) - 1
+            if remaining > 0:
+                self._in_flight[host] = remaining
+            else:
+                self._in_flight.pop(host, None)
+            self._cond.notify_all()
+
+
+_host_slots: Optional[HostSlots] = None
+
+
+def get_host_slots() -> HostSlots:
+    global _host_slots
+    if _host_slots is None:
+        _host_slots = HostSlots()
+    return _host_slots
+
+
+def target_host(*urls: Optional[str]) -> str:
+    """取第一个可解析的 URL 的主机（含端口）"""
+    for url in urls:
+        if url:
+            netloc = urlparse(url).netloc
+            if netloc:
+                return netloc.lower()
+    return ""
+
+
+class _Slot:
+    """一次请求占用的并发名额"""
+
+    def __init__(self, controller: "AdaptiveConcurrencyController", host: str):
+        self.controller = controller
+        self.host = host
+        self.generation = 0  # 占用名额时并发上限的版本，用于忽略上次下降之前发出的请求
+        self._outcome = None
+
+    def record(self, latency_ms: Optional[int], status_code: Optional[int], failed: bool = False):
+        """记录请求结果：status_code 为空视为请求失败（连接错误、超时等）"""
+        self._outcome = (latency_ms, status_code, failed or status_code is None)
+
+    async def __aenter__(self):
+        self.generation = await self.controller._acquire(self.host)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        outcome = self._outcome if exc_type is None else (None, None, True)
+        await self.controller._release(self.host, outcome, self.generation)
+
+
+class AdaptiveConcurrencyController:
+    """单次执行的并发控制器"""
+
+    def __init__(self, config: ConcurrencyConfig):
+        self.config = config
+        self.limit = float(config.initial)
+        self.peak = config.initial
+        self.adjustments = 0
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+        self._bucket = TokenBucket(config.rps) if config.rps and config.rps > 0 else None
+        self._host_slots = get_host_slots()
+        # 当前评估窗口
+        self._window_count = 0
+        self._window_errors = 0
+        self._window_throttled = 0
+        self._window_latency = 0.0
+        self._window_latency_count = 0
+        self._baseline_latency: Optional[float] = None  # 观察到的最低窗口平均延迟
+        self._generation = 0  # 每次下降并发上限时递增
+
+    def slot(self, host: str = "") -> _Slot:
+        return _Slot(self, host)
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.config.min, int(self.limit))
+
+    async def _acquire(self, host: str) -> int:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.current_limit)
+            self._in_flight += 1
+            generation = self._generation
+        try:
+            await self._host_slots.acquire(host, self.config.per_host)
+            if self._bucket is not None:
+                await self._bucket.acquire()
+        except BaseException:
+            async with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+            raise
+        return generation
+
+    async def _release(self, host: str, outcome, generation: int):
+        await self._host_slots.release(host, self.config.per_host)
+        async with self._cond:
+            self._in_flight -= 1
+            if outcome is not None:
+                self._record(*outcome, generation=generation)
+            self._cond.notify_all()
+
+    def _record(self, latency_ms: Optional[int], status_code: Optional[int], failed: bool, generation: Optional[int] = None):
+        # 上次下降之前发出的请求反映的是下降前的并发，不计入当前窗口（避免同一批限流连续减半）
+        if generation is not None and generation < self._generation:
+            return
+        self._window_count += 1
+        if status_code in THROTTLE_STATUS_CODES:
+            self._window_throttled += 1
+        elif failed or (status_code is not None and status_code >= 500):
+            self._window_errors += 1
+        if latency_ms is not None:
+            self._window_latency += latency_ms
+            self._window_latency_count += 1
+
+        if not self.config.adaptive:
+            self._reset_window()
+            return
+        # 被限流时立即下降，否则每完成约「当前并发数」个请求评估一次
+        if self._window_throttled:
+            self._decrease(0.5)
+        elif self._window_count >= max(self.current_limit, 5):
+            self._evaluate()
+
+    def _evaluate(self):
+        error_rate = self._window_errors / self._window_count
+        avg_latency = None
+        if self._window_latency_count:
+            avg_latency = self._window_latency / self._window_latency_count
+
+        latency_high = False
+        if avg_latency is not None:
+            if self.config.latency_target_ms:
+                latency_high = avg_latency > self.config.latency_target_ms
+            elif self._baseline_latency is not None:
+                latency_high = avg_latency > self._baseline_latency * self.config.latency_tolerance
+            if self._baseline_latency is None or avg_latency < self._baseline_latency:
+                self._baseline_latency = avg_latency
+
+        if error_rate > self.config.error_rate_threshold or latency_high:
+            self._decrease(self.config.decrease_factor)
+        else:
+            self._increase()
+
+    def _increase(self):
+        if self.limit < self.config.max:
+            self.limit = min(float(self.config.max), self.limit + 1)
+            self.peak = max(self.peak, self.current_limit)
+            self.adjustments += 1
+        self._reset_window()
+
+    def _decrease(self, factor: float):
+        new_limit = max(float(self.config.min), self.limit * factor)
+        if new_limit < self.limit:
+            self.limit = new_limit
+            self.adjustments += 1
+            self._generation += 1
+        self._reset_window()
+
+    def _reset_window(self):
+        self._window_count = 0
+        self._window_errors = 0
+        self._window_throttled = 0
+        self._window_latency = 0.0
+        self._window_latency_count = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "current": self.current_limit,
+            "peak": self.peak,
+            "adjustments": self.adjustments,
+            "baseline_latency_ms": round(self._baseline_latency, 1) if self._baseline_latency is not None else None,
+        }
+
+
+async def run_worker_pool(
+    items: AsyncIterable[Any],
+    handler: Callable[[Any], Awaitable[None]],
+    workers: int,
+    queue_size: int = 0,
+):
+    """固定数量的工作协程从有界队列中取数据处理
+
+    生产者按队列余量从 items 中拉取数据，内存中最多只有 queue_size + workers 条数据；
+    handler 抛出的异常会取消其余协程并向上抛出（需要逐条容错时由 handler 自行捕获）。
+    """
+    workers = max(1, workers)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size if queue_size > 0 else workers * 2)
+    done = object()
+
+    iterator = items.__aiter__()
+
+    async def produce():
+        async for item in iterator:
+            await queue.put(item)
+        # 只在数据取完时发送结束标记：被取消时工作协程也已被取消，
+        # 此时向没人消费的有界队列 put 会永远阻塞
+        for _ in range(workers):
+            await queue.put(done)
+
+    async def work():
+        while True:
+            item = await queue.get()
+            if item is done:
+                return
+            await handler(item)
+
+    tasks = [asyncio.create_task(produce())] + [asyncio.create_task(work()) for _ in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # 提前结束时关闭数据源（如流式读取的数据行），释放其持有的游标 / 连接
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -0,0 +1,299 @@
+"""
+测试执行实时事件
+
+执行过程中发布进度事件，前端通过 SSE / WebSocket 订阅，不再轮询日志接口：
+- Redis 后端：事件通过 pub/sub 广播，执行节点与 API 进程可以不在同一进程；
+  最近一次进度快照同时写入 Redis，订阅者连接时立即收到当前进度
+- 进程内后端：Redis 不可用时的退化实现，只能订阅本进程内运行的执行
+
+事件格式：{"type": ..., "execution_id": ..., "ts": ..., ...}
+- started：开始执行（total）
+- row_started / row_finished：单行数据开始/结束（data_index、status、elapsed_ms）
+- progress：进度计数（completed、total、passed、failed、percent、elapsed_seconds、eta_seconds）
+- finished：执行结束（status、summary），订阅在收到该事件后结束
+"""
+import json
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+from app.core.redis_client import get_available_redis
+
+logger = logging.getLogger(__name__)
+
+_CHANNEL_PREFIX = "qualityguard:execution"
+_SNAPSHOT_TTL = 3600  # 进度快照保留时间（秒）
+
+FINISHED = "finished"
+
+
+def _channel(execution_id: int) -> str:
+    return f"{_CHANNEL_PREFIX}:{execution_id}:events"
+
+
+def _snapshot_key(execution_id: int) -> str:
+    return f"{_CHANNEL_PREFIX}:{execution_id}:snapshot"
+
+
+class BaseExecutionEventBus:
+    """执行事件总线接口"""
+
+    backend = "base"
+
+    async def publish(self, execution_id: int, event: Dict[str, Any]):
+        """发布事件（progress / started / finished 同时更新快照）"""
+        raise NotImplementedError
+
+    async def snapshot(self, execution_id: int) -> Optional[Dict[str, Any]]:
+        """最近一次进度快照"""
+        raise NotImplementedError
+
+    def subscribe(self, execution_id: int) -> "BaseSubscription":
+        raise NotImplementedError
+
+
+class BaseSubscription:
+    """单个订阅者，使用 `async with` 管理生命周期"""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """等待下一条事件，超时返回 None"""
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+# ----------------------------------------------------------------------
+# 进程内实现
+# ----------------------------------------------------------------------
+
+class _MemorySubscription(BaseSubscription):
+
+    def __init__(self, bus: "InMemoryExecutionEventBus", execution_id: int):
+        self.bus = bus
+        self.execution_id = execution_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        bus._subscribers.setdefault(execution_id, set()).add(self.queue)
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        queues = self.bus._subscribers.get(self.execution_id)
+        if queues is not None:
+            queues.discard(self.queue)
+            if not queues:
+                self.bus._subscribers.pop(self.execution_id, None)
+
+
+class InMemoryExecutionEventBus(BaseExecutionEventBus):
+    """进程内事件总线"""
+
+    backend = "memory"
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._snapshots: Dict[int, Dict[str, Any]] = {}
+
+    async def publish(self, execution_id: int, event: Dict[str, Any]):
+        if event.get("type") in ("started", "progress", FINISHED):
+            if event.get("type") == FINISHED:
+                self._snapshots.pop(execution_id, None)
+            else:
+                self._snapshots[execution_id] = event
+        for queue in list(self._subscribers.get(execution_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # 消费过慢的订阅者丢弃事件，不阻塞执行
+                pass
+
+    async def snapshot(self, execution_id: int) -> Optional[Dict[str, Any]]:
+        return self._snapshots.get(execution_id)
+
+    def subscribe(self, execution_id: int) -> BaseSubscription:
+        return _MemorySubscription(self, execution_id)
+
+
+# ----------------------------------------------------------------------
+# Redis 实现
+# ----------------------------------------------------------------------
+
+class _RedisSubscription(BaseSubscription):
+
+    def __init__(self, client, execution_id: int):
+        self.channel = _channel(execution_id)
+        self.pubsub = client.pubsub()
+        self._subscribed = False
+
+    async def __aenter__(self):
+        await self.pubsub.subscribe(self.channel)
+        self._subscribed = True
+        return self
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+            if message and message.get("type") == "message":
+                try:
+                    return json.loads(message["data"])
+                except (TypeError, ValueError):
+                    continue
+
+    async def close(self):
+        try:
+            if self._subscribed:
+                await self.pubsub.unsubscribe(self.channel)
+            await self.pubsub.close()
+        except Exception as e:
+            logger.debug(f"关闭订阅 {self.channel} 失败: {e}")
+
+
+class RedisExecutionEventBus(BaseExecutionEventBus):
+    """基于 Redis pub/sub 的事件总线"""
+
+    backend = "redis"
+
+    def __init__(self, client):
+        self.client = client
+
+    async def publish(self, execution_id: int, event: Dict[str, Any]):
+        payload = json.dumps(event, ensure_ascii=False, default=str)
+        pipe = self.client.pipeline(transaction=False)
+        if event.get("type") == FINISHED:
+            pipe.delete(_snapshot_key(execution_id))
+        elif event.get("type") in ("started", "progress"):
+            pipe.set(_snapshot_key(execution_id), payload, ex=_SNAPSHOT_TTL)
+        pipe.publish(_channel(execution_id), payload)
+        await pipe.execute()
+
+    async def snapshot(self, execution_id: int) -> Optional[Dict[str, Any]]:
+        payload = await self.client.get(_snapshot_key(execution_id))
+        return json.loads(payload) if payload else None
+
+    def subscribe(self, execution_id: int) -> BaseSubscription:
+        return _RedisSubscription(self.client, execution_id)
+
+
+_bus: Optional[BaseExecutionEventBus] = None
+
+
+async def get_execution_event_bus() -> BaseExecutionEventBus:
+    """获取事件总线实例（优先使用 Redis，不可用时退回进程内实现）"""
+    global _bus
+    if _bus is None:
+        client = None
+        if settings.EXECUTION_EVENTS_BACKEND == "redis":
+            client = await get_available_redis()
+        if client is not None:
+            _bus = RedisExecutionEventBus(client)
+        else:
+            if settings.EXECUTION_EVENTS_BACKEND == "redis":
+                logger.warning("Redis不可用，执行事件退回进程内实现（只能订阅本进程内的执行）")
+            _bus = InMemoryExecutionEventBus()
+    return _bus
+
+
+class ExecutionProgress:
+    """单次执行的进度跟踪与事件发布
+
+    发布失败只记录日志，不影响执行；progress 事件按 EXECUTION_PROGRESS_EVENT_INTERVAL 节流，
+    数据库检查点按 EXECUTION_PROGRESS_CHECKPOINT_SECONDS 节流（见 checkpoint_due）。
+    """
+
+    def __init__(self, bus: BaseExecutionEventBus, execution_id: int, total: int):
+        self.bus = bus
+        self.execution_id = execution_id
+        self.total = total
+        self.completed = 0
+        self.passed = 0
+        self.failed = 0
+        self._started_at = time.monotonic()
+        self._row_started: Dict[int, float] = {}
+        self._last_progress_event = 0.0
+        self._last_checkpoint = self._started_at
+
+    async def _publish(self, event_type: str, **fields):
+        event = {"type": event_type, "execution_id": self.execution_id, "ts": time.time(), **fields}
+        try:
+            await self.bus.publish(self.execution_id, event)
+        except Exception as e:
+            logger.warning(f"发布执行 {self.execution_id} 事件失败: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self._started_at
+        eta = None
+        if 0 < self.completed < self.total:
+            eta = round(elapsed / self.completed * (self.total - self.completed), 1)
+        return {
+            "completed": self.completed,
+            "total": self.total,
+            "passed": self.passed,
+            "failed": self.failed,
+            "percent": int(self.completed / self.total * 100) if self.total else 100,
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": eta,
+        }
+
+    async def start(self):
+        await self._publish("started", **self.snapshot())
+
+    async def row_started(self, data_index: int):
+        self._row_started[data_index] = time.monotonic()
+        await self._publish("row_started", data_index=data_index)
+
+    async def row_finished(self, data_index: int, status: str):
+        started = self._row_started.pop(data_index, None)
+        self.completed += 1
+        if status == "passed":
+            self.passed += 1
+        else:
+            self.failed += 1
+        elapsed_ms = int((time.monotonic() - started) * 1000) if started is not None else None
+        await self._publish("row_finished", data_index=data_index, status=status, elapsed_ms=elapsed_ms)
+
+        now = time.monotonic()
+        if self.completed >= self.total or now - self._last_progress_event >= settings.EXECUTION_PROGRESS_EVENT_INTERVAL:
+            self._last_progress_event = now
+            await self._publish("progress", **self.snapshot())
+
+    def checkpoint_due(self) -> bool:
+        """是否需要把进度写回数据库（写入后自动重置计时）"""
+        now = time.monotonic()
+        if now - self._last_checkpoint >= settings.EXECUTION_PROGRESS_CHECKPOINT_SECONDS:
+            self._last_checkpoint = now
+            return True
+        return False
+
+    async def finish(self, status: str, summary: Dict[str, Any]):
+        await self._publish(FINISHED, status=status, summary=summary, **self.snapshot())
+
+
+async def publish_execution_finished(execution_id: int, status: str, summary: Optional[Dict[str, Any]] = None):
+    """在执行流程之外发布结束事件（如执行节点记录异常）"""
+    bus = await get_execution_event_bus()
+    try:
+        await bus.publish(execution_id, {
+            "type": FINISHED,
+            "execution_id": execution_id,
+            "ts": time.time(),
+            "status": status,
+            "summary": summary or {},
+        })
+    except Exception as e:
+        logger.warning(f"发布执行 {execution_id} 结束事件失败: {e}")
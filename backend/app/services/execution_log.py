@@ -0,0 +1,283 @@
+"""
+测试执行日志
+
+执行过程中的日志不再拼接成一个大字符串反复写回 `TestExecution.logs`，
+而是由 ExecutionLogWriter 追加写入 test_execution_logs 表：
+- 每条日志带执行内递增序号和级别，读取时按 `after=seq` 分页/追尾
+- 低于 EXECUTION_LOG_LEVEL 的日志（默认丢弃 `[调试]` 输出）不落库
+- 单条日志超过 EXECUTION_LOG_MAX_LINE_CHARS 截断，单次执行超过 EXECUTION_LOG_MAX_LINES 后不再写入
+- 后台定时批量写入；`TestExecution.logs` 只保留最近 EXECUTION_LOG_TAIL_LINES 条作为摘要
+- 写入器之外的日志（append_execution_log）：本进程有该执行的写入器时交给它写入，否则在 SQL 中分配序号；
+  写入器批量写入遇到序号冲突（其他进程插入了日志）时按库中最大序号重新编号后重试
+
+Writer 实现了 `append` / `extend`，可以直接替代原来的 `lines` 列表传给各执行函数。
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select, insert, func, literal, cast, Integer, String, Text
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.test_execution_log import TestExecutionLog
+
+logger = logging.getLogger(__name__)
+
+DEBUG = "DEBUG"
+INFO = "INFO"
+WARNING = "WARNING"
+ERROR = "ERROR"
+
+LEVELS = {DEBUG: 10, INFO: 20, WARNING: 30, ERROR: 40}
+
+# 序号冲突时的重试次数
+_SEQ_CONFLICT_RETRIES = 3
+
+# 本进程内正在写入的执行日志写入器（execution_id -> writer）
+_active_writers: Dict[int, "ExecutionLogWriter"] = {}
+
+# 按日志前缀推断级别（执行代码中沿用的约定）
+_LEVEL_PREFIXES = (
+    ("[调试]", DEBUG),
+    ("[警告]", WARNING),
+    ("⚠", WARNING),
+    ("[错误]", ERROR),
+    ("✗", ERROR),
+    ("执行出错", ERROR),
+)
+
+
+def detect_level(message: str) -> str:
+    """根据日志前缀推断级别"""
+    text = message.lstrip()
+    for prefix, level in _LEVEL_PREFIXES:
+        if text.startswith(prefix):
+            return level
+    return INFO
+
+
+def level_value(level: Optional[str]) -> int:
+    return LEVELS.get((level or INFO).upper(), LEVELS[INFO])
+
+
+def truncate_message(message: str, max_chars: Optional[int] = None) -> str:
+    """截断超长日志，保留开头并注明截断的字符数"""
+    max_chars = max_chars or settings.EXECUTION_LOG_MAX_LINE_CHARS
+    if max_chars <= 0 or len(message) <= max_chars:
+        return message
+    return f"{message[:max_chars]}...（已截断 {len(message) - max_chars} 个字符）"
+
+
+class ExecutionLogWriter:
+    """单次执行的日志写入器（同一执行同一时刻只应有一个写入器）"""
+
+    def __init__(self, execution_id: int, min_level: Optional[str] = None):
+        self.execution_id = execution_id
+        self.min_level = level_value(min_level or settings.EXECUTION_LOG_LEVEL)
+        self.max_lines = settings.EXECUTION_LOG_MAX_LINES
+        self._seq = 0
+        self._written = 0  # 已接收（将落库）的条数，用于上限控制
+        self._dropped = 0  # 超出上限被丢弃的条数
+        self._pending: List[Dict[str, Any]] = []
+        self._tail: deque = deque(maxlen=max(1, settings.EXECUTION_LOG_TAIL_LINES))
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # 兼容 list 的写入接口
+    # ------------------------------------------------------------------
+
+    def append(self, message: Any, level: Optional[str] = None):
+        message = message if isinstance(message, str) else str(message)
+        level = (level or detect_level(message)).upper()
+        if level_value(level) < self.min_level:
+            return
+        if self._written >= self.max_lines:
+            self._dropped += 1
+            return
+
+        self._written += 1
+        message = truncate_message(message)
+        if self._written == self.max_lines:
+            message = f"{message}\n[警告] 日志条数达到上限 {self.max_lines}，后续日志不再记录"
+        self._seq += 1
+        self._pending.append({
+            "execution_id": self.execution_id,
+            "seq": self._seq,
+            "level": level,
+            "message": message,
+        })
+        self._tail.append(message)
+
+    def extend(self, messages: Iterable[Any]):
+        for message in messages:
+            self.append(message)
+
+    def debug(self, message: str):
+        self.append(message, DEBUG)
+
+    def info(self, message: str):
+        self.append(message, INFO)
+
+    def warning(self, message: str):
+        self.append(message, WARNING)
+
+    def error(self, message: str):
+        self.append(message, ERROR)
+
+    def __len__(self) -> int:
+        return self._written
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def tail_text(self) -> str:
+        """最近日志，用于写回 `TestExecution.logs`"""
+        text = "\n".join(self._tail)
+        if self._seq > len(self._tail):
+            text = f"（仅保留最近 {len(self._tail)} 条，共 {self._seq} 条，完整日志见日志接口）\n" + text
+        if self._dropped:
+            text += f"\n（另有 {self._dropped} 条日志因超出上限未记录）"
+        return text
+
+    # ------------------------------------------------------------------
+    # 落库
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """接续已有序号（任务重试时），并启动后台定时写入"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(func.max(TestExecutionLog.seq)).where(TestExecutionLog.execution_id == self.execution_id)
+            )
+            last_seq = result.scalar() or 0
+        # start 之前已追加的日志顺延序号
+        for offset, record in enumerate(self._pending, start=1):
+            record["seq"] = last_seq + offset
+        self._seq = last_seq + len(self._pending)
+        _active_writers[self.execution_id] = self
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _resequence(self):
+        """其他进程插入了日志导致序号冲突：未写入的日志接在库中最大序号之后重新编号"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(func.max(TestExecutionLog.seq)).where(TestExecutionLog.execution_id == self.execution_id)
+            )
+            last_seq = result.scalar() or 0
+        for offset, record in enumerate(self._pending, start=1):
+            record["seq"] = last_seq + offset
+        self._seq = last_seq + len(self._pending)
+
+    async def _flush_loop(self):
+        interval = max(0.1, settings.EXECUTION_LOG_FLUSH_INTERVAL)
+        while not self._closed:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"写入执行 {self.execution_id} 日志失败: {e}")
+
+    async def flush(self):
+        """把缓冲区中的日志批量写入数据库"""
+        async with self._flush_lock:
+            conflicts = 0
+            while self._pending:
+                batch_size = max(1, settings.EXECUTION_LOG_FLUSH_BATCH)
+                batch = self._pending[:batch_size]
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await db.execute(insert(TestExecutionLog), batch)
+                        await db.commit()
+                except IntegrityError:
+                    conflicts += 1
+                    if conflicts > _SEQ_CONFLICT_RETRIES:
+                        raise
+                    await self._resequence()
+                    continue
+                del self._pending[:len(batch)]
+
+    async def close(self):
+        """停止后台写入并写完剩余日志"""
+        self._closed = True
+        if _active_writers.get(self.execution_id) is self:
+            del _active_writers[self.execution_id]
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._flush_task = None
+        await self.flush()
+
+
+async def append_execution_log(execution_id: int, message: str, level: Optional[str] = None):
+    """在执行写入器之外追加一条日志（如执行节点记录异常）
+
+    本进程内该执行的写入器仍在运行时交给它写入，保证序号连续；否则在 SQL 中取最大序号 + 1 插入，
+    与其他进程并发插入冲突时重试。
+    """
+    message = message if isinstance(message, str) else str(message)
+    level = (level or detect_level(message)).upper()
+    writer = _active_writers.get(execution_id)
+    if writer is not None and not writer._closed:
+        writer.append(message, level)
+        return
+
+    next_seq = (
+        select(
+            cast(literal(execution_id), Integer),
+            func.coalesce(func.max(TestExecutionLog.seq), 0) + 1,
+            cast(literal(level), String),
+            cast(literal(truncate_message(message)), Text),
+        )
+        .where(TestExecutionLog.execution_id == execution_id)
+    )
+    statement = insert(TestExecutionLog).from_select(
+        ["execution_id", "seq", "level", "message"], next_seq
+    )
+    for attempt in range(_SEQ_CONFLICT_RETRIES + 1):
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(statement)
+                await db.commit()
+            return
+        except IntegrityError:
+            if attempt == _SEQ_CONFLICT_RETRIES:
+                raise
+
+
+async def read_execution_logs(
+    db,
+    execution_id: int,
+    after: Optional[int] = None,
+    limit: int = 500,
+    tail: Optional[int] = None,
+    min_level: Optional[str] = None,
+) -> List[TestExecutionLog]:
+    """按序号读取日志
+
+    Args:
+        after: 只返回序号大于该值的日志（追尾读取时传上次返回的最大序号）
+        limit: 最多返回条数
+        tail: 返回最近的 N 条（忽略 after）
+        min_level: 最低日志级别
+    """
+    query = select(TestExecutionLog).where(TestExecutionLog.execution_id == execution_id)
+    if min_level:
+        allowed = [name for name, value in LEVELS.items() if value >= level_value(min_level)]
+        query = query.where(TestExecutionLog.level.in_(allowed))
+    if tail:
+        result = await db.execute(query.order_by(TestExecutionLog.seq.desc()).limit(tail))
+        return list(reversed(result.scalars().all()))
+    if after is not None:
+        query = query.where(TestExecutionLog.seq > after)
+    result = await db.execute(query.order_by(TestExecutionLog.seq).limit(limit))
+    return list(result.scalars().all())
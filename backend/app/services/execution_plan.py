@@ -0,0 +1,365 @@
+"""
+测试用例执行计划
+
+把 `test_case.config` 预先解析为只读的执行计划（编译一次，多行复用）：
+- 请求模板（method/path/headers/params/body）只解析一次
+- `${var}` 占位符用 app.utils.template 预编译，不含占位符的子树逐行绑定时直接复用
+- 为请求 body 建立字段索引，数据行覆盖 body 字段时只改动命中的路径
+- 断言、提取器、Token 配置预先规整
+
+计划按 (test_case_id, updated_at) 缓存在进程内 LRU 中，用例被修改后自动失效。
+计划对象在多个执行之间共享，调用方不得修改其中的模板数据。
+"""
+import re
+import copy
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.utils.template import Template
+_ARRAY_SUFFIX_PATTERN = re.compile(r'^(.+)_(\d+)$')
+
+
+def auto_convert_type(value: Any) -> Any:
+    """自动转换值的类型（布尔值、null、JSON、数字），无法转换时保持字符串"""
+    if not isinstance(value, str):
+        return value
+
+    value = value.strip()
+
+    # 空字符串
+    if not value:
+        return value
+
+    # 布尔值
+    if value.lower() == 'true':
+        return True
+    elif value.lower() == 'false':
+        return False
+    elif value.lower() == 'null':
+        return None
+
+    # 尝试JSON解析
+    if value.startswith(('{', '[')):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            pass
+
+    # 尝试数字
+    try:
+        if '.' in value:
+            return float(value)
+        else:
+            return int(value)
+    except ValueError:
+        pass
+
+    # 保持字符串
+    return value
+
+
+def convert_to_template_type(template_value: Any, data_value: Any) -> Any:
+    """根据模板值的类型，转换数据值"""
+    # 如果模板是数组
+    if isinstance(template_value, list):
+        if isinstance(data_value, list):
+            return data_value  # 已经是数组，直接使用
+        elif isinstance(data_value, str):
+            # 字符串转数组
+            if data_value.strip() == "":
+                return []  # 空字符串 -> 空数组
+            elif data_value.startswith('['):
+                # 尝试解析JSON数组
+                try:
+                    parsed = json.loads(data_value)
+                    return parsed if isinstance(parsed, list) else [data_value]
+                except ValueError:
+                    return [data_value]
+            else:
+                return [data_value]  # 单个值 -> 单元素数组
+        elif data_value is None or data_value == "":
+            return []  # null/空值 -> 空数组
+        else:
+            return [data_value]  # 其他类型 -> 单元素数组
+
+    # 如果模板是数字
+    elif isinstance(template_value, (int, float)):
+        if isinstance(data_value, (int, float)):
+            return data_value
+        elif isinstance(data_value, str):
+            try:
+                return int(data_value) if '.' not in str(data_value) else float(data_value)
+            except ValueError:
+                return template_value  # 转换失败，保持模板值
+        else:
+            return template_value
+
+    # 如果模板是布尔值
+    elif isinstance(template_value, bool):
+        if isinstance(data_value, bool):
+            return data_value
+        elif isinstance(data_value, str):
+            if data_value.lower() in ('true', '1', 'yes'):
+                return True
+            elif data_value.lower() in ('false', '0', 'no', ''):
+                return False
+            else:
+                return template_value
+        elif isinstance(data_value, (int, float)):
+            return bool(data_value)
+        else:
+            return template_value
+
+    # 如果模板是字符串
+    elif isinstance(template_value, str):
+        return str(data_value) if data_value is not None else ""
+
+    # 如果模板是None或其他类型，直接使用数据值
+    else:
+        return data_value
+
+
+def _merge_array_fields(test_data: Dict[str, Any]) -> Dict[str, Any]:
+    """识别并合并数组字段（如 user_ids_1, user_ids_2 -> user_ids: [...]）"""
+    processed: Dict[str, Any] = {}
+    array_fields: Dict[str, Dict[int, Any]] = {}
+
+    for key, value in test_data.items():
+        match = _ARRAY_SUFFIX_PATTERN.match(key)
+        if match:
+            array_fields.setdefault(match.group(1), {})[int(match.group(2))] = value
+        else:
+            processed[key] = value
+
+    for base_name, values_dict in array_fields.items():
+        # 按索引排序并合并，过滤空值
+        sorted_values = [values_dict[i] for i in sorted(values_dict.keys())]
+        sorted_values = [v for v in sorted_values if v is not None and v != '']
+        if sorted_values:
+            processed[base_name] = sorted_values
+    return processed
+
+
+class ExecutionPlan:
+    """编译后的测试用例执行计划（只读，可在多次执行之间共享）"""
+
+    def __init__(self, test_case_id: int, version: Any, config: Optional[Dict[str, Any]]):
+        self.test_case_id = test_case_id
+        self.version = version
+
+        self.has_config = isinstance(config, dict)
+        # 拷贝一份配置，避免ORM对象上的原地修改影响已缓存的计划
+        config = copy.deepcopy(config) if self.has_config else {}
+        request_cfg = config.get("request") or {}
+        interface_cfg = config.get("interface") or {}
+
+        self.request_url: Optional[str] = request_cfg.get("url")
+        self.request_template: Dict[str, Any] = {}
+        if self.has_config:
+            self.request_template = {
+                "method": interface_cfg.get("method") or request_cfg.get("method") or "GET",
+                "path": interface_cfg.get("path") or request_cfg.get("path") or "",
+                "headers": request_cfg.get("headers") or {},
+                "params": request_cfg.get("params") or {},
+                "path_params": request_cfg.get("path_params") or {},
+                "body": request_cfg.get("body") or request_cfg.get("data") or None,
+            }
+
+        raw_assertions = config.get("assertions") or []
+        self.assertions: List[Dict[str, Any]] = raw_assertions if isinstance(raw_assertions, list) else []
+        # 自动生成了状态码断言时，用例配置中的状态码断言需要去掉
+        self.assertions_without_status_code: List[Dict[str, Any]] = [
+            a for a in self.assertions if not (isinstance(a, dict) and a.get("type") == "status_code")
+        ]
+
+        raw_extractors = config.get("extractors") or []
+        self.extractors: List[Dict[str, Any]] = raw_extractors if isinstance(raw_extractors, list) else []
+
+        self.token_config: Optional[Dict[str, Any]] = config.get("token_config")
+        self.concurrency: Any = config.get("concurrency")  # 用例级并发控制配置
+
+        # 占位符预编译：每个请求字段一个模板
+        self._templates: Dict[str, Template] = {k: Template(v) for k, v in self.request_template.items()}
+        self.placeholders: Set[str] = set()
+        for template in self._templates.values():
+            self.placeholders.update(template.variables)
+        self._has_placeholders = bool(self.placeholders)
+
+        # body 字段索引：字段名 -> [(路径, 模板值), ...]
+        self._body_index: Dict[str, List[Tuple[Tuple[str, ...], Any]]] = {}
+        template_body = self.request_template.get("body")
+        if isinstance(template_body, dict):
+            self._index_body(template_body, (), 0)
+
+    # ------------------------------------------------------------------
+    # 编译
+    # ------------------------------------------------------------------
+
+    def _index_body(self, obj: Dict[str, Any], prefix: Tuple[str, ...], depth: int):
+        """建立 body 字段索引
+
+        与原深度合并规则一致：顶层的对象字段不会被整体替换，
+        其余任意层级的同名字段都会按模板类型转换后替换。
+        """
+        for key, value in obj.items():
+            path = prefix + (key,)
+            if isinstance(value, dict):
+                if depth > 0:
+                    self._body_index.setdefault(key, []).append((path, value))
+                self._index_body(value, path, depth + 1)
+            else:
+                self._body_index.setdefault(key, []).append((path, value))
+
+    # ------------------------------------------------------------------
+    # 逐行绑定
+    # ------------------------------------------------------------------
+
+    def bind_request(self, test_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
+        """将一行测试数据绑定到请求模板
+
+        Returns:
+            (请求信息, 数据行中的 request 配置；未使用时为 None)
+        """
+        test_request = test_data.get("request") or test_data.get("request_params")
+        if not test_request:
+            return self._render_request(test_data), None
+
+        if isinstance(test_request, str):
+            try:
+                test_request = json.loads(test_request)
+            except ValueError:
+                test_request = {}
+
+        request_info = dict(self.request_template)
+        if isinstance(test_request, dict):
+            # 合并headers、params、body等
+            if test_request.get("headers"):
+                request_info["headers"] = {**request_info.get("headers", {}), **test_request["headers"]}
+            if test_request.get("params"):
+                request_info["params"] = {**request_info.get("params", {}), **test_request["params"]}
+            if test_request.get("body") is not None:
+                request_info["body"] = test_request["body"]
+            elif test_request:
+                # 没有body字段时，把其他字段深度合并到模板的body中
+                if isinstance(request_info.get("body"), dict):
+                    request_info["body"] = self._merge_body(test_request)
+                else:
+                    request_info["body"] = test_request
+            if test_request.get("path"):
+                request_info["path"] = test_request["path"]
+            if test_request.get("method"):
+                request_info["method"] = test_request["method"]
+        return request_info, test_request
+
+    def _merge_body(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """按字段索引把数据写入模板 body（只复制被修改路径上的容器）"""
+        slots = []
+        for key, value in data.items():
+            for path, template_value in self._body_index.get(key, ()):
+                slots.append((path, template_value, value))
+        body = dict(self.request_template["body"])
+        if not slots:
+            return body
+
+        copied = {id(body)}
+        # 先写深层字段，再写浅层字段：与原逻辑一致，外层对象的替换优先
+        slots.sort(key=lambda slot: len(slot[0]), reverse=True)
+        for path, template_value, value in slots:
+            node = body
+            for key in path[:-1]:
+                child = node[key]
+                if id(child) not in copied:
+                    child = dict(child)
+                    node[key] = child
+                    copied.add(id(child))
+                node = child
+            node[path[-1]] = convert_to_template_type(template_value, value)
+        return body
+
+    def _render_request(self, test_data: Dict[str, Any]) -> Dict[str, Any]:
+        """用 ${key} 占位符把测试数据渲染到请求模板中
+
+        - 整个字符串就是一个变量（如 "${user_ids}"）时保留数据类型
+        - 支持字段名后缀识别（如 user_ids_1, user_ids_2 合并为数组）
+        - body 为空时直接使用测试数据作为 body（排除 expected_* 字段）
+        """
+        template = self.request_template
+        body = template.get("body")
+        if not self._has_placeholders and not isinstance(body, str) and not (body is None and test_data):
+            return dict(template)
+
+        data = _merge_array_fields(test_data)
+        result = {}
+        for key, compiled in self._templates.items():
+            if key == "headers":
+                # 请求头只能是字符串，整值占位符不做类型转换
+                result[key] = compiled.render(data, typed=False)
+            else:
+                result[key] = compiled.render(data, convert=auto_convert_type)
+
+        if isinstance(result.get("body"), str):
+            # body 是字符串且包含JSON时，解析后再替换
+            body_str = result["body"]
+            try:
+                result["body"] = Template(json.loads(body_str)).render(data, convert=auto_convert_type)
+            except (json.JSONDecodeError, TypeError):
+                result["body"] = body_str
+        elif result.get("body") is None and test_data:
+            result["body"] = {k: v for k, v in data.items() if not k.startswith('expected_')}
+        return result
+
+    def row_assertions(self, test_data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """数据行中显式配置的断言（优先级高于用例配置），未配置时返回 None"""
+        test_assertions = test_data.get("assertions")
+        if not test_assertions:
+            return None
+        if isinstance(test_assertions, str):
+            try:
+                return json.loads(test_assertions)
+            except ValueError:
+                return self.assertions
+        if isinstance(test_assertions, list):
+            return test_assertions
+        return self.assertions
+
+    def merge_generated_assertions(self, generated: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """把根据 expected_* 字段自动生成的断言与用例配置中的断言合并"""
+        if not generated:
+            return self.assertions
+        if not self.assertions:
+            return generated
+        if any(a.get('type') == 'status_code' for a in generated):
+            base = self.assertions_without_status_code
+        else:
+            base = self.assertions
+        return base + generated
+
+
+# 进程内执行计划缓存（LRU）
+_plan_cache: "OrderedDict[Tuple[int, Any], ExecutionPlan]" = OrderedDict()
+
+
+def get_execution_plan(test_case) -> ExecutionPlan:
+    """获取测试用例的执行计划（按 (id, updated_at) 缓存）"""
+    version = test_case.updated_at or test_case.created_at
+    key = (test_case.id, version)
+    plan = _plan_cache.get(key)
+    if plan is not None:
+        _plan_cache.move_to_end(key)
+        return plan
+
+    plan = ExecutionPlan(test_case.id, version, test_case.config)
+    _plan_cache[key] = plan
+    # 同一用例的旧版本计划不会再被命中，直接淘汰
+    for stale_key in [k for k in _plan_cache if k[0] == test_case.id and k != key]:
+        del _plan_cache[stale_key]
+    while len(_plan_cache) > settings.EXECUTION_PLAN_CACHE_SIZE:
+        _plan_cache.popitem(last=False)
+    return plan
+
+
+def clear_execution_plan_cache():
+    """清空执行计划缓存"""
+    _plan_cache.clear()
@@ -0,0 +1,326 @@
+"""
+测试执行任务队列
+
+创建执行时只把任务放入队列，由执行节点（worker）领取后运行。
+- Redis 后端：多进程/多节点共享，领取任务时写入租约（lease），
+  执行期间定期心跳续约，租约过期（节点崩溃）的任务会被重新入队
+- 租约以领取次数（attempts）为令牌：任务被重新领取后，旧持有者的心跳与确认都会失败，
+  不会续上或释放新持有者的租约与项目并发名额
+- 进程内后端：Redis 不可用时的退化实现，只能由本进程内的 worker 消费
+- 每个项目同时运行的任务数不超过 settings.MAX_CONCURRENT_TESTS
+"""
+import time
+import logging
+from collections import deque
+from typing import Optional, List, Dict, Tuple
+
+from app.core.config import settings
+from app.core.redis_client import get_available_redis
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionJob:
+    """队列中的执行任务"""
+
+    def __init__(self, execution_id: int, project_id: int, attempts: int = 0):
+        self.execution_id = execution_id
+        self.project_id = project_id
+        self.attempts = attempts  # 已领取次数（含本次）
+
+    def __repr__(self) -> str:
+        return f"ExecutionJob(execution_id={self.execution_id}, project_id={self.project_id}, attempts={self.attempts})"
+
+
+class BaseExecutionQueue:
+    """执行队列接口"""
+
+    backend = "base"
+
+    def __init__(self):
+        self.lease_seconds = settings.EXECUTION_JOB_LEASE_SECONDS
+        self.max_attempts = settings.EXECUTION_JOB_MAX_ATTEMPTS
+        self.project_limit = settings.MAX_CONCURRENT_TESTS
+
+    async def enqueue(self, execution_id: int, project_id: int):
+        """任务入队"""
+        raise NotImplementedError
+
+    async def claim(self, worker_id: str) -> Optional[ExecutionJob]:
+        """领取一个任务（非阻塞），跳过已达到并发上限的项目，无可执行任务时返回None"""
+        raise NotImplementedError
+
+    async def heartbeat(self, job: ExecutionJob) -> bool:
+        """续约，返回False表示租约已丢失（已过期或被重新分配）"""
+        raise NotImplementedError
+
+    async def ack(self, job: ExecutionJob) -> bool:
+        """任务完成，释放租约与项目并发名额；返回False表示租约已丢失，未做任何修改"""
+        raise NotImplementedError
+
+    async def requeue_expired(self) -> List[Tuple[int, bool]]:
+        """重新入队租约过期的任务
+
+        Returns:
+            [(execution_id, 是否已超过最大重试次数), ...]
+        """
+        raise NotImplementedError
+
+    async def stats(self) -> Dict[str, int]:
+        """队列统计"""
+        raise NotImplementedError
+
+
+class InMemoryExecutionQueue(BaseExecutionQueue):
+    """进程内执行队列（Redis 不可用时使用）"""
+
+    backend = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self._queue: deque = deque()
+        self._jobs: Dict[int, ExecutionJob] = {}
+        self._leases: Dict[int, float] = {}  # execution_id -> 租约到期时间
+        self._project_running: Dict[int, set] = {}
+
+    async def enqueue(self, execution_id: int, project_id: int):
+        self._jobs[execution_id] = ExecutionJob(execution_id, project_id)
+        self._queue.append(execution_id)
+
+    async def claim(self, worker_id: str) -> Optional[ExecutionJob]:
+        # 轮转一遍队列，跳过已达到项目并发上限的任务
+        for _ in range(len(self._queue)):
+            execution_id = self._queue.popleft()
+            job = self._jobs.get(execution_id)
+            if job is None:
+                continue
+            running = self._project_running.setdefault(job.project_id, set())
+            if self.project_limit > 0 and len(running) >= self.project_limit:
+                self._queue.append(execution_id)
+                continue
+            running.add(execution_id)
+            job.attempts += 1
+            self._leases[execution_id] = time.time() + self.lease_seconds
+            # 返回副本：持有者的 attempts 固定为领取时的值，作为租约令牌
+            return ExecutionJob(job.execution_id, job.project_id, job.attempts)
+        return None
+
+    def _holds_lease(self, job: ExecutionJob) -> bool:
+        current = self._jobs.get(job.execution_id)
+        return job.execution_id in self._leases and current is not None and current.attempts == job.attempts
+
+    async def heartbeat(self, job: ExecutionJob) -> bool:
+        if not self._holds_lease(job):
+            return False
+        self._leases[job.execution_id] = time.time() + self.lease_seconds
+        return True
+
+    async def ack(self, job: ExecutionJob) -> bool:
+        if not self._holds_lease(job):
+            return False
+        self._leases.pop(job.execution_id, None)
+        self._jobs.pop(job.execution_id, None)
+        self._project_running.get(job.project_id, set()).discard(job.execution_id)
+        return True
+
+    async def requeue_expired(self) -> List[Tuple[int, bool]]:
+        now = time.time()
+        expired = [eid for eid, deadline in self._leases.items() if deadline < now]
+        results = []
+        for execution_id in expired:
+            self._leases.pop(execution_id, None)
+            job = self._jobs.get(execution_id)
+            if job is None:
+                continue
+            self._project_running.get(job.project_id, set()).discard(execution_id)
+            if job.attempts >= self.max_attempts:
+                self._jobs.pop(execution_id, None)
+                results.append((execution_id, True))
+            else:
+                self._queue.append(execution_id)
+                results.append((execution_id, False))
+        return results
+
+    async def stats(self) -> Dict[str, int]:
+        return {"queued": len(self._queue), "running": len(self._leases)}
+
+
+# 原子领取：从队首起最多扫描 ARGV[7] 个任务，跳过已达到并发上限的项目，
+# 领取第一个可执行的任务并写入租约；跳过的任务按原顺序放回队首
+_CLAIM_SCRIPT = """
+local limit = tonumber(ARGV[3])
+local skipped = {}
+local missing = {}
+local throttled = {}
+local claimed = nil
+for _ = 1, tonumber(ARGV[7]) do
+  local job_id = redis.call('RPOP', KEYS[1])
+  if not job_id then break end
+  local job_key = ARGV[4] .. job_id
+  local project_id = redis.call('HGET', job_key, 'project_id')
+  if not project_id then
+    table.insert(missing, job_id)
+  elseif throttled[project_id] then
+    table.insert(skipped, job_id)
+  else
+    local running_key = ARGV[5] .. project_id
+    redis.call('ZREMRANGEBYSCORE', running_key, '-inf', ARGV[1])
+    if limit > 0 and redis.call('ZCARD', running_key) >= limit then
+      throttled[project_id] = true
+      table.insert(skipped, job_id)
+    else
+      redis.call('ZADD', running_key, ARGV[2], job_id)
+      redis.call('ZADD', KEYS[2], ARGV[2], job_id)
+      local attempts = redis.call('HINCRBY', job_key, 'attempts', 1)
+      redis.call('HSET', job_key, 'worker_id', ARGV[6])
+      claimed = {job_id, project_id, tostring(attempts)}
+      break
+    end
+  end
+end
+for i = #skipped, 1, -1 do
+  redis.call('RPUSH', KEYS[1], skipped[i])
+end
+if claimed then
+  return {'claimed', claimed[1], claimed[2], claimed[3], table.concat(missing, ',')}
+end
+return {'none', '0', '0', '0', table.concat(missing, ',')}
+"""
+
+# 续约：租约存在且领取次数与持有者一致时才续上
+_HEARTBEAT_SCRIPT = """
+local job_key = ARGV[3] .. ARGV[1]
+if redis.call('HGET', job_key, 'attempts') ~= ARGV[2] then return 0 end
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then return 0 end
+redis.call('ZADD', KEYS[1], 'XX', ARGV[4], ARGV[1])
+local project_id = redis.call('HGET', job_key, 'project_id')
+if project_id then redis.call('ZADD', ARGV[5] .. project_id, 'XX', ARGV[4], ARGV[1]) end
+return 1
+"""
+
+# 确认：只有当前持有者可以释放租约、项目并发名额并删除任务
+_ACK_SCRIPT = """
+local job_key = ARGV[3] .. ARGV[1]
+if redis.call('HGET', job_key, 'attempts') ~= ARGV[2] then return 0 end
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then return 0 end
+redis.call('ZREM', KEYS[1], ARGV[1])
+local project_id = redis.call('HGET', job_key, 'project_id')
+if project_id then redis.call('ZREM', ARGV[4] .. project_id, ARGV[1]) end
+redis.call('DEL', job_key)
+return 1
+"""
+
+# 回收过期租约：仍然过期才处理，超过最大次数则丢弃
+_REQUEUE_SCRIPT = """
+local score = redis.call('ZSCORE', KEYS[2], ARGV[1])
+if not score or tonumber(score) >= tonumber(ARGV[2]) then return nil end
+redis.call('ZREM', KEYS[2], ARGV[1])
+local job_key = ARGV[4] .. ARGV[1]
+local project_id = redis.call('HGET', job_key, 'project_id')
+if project_id then redis.call('ZREM', ARGV[5] .. project_id, ARGV[1]) end
+local attempts = tonumber(redis.call('HGET', job_key, 'attempts') or '0')
+if attempts >= tonumber(ARGV[3]) then
+  redis.call('DEL', job_key)
+  return 'dead'
+end
+redis.call('LPUSH', KEYS[1], ARGV[1])
+return 'requeued'
+"""
+
+
+class RedisExecutionQueue(BaseExecutionQueue):
+    """基于 Redis 的执行队列，可被多个 worker 进程共享"""
+
+    backend = "redis"
+
+    QUEUE_KEY = "qg:exec:queue"
+    LEASES_KEY = "qg:exec:leases"
+    JOB_PREFIX = "qg:exec:job:"
+    PROJECT_RUNNING_PREFIX = "qg:exec:project_running:"
+    # 单次领取最多扫描的任务数（队首连续多个任务所属项目都已满额时）
+    CLAIM_SCAN_LIMIT = 100
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+        self._claim = client.register_script(_CLAIM_SCRIPT)
+        self._heartbeat = client.register_script(_HEARTBEAT_SCRIPT)
+        self._ack = client.register_script(_ACK_SCRIPT)
+        self._requeue = client.register_script(_REQUEUE_SCRIPT)
+
+    async def enqueue(self, execution_id: int, project_id: int):
+        job_key = f"{self.JOB_PREFIX}{execution_id}"
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(job_key, mapping={
+                "project_id": project_id,
+                "attempts": 0,
+                "enqueued_at": time.time(),
+            })
+            pipe.lpush(self.QUEUE_KEY, execution_id)
+            await pipe.execute()
+
+    async def claim(self, worker_id: str) -> Optional[ExecutionJob]:
+        now = time.time()
+        result = await self._claim(
+            keys=[self.QUEUE_KEY, self.LEASES_KEY],
+            args=[now, now + self.lease_seconds, self.project_limit,
+                  self.JOB_PREFIX, self.PROJECT_RUNNING_PREFIX, worker_id, self.CLAIM_SCAN_LIMIT],
+        )
+        state, job_id, project_id, attempts, missing = result
+        if missing:
+            logger.warning(f"队列中的任务 {missing} 缺少任务信息，已丢弃")
+        if state != "claimed":
+            return None
+        return ExecutionJob(int(job_id), int(project_id), int(attempts))
+
+    async def heartbeat(self, job: ExecutionJob) -> bool:
+        renewed = await self._heartbeat(
+            keys=[self.LEASES_KEY],
+            args=[job.execution_id, job.attempts, self.JOB_PREFIX,
+                  time.time() + self.lease_seconds, self.PROJECT_RUNNING_PREFIX],
+        )
+        return bool(renewed)
+
+    async def ack(self, job: ExecutionJob) -> bool:
+        released = await self._ack(
+            keys=[self.LEASES_KEY],
+            args=[job.execution_id, job.attempts, self.JOB_PREFIX, self.PROJECT_RUNNING_PREFIX],
+        )
+        return bool(released)
+
+    async def requeue_expired(self) -> List[Tuple[int, bool]]:
+        now = time.time()
+        expired = await self.client.zrangebyscore(self.LEASES_KEY, "-inf", now)
+        results = []
+        for job_id in expired:
+            state = await self._requeue(
+                keys=[self.QUEUE_KEY, self.LEASES_KEY],
+                args=[job_id, now, self.max_attempts, self.JOB_PREFIX, self.PROJECT_RUNNING_PREFIX],
+            )
+            if state:
+                results.append((int(job_id), state == "dead"))
+        return results
+
+    async def stats(self) -> Dict[str, int]:
+        queued = await self.client.llen(self.QUEUE_KEY)
+        running = await self.client.zcard(self.LEASES_KEY)
+        return {"queued": queued, "running": running}
+
+
+_queue: Optional[BaseExecutionQueue] = None
+
+
+async def get_execution_queue() -> BaseExecutionQueue:
+    """获取执行队列实例（优先使用 Redis，不可用时退回进程内队列）"""
+    global _queue
+    if _queue is None:
+        client = None
+        if settings.EXECUTION_QUEUE_BACKEND == "redis":
+            client = await get_available_redis()
+        if client is not None:
+            _queue = RedisExecutionQueue(client)
+        else:
+            if settings.EXECUTION_QUEUE_BACKEND == "redis":
+                logger.warning("Redis不可用，执行队列退回进程内实现（仅本进程内的worker可消费）")
+            _queue = InMemoryExecutionQueue()
+    return _queue
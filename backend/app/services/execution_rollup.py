@@ -0,0 +1,199 @@
+"""
+测试执行日汇总
+
+仪表盘原来每次加载都对 test_executions 做十来次 COUNT(*)，执行记录越多越慢。
+这里维护按 项目 / 日期 / 状态 的汇总表 execution_daily_rollups：
+- 执行结束时由写入结束状态的代码调用 rollup_finished_executions，与状态更新在同一事务内累加
+- test_executions.rolled_up_at 标记已计入的执行，同一条执行重复调用不会重复计数
+- 删除已计入的执行、或改写其结束状态前调用 unroll_executions 先从汇总中扣除
+- 耗时按固定分桶计数（DURATION_BUCKETS_MS），分位数由分桶估算
+- 升级前的历史数据由迁移脚本 create_execution_daily_rollups_table.sql 回填
+"""
+from bisect import bisect_left
+from datetime import date, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Integer, update, func, literal_column, text, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.execution_rollup import ExecutionDailyRollup
+from app.models.test_execution import TestExecution, ExecutionStatus
+
+# 耗时分桶上界（毫秒），最后一个桶为超过最大上界的执行
+DURATION_BUCKETS_MS = (50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000, 300000)
+
+FINISHED_STATUSES = (
+    ExecutionStatus.PASSED, ExecutionStatus.FAILED, ExecutionStatus.ERROR, ExecutionStatus.CANCELLED,
+)
+
+_rollups = ExecutionDailyRollup.__table__
+
+
+def duration_bucket(duration_ms: int) -> int:
+    """耗时所在分桶的下标"""
+    return bisect_left(DURATION_BUCKETS_MS, duration_ms)
+
+
+class RollupAggregate:
+    """执行耗时的合计：写入时累加单次执行，读取时合并多行汇总（跨项目 / 跨日期）"""
+
+    def __init__(self):
+        self.count = 0
+        self.timed_count = 0
+        self.duration_sum_ms = 0
+        self.duration_max_ms: Optional[int] = None
+        self.buckets = [0] * (len(DURATION_BUCKETS_MS) + 1)
+
+    def add_duration(self, duration_ms: Optional[int]):
+        """计入一次执行"""
+        self.count += 1
+        if duration_ms is None:
+            return
+        duration_ms = max(0, int(duration_ms))
+        self.timed_count += 1
+        self.duration_sum_ms += duration_ms
+        self.duration_max_ms = duration_ms if self.duration_max_ms is None else max(self.duration_max_ms, duration_ms)
+        self.buckets[duration_bucket(duration_ms)] += 1
+
+    def add_row(self, row: Any):
+        """合并一行汇总"""
+        self.count += row.execution_count or 0
+        self.timed_count += row.timed_count or 0
+        self.duration_sum_ms += row.duration_sum_ms or 0
+        if row.duration_max_ms is not None:
+            self.duration_max_ms = (
+                row.duration_max_ms if self.duration_max_ms is None else max(self.duration_max_ms, row.duration_max_ms)
+            )
+        for index, value in enumerate((row.duration_buckets or [])[:len(self.buckets)]):
+            self.buckets[index] += value or 0
+
+    @property
+    def avg_duration_ms(self) -> Optional[float]:
+        return self.duration_sum_ms / self.timed_count if self.timed_count else None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """按分桶估算耗时分位数（桶内线性插值，最后一个桶以最大耗时为上界）"""
+        if not self.timed_count:
+            return None
+        rank = p * self.timed_count
+        seen = 0
+        for index, value in enumerate(self.buckets):
+            if not value:
+                continue
+            if seen + value >= rank:
+                lower = DURATION_BUCKETS_MS[index - 1] if index > 0 else 0
+                upper = DURATION_BUCKETS_MS[index] if index < len(DURATION_BUCKETS_MS) else (self.duration_max_ms or lower)
+                if self.duration_max_ms is not None:
+                    upper = min(upper, self.duration_max_ms)
+                return lower + (upper - lower) * max(0.0, rank - seen) / value
+            seen += value
+        return float(self.duration_max_ms or 0)
+
+
+def _aggregate_rows(rows: Iterable[Any]) -> list:
+    """把 (project_id, status, finished_at, summary) 行按 项目 / 日期 / 状态 合计，按固定顺序返回
+
+    按固定顺序写入，批量计入 / 扣除时避免并发事务互相等待行锁形成死锁。
+    """
+    aggregates: Dict[Tuple[int, date, ExecutionStatus], RollupAggregate] = {}
+    for project_id, execution_status, finished_at, summary in rows:
+        if finished_at.tzinfo is not None:
+            finished_at = finished_at.astimezone(timezone.utc)
+        key = (project_id, finished_at.date(), execution_status)
+        aggregates.setdefault(key, RollupAggregate()).add_duration((summary or {}).get("duration_ms"))
+    return sorted(aggregates.items(), key=lambda item: (item[0][0], item[0][1], item[0][2].name))
+
+
+async def rollup_finished_executions(db: AsyncSession, execution_ids: Iterable[Optional[int]]):
+    """把已结束的执行计入日汇总
+
+    在写入结束状态之后、提交之前调用（与状态更新同一事务）；未结束或已计入的执行跳过。
+    """
+    ids = [execution_id for execution_id in execution_ids if execution_id]
+    if not ids:
+        return
+    # 会话未开启 autoflush，先把结束状态写入数据库
+    await db.flush()
+    result = await db.execute(
+        update(TestExecution)
+        .where(
+            TestExecution.id.in_(ids),
+            TestExecution.rolled_up_at.is_(None),
+            TestExecution.status.in_(FINISHED_STATUSES),
+            TestExecution.finished_at.isnot(None),
+        )
+        .values(rolled_up_at=func.now())
+        .returning(TestExecution.project_id, TestExecution.status, TestExecution.finished_at, TestExecution.summary)
+        .execution_options(synchronize_session=False)
+    )
+    for (project_id, day, execution_status), aggregate in _aggregate_rows(result.all()):
+        statement = insert(ExecutionDailyRollup).values(
+            project_id=project_id,
+            day=day,
+            status=execution_status,
+            execution_count=aggregate.count,
+            timed_count=aggregate.timed_count,
+            duration_sum_ms=aggregate.duration_sum_ms,
+            duration_max_ms=aggregate.duration_max_ms,
+            duration_buckets=aggregate.buckets,
+        )
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[_rollups.c.project_id, _rollups.c.day, _rollups.c.status],
+            set_={
+                "execution_count": _rollups.c.execution_count + excluded.execution_count,
+                "timed_count": _rollups.c.timed_count + excluded.timed_count,
+                "duration_sum_ms": _rollups.c.duration_sum_ms + excluded.duration_sum_ms,
+                "duration_max_ms": func.greatest(_rollups.c.duration_max_ms, excluded.duration_max_ms),
+                # 分桶逐个相加
+                "duration_buckets": literal_column(
+                    "ARRAY(SELECT COALESCE(a, 0) + COALESCE(b, 0) FROM unnest("
+                    "execution_daily_rollups.duration_buckets, excluded.duration_buckets) AS t(a, b))"
+                ),
+                "updated_at": func.now(),
+            },
+        )
+        await db.execute(statement)
+
+
+async def unroll_executions(db: AsyncSession, execution_ids: Iterable[Optional[int]]):
+    """从日汇总中扣除已计入的执行，并清除 rolled_up_at
+
+    删除执行、或改写已计入执行的结束状态之前调用（与删除 / 状态更新同一事务），
+    扣除的是数据库中当前的状态与耗时，所以必须在新状态 flush 之前调用；未计入的执行跳过。
+    改写状态后再调用 rollup_finished_executions 按新状态重新计入。
+    最大耗时无法扣除，保留为上界。
+    """
+    ids = [execution_id for execution_id in execution_ids if execution_id]
+    if not ids:
+        return
+    result = await db.execute(
+        update(TestExecution)
+        .where(TestExecution.id.in_(ids), TestExecution.rolled_up_at.isnot(None))
+        .values(rolled_up_at=None)
+        .returning(TestExecution.project_id, TestExecution.status, TestExecution.finished_at, TestExecution.summary)
+        .execution_options(synchronize_session=False)
+    )
+    rows = [row for row in result.all() if row.finished_at is not None]
+    for (project_id, day, execution_status), aggregate in _aggregate_rows(rows):
+        await db.execute(
+            update(_rollups)
+            .where(
+                _rollups.c.project_id == project_id,
+                _rollups.c.day == day,
+                _rollups.c.status == execution_status,
+            )
+            .values(
+                execution_count=func.greatest(_rollups.c.execution_count - aggregate.count, 0),
+                timed_count=func.greatest(_rollups.c.timed_count - aggregate.timed_count, 0),
+                duration_sum_ms=func.greatest(_rollups.c.duration_sum_ms - aggregate.duration_sum_ms, 0),
+                # 分桶逐个相减
+                duration_buckets=text(
+                    "ARRAY(SELECT GREATEST(COALESCE(a, 0) - COALESCE(b, 0), 0) FROM unnest("
+                    "execution_daily_rollups.duration_buckets, :buckets) AS t(a, b))"
+                ).bindparams(bindparam("buckets", aggregate.buckets, type_=ARRAY(Integer))),
+                updated_at=func.now(),
+            )
+        )
@@ -0,0 +1,288 @@
+"""
+测试执行节点（worker）
+
+从执行队列领取任务并运行，运行期间定期心跳续约；
+同时负责回收租约过期（执行节点崩溃）的任务。
+
+既可以嵌入 API 进程运行（EXECUTION_WORKER_MODE=embedded），
+也可以作为独立的进程池运行：
+
+    python -m app.services.execution_worker --processes 4 --concurrency 4
+"""
+import os
+import uuid
+import signal
+import socket
+import asyncio
+import logging
+import argparse
+import multiprocessing
+from datetime import datetime
+from typing import Optional, List
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.test_execution import TestExecution, ExecutionStatus
+from app.services.execution_log import append_execution_log, ERROR
+from app.services.execution_events import publish_execution_finished
+from app.services.report_service import build_execution_summary
+from app.services.execution_rollup import rollup_finished_executions, unroll_executions
+from app.services.execution_queue import BaseExecutionQueue, ExecutionJob, get_execution_queue
+from app.services.test_plan_executor import notify_execution_finished
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionWorker:
+    """执行节点：在一个事件循环内并发运行多个执行槽位"""
+
+    def __init__(self, queue: BaseExecutionQueue, concurrency: Optional[int] = None):
+        self.queue = queue
+        self.concurrency = concurrency or settings.EXECUTION_WORKER_CONCURRENCY
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.poll_interval = settings.EXECUTION_WORKER_POLL_INTERVAL
+        self.heartbeat_interval = settings.EXECUTION_JOB_HEARTBEAT_SECONDS
+        self.running = False
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """启动执行槽位与过期租约回收任务"""
+        if self.running:
+            return
+        self.running = True
+        self._tasks = [asyncio.create_task(self._slot_loop(i)) for i in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._reaper_loop()))
+        logger.info(f"执行节点 {self.worker_id} 已启动，并发槽位={self.concurrency}，队列后端={self.queue.backend}")
+
+    async def stop(self):
+        """停止领取新任务并等待当前任务被取消"""
+        self.running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info(f"执行节点 {self.worker_id} 已停止")
+
+    async def _slot_loop(self, slot: int):
+        while self.running:
+            try:
+                job = await self.queue.claim(self.worker_id)
+            except Exception as e:
+                logger.error(f"领取执行任务失败: {e}", exc_info=True)
+                job = None
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self._run_job(job)
+
+    async def _reaper_loop(self):
+        while self.running:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                for execution_id, dead in await self.queue.requeue_expired():
+                    if dead:
+                        logger.error(f"执行任务 {execution_id} 租约过期且已达到最大重试次数，标记为错误")
+                        await _mark_execution_error(
+                            execution_id, f"执行节点多次异常退出，已重试 {self.queue.max_attempts} 次，放弃执行"
+                        )
+                        await notify_execution_finished(execution_id)
+                    else:
+                        logger.warning(f"执行任务 {execution_id} 租约过期（执行节点可能已崩溃），重新入队")
+            except Exception as e:
+                logger.error(f"回收过期执行任务失败: {e}", exc_info=True)
+
+    async def _heartbeat_loop(self, job: ExecutionJob):
+        """定期续约，租约丢失（已过期并被回收 / 重新分配）时返回"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                if not await self.queue.heartbeat(job):
+                    return
+            except Exception as e:
+                logger.warning(f"执行任务 {job.execution_id} 心跳失败: {e}")
+
+    async def _run_job(self, job: ExecutionJob):
+        run = asyncio.create_task(run_execution(job.execution_id, attempt=job.attempts))
+        heartbeat = asyncio.create_task(self._heartbeat_loop(job))
+        try:
+            await asyncio.wait({run, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # 节点停止时两者一起取消：不确认任务，租约过期后由其他节点重新执行
+            heartbeat.cancel()
+            if not run.done():
+                run.cancel()
+            await asyncio.gather(run, heartbeat, return_exceptions=True)
+
+        if run.cancelled():
+            # 租约已丢失：任务可能已被其他节点领取，停止本次执行，不确认也不触发后续流程
+            logger.warning(f"执行任务 {job.execution_id} 的租约已丢失（第 {job.attempts} 次领取），停止执行")
+            return
+        if run.exception() is not None:
+            e = run.exception()
+            logger.error(f"执行任务 {job.execution_id} 失败: {e}", exc_info=e)
+            await _mark_execution_error(job.execution_id, f"执行出错: {str(e)}")
+        if not await self.queue.ack(job):
+            # 执行结束前租约已被回收：重新领取的节点会看到执行已结束并负责后续流程
+            logger.warning(f"执行任务 {job.execution_id} 完成时租约已丢失，交由重新领取的节点确认")
+            return
+        # 属于测试计划的执行：启动后续用例、汇总计划结果
+        await notify_execution_finished(job.execution_id)
+
+
+async def run_execution(execution_id: int, attempt: int = 1):
+    """在独立的数据库会话中运行一次测试执行"""
+    from app.api.v1.test_executions import _execute_pending_test_execution
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(TestExecution).where(TestExecution.id == execution_id))
+        execution = result.scalar_one_or_none()
+        if not execution:
+            logger.warning(f"找不到执行记录: {execution_id}，跳过")
+            return
+        if execution.status in (ExecutionStatus.PASSED, ExecutionStatus.FAILED,
+                                ExecutionStatus.ERROR, ExecutionStatus.CANCELLED):
+            logger.info(f"执行记录 {execution_id} 已结束（status={execution.status}），跳过")
+            return
+
+        execution.status = ExecutionStatus.RUNNING
+        execution.started_at = datetime.utcnow()
+        execution.logs = "测试执行已启动" if attempt <= 1 else f"测试执行已启动（第 {attempt} 次尝试）"
+        await db.commit()
+        if attempt > 1:
+            await append_execution_log(execution_id, f"[警告] 执行节点中断，第 {attempt} 次尝试重新执行")
+
+        await _execute_pending_test_execution(execution, db)
+
+
+async def _mark_execution_error(execution_id: int, message: str):
+    async with AsyncSessionLocal() as db:
+        try:
+            result = await db.execute(select(TestExecution).where(TestExecution.id == execution_id))
+            execution = result.scalar_one_or_none()
+            if execution:
+                # 执行可能已结束并计入日汇总，先按原状态扣除
+                await unroll_executions(db, [execution_id])
+                execution.status = ExecutionStatus.ERROR
+                execution.logs = (execution.logs or "") + f"\n{message}"
+                execution.finished_at = datetime.utcnow()
+                execution.summary = build_execution_summary(
+                    None, execution.status, execution.started_at, execution.finished_at
+                )
+                await rollup_finished_executions(db, [execution_id])
+                await db.commit()
+                await append_execution_log(execution_id, message, level=ERROR)
+                await publish_execution_finished(execution_id, ExecutionStatus.ERROR.value)
+        except Exception as e:
+            logger.error(f"更新执行 {execution_id} 状态失败: {e}", exc_info=True)
+            await db.rollback()
+
+
+# 嵌入 API 进程运行的执行节点
+_embedded_worker: Optional[ExecutionWorker] = None
+
+
+async def start_embedded_worker():
+    """在当前进程内启动执行节点
+
+    EXECUTION_WORKER_MODE=embedded 时总是启动；外部进程池模式下，
+    如果队列退回了进程内实现（Redis 不可用），也必须在本进程内消费。
+    """
+    global _embedded_worker
+    queue = await get_execution_queue()
+    if settings.EXECUTION_WORKER_MODE != "embedded" and queue.backend == "redis":
+        return
+    if _embedded_worker is None:
+        _embedded_worker = ExecutionWorker(queue)
+        await _embedded_worker.start()
+
+
+async def stop_embedded_worker():
+    global _embedded_worker
+    if _embedded_worker is not None:
+        await _embedded_worker.stop()
+        _embedded_worker = None
+
+
+async def _worker_main(concurrency: int):
+    from app.core.redis_client import init_redis, close_redis
+    from app.core.http_client import close_http_clients
+
+    await init_redis()
+    queue = await get_execution_queue()
+    if queue.backend != "redis":
+        logger.error("独立执行节点需要可用的 Redis（进程内队列无法跨进程共享），退出")
+        await close_redis()
+        return
+
+    worker = ExecutionWorker(queue, concurrency)
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    await worker.start()
+    await stop_event.wait()
+    await worker.stop()
+    await close_http_clients()
+    await close_redis()
+
+
+def _run_worker_process(concurrency: int):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    asyncio.run(_worker_main(concurrency))
+
+
+def run_worker_pool(processes: int, concurrency: int):
+    """启动执行节点进程池，子进程异常退出时自动拉起"""
+    ctx = multiprocessing.get_context("spawn")
+    workers: List[multiprocessing.Process] = []
+    stopping = False
+
+    def spawn() -> multiprocessing.Process:
+        process = ctx.Process(target=_run_worker_process, args=(concurrency,), daemon=False)
+        process.start()
+        logger.info(f"执行节点进程已启动: pid={process.pid}")
+        return process
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    workers.extend(spawn() for _ in range(processes))
+    while not stopping:
+        for i, process in enumerate(workers):
+            process.join(timeout=1)
+            if not process.is_alive() and not stopping:
+                logger.warning(f"执行节点进程 {process.pid} 退出（exitcode={process.exitcode}），重新启动")
+                workers[i] = spawn()
+    for process in workers:
+        process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="QualityGuard 测试执行节点")
+    parser.add_argument("--processes", type=int, default=settings.EXECUTION_WORKER_PROCESSES, help="进程数")
+    parser.add_argument("--concurrency", type=int, default=settings.EXECUTION_WORKER_CONCURRENCY, help="每个进程的并发执行数")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    run_worker_pool(args.processes, args.concurrency)
@@ -0,0 +1,157 @@
+"""
+主节点选举
+
+多个 API 进程 / 副本中只允许一个运行定时调度等单实例任务：
+- Redis 后端：SET NX PX 写入带随机令牌的租约键，主节点定期续约，只有持有令牌的节点能续约与释放
+- Postgres 后端：会话级 advisory lock，持锁连接断开（进程崩溃）时锁自动释放
+主节点崩溃后租约过期（Redis）或连接断开（Postgres），其他节点在下一次竞选时接管。
+"""
+import uuid
+import zlib
+import logging
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.redis_client import get_available_redis
+
+logger = logging.getLogger(__name__)
+
+# 续约：令牌匹配时延长过期时间
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# 释放：令牌匹配时删除
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class BaseLeaderLease:
+    """主节点租约接口"""
+
+    backend = "base"
+
+    def __init__(self, name: str):
+        self.name = name
+        self.is_leader = False
+
+    async def acquire(self) -> bool:
+        """竞选或续约，返回当前是否为主节点"""
+        raise NotImplementedError
+
+    async def release(self):
+        """主动释放（正常停止时调用，其他节点可立即接管）"""
+        raise NotImplementedError
+
+
+class RedisLeaderLease(BaseLeaderLease):
+    """基于 Redis 租约键的主节点选举"""
+
+    backend = "redis"
+
+    KEY_PREFIX = "qg:leader:"
+
+    def __init__(self, name: str, client, ttl_seconds: int):
+        super().__init__(name)
+        self.client = client
+        self.key = f"{self.KEY_PREFIX}{name}"
+        self.token = uuid.uuid4().hex
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self._renew = client.register_script(_RENEW_SCRIPT)
+        self._release = client.register_script(_RELEASE_SCRIPT)
+
+    async def acquire(self) -> bool:
+        try:
+            if self.is_leader:
+                self.is_leader = bool(await self._renew(keys=[self.key], args=[self.token, self.ttl_ms]))
+            if not self.is_leader:
+                self.is_leader = bool(await self.client.set(self.key, self.token, nx=True, px=self.ttl_ms))
+        except Exception as e:
+            # 无法确认租约时按失去主节点处理，避免与接管的节点同时调度
+            logger.warning(f"主节点租约 {self.name} 续约失败: {e}")
+            self.is_leader = False
+        return self.is_leader
+
+    async def release(self):
+        if self.is_leader:
+            try:
+                await self._release(keys=[self.key], args=[self.token])
+            except Exception as e:
+                logger.warning(f"释放主节点租约 {self.name} 失败: {e}")
+        self.is_leader = False
+
+
+class PostgresLeaderLease(BaseLeaderLease):
+    """基于 Postgres 会话级 advisory lock 的主节点选举（持锁期间占用一个连接）"""
+
+    backend = "postgres"
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        # advisory lock 的键为 64 位整数，由名称稳定地计算
+        self.lock_key = zlib.crc32(f"qg:leader:{name}".encode("utf-8"))
+        self._conn = None
+
+    async def acquire(self) -> bool:
+        try:
+            if self._conn is None:
+                self._conn = await engine.connect()
+            if self.is_leader:
+                # 持锁连接仍可用即仍持有锁
+                await self._conn.execute(text("SELECT 1"))
+            else:
+                result = await self._conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key})
+                self.is_leader = bool(result.scalar())
+            await self._conn.commit()
+        except Exception as e:
+            logger.warning(f"主节点锁 {self.name} 检查失败: {e}")
+            self.is_leader = False
+            # 连接可能仍持有锁（如语句超时而非断线），不能归还连接池
+            await self._close(invalidate=True)
+            return False
+        if not self.is_leader:
+            # 未竞选成功时归还连接
+            await self._close()
+        return self.is_leader
+
+    async def release(self):
+        invalidate = False
+        if self._conn is not None and self.is_leader:
+            try:
+                await self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+                await self._conn.commit()
+            except Exception as e:
+                logger.warning(f"释放主节点锁 {self.name} 失败: {e}")
+                invalidate = True
+        self.is_leader = False
+        await self._close(invalidate=invalidate)
+
+    async def _close(self, invalidate: bool = False):
+        """归还连接；invalidate 时关闭底层连接（连接池归还时的重置不会释放会话级 advisory lock）"""
+        if self._conn is not None:
+            try:
+                if invalidate:
+                    await self._conn.invalidate()
+                await self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+async def create_leader_lease(name: str) -> BaseLeaderLease:
+    """创建主节点租约（优先使用 Redis，不可用时退回 Postgres advisory lock）"""
+    if settings.SCHEDULER_LEADER_BACKEND == "redis":
+        client = await get_available_redis()
+        if client is not None:
+            return RedisLeaderLease(name, client, settings.SCHEDULER_LEADER_TTL_SECONDS)
+        logger.warning(f"Redis不可用，主节点选举 {name} 退回 Postgres advisory lock")
+    return PostgresLeaderLease(name)
@@ -0,0 +1,80 @@
+"""
+压测场景解析
+
+性能测试的 scenarios 可以引用已有的 API 用例（test_case_id）。压测进程与远程压测节点不访问数据库，
+这里在 API 进程内把引用展开为内联场景（见 app.engines.load_scenarios）：
+- 用例配置（请求模板、token_config、extractors）原样带上，由压测端编译执行计划
+- 数据行：用例关联的测试数据配置或内联数据，最多 PERF_SCENARIO_MAX_ROWS 行
+- 环境：场景或压测配置中的 environment，取 base_url 与默认请求头 / 参数
+- Token：配置了 token_config 时在这里登录一次（走 Token 缓存），变量随场景下发，
+  各压测进程不必各自登录
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.environment import Environment
+from app.models.test_case import TestCase, TestType
+from app.services.test_data_rows import TestDataRows
+from app.services.token_auth import obtain_token
+
+
+async def _load_environment(db: AsyncSession, key: Optional[str]) -> Optional[Environment]:
+    if not key:
+        return None
+    result = await db.execute(select(Environment).where(Environment.key == key))
+    environment = result.scalar_one_or_none()
+    if environment is None:
+        raise ValueError(f"环境不存在: {key}")
+    return environment
+
+
+async def _collect_rows(db: AsyncSession, test_case: TestCase) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    async for _, row in await TestDataRows.for_test_case(db, test_case):
+        rows.append(row)
+        if len(rows) >= settings.PERF_SCENARIO_MAX_ROWS:
+            break
+    return rows
+
+
+async def resolve_load_scenarios(db: AsyncSession, config: Dict[str, Any]) -> Dict[str, Any]:
+    """展开压测配置中引用用例的场景，返回新的压测配置（不修改传入的配置），引用无效时抛出 ValueError"""
+    specs = config.get("scenarios")
+    if not specs or not any(isinstance(spec, dict) and spec.get("test_case_id") for spec in specs):
+        return config
+
+    resolved = []
+    for spec in specs:
+        if not isinstance(spec, dict) or not spec.get("test_case_id") or spec.get("config"):
+            resolved.append(spec)
+            continue
+        test_case = await db.get(TestCase, spec["test_case_id"])
+        if test_case is None:
+            raise ValueError(f"测试用例不存在: {spec['test_case_id']}")
+        if test_case.test_type != TestType.API or test_case.is_multi_interface:
+            raise ValueError(f"测试用例 {test_case.id} 不是单接口 API 用例，不能作为压测场景")
+        if not isinstance(test_case.config, dict):
+            raise ValueError(f"测试用例 {test_case.id} 缺少请求配置")
+
+        environment = await _load_environment(db, spec.get("environment") or config.get("environment"))
+        base_url = spec.get("base_url") or (environment.base_url.rstrip("/") if environment and environment.base_url else "")
+        variables: Dict[str, Any] = dict(spec.get("variables") or {})
+        token_config = test_case.config.get("token_config")
+        if token_config:
+            # 登录失败时不下发 Token，由压测端在开始前重试
+            await obtain_token(token_config, base_url, variables)
+
+        resolved.append({
+            **spec,
+            "name": spec.get("name") or test_case.name,
+            "config": test_case.config,
+            "rows": spec.get("rows") or await _collect_rows(db, test_case),
+            "base_url": base_url,
+            "default_headers": spec.get("default_headers") or (environment.default_headers if environment else None),
+            "default_params": spec.get("default_params") or (environment.default_params if environment else None),
+            "variables": variables,
+        })
+    return dict(config, scenarios=resolved)
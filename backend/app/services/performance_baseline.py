@@ -0,0 +1,329 @@
+"""
+性能基线与回归判定
+
+每次性能测试结束后保存一条 PerformanceRun（汇总指标 + 延迟直方图），同一 (用例, 环境) 最近
+PERF_BASELINE_WINDOW 次计入基线的运行构成滚动基线。新运行与基线逐项对比：
+
+- 延迟分位数（p50 / p95 / p99）：相对基线中位数的变化超过阈值（默认 10%），并且同时满足
+  1. 运行间波动：超出基线各次取值的预测区间（均值 ± t·s·√(1+1/n)，单侧置信度 PERF_BASELINE_CONFIDENCE）
+  2. 采样误差：本次分位数的置信下界高于基线合并直方图的置信上界（分位数的非参数区间，
+     按二项分布的秩 n·q ± z·√(n·q·(1-q)) 在直方图上取值）
+  才判定为回归（反向同理为改善）
+- 错误率：双比例 z 检验显著升高，且绝对升幅超过 PERF_BASELINE_ERROR_RATE_DELTA
+- 吞吐量：相对基线中位数下降超过阈值，并且低于运行间预测区间的下界
+
+基线运行数不足 PERF_BASELINE_MIN_RUNS 时判定为 insufficient_baseline。
+判定为回归的运行默认不计入后续基线（可通过接口改为计入，使基线接受新的性能水平）。
+"""
+import math
+from statistics import NormalDist, mean, median, stdev
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.performance_run import PerformanceRun
+from app.utils.histogram import Histogram, percentile_key, percentiles_in_ms
+
+REGRESSION = "regression"
+IMPROVEMENT = "improvement"
+NO_CHANGE = "no_change"
+INSUFFICIENT_BASELINE = "insufficient_baseline"
+
+# 参与对比的延迟分位数
+COMPARED_PERCENTILES = (50.0, 95.0, 99.0)
+
+
+def compact_summary(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """从性能测试指标中提取保存的汇总（不含时间序列与直方图）"""
+    return {
+        "total_requests": metrics.get("total_requests", 0),
+        "failed_requests": metrics.get("failed_requests", 0),
+        "error_rate": metrics.get("error_rate", 0),
+        "rps": metrics.get("rps", 0),
+        "avg_ms": round(metrics.get("avg_response_time", 0) * 1000, 3),
+        "max_ms": round(metrics.get("max_response_time", 0) * 1000, 3),
+        "percentiles": metrics.get("percentiles") or {},
+        "duration": metrics.get("duration"),
+        "mode": metrics.get("mode"),
+        "peak_concurrency": metrics.get("peak_concurrency"),
+    }
+
+
+def _t_quantile(confidence: float, df: int) -> float:
+    """t 分布单侧分位数（Cornish-Fisher 展开，自由度 ≥ 3 时误差 < 1%）"""
+    z = NormalDist().inv_cdf(confidence)
+    return (
+        z
+        + (z ** 3 + z) / (4 * df)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+        + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3)
+    )
+
+
+def prediction_interval(values: Sequence[float], confidence: float) -> Optional[Tuple[float, float]]:
+    """基线各次取值对「下一次运行」的预测区间，样本少于 2 个时返回 None"""
+    if len(values) < 2:
+        return None
+    n = len(values)
+    margin = _t_quantile(confidence, n - 1) * stdev(values) * math.sqrt(1 + 1 / n)
+    center = mean(values)
+    return center - margin, center + margin
+
+
+def quantile_interval(histogram: Histogram, percentile: float, confidence: float) -> Optional[Tuple[float, float]]:
+    """直方图上分位数的非参数置信区间（毫秒）"""
+    n = histogram.count
+    if not n:
+        return None
+    q = percentile / 100
+    z = NormalDist().inv_cdf(confidence)
+    spread = z * math.sqrt(n * q * (1 - q))
+    low_rank = max(0.0, n * q - spread)
+    high_rank = min(float(n), n * q + spread)
+    low = histogram.percentile(100 * low_rank / n)
+    high = histogram.percentile(100 * high_rank / n)
+    return low / 1000, high / 1000
+
+
+def _relative_change(current: float, reference: float) -> Optional[float]:
+    if not reference:
+        return None
+    return (current - reference) / reference
+
+
+def _latency_comparison(
+    percentile: float,
+    current: Dict[str, Any],
+    current_histogram: Optional[Histogram],
+    baseline: List[PerformanceRun],
+    baseline_histogram: Optional[Histogram],
+    threshold: float,
+    confidence: float,
+) -> Optional[Dict[str, Any]]:
+    key = percentile_key(percentile)
+    value = (current.get("percentiles") or {}).get(key)
+    values = [
+        run.summary["percentiles"][key] for run in baseline
+        if (run.summary.get("percentiles") or {}).get(key) is not None
+    ]
+    if value is None or not values:
+        return None
+    reference = median(values)
+    change = _relative_change(value, reference)
+    predicted = prediction_interval(values, confidence)
+    current_bounds = quantile_interval(current_histogram, percentile, confidence) if current_histogram else None
+    baseline_bounds = quantile_interval(baseline_histogram, percentile, confidence) if baseline_histogram else None
+
+    verdict = NO_CHANGE
+    if change is not None and change > threshold:
+        if (predicted is None or value > predicted[1]) and (
+            current_bounds is None or baseline_bounds is None or current_bounds[0] > baseline_bounds[1]
+        ):
+            verdict = REGRESSION
+    elif change is not None and change < -threshold:
+        if (predicted is None or value < predicted[0]) and (
+            current_bounds is None or baseline_bounds is None or current_bounds[1] < baseline_bounds[0]
+        ):
+            verdict = IMPROVEMENT
+    return {
+        "metric": f"{key}_ms",
+        "current": value,
+        "baseline": reference,
+        "change": round(change, 4) if change is not None else None,
+        "prediction_interval": [round(bound, 3) for bound in predicted] if predicted else None,
+        "current_interval": [round(bound, 3) for bound in current_bounds] if current_bounds else None,
+        "baseline_interval": [round(bound, 3) for bound in baseline_bounds] if baseline_bounds else None,
+        "verdict": verdict,
+    }
+
+
+def _error_rate_comparison(current: Dict[str, Any], baseline: List[PerformanceRun], confidence: float) -> Optional[Dict[str, Any]]:
+    """错误率：双比例 z 检验（基线各次合并）"""
+    current_total = current.get("total_requests") or 0
+    baseline_total = sum(run.summary.get("total_requests") or 0 for run in baseline)
+    if not current_total or not baseline_total:
+        return None
+    current_failed = current.get("failed_requests") or 0
+    baseline_failed = sum(run.summary.get("failed_requests") or 0 for run in baseline)
+    current_rate = current_failed / current_total
+    baseline_rate = baseline_failed / baseline_total
+    pooled = (current_failed + baseline_failed) / (current_total + baseline_total)
+    variance = pooled * (1 - pooled) * (1 / current_total + 1 / baseline_total)
+    z = (current_rate - baseline_rate) / math.sqrt(variance) if variance > 0 else 0.0
+    critical = NormalDist().inv_cdf(confidence)
+
+    verdict = NO_CHANGE
+    if z > critical and current_rate - baseline_rate > settings.PERF_BASELINE_ERROR_RATE_DELTA:
+        verdict = REGRESSION
+    elif z < -critical and baseline_rate - current_rate > settings.PERF_BASELINE_ERROR_RATE_DELTA:
+        verdict = IMPROVEMENT
+    return {
+        "metric": "error_rate",
+        "current": round(current_rate, 6),
+        "baseline": round(baseline_rate, 6),
+        "change": round(current_rate - baseline_rate, 6),
+        "z_score": round(z, 3),
+        "verdict": verdict,
+    }
+
+
+def _throughput_comparison(current: Dict[str, Any], baseline: List[PerformanceRun], threshold: float, confidence: float) -> Optional[Dict[str, Any]]:
+    values = [run.summary.get("rps") for run in baseline if run.summary.get("rps")]
+    value = current.get("rps")
+    if not value or not values:
+        return None
+    reference = median(values)
+    change = _relative_change(value, reference)
+    predicted = prediction_interval(values, confidence)
+    verdict = NO_CHANGE
+    if change is not None and change < -threshold and (predicted is None or value < predicted[0]):
+        verdict = REGRESSION
+    elif change is not None and change > threshold and (predicted is None or value > predicted[1]):
+        verdict = IMPROVEMENT
+    return {
+        "metric": "rps",
+        "current": round(value, 3),
+        "baseline": round(reference, 3),
+        "change": round(change, 4) if change is not None else None,
+        "prediction_interval": [round(bound, 3) for bound in predicted] if predicted else None,
+        "verdict": verdict,
+    }
+
+
+def compare_with_baseline(
+    summary: Dict[str, Any],
+    histogram: Optional[Dict[str, Any]],
+    baseline: List[PerformanceRun],
+    threshold: Optional[float] = None,
+    confidence: Optional[float] = None,
+) -> Dict[str, Any]:
+    """把一次运行的汇总与基线运行逐项对比，返回回归判定"""
+    threshold = settings.PERF_BASELINE_REGRESSION_THRESHOLD if threshold is None else threshold
+    confidence = settings.PERF_BASELINE_CONFIDENCE if confidence is None else confidence
+    result: Dict[str, Any] = {
+        "verdict": NO_CHANGE,
+        "baseline_runs": len(baseline),
+        "baseline_run_ids": [run.id for run in baseline],
+        "threshold": threshold,
+        "confidence": confidence,
+        "metrics": [],
+    }
+    if len(baseline) < settings.PERF_BASELINE_MIN_RUNS:
+        result["verdict"] = INSUFFICIENT_BASELINE
+        return result
+
+    current_histogram = Histogram.from_dict(histogram) if histogram else None
+    baseline_histograms = [Histogram.from_dict(run.histogram) for run in baseline if run.histogram]
+    baseline_histogram = Histogram.merged(baseline_histograms) if baseline_histograms else None
+
+    comparisons = [
+        _latency_comparison(percentile, summary, current_histogram, baseline, baseline_histogram, threshold, confidence)
+        for percentile in COMPARED_PERCENTILES
+    ]
+    comparisons.append(_error_rate_comparison(summary, baseline, confidence))
+    comparisons.append(_throughput_comparison(summary, baseline, threshold, confidence))
+    result["metrics"] = [comparison for comparison in comparisons if comparison is not None]
+
+    verdicts = {comparison["verdict"] for comparison in result["metrics"]}
+    if REGRESSION in verdicts:
+        result["verdict"] = REGRESSION
+    elif IMPROVEMENT in verdicts:
+        result["verdict"] = IMPROVEMENT
+    return result
+
+
+async def load_baseline_runs(
+    db: AsyncSession,
+    test_case_id: int,
+    environment: Optional[str],
+    before_id: Optional[int] = None,
+    window: Optional[int] = None,
+) -> List[PerformanceRun]:
+    """滚动基线：同一用例与环境最近 window 次计入基线且未出错的运行（before_id 之前）"""
+    query = select(PerformanceRun).where(
+        PerformanceRun.test_case_id == test_case_id,
+        PerformanceRun.environment == environment if environment else PerformanceRun.environment.is_(None),
+        PerformanceRun.include_in_baseline.is_(True),
+        PerformanceRun.status != "error",
+    )
+    if before_id is not None:
+        query = query.where(PerformanceRun.id < before_id)
+    query = query.order_by(PerformanceRun.id.desc()).limit(window or settings.PERF_BASELINE_WINDOW)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def record_performance_run(
+    db: AsyncSession,
+    project_id: int,
+    test_case_id: int,
+    environment: Optional[str],
+    result: Dict[str, Any],
+    execution_id: Optional[int] = None,
+    baseline_config: Optional[Dict[str, Any]] = None,
+) -> PerformanceRun:
+    """保存一次性能测试结果并与滚动基线对比（调用方提交事务）
+
+    baseline_config 可覆盖 window / threshold / confidence（来自性能测试配置中的 baseline）。
+    """
+    baseline_config = baseline_config or {}
+    metrics = result.get("metrics") or {}
+    summary = compact_summary(metrics)
+    histogram = metrics.get("latency_histogram")
+    run_status = result.get("status") or "error"
+
+    baseline = await load_baseline_runs(db, test_case_id, environment, window=baseline_config.get("window"))
+    verdict = None
+    if run_status != "error" and metrics:
+        verdict = compare_with_baseline(
+            summary, histogram, baseline,
+            threshold=baseline_config.get("threshold"), confidence=baseline_config.get("confidence"),
+        )
+
+    run = PerformanceRun(
+        project_id=project_id,
+        test_case_id=test_case_id,
+        execution_id=execution_id,
+        environment=environment or None,
+        status=run_status,
+        summary=summary,
+        histogram=histogram,
+        verdict=verdict,
+        include_in_baseline=run_status != "error" and (verdict is None or verdict["verdict"] != REGRESSION),
+    )
+    db.add(run)
+    await db.flush()
+    return run
+
+
+def baseline_overview(baseline: List[PerformanceRun], confidence: Optional[float] = None) -> Dict[str, Any]:
+    """基线概况：各指标的中位数与预测区间、合并直方图的分位数"""
+    confidence = settings.PERF_BASELINE_CONFIDENCE if confidence is None else confidence
+    overview: Dict[str, Any] = {"runs": len(baseline), "run_ids": [run.id for run in baseline], "metrics": {}}
+    if not baseline:
+        return overview
+    for percentile in COMPARED_PERCENTILES:
+        key = percentile_key(percentile)
+        values = [
+            run.summary["percentiles"][key] for run in baseline
+            if (run.summary.get("percentiles") or {}).get(key) is not None
+        ]
+        if values:
+            predicted = prediction_interval(values, confidence)
+            overview["metrics"][f"{key}_ms"] = {
+                "median": median(values),
+                "prediction_interval": [round(bound, 3) for bound in predicted] if predicted else None,
+            }
+    rps_values = [run.summary.get("rps") for run in baseline if run.summary.get("rps")]
+    if rps_values:
+        overview["metrics"]["rps"] = {"median": round(median(rps_values), 3)}
+    total = sum(run.summary.get("total_requests") or 0 for run in baseline)
+    if total:
+        failed = sum(run.summary.get("failed_requests") or 0 for run in baseline)
+        overview["metrics"]["error_rate"] = {"pooled": round(failed / total, 6)}
+    histograms = [Histogram.from_dict(run.histogram) for run in baseline if run.histogram]
+    if histograms:
+        overview["merged_percentiles"] = percentiles_in_ms(Histogram.merged(histograms))
+    return overview
@@ -7,15 +7,69 @@
 - 报告 ID == 执行 ID
 - 报告列表 = 带有结果的执行列表
 """
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
 import json
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
+from sqlalchemy.orm import load_only
 
 from app.models.test_execution import TestExecution, ExecutionStatus
 from app.models.test_case import TestCase
+from app.models.performance_run import PerformanceRun
+from app.utils.pagination import encode_cursor, keyset_before
+
+
+def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def build_execution_summary(
+    counts: Optional[Dict[str, Any]],
+    status: Any,
+    started_at: Optional[datetime] = None,
+    finished_at: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """生成执行结果摘要（写入 `TestExecution.summary`）
+
+    counts 缺少的计数按执行状态推断：单次执行视为 1 条，通过计入 passed，失败/错误计入 failed。
+    """
+    counts = counts or {}
+    started_at, finished_at = _as_naive_utc(started_at), _as_naive_utc(finished_at)
+    duration_ms = None
+    if started_at and finished_at:
+        duration_ms = max(0, int((finished_at - started_at).total_seconds() * 1000))
+    return {
+        "total": counts.get("total", 1),
+        "passed": counts.get("passed", 1 if status == ExecutionStatus.PASSED else 0),
+        "failed": counts.get(
+            "failed",
+            1 if status in {ExecutionStatus.FAILED, ExecutionStatus.ERROR} else 0,
+        ),
+        "skipped": counts.get("skipped", 0),
+        "duration_ms": duration_ms,
+    }
+
+
+# 列表只需要的列（不加载 result / logs 大字段）
+LIST_COLUMNS = (
+    TestExecution.id,
+    TestExecution.project_id,
+    TestExecution.test_case_id,
+    TestExecution.test_plan_id,
+    TestExecution.schedule_id,
+    TestExecution.status,
+    TestExecution.summary,
+    TestExecution.config,
+    TestExecution.environment,
+    TestExecution.started_at,
+    TestExecution.finished_at,
+    TestExecution.next_run_at,
+    TestExecution.created_at,
+)
 
 
 class ReportService:
@@ -55,7 +109,7 @@ class ReportService:
 
         # 尝试获取已存在的结果摘要与详情
         result = execution.result or {}
-        summary = result.get("summary") or {}
+        summary = execution.summary or result.get("summary") or {}
 
         # 尝试补充用例信息
         case_name = None
@@ -79,6 +133,7 @@ class ReportService:
                 1 if execution.status in {ExecutionStatus.FAILED, ExecutionStatus.ERROR} else 0,
             ),
             "skipped": summary.get("skipped", 0),
+            "duration_ms": summary.get("duration_ms"),
         }
 
         report = {
@@ -99,6 +154,19 @@ class ReportService:
         if result:
             report["result"] = result
 
+        # 性能测试：汇总指标与基线对比结果
+        run_result = await db.execute(
+            select(PerformanceRun).where(PerformanceRun.execution_id == execution.id)
+        )
+        performance_run = run_result.scalars().first()
+        if performance_run:
+            report["performance"] = {
+                "run_id": performance_run.id,
+                "summary": performance_run.summary,
+                "baseline": performance_run.verdict,
+                "include_in_baseline": performance_run.include_in_baseline,
+            }
+
         return report
 
     async def get_report(
@@ -119,12 +187,14 @@ class ReportService:
         project_id: Optional[int] = None,
         limit: int = 20,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> List[Dict]:
         """
         获取报告列表
 
         - 以有执行结果/已结束的执行记录作为报告来源
-        - 仅返回高层摘要信息
+        - 仅返回高层摘要信息（只读取摘要列，不加载 result / logs）
+        - 传入 cursor（上一页最后一条的 cursor 字段）时按键集分页，忽略 offset
         """
         conditions = [
             TestExecution.status.in_(
@@ -138,14 +208,18 @@ class ReportService:
 
         if project_id is not None:
             conditions.append(TestExecution.project_id == project_id)
+        if cursor:
+            conditions.append(keyset_before(TestExecution.created_at, TestExecution.id, cursor))
 
         query = (
             select(TestExecution)
+            .options(load_only(*LIST_COLUMNS))
             .where(and_(*conditions))
-            .order_by(TestExecution.created_at.desc())
-            .offset(offset)
+            .order_by(TestExecution.created_at.desc(), TestExecution.id.desc())
             .limit(limit)
         )
+        if not cursor:
+            query = query.offset(offset)
 
         result = await db.execute(query)
         executions = result.scalars().all()
@@ -153,8 +227,9 @@ class ReportService:
         reports: List[Dict] = []
         for execution in executions:
             # 这里不再单独查询用例名称，以降低 N+1 查询风险，只返回基础信息
-            res = execution.result or {}
-            summary = res.get("summary") or {}
+            summary = execution.summary or build_execution_summary(
+                None, execution.status, execution.started_at, execution.finished_at
+            )
 
             reports.append(
                 {
@@ -165,24 +240,11 @@ class ReportService:
                     "status": execution.status.value
                     if hasattr(execution.status, "value")
                     else execution.status,
-                    "summary": {
-                        "total": summary.get("total", 1),
-                        "passed": summary.get(
-                            "passed",
-                            1 if execution.status == ExecutionStatus.PASSED else 0,
-                        ),
-                        "failed": summary.get(
-                            "failed",
-                            1
-                            if execution.status
-                            in {ExecutionStatus.FAILED, ExecutionStatus.ERROR}
-                            else 0,
-                        ),
-                        "skipped": summary.get("skipped", 0),
-                    },
+                    "summary": summary,
                     "created_at": (
                         execution.created_at or datetime.utcnow()
                     ).isoformat(),
+                    "cursor": encode_cursor(execution.created_at, execution.id),
                 }
             )
 
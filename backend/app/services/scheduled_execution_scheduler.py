@@ -1,516 +1,753 @@
 """
 定时任务执行调度器
-定期检查并执行到期的定时任务
+
+两类定时任务都带下次触发时间 next_run_at（带索引）：
+- 定时计划（schedules）：按 Cron 表达式与时区周期触发，到点时才创建测试执行并放入执行队列
+- 单次定时执行（test_executions，scheduling.schedule_type = once）：创建时即为 PENDING 记录
+
+调度器在内存中维护 (next_run_at, 类型, ID) 小顶堆，睡眠到堆顶任务到期时刻（秒级精度）后触发：
+- 启动时用一次索引查询（两张表 UNION ALL，按 next_run_at 排序）重建堆
+- 新建 / 修改定时任务后调用 notify_scheduled / notify_schedule 入堆并唤醒调度器
+- 堆中的条目可能过期（被删除、停用或改期），触发时以数据库中的状态为准
+- 每 SCHEDULER_RESYNC_SECONDS 秒重建一次堆，兜底其他进程创建的定时任务
+
+多进程 / 多副本部署时通过主节点选举只让一个进程调度；领取到期任务使用
+SELECT ... FOR UPDATE SKIP LOCKED 并在同一事务内更新状态 / 下次触发时间，主节点切换的
+间隙即使两个进程同时领取也不会重复触发。非主节点新建的定时任务通过 Redis 通知主节点。
+
+错过触发（调度器停机 / 主节点切换期间到期，超过 misfire_grace_seconds）按错过策略处理：
+- run_once：合并为一次补执行（默认）
+- skip：跳过，推进到当前时间之后的下一次
+- run_all：从最近 SCHEDULER_CATCHUP_MAX_RUNS 次错过的触发开始逐个补执行
+补执行共用一个全局令牌桶（SCHEDULER_CATCHUP_RATE），超出速率的顺延 next_run_at，
+重启后积压的任务按速率陆续触发而不是同时涌入执行队列。定时计划还可以配置抖动窗口
+jitter_seconds，按计划ID在窗口内取固定偏移，分散同一 Cron 时间到期的大量计划。
 """
 import asyncio
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, text
+import heapq
+import zlib
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
+from sqlalchemy import select, update, and_, text, literal_column, union_all
+from sqlalchemy.orm import defer
+from app.core.config import settings
 from app.core.database import AsyncSessionLocal
+from app.core.redis_client import get_available_redis
+from app.models.schedule import Schedule
 from app.models.test_execution import TestExecution, ExecutionStatus
-from app.models.test_case import TestCase
-from app.models.project import Project
-from app.models.environment import Environment
-from app.models.test_data_config import TestDataConfig, TestCaseTestDataConfig
-import json
-import httpx
-import copy
+from app.services.concurrency_control import TokenBucket
+from app.services.execution_rollup import rollup_finished_executions
+from app.services.leader_election import BaseLeaderLease, create_leader_lease
+from app.utils.cron import parse_cron, get_timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 堆条目类型
+EXECUTION = "execution"
+SCHEDULE = "schedule"
+
+# 错过触发策略
+MISFIRE_RUN_ONCE = "run_once"
+MISFIRE_SKIP = "skip"
+MISFIRE_RUN_ALL = "run_all"
+MISFIRE_POLICIES = (MISFIRE_RUN_ONCE, MISFIRE_SKIP, MISFIRE_RUN_ALL)
+
+# 旧版周期定时执行（每次执行后复制一条 PENDING 记录），启动时迁移为定时计划
+_LEGACY_RECURRING_TYPES = ("daily", "weekly", "time_range")
+
+
+def _local_tz():
+    """前端保存的是本地时间字符串，按系统默认时区解析"""
+    return get_timezone(settings.SCHEDULER_DEFAULT_TIMEZONE)
+
+
+def _parse_local(value: str, fmt: str) -> datetime:
+    """解析本地时间字符串，返回 UTC 时间"""
+    return datetime.strptime(value, fmt).replace(tzinfo=_local_tz()).astimezone(timezone.utc)
+
+
+def _parse_time_of_day(value: str) -> Tuple[int, int, int]:
+    parts = [int(part) for part in (value or "00:00:00").split(":")]
+    parts += [0] * (3 - len(parts))
+    return parts[0], parts[1], parts[2]
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """数据库读回的时间带时区，utcnow 写入的不带时区，统一为带时区的 UTC 时间"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def compute_next_run_at(scheduling: Optional[Dict[str, Any]]) -> Optional[datetime]:
+    """单次定时执行的触发时间（UTC）
+
+    scheduled_at 为本地时间 "%Y-%m-%d %H:%M:%S"，只有日期时取当天 0 点；
+    不是单次定时执行或无法解析时返回 None（周期执行见 legacy_schedule_fields）。
+    """
+    if not scheduling or scheduling.get("mode") != "schedule":
+        return None
+    if scheduling.get("schedule_type", "once") != "once":
+        return None
+    scheduled_at = scheduling.get("scheduled_at")
+    if not scheduled_at:
+        return None
+    try:
+        try:
+            return _parse_local(scheduled_at, "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            return _parse_local(scheduled_at, "%Y-%m-%d")
+    except ValueError as e:
+        logger.warning(f"无法解析定时配置 {scheduling}: {e}")
+        return None
+
+
+def legacy_schedule_fields(scheduling: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """把旧版周期定时配置（daily / weekly / time_range）转换为定时计划字段
+
+    - daily：每天 schedule_config.time，从 scheduled_at 当天开始
+    - weekly：每周 schedule_config.weekdays（1=周一 … 7=周日）的 time
+    - time_range：在 [start, end] 内每天 start 的时间点
+
+    不是周期定时配置或无法解析时返回 None。
+    """
+    if not scheduling or scheduling.get("mode") != "schedule":
+        return None
+    schedule_type = scheduling.get("schedule_type", "once")
+    if schedule_type not in _LEGACY_RECURRING_TYPES:
+        return None
+    schedule_config = scheduling.get("schedule_config") or {}
+    fields: Dict[str, Any] = {"timezone": settings.SCHEDULER_DEFAULT_TIMEZONE, "start_at": None, "end_at": None}
+    try:
+        if schedule_type == "daily":
+            hour, minute, second = _parse_time_of_day(schedule_config.get("time"))
+            fields["cron_expression"] = f"{second} {minute} {hour} * * *"
+            if scheduling.get("scheduled_at"):
+                fields["start_at"] = _parse_local(scheduling["scheduled_at"], "%Y-%m-%d")
+        elif schedule_type == "weekly":
+            weekdays = sorted({int(day) % 7 for day in schedule_config.get("weekdays") or []})
+            if not weekdays:
+                return None
+            hour, minute, second = _parse_time_of_day(schedule_config.get("time"))
+            fields["cron_expression"] = f"{second} {minute} {hour} * * {','.join(str(day) for day in weekdays)}"
+        else:
+            start_time = _parse_local(schedule_config["start"], "%Y-%m-%d %H:%M:%S")
+            end_time = _parse_local(schedule_config["end"], "%Y-%m-%d %H:%M:%S")
+            local_start = start_time.astimezone(_local_tz())
+            fields["cron_expression"] = f"{local_start.second} {local_start.minute} {local_start.hour} * * *"
+            fields["start_at"] = start_time
+            fields["end_at"] = end_time
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"无法解析定时配置 {scheduling}: {e}")
+        return None
+    if scheduling.get("misfire_policy") in MISFIRE_POLICIES:
+        fields["misfire_policy"] = scheduling["misfire_policy"]
+    return fields
+
+
+def resolve_misfire_policy(value: Optional[str]) -> str:
+    """错过触发策略，未配置或无效时使用系统配置"""
+    if value in MISFIRE_POLICIES:
+        return value
+    if settings.SCHEDULER_MISFIRE_POLICY in MISFIRE_POLICIES:
+        return settings.SCHEDULER_MISFIRE_POLICY
+    return MISFIRE_RUN_ONCE
+
+
+def _misfire_grace(value: Optional[int]) -> timedelta:
+    return timedelta(seconds=settings.SCHEDULER_MISFIRE_GRACE_SECONDS if value is None else value)
+
+
+def _jitter_offset(schedule: Schedule) -> timedelta:
+    """抖动偏移：按计划ID在 [0, jitter_seconds) 内取固定值，多进程计算结果一致"""
+    jitter = settings.SCHEDULER_JITTER_SECONDS if schedule.jitter_seconds is None else schedule.jitter_seconds
+    if not jitter or jitter <= 0 or schedule.id is None:
+        return timedelta(0)
+    return timedelta(milliseconds=zlib.crc32(f"qg:schedule:{schedule.id}".encode("utf-8")) % (jitter * 1000))
+
+
+def compute_schedule_next_run(schedule: Schedule, after: datetime) -> Optional[datetime]:
+    """定时计划在 after 之后的下次触发时间（UTC），已停用或超过失效时间时返回 None"""
+    if not schedule.enabled:
+        return None
+    after = _as_utc(after)
+    start_at = _as_utc(schedule.start_at)
+    if start_at is not None and start_at > after:
+        # 生效时间本身也可以触发
+        after = start_at - timedelta(seconds=1)
+    next_run_at = parse_cron(schedule.cron_expression).next_after(after, get_timezone(schedule.timezone))
+    end_at = _as_utc(schedule.end_at)
+    if next_run_at is None or (end_at is not None and next_run_at > end_at):
+        return None
+    return next_run_at
+
+
+def plan_schedule_next_run(schedule: Schedule, after: datetime) -> Optional[datetime]:
+    """计算 after 之后的下次触发并写入计划：next_fire_at 为 Cron 时间，next_run_at 再加上抖动偏移
+
+    抖动按计划ID计算，新建的计划需要先 flush 拿到ID。返回 next_run_at。
+    """
+    fire_at = compute_schedule_next_run(schedule, after)
+    schedule.next_fire_at = fire_at
+    schedule.next_run_at = fire_at + _jitter_offset(schedule) if fire_at is not None else None
+    return schedule.next_run_at
+
+
+def _catchup_start(schedule: Schedule, fire_at: datetime, now: datetime) -> datetime:
+    """run_all 补执行的起点：fire_at 到 now 之间最近 SCHEDULER_CATCHUP_MAX_RUNS 次触发中最早的一次
+
+    从 now 往前按指数扩大的窗口查找，秒级 Cron 停机很久时也不必从 fire_at 逐个遍历。
+    """
+    keep = max(1, settings.SCHEDULER_CATCHUP_MAX_RUNS)
+    expression, tz = parse_cron(schedule.cron_expression), get_timezone(schedule.timezone)
+    end_at = _as_utc(schedule.end_at)
+    end = min(now, end_at) if end_at is not None else now
+    span = timedelta(minutes=1)
+    while True:
+        window_start = max(fire_at, end - span)
+        recent = deque(maxlen=keep)
+        if window_start == fire_at:
+            recent.append(fire_at)
+        for candidate in expression.iter_after(window_start, tz):
+            if candidate > end:
+                break
+            recent.append(candidate)
+        if len(recent) >= keep or window_start == fire_at:
+            return recent[0]
+        span *= 4
+
+
+class SchedulerMetrics:
+    """调度延迟统计（进程内，只在主节点上累计）
+
+    延迟为触发时刻相对计划时间（定时计划为 Cron 时间）的秒数，保留最近 window 次用于计算分位数。
+    """
+
+    def __init__(self, window: int = 1000):
+        self.fired = 0  # 触发次数
+        self.caught_up = 0  # 其中错过触发后的补执行次数
+        self.skipped = 0  # 按 skip 策略跳过的错过触发
+        self.deferred = 0  # 补执行超出速率被顺延的次数
+        self.max_lag_seconds = 0.0
+        self.last_fired_at: Optional[datetime] = None
+        self._lags = deque(maxlen=window)
+
+    def record_fire(self, lag_seconds: float, caught_up: bool = False):
+        self.fired += 1
+        if caught_up:
+            self.caught_up += 1
+        self._lags.append(lag_seconds)
+        self.max_lag_seconds = max(self.max_lag_seconds, lag_seconds)
+        self.last_fired_at = datetime.now(timezone.utc)
+
+    def snapshot(self) -> Dict[str, Any]:
+        lags = sorted(self._lags)
+
+        def percentile(p: float) -> Optional[float]:
+            if not lags:
+                return None
+            return round(lags[min(len(lags) - 1, int(len(lags) * p))], 3)
+
+        return {
+            "fired": self.fired,
+            "caught_up": self.caught_up,
+            "skipped": self.skipped,
+            "deferred": self.deferred,
+            "last_fired_at": self.last_fired_at,
+            "lag_avg_seconds": round(sum(lags) / len(lags), 3) if lags else None,
+            "lag_p50_seconds": percentile(0.5),
+            "lag_p95_seconds": percentile(0.95),
+            "lag_p99_seconds": percentile(0.99),
+            "lag_max_seconds": round(self.max_lag_seconds, 3),
+        }
+
+
+def build_schedule_execution(schedule: Schedule) -> TestExecution:
+    """定时计划触发时为测试用例创建的执行记录"""
+    return TestExecution(
+        test_case_id=schedule.test_case_id,
+        project_id=schedule.project_id,
+        schedule_id=schedule.id,
+        environment=schedule.environment,
+        config=dict(schedule.config or {}),
+        status=ExecutionStatus.PENDING,
+        logs=f"定时计划「{schedule.name}」触发，已加入队列，等待执行节点领取",
+    )
+
+
+async def launch_schedule_targets(executions: List[Tuple[int, int]], plan_schedules: List[int]):
+    """提交后把定时触发的执行放入执行队列、启动测试计划运行"""
+    if executions:
+        from app.services.execution_queue import get_execution_queue
+        queue = await get_execution_queue()
+        for execution_id, project_id in executions:
+            await queue.enqueue(execution_id, project_id)
+
+    for schedule_id in plan_schedules:
+        try:
+            from app.models.test_plan import TestPlan
+            from app.services.test_plan_executor import start_plan_run
+            async with AsyncSessionLocal() as db:
+                schedule = await db.get(Schedule, schedule_id)
+                plan = await db.get(TestPlan, schedule.test_plan_id) if schedule else None
+                if plan is None:
+                    logger.warning(f"定时计划 {schedule_id} 的测试计划不存在，跳过")
+                    continue
+                # 测试计划的 config 为本次运行的覆盖配置（max_parallel / fail_fast / execution_config）
+                run = await start_plan_run(
+                    db, plan, executed_by=schedule.created_by,
+                    environment=schedule.environment, overrides=dict(schedule.config or {}),
+                )
+                schedule.last_plan_run_id = run.id
+                await db.commit()
+        except Exception as e:
+            logger.error(f"定时计划 {schedule_id} 启动测试计划运行失败: {e}", exc_info=True)
+
 
 class ScheduledExecutionScheduler:
-    """定时任务执行调度器"""
-    
+    """定时任务执行调度器
+
+    每个 API 进程都会启动调度器，但只有竞选成为主节点的进程维护到期时间堆并触发任务；
+    其他进程定期参与竞选，主节点崩溃或停止后接管。
+    """
+
+    LEADER_NAME = "scheduled-execution-scheduler"
+    WAKEUP_CHANNEL = "qg:scheduler:wakeup"
+
     def __init__(self):
         self.running = False
-        self.check_interval = 600  # 每10分钟（600秒）检查一次
-        
+        self.resync_interval = settings.SCHEDULER_RESYNC_SECONDS
+        self._heap: List[Tuple[datetime, str, int]] = []
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._lease: Optional[BaseLeaderLease] = None
+        self._election_task: Optional[asyncio.Task] = None
+        self._leader_tasks: List[asyncio.Task] = []
+        # 重建堆期间入堆的条目（查询可能读不到刚提交的记录）
+        self._notified: Optional[List[Tuple[datetime, str, int]]] = None
+        self.metrics = SchedulerMetrics()
+        # 补执行共用的令牌桶，为空表示不限速
+        self._catchup_bucket: Optional[TokenBucket] = None
+        if settings.SCHEDULER_CATCHUP_RATE > 0:
+            self._catchup_bucket = TokenBucket(settings.SCHEDULER_CATCHUP_RATE, settings.SCHEDULER_CATCHUP_BURST)
+
+    @property
+    def heap_size(self) -> int:
+        return len(self._heap)
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lease is not None and self._lease.is_leader
+
     async def start(self):
         """启动调度器"""
         if self.running:
             logger.warning("调度器已经在运行")
             return
-        
+
         self.running = True
-        logger.info("定时任务调度器已启动")
-        asyncio.create_task(self._scheduler_loop())
-    
+        self._lease = await create_leader_lease(self.LEADER_NAME)
+        logger.info(f"定时任务调度器已启动（主节点选举：{self._lease.backend}）")
+        self._election_task = asyncio.create_task(self._election_loop())
+
     async def stop(self):
         """停止调度器"""
         self.running = False
+        self._wakeup.set()
+        if self._election_task is not None:
+            self._election_task.cancel()
+            self._election_task = None
+        await self._step_down()
+        if self._lease is not None:
+            await self._lease.release()
         logger.info("定时任务调度器已停止")
-    
+
+    async def _election_loop(self):
+        """定期竞选 / 续约主节点，身份变化时启动或停止调度"""
+        while self.running:
+            was_leader = self.is_leader
+            try:
+                is_leader = await self._lease.acquire()
+            except Exception as e:
+                logger.error(f"定时任务调度器竞选主节点失败: {e}", exc_info=True)
+                is_leader = False
+            if is_leader and not was_leader:
+                logger.info("本进程成为定时任务调度主节点")
+                self._leader_tasks = [
+                    asyncio.create_task(self._scheduler_loop()),
+                    asyncio.create_task(self._wakeup_listener()),
+                ]
+            elif was_leader and not is_leader:
+                logger.warning("本进程失去定时任务调度主节点身份，停止调度")
+                await self._step_down()
+            await asyncio.sleep(settings.SCHEDULER_LEADER_RENEW_SECONDS)
+
+    async def _step_down(self):
+        """停止主节点任务（已触发的执行不受影响）"""
+        tasks, self._leader_tasks = self._leader_tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._heap = []
+
+    def notify_scheduled(self, execution_id: int, next_run_at: Optional[datetime]):
+        """新的单次定时执行入堆"""
+        self._notify(next_run_at, EXECUTION, execution_id)
+
+    def notify_schedule(self, schedule_id: int, next_run_at: Optional[datetime]):
+        """新建或修改的定时计划入堆"""
+        self._notify(next_run_at, SCHEDULE, schedule_id)
+
+    def _notify(self, next_run_at: Optional[datetime], kind: str, target_id: int):
+        """入堆；早于当前堆顶时唤醒调度器
+
+        本进程不是主节点时通过 Redis 通知主节点（Redis 不可用时由主节点定期重建兜底）。
+        """
+        if next_run_at is None:
+            return
+        entry = (_as_utc(next_run_at), kind, target_id)
+        if not self.is_leader:
+            asyncio.create_task(self._publish_wakeup(entry))
+            return
+        self._push(entry)
+
+    def _push(self, entry: Tuple[datetime, str, int]):
+        wake = not self._heap or entry < self._heap[0]
+        heapq.heappush(self._heap, entry)
+        if self._notified is not None:
+            self._notified.append(entry)
+        if wake:
+            self._wakeup.set()
+
+    async def _publish_wakeup(self, entry: Tuple[datetime, str, int]):
+        client = await get_available_redis()
+        if client is None:
+            return
+        next_run_at, kind, target_id = entry
+        try:
+            await client.publish(self.WAKEUP_CHANNEL, f"{kind}:{target_id}:{next_run_at.timestamp()}")
+        except Exception as e:
+            logger.warning(f"通知定时任务主节点失败: {e}")
+
+    async def _wakeup_listener(self):
+        """主节点订阅其他进程新建定时任务的通知"""
+        client = await get_available_redis()
+        if client is None:
+            return
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self.WAKEUP_CHANNEL)
+        try:
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if not message:
+                    continue
+                try:
+                    kind, target_id, timestamp = str(message["data"]).split(":", 2)
+                    self._push((datetime.fromtimestamp(float(timestamp), timezone.utc), kind, int(target_id)))
+                except ValueError:
+                    logger.warning(f"无法解析定时任务通知: {message['data']}")
+        finally:
+            await pubsub.unsubscribe(self.WAKEUP_CHANNEL)
+            await pubsub.close()
+
     async def _scheduler_loop(self):
-        """调度器主循环"""
-        logger.info("调度器主循环已启动，每10分钟检查一次定时任务")
-        # 启动后立即检查一次
+        """主节点主循环：睡眠到堆顶任务到期，或被 notify / 定期重建唤醒"""
         try:
-            logger.info("执行首次检查...")
-            await self._check_and_execute_scheduled_tasks()
-            logger.info("首次检查完成")
+            await self._upgrade_legacy_executions()
         except Exception as e:
-            logger.error(f"调度器首次检查任务时出错: {e}", exc_info=True)
-        
-        check_count = 0
+            logger.error(f"迁移旧版定时任务失败: {e}", exc_info=True)
+
+        last_resync = None
         while self.running:
             try:
-                check_count += 1
-                if check_count % 10 == 0:  # 每10次检查记录一次
-                    logger.info(f"调度器运行中，已执行 {check_count} 次检查")
-                await self._check_and_execute_scheduled_tasks()
+                loop_time = asyncio.get_running_loop().time()
+                if last_resync is None or loop_time - last_resync >= self.resync_interval:
+                    await self._rebuild_heap()
+                    last_resync = loop_time
+                await self._dispatch_due()
             except Exception as e:
                 logger.error(f"调度器检查任务时出错: {e}", exc_info=True)
-            
-            await asyncio.sleep(self.check_interval)
-    
-    async def _check_and_execute_scheduled_tasks(self):
-        """检查并执行到期的定时任务"""
-        # 获取数据库会话
-        async with AsyncSessionLocal() as db:
+
+            timeout = self.resync_interval
+            if self._heap:
+                until_due = (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds()
+                timeout = min(timeout, max(0.0, until_due))
+            self._wakeup.clear()
             try:
-                # 查询所有pending状态的定时任务
-                query = select(TestExecution).where(
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _rebuild_heap(self):
+        """用一次索引查询重建堆（结果已按 next_run_at 排序，即为合法的小顶堆）"""
+        self._notified = []
+        executions = select(
+            TestExecution.next_run_at.label("next_run_at"), literal_column(f"'{EXECUTION}'").label("kind"), TestExecution.id.label("id")
+        ).where(TestExecution.status == ExecutionStatus.PENDING, TestExecution.next_run_at.isnot(None))
+        schedules = select(
+            Schedule.next_run_at.label("next_run_at"), literal_column(f"'{SCHEDULE}'").label("kind"), Schedule.id.label("id")
+        ).where(Schedule.enabled.is_(True), Schedule.next_run_at.isnot(None))
+        query = union_all(executions, schedules).order_by(text("next_run_at"), text("kind"), text("id"))
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(query)
+            heap = [(_as_utc(next_run_at), kind, target_id) for next_run_at, kind, target_id in result.all()]
+        async with self._lock:
+            if self._notified:
+                heap.extend(self._notified)
+                heapq.heapify(heap)
+            self._notified = None
+            self._heap = heap
+        logger.debug(f"定时任务堆已重建，共 {len(heap)} 个待触发任务")
+
+    async def _upgrade_legacy_executions(self):
+        """处理升级前创建的定时执行
+
+        - 单次定时执行：计算 next_run_at
+        - 周期定时执行（daily / weekly / time_range 的 PENDING 占位记录）：转换为定时计划，占位记录取消
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(TestExecution).options(defer(TestExecution.result), defer(TestExecution.logs)).where(
                     and_(
                         TestExecution.status == ExecutionStatus.PENDING,
+                        TestExecution.next_run_at.is_(None),
                         text("config IS NOT NULL AND config->'scheduling' IS NOT NULL AND (config->'scheduling'->>'mode') = 'schedule'")
                     )
-                )
-                result = await db.execute(query)
-                all_pending = result.scalars().all()
-                
-                # 对于time_range类型，过滤掉刚刚创建的任务，避免频繁执行
-                # time_range类型默认每小时执行一次，所以需要过滤掉60分钟内创建的任务
-                # 但实际执行间隔会在执行逻辑中判断
-                pending_executions = []
-                for exec in all_pending:
-                    pending_executions.append(exec)
-                
-                logger.info(f"查询到 {len(pending_executions)} 个pending状态的定时任务")
-                
-                if not pending_executions:
-                    logger.info("没有找到待执行的定时任务（pending状态且scheduling.mode=schedule）")
-                    return
-                
-                logger.info(f"找到 {len(pending_executions)} 个待执行的定时任务")
-                
-                # 使用本地时间进行比较（因为前端保存的是本地时间字符串）
-                # 服务器时区是 CST (UTC+8)
-                from datetime import timezone
-                cst = timezone(timedelta(hours=8))  # CST = UTC+8
-                current_utc = datetime.utcnow()
-                current_local = current_utc.replace(tzinfo=timezone.utc).astimezone(cst).replace(tzinfo=None)
-                current_time = current_local  # 使用本地时间进行比较
-                logger.info(f"当前UTC时间: {current_utc.strftime('%Y-%m-%d %H:%M:%S')}")
-                logger.info(f"当前本地时间(CST): {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                
-                for execution in pending_executions:
-                    try:
-                        scheduling = execution.config.get("scheduling", {}) if execution.config else {}
-                        schedule_type = scheduling.get("schedule_type", "once")
-                        scheduled_at = scheduling.get("scheduled_at")
-                        schedule_config = scheduling.get("schedule_config", {})
-                        
-                        logger.info(f"检查定时任务 {execution.id}: schedule_type={schedule_type}, scheduled_at={scheduled_at}, schedule_config={schedule_config}")
-                        
-                        if not scheduled_at and schedule_type not in ("weekly", "time_range"):
-                            logger.warning(f"定时任务 {execution.id} 没有 scheduled_at 且不是 weekly/time_range 类型")
-                            continue
-                        
-                        # 检查是否到了执行时间
-                        should_execute = False
-                        
-                        if schedule_type == "once":
-                            # 单次执行：检查 scheduled_at 是否到了
-                            try:
-                                scheduled_time = datetime.strptime(scheduled_at, "%Y-%m-%d %H:%M:%S")
-                                time_diff = (current_time - scheduled_time).total_seconds() / 60  # 分钟差
-                                logger.info(f"任务 {execution.id} (once): 计划时间={scheduled_at}, 当前时间={current_time.strftime('%Y-%m-%d %H:%M:%S')}, 时间差={time_diff:.1f}分钟")
-                                # 允许1分钟的时间误差，且必须已经过了计划时间
-                                if time_diff >= -1:  # 允许1分钟的提前执行
-                                    should_execute = True
-                                    logger.info(f"任务 {execution.id} 已到执行时间（时间差={time_diff:.1f}分钟），准备执行")
-                                else:
-                                    logger.info(f"任务 {execution.id} 还未到执行时间（时间差={time_diff:.1f}分钟，需要>= -1分钟）")
-                            except ValueError:
-                                # 如果格式不对，尝试只解析日期
-                                try:
-                                    scheduled_time = datetime.strptime(scheduled_at, "%Y-%m-%d")
-                                    if current_time.date() >= scheduled_time.date():
-                                        should_execute = True
-                                        logger.info(f"任务 {execution.id} 日期已到，准备执行")
-                                except ValueError:
-                                    logger.warning(f"无法解析 scheduled_at: {scheduled_at}")
-                                    continue
-                        
-                        elif schedule_type == "daily":
-                            # 每天执行：每天只执行一次，在指定时间点执行
-                            # 检查当前日期是否等于scheduled_at日期，且时间匹配
-                            time_str = schedule_config.get("time", "00:00:00")
-                            
-                            if not scheduled_at:
-                                logger.warning(f"任务 {execution.id} (daily) 缺少 scheduled_at")
-                                continue
-                            
-                            # 检查任务是否已经被执行过（通过检查started_at）
-                            if execution.started_at is not None:
-                                logger.debug(f"任务 {execution.id} 已经执行过（started_at={execution.started_at}），跳过")
-                                continue
-                            
-                            try:
-                                # 解析scheduled_at日期
-                                scheduled_date = datetime.strptime(scheduled_at, "%Y-%m-%d").date()
-                                current_date = current_time.date()
-                                
-                                # 只有当当前日期等于scheduled_at日期时，才检查时间匹配
-                                if current_date != scheduled_date:
-                                    logger.debug(f"任务 {execution.id} (daily): 当前日期({current_date})不等于计划日期({scheduled_date})，跳过")
-                                    continue
-                                
-                                # 解析时间 HH:mm:ss（本地时间）
-                                time_parts = time_str.split(":")
-                                current_hour = current_time.hour  # 当前本地时间的小时
-                                current_minute = current_time.minute  # 当前本地时间的分钟
-                                scheduled_hour = int(time_parts[0])
-                                scheduled_minute = int(time_parts[1]) if len(time_parts) > 1 else 0
-                                
-                                minute_diff = abs(current_minute - scheduled_minute)
-                                logger.info(f"任务 {execution.id} (daily): 计划日期={scheduled_date}, 计划时间(本地)={time_str}, 当前本地时间={current_time.strftime('%H:%M:%S')}, 小时匹配={current_hour == scheduled_hour}, 分钟差={minute_diff}")
-                                
-                                # 计算计划执行时间
-                                scheduled_datetime = datetime.combine(scheduled_date, datetime.min.time().replace(hour=scheduled_hour, minute=scheduled_minute))
-                                
-                                # 如果当前时间已经超过了计划时间，执行（补执行）
-                                # 允许在当天执行，即使时间已经过了
-                                if current_time >= scheduled_datetime:
-                                    should_execute = True
-                                    # 检查是否精确匹配（允许1分钟误差）
-                                    time_match = (current_hour == scheduled_hour and minute_diff <= 1)
-                                    if time_match:
-                                        logger.info(f"任务 {execution.id} 日期和时间都匹配，准备执行")
-                                    else:
-                                        logger.info(f"任务 {execution.id} 日期匹配但时间已过（计划={scheduled_hour}:{scheduled_minute:02d}, 当前={current_hour}:{current_minute:02d}），补执行")
-                                else:
-                                    logger.debug(f"任务 {execution.id} 日期匹配但还未到计划时间（计划={scheduled_hour}:{scheduled_minute:02d}, 当前={current_hour}:{current_minute:02d}），等待")
-                            except (ValueError, IndexError) as e:
-                                logger.warning(f"无法解析时间或日期: scheduled_at={scheduled_at}, time={time_str}, 错误: {e}")
-                                continue
-                        
-                        elif schedule_type == "weekly":
-                            # 每周执行：每周只执行一次，在指定星期和时间点执行
-                            # 如果星期匹配且任务未被执行过，无论时间是否匹配都应该执行（补执行）
-                            weekdays = schedule_config.get("weekdays", [])
-                            time_str = schedule_config.get("time", "00:00:00")
-                            
-                            # 获取当前星期（0=周一，6=周日，需要转换为1-7格式）
-                            # Python的weekday(): 0=周一, 1=周二, ..., 6=周日
-                            # 我们的格式: 1=周一, 2=周二, ..., 7=周日
-                            current_weekday = current_time.weekday() + 1  # 转换为1-7格式
-                            
-                            logger.info(f"任务 {execution.id} (weekly): 当前星期={current_weekday}, 计划星期={weekdays}, 计划时间(本地)={time_str}, 当前本地时间={current_time.strftime('%H:%M:%S')}, 任务状态={execution.status}")
-                            
-                            if str(current_weekday) in weekdays:
-                                # 检查任务是否已经被执行过（通过检查started_at）
-                                # 如果任务已经执行过（started_at不为None），跳过
-                                if execution.started_at is not None:
-                                    logger.debug(f"任务 {execution.id} 已经执行过（started_at={execution.started_at}），跳过")
-                                    continue
-                                
-                                # 检查任务的创建时间，防止新创建的任务在本周重复执行
-                                # weekly任务执行后会创建新记录，新记录应该在下周执行，不应该在本周执行
-                                if execution.created_at:
-                                    created_at_local = execution.created_at.replace(tzinfo=None) if execution.created_at.tzinfo else execution.created_at
-                                    # 计算本周的开始日期（周一）
-                                    current_week_start = current_time.date() - timedelta(days=current_time.weekday())
-                                    created_week_start = created_at_local.date() - timedelta(days=created_at_local.weekday())
-                                    
-                                    # 如果任务是在本周创建的，说明是刚创建的新记录，应该跳过（等待下周执行）
-                                    # weekly任务执行后会创建新记录，新记录应该在下周执行，不应该在本周执行
-                                    if created_week_start == current_week_start:
-                                        # 任务是在本周创建的，跳过（等待下周执行）
-                                        logger.info(f"任务 {execution.id} 是在本周创建的新记录（创建周={created_week_start}, 当前周={current_week_start}），跳过，等待下周执行")
-                                        continue
-                                    else:
-                                        # 任务不是在本周创建的，说明是历史任务，应该执行（补执行）
-                                        should_execute = True
-                                        try:
-                                            time_parts = time_str.split(":")
-                                            current_hour = current_time.hour
-                                            current_minute = current_time.minute
-                                            scheduled_hour = int(time_parts[0])
-                                            scheduled_minute = int(time_parts[1]) if len(time_parts) > 1 else 0
-                                            minute_diff = abs(current_minute - scheduled_minute)
-                                            time_match = (current_hour == scheduled_hour and minute_diff <= 1)
-                                            
-                                            if time_match:
-                                                logger.info(f"任务 {execution.id} 星期和时间都匹配，准备执行（历史任务补执行）")
-                                            else:
-                                                logger.info(f"任务 {execution.id} 星期匹配但时间已过（计划={scheduled_hour}:{scheduled_minute:02d}, 当前={current_hour}:{current_minute:02d}），补执行")
-                                        except (ValueError, IndexError) as e:
-                                            logger.warning(f"无法解析时间: {time_str}, 错误: {e}，但仍将执行")
-                                else:
-                                    # 如果没有创建时间，使用旧的逻辑（允许执行）
-                                    should_execute = True
-                                    logger.warning(f"任务 {execution.id} 没有创建时间，使用旧逻辑执行")
-                            else:
-                                logger.debug(f"任务 {execution.id} 当前星期 {current_weekday} 不在计划星期 {weekdays} 中")
-                        
-                        elif schedule_type == "time_range":
-                            # 时间段执行：每天只执行一次，在开始时间的同一时间点执行
-                            # 第一次执行：开始时间的日期和时间点（如 2025/12/21 17:05:02）
-                            # 执行完成后，开始时间更新为下一天的同一时间点（如 2025/12/22 17:05:02）
-                            start_str = schedule_config.get("start")
-                            end_str = schedule_config.get("end")
-                            
-                            if not start_str or not end_str:
-                                logger.warning(f"任务 {execution.id} (time_range) 缺少 start 或 end 配置")
-                                continue
-                            
-                            try:
-                                start_time = datetime.strptime(start_str, "%Y-%m-%d %H:%M:%S")
-                                end_time = datetime.strptime(end_str, "%Y-%m-%d %H:%M:%S")
-                                
-                                logger.info(f"任务 {execution.id} (time_range): 开始时间={start_str}, 结束时间={end_str}, 当前本地时间={current_time.strftime('%Y-%m-%d %H:%M:%S')}, 任务状态={execution.status}")
-                                
-                                # 如果当前时间超过结束时间，不再执行
-                                if current_time > end_time:
-                                    logger.info(f"任务 {execution.id} 已超过结束时间，不再执行")
-                                    # 将状态更新为cancelled
-                                    execution.status = ExecutionStatus.CANCELLED
-                                    await db.commit()
-                                    continue
-                                
-                                # 如果当前时间还未到开始时间，不执行
-                                if current_time < start_time:
-                                    logger.debug(f"任务 {execution.id} 还未到开始时间")
-                                    continue
-                                
-                                # 检查任务是否已经被执行过（通过检查started_at）
-                                # 如果任务已经执行过，跳过
-                                if execution.started_at is not None:
-                                    logger.debug(f"任务 {execution.id} 已经执行过（started_at={execution.started_at}），跳过")
-                                    continue
-                                
-                                # 如果当前时间在时间段内，且任务未被执行过，执行任务
-                                # 允许补执行：如果执行时间已过，但在时间段内，仍然执行一次
-                                # 每天在开始时间的同一时间点执行（如每天17:05:02）
-                                start_hour = start_time.hour
-                                start_minute = start_time.minute
-                                
-                                current_hour = current_time.hour
-                                current_minute = current_time.minute
-                                
-                                # 检查是否到了每天的执行时间点（时、分匹配，允许1分钟误差）
-                                hour_match = current_hour == start_hour
-                                minute_diff = abs(current_minute - start_minute)
-                                time_match = hour_match and minute_diff <= 1
-                                
-                                # 当前时间的日期必须 >= 开始时间的日期
-                                if current_time.date() >= start_time.date():
-                                    if time_match:
-                                        should_execute = True
-                                        logger.info(f"任务 {execution.id} 时间匹配，准备执行（当前日期={current_time.date()}, 开始日期={start_time.date()}, 时间点={start_hour}:{start_minute:02d}）")
-                                    else:
-                                        # 时间已过，但在时间段内，补执行一次
-                                        should_execute = True
-                                        logger.info(f"任务 {execution.id} 执行时间已过但仍在时间段内，补执行（计划时间={start_hour}:{start_minute:02d}, 当前时间={current_hour}:{current_minute:02d}）")
-                                else:
-                                    logger.debug(f"任务 {execution.id} 当前日期还未到开始日期")
-                                    
-                            except ValueError as e:
-                                logger.warning(f"无法解析时间范围: start={start_str}, end={end_str}, 错误: {e}")
-                                continue
-                        
-                        if should_execute:
-                            logger.info(f"执行定时任务: execution_id={execution.id}")
-                            await self._execute_scheduled_task(execution, db)
-                    
-                    except Exception as e:
-                        logger.error(f"处理定时任务 {execution.id} 时出错: {e}", exc_info=True)
-                        continue
-            
-            except Exception as e:
-                logger.error(f"检查定时任务时出错: {e}", exc_info=True)
-    
-    async def _execute_scheduled_task(self, execution: TestExecution, db: AsyncSession):
-        """执行定时任务"""
-        try:
-            # 先更新当前任务状态为running（避免重复执行）
-            execution.status = ExecutionStatus.RUNNING
-            execution.started_at = datetime.utcnow()
-            execution.logs = "定时任务已触发，开始执行"
-            await db.commit()
-            await db.refresh(execution)
-            
-            # 调用执行逻辑（异步执行，不阻塞调度器）
-            # 传递execution.id和config，用于执行完成后创建新记录
-            asyncio.create_task(self._run_execution(execution.id, execution.config))
-            
-        except Exception as e:
-            logger.error(f"执行定时任务 {execution.id} 失败: {e}", exc_info=True)
-            execution.status = ExecutionStatus.ERROR
-            execution.logs = f"执行失败: {str(e)}"
-            await db.commit()
-    
-    async def _create_next_scheduled_task(self, original_config: dict, execution: TestExecution):
-        """为周期性任务创建下一次执行记录（在任务执行完成后调用）"""
-        try:
-            scheduling = original_config.get("scheduling", {}) if original_config else {}
-            schedule_type = scheduling.get("schedule_type", "once")
-            
-            # 只有daily、weekly、time_range类型需要创建新记录
-            if schedule_type not in ("daily", "weekly", "time_range"):
+                ).with_for_update(skip_locked=True)
+            )
+            executions = result.scalars().all()
+            if not executions:
                 return
-            
-            from app.core.database import AsyncSessionLocal
-            from datetime import timezone
-            import copy
-            
-            # 复制配置并更新计划执行时间
-            new_config = copy.deepcopy(original_config)
-            new_scheduling = new_config.get("scheduling", {})
-            schedule_config = new_scheduling.get("schedule_config", {})
-            
-            # 获取当前本地时间（用于计算下一次执行时间）
-            cst = timezone(timedelta(hours=8))  # CST = UTC+8
-            current_utc = datetime.utcnow()
-            current_local = current_utc.replace(tzinfo=timezone.utc).astimezone(cst).replace(tzinfo=None)
-            
-            if schedule_type == "daily":
-                # daily类型：更新scheduled_at为下一天的日期
-                current_scheduled_at = new_scheduling.get("scheduled_at", "")
-                if current_scheduled_at:
-                    try:
-                        # 解析当前日期
-                        scheduled_date = datetime.strptime(current_scheduled_at, "%Y-%m-%d")
-                        # 加1天
-                        next_date = scheduled_date + timedelta(days=1)
-                        new_scheduling["scheduled_at"] = next_date.strftime("%Y-%m-%d")
-                        logger.info(f"daily任务：更新scheduled_at从 {current_scheduled_at} 到 {new_scheduling['scheduled_at']}")
-                    except ValueError:
-                        # 如果解析失败，使用当前日期+1天
-                        next_date = current_local.date() + timedelta(days=1)
-                        new_scheduling["scheduled_at"] = next_date.strftime("%Y-%m-%d")
-                        logger.info(f"daily任务：无法解析原日期，使用明天日期 {new_scheduling['scheduled_at']}")
-                else:
-                    # 如果没有scheduled_at，使用明天日期
-                    next_date = current_local.date() + timedelta(days=1)
-                    new_scheduling["scheduled_at"] = next_date.strftime("%Y-%m-%d")
-                    logger.info(f"daily任务：添加scheduled_at为明天 {new_scheduling['scheduled_at']}")
-            
-            elif schedule_type == "weekly":
-                # weekly类型：不需要更新scheduled_at（weekly类型没有scheduled_at）
-                # weekdays和time保持不变
-                logger.info(f"weekly任务：保持weekdays={schedule_config.get('weekdays')}和time={schedule_config.get('time')}")
-            
-            elif schedule_type == "time_range":
-                # time_range类型：每天执行一次，执行后将开始时间更新为下一天的同一时间点
-                start_str = schedule_config.get("start", "")
-                end_str = schedule_config.get("end", "")
-                should_create_new = True
-                if start_str and end_str:
-                    try:
-                        start_time = datetime.strptime(start_str, "%Y-%m-%d %H:%M:%S")
-                        end_time = datetime.strptime(end_str, "%Y-%m-%d %H:%M:%S")
-                        
-                        # 计算下一天的开始时间（保持相同的时、分、秒）
-                        next_start_time = start_time + timedelta(days=1)
-                        
-                        # 如果下一天的开始时间已经超过结束时间，不创建新记录
-                        if next_start_time > end_time:
-                            logger.info(f"time_range任务：下一天的开始时间({next_start_time.strftime('%Y-%m-%d %H:%M:%S')})已超过结束时间({end_str})，不创建新记录")
-                            return
-                        else:
-                            # 更新开始时间为下一天的同一时间点
-                            new_start_str = next_start_time.strftime("%Y-%m-%d %H:%M:%S")
-                            schedule_config["start"] = new_start_str
-                            # 结束时间保持不变
-                            new_scheduling["schedule_config"] = schedule_config
-                            logger.info(f"time_range任务：更新开始时间从 {start_str} 到 {new_start_str}，结束时间保持为 {end_str}")
-                    except ValueError as e:
-                        logger.warning(f"time_range任务：无法解析时间范围，错误: {e}")
-                        return
-                else:
-                    logger.warning(f"time_range任务：缺少start或end配置，不创建新记录")
-                    return
-            
-            # 更新配置中的scheduling
-            new_config["scheduling"] = new_scheduling
-            
-            async with AsyncSessionLocal() as new_db:
-                from app.models.test_execution import TestExecution as NewExecution
-                new_execution = NewExecution(
-                    test_case_id=execution.test_case_id,
+            now = datetime.now(timezone.utc)
+            for execution in executions:
+                scheduling = (execution.config or {}).get("scheduling", {})
+                if scheduling.get("schedule_type", "once") not in _LEGACY_RECURRING_TYPES:
+                    execution.next_run_at = compute_next_run_at(scheduling)
+                    if execution.next_run_at is None:
+                        logger.warning(f"定时任务 {execution.id} 的定时配置无法解析，不会被调度: {scheduling}")
+                    continue
+
+                fields = legacy_schedule_fields(scheduling)
+                execution.status = ExecutionStatus.CANCELLED
+                execution.finished_at = now
+                if fields is None:
+                    execution.logs = "定时配置无法解析，已取消"
+                    continue
+                config = {key: value for key, value in (execution.config or {}).items() if key != "scheduling"}
+                schedule = Schedule(
+                    name=f"定时任务 #{execution.id}",
                     project_id=execution.project_id,
+                    test_case_id=execution.test_case_id,
                     environment=execution.environment,
-                    config=new_config,
-                    status=ExecutionStatus.PENDING,
-                    started_at=None,
-                    logs="定时任务已创建，等待执行",
-                    result=None,
+                    config=config,
+                    enabled=True,
+                    **fields,
                 )
-                new_db.add(new_execution)
-                await new_db.commit()
-                logger.info(f"任务 {execution.id} 执行完成后，为 {schedule_type} 类型任务创建了新的执行记录: {new_execution.id}，配置: {new_config.get('scheduling', {})}")
-        
-        except Exception as e:
-            logger.error(f"创建新的执行记录失败: {e}", exc_info=True)
-    
-    async def _run_execution(self, execution_id: int, original_config: dict = None):
-        """执行测试任务（异步）"""
+                db.add(schedule)
+                await db.flush()
+                plan_schedule_next_run(schedule, now)
+                execution.logs = f"已迁移为定时计划 {schedule.id}，由定时计划按时创建执行"
+            await db.commit()
+            logger.info(f"已处理 {len(executions)} 个升级前创建的定时任务")
+
+    async def _check_and_execute_scheduled_tasks(self):
+        """立即触发到期的定时任务（手动触发检查；领取时跳过已被锁定的记录，任意进程调用都不会重复触发）"""
+        if self.is_leader:
+            await self._rebuild_heap()
+            self._wakeup.set()
+        await self._dispatch_due()
+
+    async def _dispatch_due(self):
+        """弹出已到期的堆条目，批量领取到期的定时执行与定时计划并触发"""
+        async with self._lock:
+            now = datetime.now(timezone.utc)
+            while self._heap and self._heap[0][0] <= now:
+                heapq.heappop(self._heap)
+            while True:
+                claimed = await self._claim_due_executions(now)
+                if len(claimed) < settings.SCHEDULER_CLAIM_BATCH:
+                    break
+            while True:
+                fired = await self._claim_due_schedules(now)
+                if len(fired) < settings.SCHEDULER_CLAIM_BATCH:
+                    break
+
+    def _catchup_delay(self) -> float:
+        """补执行预占一个令牌，返回需要顺延的秒数"""
+        if self._catchup_bucket is None:
+            return 0.0
+        return self._catchup_bucket.reserve()
+
+    async def _claim_due_executions(self, now: datetime) -> List[int]:
+        """领取一批到期的单次定时执行（FOR UPDATE SKIP LOCKED，同一条记录只会被一个进程领取）
+
+        状态在同一事务内更新为running，提交后放入执行队列。错过触发的执行按
+        config.scheduling.misfire_policy 跳过（取消），或在补执行速率内触发、超出的顺延。
+        """
+        grace = _misfire_grace(None)
+        fired: List[Tuple[int, int, datetime, float]] = []
+        skipped: List[int] = []
+        deferred: List[Tuple[int, datetime]] = []
         async with AsyncSessionLocal() as db:
-            try:
-                # 获取执行记录
-                result = await db.execute(
-                    select(TestExecution).where(TestExecution.id == execution_id)
+            result = await db.execute(
+                select(TestExecution.id, TestExecution.project_id, TestExecution.next_run_at, TestExecution.config)
+                .where(
+                    TestExecution.status == ExecutionStatus.PENDING,
+                    TestExecution.next_run_at.isnot(None),
+                    TestExecution.next_run_at <= now,
                 )
-                execution = result.scalar_one_or_none()
-                
-                if not execution:
-                    logger.error(f"找不到执行记录: {execution_id}")
-                    return
-                
-                if execution.status != ExecutionStatus.RUNNING:
-                    logger.warning(f"执行记录状态不是RUNNING: {execution_id}, status={execution.status}")
-                    return
-                
-                # 如果original_config未提供，使用execution.config
-                if original_config is None:
-                    original_config = execution.config
-                
-                # 调用执行逻辑
-                from app.api.v1.test_executions import _execute_pending_test_execution
-                await _execute_pending_test_execution(execution, db)
-                
-                # 刷新execution状态
-                await db.refresh(execution)
-                
-                # 执行完成后，检查是否需要创建下一次执行记录
-                # 只有当任务成功完成（passed或failed）或错误完成（error）时才创建新记录
-                if execution.status in (ExecutionStatus.PASSED, ExecutionStatus.FAILED, ExecutionStatus.ERROR):
-                    await self._create_next_scheduled_task(original_config, execution)
-                    
-            except Exception as e:
-                logger.error(f"执行任务 {execution_id} 时出错: {e}", exc_info=True)
-                # 更新执行状态为错误
-                try:
-                    result = await db.execute(
-                        select(TestExecution).where(TestExecution.id == execution_id)
+                .order_by(TestExecution.next_run_at, TestExecution.id)
+                .limit(settings.SCHEDULER_CLAIM_BATCH)
+                .with_for_update(skip_locked=True)
+            )
+            rows = result.all()
+            if not rows:
+                return []
+
+            for execution_id, project_id, next_run_at, config in rows:
+                due = _as_utc(next_run_at)
+                scheduling = (config or {}).get("scheduling") or {}
+                misfired = now - due > grace
+                if misfired:
+                    if resolve_misfire_policy(scheduling.get("misfire_policy")) == MISFIRE_SKIP:
+                        skipped.append(execution_id)
+                        continue
+                    delay = self._catchup_delay()
+                    if delay > 0:
+                        deferred.append((execution_id, now + timedelta(seconds=delay)))
+                        continue
+                # 顺延过的执行 next_run_at 已改变，延迟按原定时间计算
+                scheduled_at = compute_next_run_at(scheduling) or due
+                lag = (now - scheduled_at).total_seconds()
+                fired.append((execution_id, project_id, scheduled_at, lag))
+                self.metrics.record_fire(lag, caught_up=misfired)
+
+            # 先更新为running再提交，避免重复触发
+            if fired:
+                await db.execute(
+                    update(TestExecution)
+                    .where(TestExecution.id.in_([execution_id for execution_id, _, _, _ in fired]))
+                    .values(status=ExecutionStatus.RUNNING, logs="定时任务已触发，已加入队列，等待执行节点领取")
+                )
+            if skipped:
+                await db.execute(
+                    update(TestExecution)
+                    .where(TestExecution.id.in_(skipped))
+                    .values(
+                        status=ExecutionStatus.CANCELLED,
+                        finished_at=now,
+                        logs=f"错过计划执行时间超过 {grace.total_seconds():.0f} 秒，按错过触发策略跳过",
                     )
-                    exec_record = result.scalar_one_or_none()
-                    if exec_record:
-                        exec_record.status = ExecutionStatus.ERROR
-                        exec_record.logs = f"执行出错: {str(e)}"
-                        exec_record.finished_at = datetime.utcnow()
-                        await db.commit()
-                        
-                        # 即使出错，如果原任务是周期性的，也尝试创建新记录
-                        if original_config:
-                            await self._create_next_scheduled_task(original_config, exec_record)
-                except Exception as e2:
-                    logger.error(f"更新执行状态失败: {e2}", exc_info=True)
+                )
+                await rollup_finished_executions(db, skipped)
+            for execution_id, run_at in deferred:
+                await db.execute(update(TestExecution).where(TestExecution.id == execution_id).values(next_run_at=run_at))
+            await db.commit()
+
+        self.metrics.skipped += len(skipped)
+        self.metrics.deferred += len(deferred)
+        for execution_id, run_at in deferred:
+            self._push((run_at, EXECUTION, execution_id))
+        if skipped:
+            logger.warning(f"跳过错过触发的定时执行: {skipped}")
+        if deferred:
+            logger.info(f"补执行超出速率，顺延 {len(deferred)} 个定时执行，最晚至 {max(run_at for _, run_at in deferred).isoformat()}")
+        for execution_id, _, scheduled_at, lag in fired:
+            logger.info(f"触发定时执行: execution_id={execution_id}，计划时间={scheduled_at.isoformat()}，延迟 {lag:.1f} 秒")
+        await launch_schedule_targets([(execution_id, project_id) for execution_id, project_id, _, _ in fired], [])
+        return [row[0] for row in rows]
+
+    async def _claim_due_schedules(self, now: datetime) -> List[int]:
+        """领取一批到期的定时计划：创建测试执行、推进下次触发时间（同一事务内），提交后入队
+
+        到期超过宽限时间的按错过策略处理；补执行超出速率时只顺延 next_run_at，
+        next_fire_at 保持错过的 Cron 时间，顺延到期后再触发。
+        """
+        executions: List[Tuple[int, int]] = []
+        plan_schedules: List[int] = []
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Schedule)
+                .where(Schedule.enabled.is_(True), Schedule.next_run_at.isnot(None), Schedule.next_run_at <= now)
+                .order_by(Schedule.next_run_at, Schedule.id)
+                .limit(settings.SCHEDULER_CLAIM_BATCH)
+                .with_for_update(skip_locked=True)
+            )
+            schedules = result.scalars().all()
+            if not schedules:
+                return []
+
+            fired: List[Tuple[Schedule, Optional[TestExecution], datetime, bool]] = []
+            for schedule in schedules:
+                due = _as_utc(schedule.next_run_at)
+                fire_at = _as_utc(schedule.next_fire_at) or due
+                policy = resolve_misfire_policy(schedule.misfire_policy)
+                misfired = now - due > _misfire_grace(schedule.misfire_grace_seconds)
+                if misfired:
+                    if policy == MISFIRE_SKIP:
+                        plan_schedule_next_run(schedule, now)
+                        self.metrics.skipped += 1
+                        logger.warning(
+                            f"定时计划 {schedule.id} 错过触发（计划时间={fire_at.isoformat()}），按 skip 策略跳过，"
+                            f"下次触发={schedule.next_run_at.isoformat() if schedule.next_run_at else '无'}"
+                        )
+                        continue
+                    if policy == MISFIRE_RUN_ALL:
+                        catchup_from = _catchup_start(schedule, fire_at, now)
+                        if catchup_from != fire_at:
+                            logger.warning(
+                                f"定时计划 {schedule.id} 错过的触发超过 {settings.SCHEDULER_CATCHUP_MAX_RUNS} 次，"
+                                f"{catchup_from.isoformat()} 之前的不再补执行"
+                            )
+                            fire_at = catchup_from
+                            schedule.next_fire_at = fire_at
+                    delay = self._catchup_delay()
+                    if delay > 0:
+                        schedule.next_run_at = now + timedelta(seconds=delay)
+                        self.metrics.deferred += 1
+                        continue
+
+                execution = None
+                if schedule.test_case_id:
+                    execution = build_schedule_execution(schedule)
+                    db.add(execution)
+                elif schedule.test_plan_id:
+                    plan_schedules.append(schedule.id)
+                schedule.last_run_at = now
+                schedule.last_lag_seconds = (now - fire_at).total_seconds()
+                if policy == MISFIRE_RUN_ALL:
+                    # 逐个补执行：从本次 Cron 时间推进，错过的下一次随即到期
+                    plan_schedule_next_run(schedule, fire_at)
+                else:
+                    # 错过的触发合并为本次，直接推进到当前时间之后
+                    plan_schedule_next_run(schedule, now)
+                self.metrics.record_fire(schedule.last_lag_seconds, caught_up=misfired)
+                fired.append((schedule, execution, fire_at, misfired))
+            await db.flush()
+            for schedule, execution, fire_at, misfired in fired:
+                if execution is not None:
+                    schedule.last_execution_id = execution.id
+                    executions.append((execution.id, schedule.project_id))
+                logger.info(
+                    f"{'补执行' if misfired else '触发'}定时计划: schedule_id={schedule.id}，计划时间={fire_at.isoformat()}，"
+                    f"延迟 {schedule.last_lag_seconds:.1f} 秒，"
+                    f"下次触发={schedule.next_run_at.isoformat() if schedule.next_run_at else '无'}"
+                )
+            next_entries = [(schedule.next_run_at, schedule.id) for schedule in schedules if schedule.next_run_at]
+            await db.commit()
+
+        for next_run_at, schedule_id in next_entries:
+            self._push((_as_utc(next_run_at), SCHEDULE, schedule_id))
+        await launch_schedule_targets(executions, plan_schedules)
+        return [schedule.id for schedule in schedules]
 
 
 # 全局调度器实例
@@ -523,4 +760,3 @@ async def get_scheduler() -> ScheduledExecutionScheduler:
     if _scheduler is None:
         _scheduler = ScheduledExecutionScheduler()
     return _scheduler
-
@@ -0,0 +1,173 @@
+"""
+执行步骤结果存储
+
+每个步骤（数据驱动的一行数据）的执行结果写入 execution_step_results 表：
+- 摘要列：状态、HTTP 状态码、耗时、响应大小、请求/响应体哈希、断言计数
+- 完整的请求、响应与断言明细 zlib 压缩后存入 payload，只在打开某个步骤时解压
+
+`TestExecution.result["details"]` 只保留第一个步骤的明细（报告页展示），
+不再把所有行的完整响应塞进一个 JSON 列。
+"""
+import json
+import zlib
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.orm import defer
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.execution_step_result import ExecutionStepResult
+
+logger = logging.getLogger(__name__)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def hash_body(value: Any) -> Optional[str]:
+    """请求/响应体的 SHA-256（JSON 按键排序后计算，便于跨执行对比）"""
+    if value is None:
+        return None
+    text = value if isinstance(value, str) else _dumps(value)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress_payload(detail: Dict[str, Any]) -> bytes:
+    return zlib.compress(_dumps(detail).encode("utf-8"), settings.EXECUTION_STEP_PAYLOAD_COMPRESS_LEVEL)
+
+
+def decompress_payload(payload: Optional[bytes]) -> Optional[Dict[str, Any]]:
+    if not payload:
+        return None
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+def summarize_step(execution_id: int, step_index: int, detail: Dict[str, Any]) -> Dict[str, Any]:
+    """把步骤明细转换为一行记录（兼容并发/串行两种明细结构）"""
+    request = detail.get("request") or {}
+    response = detail.get("response") or {}
+    assertions = detail.get("assertions") or []
+
+    response_body = response.get("body_json", response.get("body"))
+    response_text = response.get("body_text") or response.get("text")
+    if response_body is None:
+        response_body = response_text
+
+    url = request.get("url")
+    return {
+        "execution_id": execution_id,
+        "step_index": step_index,
+        "name": (detail.get("name") or "")[:200] or None,
+        "status": detail.get("status") or "failed",
+        "method": (request.get("method") or "")[:10] or None,
+        "url": str(url) if url is not None else None,
+        "status_code": response.get("status_code"),
+        "latency_ms": response.get("latency_ms"),
+        "response_size": len(response_text.encode("utf-8")) if isinstance(response_text, str) else None,
+        "request_body_hash": hash_body(request.get("body")),
+        "response_body_hash": hash_body(response_body),
+        "assertions_total": len(assertions),
+        "assertions_failed": sum(1 for a in assertions if isinstance(a, dict) and not a.get("passed")),
+        "error": detail.get("error") or response.get("error"),
+        "payload": compress_payload(detail),
+    }
+
+
+class StepResultWriter:
+    """单次执行的步骤结果写入器（批量写入）"""
+
+    def __init__(self, execution_id: int):
+        self.execution_id = execution_id
+        self.count = 0
+        self.first_detail: Optional[Dict[str, Any]] = None  # 第一个步骤的明细，写回 result["details"]
+        self._first_index: Optional[int] = None
+        self._pending: List[Dict[str, Any]] = []
+
+    async def start(self):
+        """清理上一次尝试（执行节点崩溃后重试）留下的步骤结果"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(ExecutionStepResult).where(ExecutionStepResult.execution_id == self.execution_id))
+            await db.commit()
+
+    async def add(self, step_index: int, detail: Dict[str, Any]):
+        """记录一个步骤，缓冲区满时批量写入"""
+        if self._first_index is None or step_index < self._first_index:
+            self._first_index = step_index
+            self.first_detail = detail
+        self._pending.append(summarize_step(self.execution_id, step_index, detail))
+        self.count += 1
+        if len(self._pending) >= max(1, settings.EXECUTION_STEP_FLUSH_BATCH):
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(ExecutionStepResult), batch)
+            await db.commit()
+
+    async def close(self):
+        await self.flush()
+
+
+def step_summary_dict(step: ExecutionStepResult) -> Dict[str, Any]:
+    return {
+        "step_index": step.step_index,
+        "name": step.name,
+        "status": step.status,
+        "method": step.method,
+        "url": step.url,
+        "status_code": step.status_code,
+        "latency_ms": step.latency_ms,
+        "response_size": step.response_size,
+        "request_body_hash": step.request_body_hash,
+        "response_body_hash": step.response_body_hash,
+        "assertions_total": step.assertions_total,
+        "assertions_failed": step.assertions_failed,
+        "error": step.error,
+    }
+
+
+async def list_step_results(
+    db,
+    execution_id: int,
+    status: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 100,
+) -> Tuple[int, List[ExecutionStepResult]]:
+    """分页读取步骤摘要（不加载 payload）"""
+    conditions = [ExecutionStepResult.execution_id == execution_id]
+    if status:
+        conditions.append(ExecutionStepResult.status == status)
+
+    total_result = await db.execute(select(func.count(ExecutionStepResult.id)).where(*conditions))
+    total = total_result.scalar() or 0
+
+    result = await db.execute(
+        select(ExecutionStepResult)
+        .options(defer(ExecutionStepResult.payload))
+        .where(*conditions)
+        .order_by(ExecutionStepResult.step_index)
+        .offset(offset)
+        .limit(limit)
+    )
+    return total, list(result.scalars().all())
+
+
+async def get_step_detail(db, execution_id: int, step_index: int) -> Optional[Dict[str, Any]]:
+    """读取并解压单个步骤的完整明细"""
+    result = await db.execute(
+        select(ExecutionStepResult.payload).where(
+            ExecutionStepResult.execution_id == execution_id,
+            ExecutionStepResult.step_index == step_index,
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return decompress_payload(row.payload)
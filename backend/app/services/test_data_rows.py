@@ -0,0 +1,200 @@
+"""
+数据驱动的测试数据行
+
+执行时不再把所有 TestDataConfig.data 拼接成一个大列表：
+- 用例关联的配置通过一次关联查询解析（不加载 data 列）
+- 行数通过 SQL 统计（json_array_elements 在数据库内展开，只返回计数）
+- 数据行按配置依次从数据库流式读取（服务端游标，每次取 EXECUTION_DATA_STREAM_BATCH 行）
+- 旧的 data_driver.data 内联数据直接迭代用例上已加载的列表
+
+每个配置的行数，以及不超过 EXECUTION_DATA_CACHE_MAX_ROWS 行的配置的数据本身，
+按 (配置ID, 更新时间) 缓存在进程内，配置修改后自动失效。
+"""
+import logging
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, case, cast, column, true, literal
+from sqlalchemy.types import JSON
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.test_data_config import TestDataConfig, TestCaseTestDataConfig
+
+logger = logging.getLogger(__name__)
+
+
+def _array_elements():
+    """TestDataConfig.data 展开为 (value, ordinality)；非数组的 data 视为空数组
+
+    迁移脚本把 data 建为 JSONB，模型建表时为 JSON：先统一转换为 json，再使用 json_* 函数。
+    """
+    raw = cast(TestDataConfig.data, JSON)
+    data = case(
+        (func.json_typeof(raw) == "array", raw),
+        else_=cast(literal("[]"), JSON),
+    )
+    return (
+        func.json_array_elements(data)
+        .table_valued(column("value", JSON), with_ordinality="ordinality")
+        .lateral("element")
+    )
+
+
+class _ConfigEntry:
+    """单个配置的缓存项"""
+
+    __slots__ = ("count", "rows")
+
+    def __init__(self, count: int):
+        self.count = count
+        self.rows: Optional[List[Dict[str, Any]]] = None
+
+
+# 进程内配置缓存（LRU），键为 (配置ID, 更新时间)
+_config_cache: "OrderedDict[Tuple[int, Any], _ConfigEntry]" = OrderedDict()
+
+
+def _cache_get(key: Tuple[int, Any]) -> Optional[_ConfigEntry]:
+    entry = _config_cache.get(key)
+    if entry is not None:
+        _config_cache.move_to_end(key)
+    return entry
+
+
+def _cache_put(key: Tuple[int, Any], entry: _ConfigEntry):
+    _config_cache[key] = entry
+    # 同一配置的旧版本不会再被命中，直接淘汰
+    for stale_key in [k for k in _config_cache if k[0] == key[0] and k != key]:
+        del _config_cache[stale_key]
+    while len(_config_cache) > settings.EXECUTION_DATA_CACHE_SIZE:
+        _config_cache.popitem(last=False)
+
+
+def clear_test_data_cache():
+    """清空测试数据缓存"""
+    _config_cache.clear()
+
+
+class TestDataRows:
+    """一次执行的数据行来源，使用 `async for index, row in rows` 迭代（index 从 1 开始）"""
+
+    def __init__(self, configs: Optional[List[Tuple[Tuple[int, Any], _ConfigEntry]]] = None, inline: Optional[List[Any]] = None):
+        self.configs = configs or []
+        self.inline = inline
+        if inline is not None:
+            self.total = len(inline)
+        else:
+            self.total = sum(entry.count for _, entry in self.configs)
+
+    @property
+    def config_ids(self) -> List[int]:
+        return [key[0] for key, _ in self.configs]
+
+    @classmethod
+    async def for_test_case(cls, db, test_case) -> "TestDataRows":
+        """解析用例的数据来源并统计行数；没有数据时返回只含一个空行的来源"""
+        rows = None
+        if test_case.is_data_driven:
+            rows = await TestDataResolver.resolve(db, test_case)
+        if rows is None or rows.total == 0:
+            rows = cls(inline=[{}])
+        return rows
+
+    async def _stream_config(self, config_id: int) -> AsyncIterator[Dict[str, Any]]:
+        elements = _array_elements()
+        query = (
+            select(elements.c.value)
+            .select_from(TestDataConfig)
+            .join(elements, true())
+            .where(
+                TestDataConfig.id == config_id,
+                func.json_typeof(elements.c.value) == "object",
+            )
+            .order_by(elements.c.ordinality)
+            .execution_options(yield_per=max(1, settings.EXECUTION_DATA_STREAM_BATCH))
+        )
+        # 独立会话：流式读取期间不占用调用方的会话
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query)
+            async for value in result.scalars():
+                yield value
+
+    async def _config_rows(self, key: Tuple[int, Any], entry: _ConfigEntry) -> AsyncIterator[Dict[str, Any]]:
+        if entry.rows is not None:
+            for row in entry.rows:
+                yield row
+            return
+        # 小配置边读边收集，完整读完后放入缓存
+        collect: Optional[List[Dict[str, Any]]] = [] if entry.count <= settings.EXECUTION_DATA_CACHE_MAX_ROWS else None
+        async for row in self._stream_config(key[0]):
+            if collect is not None:
+                collect.append(row)
+            yield row
+        if collect is not None and len(collect) == entry.count:
+            entry.rows = collect
+
+    async def __aiter__(self) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        index = 0
+        if self.inline is not None:
+            for row in self.inline:
+                index += 1
+                yield index, row if isinstance(row, dict) else {}
+            return
+        for key, entry in self.configs:
+            async for row in self._config_rows(key, entry):
+                index += 1
+                if index > self.total:
+                    # 统计之后数据被修改：不超出已公布的总数
+                    logger.warning(f"测试数据配置 {key[0]} 在执行期间被修改，忽略多出的数据行")
+                    return
+                yield index, row
+
+
+class TestDataResolver:
+    """解析用例关联的测试数据配置（创建执行与执行节点共用）"""
+
+    @staticmethod
+    async def resolve(db, test_case) -> Optional[TestDataRows]:
+        """返回数据行来源；用例既没有关联配置也没有内联数据时返回 None
+
+        1. 优先使用关联的 TestDataConfig（只统计激活配置中的对象行）
+        2. 向后兼容：旧的 data_driver.data 内联数据
+        """
+        result = await db.execute(
+            select(TestDataConfig.id, TestDataConfig.updated_at, TestDataConfig.created_at, TestDataConfig.is_active)
+            .join(TestCaseTestDataConfig, TestCaseTestDataConfig.test_data_config_id == TestDataConfig.id)
+            .where(TestCaseTestDataConfig.test_case_id == test_case.id)
+            .order_by(TestCaseTestDataConfig.id)
+        )
+        linked = result.all()
+        if linked:
+            keys = [(config_id, updated_at or created_at) for config_id, updated_at, created_at, is_active in linked if is_active]
+            entries = {key: _cache_get(key) for key in keys}
+            missing = [key for key, entry in entries.items() if entry is None]
+            if missing:
+                counts = await TestDataResolver._count_rows(db, [key[0] for key in missing])
+                for key in missing:
+                    entries[key] = _ConfigEntry(counts.get(key[0], 0))
+                    _cache_put(key, entries[key])
+            return TestDataRows(configs=[(key, entries[key]) for key in keys if entries[key].count])
+
+        data_driver_config = test_case.data_driver or {}
+        if isinstance(data_driver_config.get("data"), list):
+            return TestDataRows(inline=data_driver_config["data"])
+        return None
+
+    @staticmethod
+    async def _count_rows(db, config_ids: List[int]) -> Dict[int, int]:
+        elements = _array_elements()
+        result = await db.execute(
+            select(TestDataConfig.id, func.count(elements.c.value))
+            .select_from(TestDataConfig)
+            .join(elements, true())
+            .where(
+                TestDataConfig.id.in_(config_ids),
+                func.json_typeof(elements.c.value) == "object",
+            )
+            .group_by(TestDataConfig.id)
+        )
+        return {config_id: count for config_id, count in result.all()}
@@ -0,0 +1,281 @@
+"""
+测试计划执行
+
+一次计划运行（TestPlanRun）把计划中的每个用例拆成一条测试执行放入执行队列，由执行节点并发运行：
+- 并发：同一次运行最多同时有 max_parallel 个用例在途；项目级（MAX_CONCURRENT_TESTS）与
+  全局（执行节点槽位）上限由执行队列保证
+- 依赖：config.dependencies = {用例ID: [前置用例ID, ...]}，前置用例全部通过后才执行，
+  前置用例失败时跳过
+- fail_fast：任一用例失败后不再启动新用例，已入队未开始的执行标记为取消
+- 共享资源：计划内的执行按环境共享 HTTP 连接池，Token 通过 Token 缓存共享
+
+运行不依赖常驻的协调任务：每当计划内的某个执行结束，执行节点调用 advance_plan_run
+（对运行记录加行锁）推进状态，多个执行节点同时结束执行也不会重复启动用例。
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.test_execution import TestExecution, ExecutionStatus
+from app.models.test_plan import TestPlan
+from app.models.test_plan_run import TestPlanRun
+from app.services.execution_rollup import rollup_finished_executions
+
+logger = logging.getLogger(__name__)
+
+# 用例状态：未开始
+WAITING = "waiting"
+# 用例状态：因前置用例失败或 fail_fast 未执行
+SKIPPED = "skipped"
+
+_TERMINAL = {
+    ExecutionStatus.PASSED.value,
+    ExecutionStatus.FAILED.value,
+    ExecutionStatus.ERROR.value,
+    ExecutionStatus.CANCELLED.value,
+    SKIPPED,
+}
+_UNSUCCESSFUL = _TERMINAL - {ExecutionStatus.PASSED.value}
+
+
+def _parse_dependencies(case_ids: List[int], dependencies: Any) -> Dict[int, List[int]]:
+    """解析并校验依赖配置（只保留计划内的用例，存在循环依赖时抛出 ValueError）"""
+    result: Dict[int, List[int]] = {case_id: [] for case_id in case_ids}
+    if isinstance(dependencies, dict):
+        for case_id, depends_on in dependencies.items():
+            try:
+                case_id = int(case_id)
+            except (TypeError, ValueError):
+                raise ValueError(f"依赖配置中的用例ID无效: {case_id}")
+            if case_id not in result:
+                raise ValueError(f"依赖配置中的用例 {case_id} 不在计划中")
+            for dep in depends_on or []:
+                dep = int(dep)
+                if dep not in result:
+                    raise ValueError(f"用例 {case_id} 依赖的用例 {dep} 不在计划中")
+                if dep != case_id and dep not in result[case_id]:
+                    result[case_id].append(dep)
+
+    # 循环依赖检查（Kahn 拓扑排序）
+    indegree = {case_id: len(deps) for case_id, deps in result.items()}
+    dependents: Dict[int, List[int]] = {case_id: [] for case_id in result}
+    for case_id, deps in result.items():
+        for dep in deps:
+            dependents[dep].append(case_id)
+    ready = [case_id for case_id, degree in indegree.items() if degree == 0]
+    visited = 0
+    while ready:
+        case_id = ready.pop()
+        visited += 1
+        for dependent in dependents[case_id]:
+            indegree[dependent] -= 1
+            if indegree[dependent] == 0:
+                ready.append(dependent)
+    if visited != len(result):
+        cyclic = sorted(case_id for case_id, degree in indegree.items() if degree > 0)
+        raise ValueError(f"用例之间存在循环依赖: {cyclic}")
+    return result
+
+
+def resolve_run_config(plan: TestPlan, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """合并计划配置与本次运行的覆盖配置"""
+    config = dict(plan.config or {})
+    config.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    try:
+        max_parallel = int(config.get("max_parallel") or settings.TEST_PLAN_MAX_PARALLEL)
+    except (TypeError, ValueError):
+        max_parallel = settings.TEST_PLAN_MAX_PARALLEL
+    config["max_parallel"] = max(1, max_parallel)
+    config["fail_fast"] = bool(config.get("fail_fast", False))
+    return config
+
+
+def build_case_states(plan: TestPlan, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """按计划中的用例顺序生成初始用例状态（去重）"""
+    case_ids: List[int] = []
+    for case_id in plan.test_case_ids or []:
+        case_id = int(case_id)
+        if case_id not in case_ids:
+            case_ids.append(case_id)
+    dependencies = _parse_dependencies(case_ids, config.get("dependencies"))
+    return [
+        {"test_case_id": case_id, "execution_id": None, "status": WAITING, "depends_on": dependencies[case_id]}
+        for case_id in case_ids
+    ]
+
+
+def summarize_case_states(case_states: List[Dict[str, Any]], started_at=None, finished_at=None) -> Dict[str, Any]:
+    counts = {"total": len(case_states), "passed": 0, "failed": 0, "error": 0, "skipped": 0, "cancelled": 0}
+    for state in case_states:
+        if state["status"] in counts:
+            counts[state["status"]] += 1
+    counts["duration_ms"] = None
+    if started_at and finished_at:
+        # 数据库读回的时间带时区，新写入的 utcnow 不带时区
+        started_at, finished_at = (
+            value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+            for value in (started_at, finished_at)
+        )
+        counts["duration_ms"] = max(0, int((finished_at - started_at).total_seconds() * 1000))
+    return counts
+
+
+def _final_status(case_states: List[Dict[str, Any]]) -> ExecutionStatus:
+    statuses = {state["status"] for state in case_states}
+    if not statuses or statuses == {ExecutionStatus.PASSED.value}:
+        return ExecutionStatus.PASSED
+    if statuses <= {ExecutionStatus.CANCELLED.value, SKIPPED, ExecutionStatus.PASSED.value} and ExecutionStatus.CANCELLED.value in statuses:
+        return ExecutionStatus.CANCELLED
+    return ExecutionStatus.FAILED
+
+
+async def start_plan_run(
+    db,
+    plan: TestPlan,
+    executed_by: Optional[int] = None,
+    environment: Optional[str] = None,
+    overrides: Optional[Dict[str, Any]] = None,
+) -> TestPlanRun:
+    """创建计划运行并启动第一批用例（依赖配置无效时抛出 ValueError）"""
+    config = resolve_run_config(plan, overrides)
+    case_states = build_case_states(plan, config)
+    run = TestPlanRun(
+        test_plan_id=plan.id,
+        project_id=plan.project_id,
+        status=ExecutionStatus.RUNNING,
+        environment=environment or config.get("environment"),
+        config=config,
+        case_states=case_states,
+        executed_by=executed_by,
+        started_at=datetime.utcnow(),
+    )
+    db.add(run)
+    await db.commit()
+    await db.refresh(run)
+    await advance_plan_run(run.id)
+    await db.refresh(run)
+    return run
+
+
+async def advance_plan_run(run_id: int) -> Optional[TestPlanRun]:
+    """根据计划内执行的最新状态推进运行：启动可运行的用例、跳过被阻塞的用例、汇总结果"""
+    launched: List[Tuple[int, int]] = []
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(TestPlanRun).where(TestPlanRun.id == run_id).with_for_update())
+        run = result.scalar_one_or_none()
+        if run is None or run.finished_at is not None:
+            return run
+
+        config = run.config or {}
+        case_states = [dict(state) for state in run.case_states or []]
+
+        # 1. 同步执行状态
+        executions_result = await db.execute(
+            select(TestExecution.id, TestExecution.status).where(TestExecution.plan_run_id == run.id)
+        )
+        execution_status = {execution_id: status for execution_id, status in executions_result.all()}
+        for state in case_states:
+            status = execution_status.get(state["execution_id"])
+            if status is not None:
+                state["status"] = status.value
+
+        by_case = {state["test_case_id"]: state for state in case_states}
+        failed = any(state["status"] in _UNSUCCESSFUL - {SKIPPED} for state in case_states)
+
+        # 2. fail_fast：不再启动新用例，已入队未开始的执行取消
+        if failed and config.get("fail_fast"):
+            pending_ids = [
+                state["execution_id"] for state in case_states
+                if state["status"] == ExecutionStatus.PENDING.value and state["execution_id"]
+            ]
+            if pending_ids:
+                cancelled = await db.execute(
+                    update(TestExecution)
+                    .where(TestExecution.id.in_(pending_ids), TestExecution.status == ExecutionStatus.PENDING)
+                    .values(status=ExecutionStatus.CANCELLED, finished_at=datetime.utcnow(), logs="测试计划 fail_fast：前序用例失败，已取消")
+                    .returning(TestExecution.id)
+                )
+                cancelled_ids = set(cancelled.scalars().all())
+                await rollup_finished_executions(db, cancelled_ids)
+                for state in case_states:
+                    if state["execution_id"] in cancelled_ids:
+                        state["status"] = ExecutionStatus.CANCELLED.value
+            for state in case_states:
+                if state["status"] == WAITING:
+                    state["status"] = SKIPPED
+
+        # 3. 前置用例未通过的用例跳过（可能级联）
+        changed = True
+        while changed:
+            changed = False
+            for state in case_states:
+                if state["status"] == WAITING and any(
+                    by_case[dep]["status"] in _UNSUCCESSFUL for dep in state["depends_on"]
+                ):
+                    state["status"] = SKIPPED
+                    changed = True
+
+        # 4. 启动前置用例均已通过的用例
+        in_flight = sum(
+            1 for state in case_states
+            if state["status"] in (ExecutionStatus.PENDING.value, ExecutionStatus.RUNNING.value)
+        )
+        slots = max(0, int(config.get("max_parallel") or 1) - in_flight)
+        execution_config = dict(config.get("execution_config") or {})
+        # 计划内的执行按环境共享连接池
+        execution_config["shared_http_clients"] = True
+        execution_config["test_plan_run_id"] = run.id
+        for state in case_states:
+            if slots <= 0:
+                break
+            if state["status"] != WAITING:
+                continue
+            if all(by_case[dep]["status"] == ExecutionStatus.PASSED.value for dep in state["depends_on"]):
+                execution = TestExecution(
+                    test_plan_id=run.test_plan_id,
+                    plan_run_id=run.id,
+                    test_case_id=state["test_case_id"],
+                    project_id=run.project_id,
+                    status=ExecutionStatus.PENDING,
+                    environment=run.environment,
+                    config=execution_config,
+                    logs=f"测试计划运行 {run.id}：已加入队列，等待执行节点领取",
+                )
+                db.add(execution)
+                await db.flush()
+                state["execution_id"] = execution.id
+                state["status"] = ExecutionStatus.PENDING.value
+                launched.append((execution.id, run.project_id))
+                slots -= 1
+
+        # 5. 全部结束时汇总
+        if all(state["status"] in _TERMINAL for state in case_states):
+            run.finished_at = datetime.utcnow()
+            run.status = _final_status(case_states)
+        run.case_states = case_states
+        run.summary = summarize_case_states(case_states, run.started_at, run.finished_at)
+        await db.commit()
+
+    # 提交后再入队，执行节点领取时执行记录已可见
+    if launched:
+        from app.services.execution_queue import get_execution_queue
+        queue = await get_execution_queue()
+        for execution_id, project_id in launched:
+            await queue.enqueue(execution_id, project_id)
+    return run
+
+
+async def notify_execution_finished(execution_id: int):
+    """执行结束后推进所属的计划运行（不属于计划的执行直接返回）"""
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(TestExecution.plan_run_id).where(TestExecution.id == execution_id))
+            run_id = result.scalar_one_or_none()
+        if run_id:
+            await advance_plan_run(run_id)
+    except Exception as e:
+        logger.error(f"推进执行 {execution_id} 所属的测试计划运行失败: {e}", exc_info=True)
@@ -0,0 +1,315 @@
+"""
+被测系统 Token 获取
+
+测试执行、数据驱动执行与压测场景通过 token_config 登录被测系统：
+- refresh_token：请求 Token 接口，依次从 JSONPath 提取器、Set-Cookie、最终 URL、响应文本中提取 Token
+- obtain_token：优先使用执行之间共享的 Token 缓存（见 app.services.token_cache），未命中时登录
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.http_client import HttpClientRegistry, get_http_client_registry
+from app.services.token_cache import get_token_cache
+from app.services.variable_extractors import process_extractors
+
+
+def _normalize_token(token: str, add_bearer: bool = True) -> str:
+    """规范化 token，自动添加 Bearer 前缀（如果需要）
+    
+    Args:
+        token: 原始 token 字符串
+        add_bearer: 是否自动添加 Bearer 前缀（如果还没有）
+    
+    Returns:
+        规范化后的 token
+    """
+    if not token:
+        return token
+    
+    token = token.strip()
+    
+    # 如果配置了自动添加 Bearer，且 token 还没有 Bearer 前缀
+    if add_bearer and not token.lower().startswith('bearer '):
+        return f"Bearer {token}"
+    
+    return token
+
+
+async def refresh_token(
+    token_config: Dict[str, Any],
+    base_url: str,
+    variable_pool: Dict[str, Any],
+    lines: Optional[List[str]] = None,
+    http_clients: Optional[HttpClientRegistry] = None,
+) -> Tuple[bool, str]:
+    """刷新 Token
+    
+    Args:
+        token_config: Token 配置，格式：
+            {
+                "url": "/api/auth/login",  # Token 接口 URL
+                "method": "POST",           # 请求方法
+                "headers": {...},           # 请求头
+                "body": {...},              # 请求体
+                "extractors": [             # 提取器配置
+                    {"name": "token", "type": "json", "path": "$.data.token"}
+                ],
+                "retry_status_codes": [401, 403]  # 触发刷新的状态码
+            }
+        base_url: 基础 URL
+        variable_pool: 变量池，用于存储提取的 token
+        lines: 日志列表（可选）
+        http_clients: HTTP 客户端注册表（可选），未传入时使用进程级共享连接池
+    
+    Returns:
+        (是否成功, 错误信息)
+    """
+    # 检查是否需要自动添加 Bearer 前缀（默认启用）
+    add_bearer_prefix = token_config.get("add_bearer_prefix", True)
+    
+    try:
+        url = token_config.get("url", "")
+        if not url:
+            return False, "Token 配置缺少 url 字段"
+        
+        # 构造完整 URL
+        if not url.startswith("http"):
+            if not url.startswith("/"):
+                url = "/" + url
+            url = f"{base_url}{url}"
+        
+        method = token_config.get("method", "POST").upper()
+        headers = token_config.get("headers", {})
+        body = token_config.get("body", {})
+        params = token_config.get("params", {})
+        
+        # 检查 Content-Type，决定使用 json 还是 data（表单数据）
+        content_type = ""
+        if isinstance(headers, dict):
+            for key, value in headers.items():
+                if key.lower() == "content-type":
+                    content_type = str(value).lower()
+                    break
+        
+        # 发送请求获取 token（跟随重定向）
+        client = (http_clients or get_http_client_registry()).get_client(verify=False, follow_redirects=True)
+        if method in ("GET", "DELETE"):
+            resp = await client.request(method, url, headers=headers, params=params)
+        else:
+            # 如果是表单数据格式，使用 data；否则使用 json
+            if content_type and "application/x-www-form-urlencoded" in content_type:
+                # 表单数据格式
+                resp = await client.request(
+                    method, url, headers=headers, params=params, data=body
+                )
+            else:
+                # JSON 格式（默认）
+                resp = await client.request(
+                    method, url, headers=headers, params=params, json=body
+                )
+            
+        # 接受 2xx 状态码（包括 200, 201, 302 重定向后的最终响应等）
+        if not (200 <= resp.status_code < 300):
+            # 记录响应信息以便调试
+            response_preview = resp.text[:500] if resp.text else "(空响应)"
+            return False, f"Token 接口返回非 2xx 状态码: {resp.status_code}，响应预览: {response_preview}"
+            
+        # 解析响应
+        response_text = resp.text
+        response_json = None
+        try:
+            response_json = resp.json()
+        except:
+            # 如果不是 JSON，记录响应信息
+            pass
+            
+        # 记录响应信息（用于调试）
+        response_headers = dict(resp.headers)
+        if lines is not None:
+            lines.append(f"[调试] Token 接口响应状态码: {resp.status_code}")
+            lines.append(f"[调试] Token 接口响应头: {json.dumps(response_headers, ensure_ascii=False)}")
+            if response_json:
+                lines.append(f"[调试] Token 接口响应 JSON: {json.dumps(response_json, ensure_ascii=False)}")
+            else:
+                lines.append(f"[调试] Token 接口响应文本（前500字符）: {response_text[:500]}")
+            
+        # 提取 token
+        extractors = token_config.get("extractors", [])
+        if not extractors:
+            return False, "Token 配置缺少 extractors 字段"
+            
+        token_name = extractors[0].get("name", "token")
+            
+        # 如果响应是 JSON，使用 JSONPath 提取
+        if response_json is not None:
+            updated_pool, extract_logs = process_extractors(
+                extractors,
+                response_json,
+                response_text,
+                variable_pool
+            )
+                
+            # 更新变量池
+            variable_pool.update(updated_pool)
+                
+            # 检查是否成功提取了 token，并规范化（添加 Bearer 前缀）
+            if token_name in variable_pool:
+                variable_pool[token_name] = _normalize_token(variable_pool[token_name], add_bearer_prefix)
+                return True, f"Token 刷新成功: {token_name}"
+            
+        # 如果 JSON 提取失败，尝试从响应头（Cookie）中提取
+        if token_name not in variable_pool:
+            # 检查 Set-Cookie 头
+            set_cookie = resp.headers.get("Set-Cookie", "")
+            if set_cookie:
+                if lines is not None:
+                    lines.append(f"[调试] 尝试从 Set-Cookie 中提取 token: {set_cookie[:200]}")
+                # 尝试从 Cookie 中提取 token（格式：token=xxx; 或 access_token=xxx;）
+                import re
+                cookie_patterns = [
+                    r'["\']?token["\']?\s*=\s*([^;,\s]+)',
+                    r'["\']?access_token["\']?\s*=\s*([^;,\s]+)',
+                    r'["\']?accessToken["\']?\s*=\s*([^;,\s]+)',
+                ]
+                for pattern in cookie_patterns:
+                    match = re.search(pattern, set_cookie, re.IGNORECASE)
+                    if match:
+                        extracted_token = match.group(1)
+                        if lines is not None:
+                            lines.append("[调试] 从 Set-Cookie 中提取到 token")
+                        variable_pool[token_name] = _normalize_token(extracted_token, add_bearer_prefix)
+                        return True, f"Token 已从 Set-Cookie 中提取: {token_name}"
+                
+            # 检查 httpx 的 cookies 对象（可能包含多个 cookie）
+            if hasattr(resp, 'cookies') and resp.cookies:
+                if lines is not None:
+                    lines.append(f"[调试] 检查 httpx cookies: {dict(resp.cookies)}")
+                import re
+                # 尝试从 cookies 中查找 token
+                for cookie_name, cookie_value in resp.cookies.items():
+                    cookie_name_lower = cookie_name.lower()
+                    if 'token' in cookie_name_lower or 'auth' in cookie_name_lower:
+                        if lines is not None:
+                            lines.append(f"[调试] 从 cookies 中找到可能的 token: {cookie_name}={cookie_value[:50]}...")
+                        variable_pool[token_name] = _normalize_token(str(cookie_value), add_bearer_prefix)
+                        return True, f"Token 已从 cookies 中提取: {cookie_name}"
+                
+            # 检查最终 URL（重定向后的 URL 可能包含 token）
+            final_url = str(resp.url)
+            if lines is not None:
+                lines.append(f"[调试] 最终 URL: {final_url}")
+            # 从 URL 参数中提取 token（支持 Token、token、access_token）
+            import re
+            from urllib.parse import unquote
+            url_token_match = re.search(r'(?:Token|token|access_token)=([^&]+)', final_url, re.IGNORECASE)
+            if url_token_match:
+                extracted_token = url_token_match.group(1)
+                # URL 解码
+                try:
+                    extracted_token = unquote(extracted_token)
+                except:
+                    pass
+                if lines is not None:
+                    lines.append("[调试] 从最终 URL 参数中提取到 token")
+                variable_pool[token_name] = _normalize_token(extracted_token, add_bearer_prefix)
+                return True, f"Token 已从最终 URL 参数中提取: {token_name}"
+            
+        # 如果 JSON 和 Cookie 都失败，尝试从响应文本中提取
+        if token_name not in variable_pool and response_text:
+            import re
+            from urllib.parse import unquote
+                
+            # 优先处理 HTML 重定向链接中的 token（如 <a href="/Help?Token=xxx">）
+            # 这是 ASP.NET 常见的重定向方式
+            href_patterns = [
+                r'<a[^>]*href=["\']([^"\']*[?&]Token=([^&"\']+))["\']',  # <a href="/Help?Token=xxx">
+                r'<a[^>]*href=["\']([^"\']*[?&]token=([^&"\']+))["\']',  # <a href="/Help?token=xxx">
+                r'<a[^>]*href=["\']([^"\']*[?&]access_token=([^&"\']+))["\']',  # <a href="/Help?access_token=xxx">
+            ]
+            for pattern in href_patterns:
+                match = re.search(pattern, response_text, re.IGNORECASE)
+                if match:
+                    extracted_token = match.group(2)  # 提取 token 参数值
+                    # URL 解码
+                    try:
+                        extracted_token = unquote(extracted_token)
+                    except:
+                        pass
+                    if lines is not None:
+                        lines.append(f"[调试] 从 HTML 重定向链接中提取到 token（使用模式 {pattern}）")
+                    variable_pool[token_name] = _normalize_token(extracted_token, add_bearer_prefix)
+                    return True, f"Token 已从 HTML 重定向链接中提取: {token_name}"
+                
+            # 常见的 token 格式：token: "xxx", "token": "xxx", token=xxx
+            # 也支持 HTML 中的 script 标签、隐藏字段等
+            token_patterns = [
+                # JSON 格式：{"token": "xxx"}, token: "xxx"
+                r'["\']?token["\']?\s*[:=]\s*["\']([^"\']+)["\']',
+                r'["\']?access_token["\']?\s*[:=]\s*["\']([^"\']+)["\']',
+                r'["\']?accessToken["\']?\s*[:=]\s*["\']([^"\']+)["\']',
+                # HTML 隐藏字段：<input type="hidden" name="token" value="xxx">
+                r'<input[^>]*name=["\']?token["\']?[^>]*value=["\']([^"\']+)["\']',
+                # JavaScript 变量：var token = "xxx"; const token = "xxx"; let token = "xxx"
+                r'(?:var|const|let)\s+token\s*=\s*["\']([^"\']+)["\']',
+                r'(?:var|const|let)\s+accessToken\s*=\s*["\']([^"\']+)["\']',
+                # URL 参数格式：token=xxx（在文本中）
+                r'(?:^|[?&])Token=([^&\s"\']+)',  # 注意：Token 首字母大写（ASP.NET 常见）
+                r'(?:^|[?&])token=([^&\s"\']+)',
+                r'(?:^|[?&])access_token=([^&\s"\']+)',
+            ]
+            for pattern in token_patterns:
+                match = re.search(pattern, response_text, re.IGNORECASE)
+                if match:
+                    extracted_token = match.group(1)
+                    # URL 解码（如果是 URL 编码的）
+                    try:
+                        extracted_token = unquote(extracted_token)
+                    except:
+                        pass
+                    if lines is not None:
+                        lines.append(f"[调试] 从响应文本中提取到 token（使用模式 {pattern}）")
+                    variable_pool[token_name] = _normalize_token(extracted_token, add_bearer_prefix)
+                    return True, f"Token 已从响应文本中提取: {token_name}"
+            
+        # 如果所有方法都失败，返回错误
+        return False, f"Token 提取失败。已尝试：JSONPath、Set-Cookie、响应文本。状态码: {resp.status_code}"
+                
+    except Exception as e:
+        return False, f"Token 刷新失败: {str(e)}"
+
+
+async def obtain_token(
+    token_config: Dict[str, Any],
+    base_url: str,
+    variable_pool: Dict[str, Any],
+    lines: Optional[List[str]] = None,
+    http_clients: Optional[HttpClientRegistry] = None,
+    force_refresh: bool = False,
+) -> Tuple[bool, str]:
+    """获取 Token 并写入变量池（优先使用执行之间共享的 Token 缓存）
+
+    Args:
+        force_refresh: 目标接口返回 401/403 时为 True，变量池中的 Token 视为已失效
+    """
+    if token_config.get("cache", True) is False:
+        return await refresh_token(token_config, base_url, variable_pool, lines, http_clients)
+
+    async def login():
+        # 使用进程级连接池：后台主动刷新可能发生在本次执行结束之后
+        fresh_pool: Dict[str, Any] = {}
+        success, message = await refresh_token(token_config, base_url, fresh_pool, None, get_http_client_registry())
+        return success, message, fresh_pool
+
+    extractors = token_config.get("extractors") or [{}]
+    stale_token = variable_pool.get(extractors[0].get("name", "token")) if force_refresh else None
+    token_cache = await get_token_cache()
+    success, message, variables = await token_cache.get(
+        token_config,
+        base_url,
+        login,
+        stale_token=stale_token,
+        force=force_refresh and stale_token is None,
+    )
+    if success:
+        variable_pool.update(variables)
+    return success, message
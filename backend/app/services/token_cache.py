@@ -0,0 +1,274 @@
+"""
+被测系统 Token 缓存
+
+测试执行通过 token_config 登录被测系统获取 Token。原来每次执行登录一次、变量池随执行丢弃，
+同一环境下批量执行 200 个用例就要登录 200 次。这里按 (Token 配置, 目标地址) 缓存登录结果：
+- 存储：优先 Redis（多个执行节点共享），不可用时退回进程内实现
+- 过期：Token 是 JWT 时按 exp 计算有效期，否则使用 token_config.cache_ttl 或 TOKEN_CACHE_DEFAULT_TTL
+- 主动刷新：剩余有效期不足 TOKEN_CACHE_REFRESH_BEFORE_SECONDS 时返回缓存并在后台刷新
+- singleflight：进程内同一缓存键只有一个登录请求在途，其他协程等待其结果；
+  跨进程通过 Redis 锁，未抢到锁的进程等待缓存写入
+
+token_config 中设置 "cache": false 可关闭缓存（每次执行单独登录）。
+"""
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.redis_client import get_available_redis
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "qualityguard:token"
+
+# 登录函数：返回 (是否成功, 说明, 登录产生的变量)
+LoginFunc = Callable[[], Awaitable[Tuple[bool, str, Dict[str, Any]]]]
+
+
+def token_cache_key(token_config: Dict[str, Any], base_url: str) -> str:
+    """缓存键：Token 配置内容 + 目标地址（配置修改或切换环境后自然失效）"""
+    fingerprint = json.dumps(token_config, ensure_ascii=False, sort_keys=True, default=str) + "|" + (base_url or "")
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:32]
+
+
+def jwt_expires_at(token: Any) -> Optional[float]:
+    """解析 JWT 的 exp（不校验签名），不是 JWT 时返回 None"""
+    if not isinstance(token, str):
+        return None
+    value = token.strip()
+    if value.lower().startswith("bearer "):
+        value = value[7:].strip()
+    parts = value.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload.encode("ascii")))
+        exp = claims.get("exp") if isinstance(claims, dict) else None
+        return float(exp) if exp is not None else None
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+
+class TokenEntry:
+    """一次登录的结果"""
+
+    def __init__(self, variables: Dict[str, Any], token_name: str, expires_at: float, fetched_at: Optional[float] = None):
+        self.variables = variables
+        self.token_name = token_name
+        self.expires_at = expires_at
+        self.fetched_at = fetched_at or time.time()
+
+    @property
+    def token(self) -> Any:
+        return self.variables.get(self.token_name)
+
+    @property
+    def remaining(self) -> float:
+        return self.expires_at - time.time()
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "variables": self.variables,
+            "token_name": self.token_name,
+            "expires_at": self.expires_at,
+            "fetched_at": self.fetched_at,
+        }, ensure_ascii=False, default=str)
+
+    @classmethod
+    def from_json(cls, payload: str) -> Optional["TokenEntry"]:
+        try:
+            data = json.loads(payload)
+            return cls(data["variables"], data["token_name"], float(data["expires_at"]), float(data["fetched_at"]))
+        except (ValueError, TypeError, KeyError):
+            return None
+
+
+class TokenCache:
+    """Token 缓存（client 为 None 时只在进程内缓存）"""
+
+    def __init__(self, client=None):
+        self.client = client
+        self._memory: Dict[str, TokenEntry] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._background: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "logins": 0, "waits": 0, "background_refreshes": 0}
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self.client is not None else "memory"
+
+    # ------------------------------------------------------------------
+    # 存储
+    # ------------------------------------------------------------------
+
+    async def _load(self, key: str) -> Optional[TokenEntry]:
+        if self.client is not None:
+            try:
+                payload = await self.client.get(f"{_KEY_PREFIX}:{key}")
+                entry = TokenEntry.from_json(payload) if payload else None
+            except Exception as e:
+                logger.warning(f"读取 Token 缓存失败: {e}")
+                entry = self._memory.get(key)
+        else:
+            entry = self._memory.get(key)
+        if entry is not None and entry.remaining <= 0:
+            return None
+        return entry
+
+    async def _store(self, key: str, entry: TokenEntry):
+        self._memory[key] = entry
+        if self.client is not None:
+            ttl = int(entry.remaining)
+            if ttl <= 0:
+                return
+            try:
+                await self.client.set(f"{_KEY_PREFIX}:{key}", entry.to_json(), ex=ttl)
+            except Exception as e:
+                logger.warning(f"写入 Token 缓存失败: {e}")
+
+    async def invalidate(self, key: str):
+        self._memory.pop(key, None)
+        if self.client is not None:
+            try:
+                await self.client.delete(f"{_KEY_PREFIX}:{key}")
+            except Exception as e:
+                logger.warning(f"删除 Token 缓存失败: {e}")
+
+    # ------------------------------------------------------------------
+    # 登录（singleflight）
+    # ------------------------------------------------------------------
+
+    def _expires_at(self, token_config: Dict[str, Any], token: Any) -> float:
+        now = time.time()
+        exp = jwt_expires_at(token)
+        if exp is not None:
+            return exp
+        ttl = token_config.get("cache_ttl") or settings.TOKEN_CACHE_DEFAULT_TTL
+        try:
+            return now + float(ttl)
+        except (TypeError, ValueError):
+            return now + settings.TOKEN_CACHE_DEFAULT_TTL
+
+    async def _login(self, key: str, token_config: Dict[str, Any], token_name: str, login: LoginFunc) -> Tuple[bool, str, Optional[TokenEntry]]:
+        """同一进程内同一缓存键只执行一次登录，其他调用者等待结果"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["waits"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._login_across_processes(key, token_config, token_name, login)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有等待者时避免 "exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _login_across_processes(self, key: str, token_config: Dict[str, Any], token_name: str, login: LoginFunc) -> Tuple[bool, str, Optional[TokenEntry]]:
+        lock_key = f"{_KEY_PREFIX}:{key}:lock"
+        lock_acquired = False
+        if self.client is not None:
+            started = time.time()
+            try:
+                lock_acquired = bool(await self.client.set(lock_key, "1", nx=True, ex=settings.TOKEN_CACHE_LOCK_SECONDS))
+            except Exception as e:
+                logger.warning(f"获取 Token 登录锁失败，直接登录: {e}")
+            if not lock_acquired:
+                # 其他进程正在登录：等待其写入缓存，超时后自行登录
+                deadline = started + settings.TOKEN_CACHE_LOCK_SECONDS
+                while time.time() < deadline:
+                    await asyncio.sleep(0.2)
+                    entry = await self._load(key)
+                    if entry is not None and entry.fetched_at >= started:
+                        self.stats["waits"] += 1
+                        return True, f"Token 已由其他执行节点获取: {token_name}", entry
+        try:
+            self.stats["logins"] += 1
+            success, message, variables = await login()
+            if not success or token_name not in variables:
+                return False, message, None
+            entry = TokenEntry(variables, token_name, self._expires_at(token_config, variables[token_name]))
+            await self._store(key, entry)
+            return True, message, entry
+        finally:
+            if lock_acquired:
+                try:
+                    await self.client.delete(lock_key)
+                except Exception:
+                    pass
+
+    def _refresh_in_background(self, key: str, token_config: Dict[str, Any], token_name: str, login: LoginFunc):
+        task = self._background.get(key)
+        if task is not None and not task.done():
+            return
+        self.stats["background_refreshes"] += 1
+
+        async def refresh():
+            try:
+                await self._login(key, token_config, token_name, login)
+            except Exception as e:
+                logger.warning(f"后台刷新 Token 失败: {e}")
+            finally:
+                self._background.pop(key, None)
+
+        self._background[key] = asyncio.create_task(refresh())
+
+    async def get(
+        self,
+        token_config: Dict[str, Any],
+        base_url: str,
+        login: LoginFunc,
+        stale_token: Any = None,
+        force: bool = False,
+    ) -> Tuple[bool, str, Dict[str, Any]]:
+        """获取 Token 变量
+
+        Args:
+            login: 缓存未命中时调用的登录函数
+            stale_token: 被目标接口拒绝（401/403）的 Token；缓存中的 Token 与之相同时才重新登录，
+                已被其他执行刷新时直接使用新 Token
+            force: 忽略缓存直接登录（stale_token 为空时的 401/403 重试）
+
+        Returns:
+            (是否成功, 说明, 登录产生的变量)
+        """
+        extractors = token_config.get("extractors") or [{}]
+        token_name = extractors[0].get("name", "token")
+        key = token_cache_key(token_config, base_url)
+
+        if not force:
+            entry = await self._load(key)
+            if entry is not None and (stale_token is None or entry.token != stale_token):
+                self.stats["hits"] += 1
+                if entry.remaining < settings.TOKEN_CACHE_REFRESH_BEFORE_SECONDS:
+                    self._refresh_in_background(key, token_config, token_name, login)
+                return True, f"使用缓存的 Token: {token_name}（剩余有效期 {int(entry.remaining)} 秒）", dict(entry.variables)
+            if entry is not None:
+                await self.invalidate(key)
+
+        success, message, entry = await self._login(key, token_config, token_name, login)
+        return success, message, dict(entry.variables) if entry is not None else {}
+
+
+_token_cache: Optional[TokenCache] = None
+
+
+async def get_token_cache() -> TokenCache:
+    """获取 Token 缓存实例（优先使用 Redis，不可用时退回进程内实现）"""
+    global _token_cache
+    if _token_cache is None:
+        client = await get_available_redis() if settings.TOKEN_CACHE_BACKEND == "redis" else None
+        _token_cache = TokenCache(client)
+    return _token_cache
@@ -0,0 +1,120 @@
+"""
+响应变量提取
+
+按用例配置的 extractors 从接口响应中提取变量写入变量池，供后续步骤与 Token 登录使用：
+- json：JSONPath（同一响应的多个路径一次遍历求值，见 app.utils.json_path）
+- regex：正则表达式，取第一个捕获组
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils import json_path
+
+
+def _extract_variable_by_regex(response_text: str, pattern: str) -> Optional[str]:
+    """通过正则表达式从响应文本中提取数据
+    
+    Args:
+        response_text: 响应文本
+        pattern: 正则表达式，需要包含捕获组，如 r"token=(\\w+)"
+    
+    Returns:
+        提取到的第一个捕获组的值，如果匹配失败则返回 None
+    """
+    import re
+    match = re.search(pattern, response_text)
+    if match:
+        # 返回第一个捕获组
+        if match.groups():
+            return match.group(1)
+        # 如果没有捕获组，返回整个匹配
+        return match.group(0)
+    return None
+
+
+def process_extractors(
+    extractors: List[Dict[str, Any]], 
+    response_json: Any, 
+    response_text: str,
+    variable_pool: Dict[str, Any]
+) -> Tuple[Dict[str, Any], List[str]]:
+    """处理提取器配置，从响应中提取变量
+    
+    Args:
+        extractors: 提取器配置列表，格式：
+            [
+                {"name": "token", "type": "json", "path": "$.data.token"},
+                {"name": "userId", "type": "regex", "pattern": "userId=(\\d+)"}
+            ]
+        response_json: 响应的 JSON 数据
+        response_text: 响应的文本数据
+        variable_pool: 变量池（会被修改）
+    
+    Returns:
+        (更新后的变量池, 提取日志列表)
+    """
+    logs = []
+    
+    # 一次遍历求出所有 JSON 提取器的值（公共路径前缀只遍历一次）
+    json_values = json_path.extract_many(response_json, [
+        extractor.get("path") for extractor in extractors
+        if isinstance(extractor, dict) and extractor.get("type", "json") == "json" and extractor.get("path")
+    ])
+    
+    for extractor in extractors:
+        if not isinstance(extractor, dict):
+            logs.append(f"[警告] 提取器配置格式错误: {extractor}")
+            continue
+        
+        name = extractor.get("name")
+        extract_type = extractor.get("type", "json")
+        
+        if not name:
+            logs.append(f"[警告] 提取器缺少 'name' 字段: {extractor}")
+            continue
+        
+        extracted_value = None
+        
+        try:
+            if extract_type == "json":
+                path = extractor.get("path")
+                if not path:
+                    logs.append(f"[警告] JSON 提取器 '{name}' 缺少 'path' 字段")
+                    continue
+                extracted_value = json_values.get(path)
+                
+            elif extract_type == "regex":
+                pattern = extractor.get("pattern")
+                if not pattern:
+                    logs.append(f"[警告] 正则提取器 '{name}' 缺少 'pattern' 字段")
+                    continue
+                extracted_value = _extract_variable_by_regex(response_text, pattern)
+                
+            elif extract_type == "header":
+                # 从响应头中提取
+                header_name = extractor.get("header")
+                if not header_name:
+                    logs.append(f"[警告] Header 提取器 '{name}' 缺少 'header' 字段")
+                    continue
+                # 注意：这里需要从实际的响应对象中获取 headers
+                # 暂时标记为不支持，后续可以扩展
+                logs.append(f"[警告] Header 提取器暂未实现: '{name}'")
+                continue
+                
+            else:
+                logs.append(f"[警告] 不支持的提取类型 '{extract_type}' for '{name}'")
+                continue
+            
+            if extracted_value is not None:
+                variable_pool[name] = extracted_value
+                # 限制日志长度
+                value_str = str(extracted_value)
+                if len(value_str) > 100:
+                    value_str = value_str[:100] + "..."
+                logs.append(f"✓ 提取变量 '{name}' = {value_str}")
+            else:
+                logs.append(f"✗ 提取变量 '{name}' 失败：未找到匹配的数据")
+                
+        except Exception as e:
+            logs.append(f"✗ 提取变量 '{name}' 失败：{str(e)}")
+    
+    return variable_pool, logs
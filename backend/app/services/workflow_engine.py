@@ -0,0 +1,410 @@
+"""
+多接口用例（流程编排）执行引擎
+
+`TestCase.workflow` 格式：
+    {
+        "mode": "dag",                       # dag（默认）/ sequential（按步骤顺序串行）
+        "steps": [
+            {
+                "step_id": 1,
+                "name": "登录",
+                "interface_id": 1,           # 引用接口管理中的接口，或直接配置 request
+                "request": {"method": "POST", "path": "/login", "headers": {}, "params": {}, "body": {}},
+                "data_mapping": {"username": "$var.user", "body.password": "${password}"},
+                "extract": [{"name": "token", "path": "$.data.token"}],
+                "assertions": [...],
+                "depends_on": [],            # 显式依赖（可选）
+                "on_error": "stop",          # stop：停止启动新步骤；continue：继续执行其他步骤
+                "cache": true                # GET/HEAD 请求在同一次运行内复用相同请求的响应
+            }
+        ],
+        "data_flow": {"user": {"from": 1, "extract": "$.data.user"}}
+    }
+
+步骤按 DAG 调度：除显式的 depends_on 外，步骤引用了其他步骤产出的变量（data_flow / extract）时
+自动依赖该步骤；没有依赖关系的步骤并发执行，总耗时为关键路径耗时而不是所有步骤耗时之和。
+"""
+import re
+import copy
+import json
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from app.core.http_client import HttpClientRegistry
+from app.models.interface import Interface
+from app.utils import json_path
+from app.utils.template import Template, VAR_PATTERN, render
+
+logger = logging.getLogger(__name__)
+
+# `$var.name` 形式的变量引用（流程编排配置中沿用的写法）
+_VAR_REF = re.compile(r"^\$var\.(\w+)$")
+_PATH_PARAM = re.compile(r"\{(\w+)\}")
+
+STOP = "stop"
+CONTINUE = "continue"
+
+PASSED = "passed"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+_CACHEABLE_METHODS = ("GET", "HEAD")
+
+# 断言函数：(断言配置, 状态码, 响应JSON, 变量) -> (是否通过, 断言详情)
+AssertionFunc = Callable[[List[Dict[str, Any]], Optional[int], Any, Dict[str, Any]], Tuple[bool, List[Dict[str, Any]]]]
+
+
+class WorkflowError(ValueError):
+    """流程编排配置错误"""
+
+
+def _collect_references(value: Any, names: Set[str]):
+    """收集配置中引用的变量名（${name} 与 $var.name）"""
+    if isinstance(value, str):
+        match = _VAR_REF.match(value.strip())
+        if match:
+            names.add(match.group(1))
+        names.update(VAR_PATTERN.findall(value))
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_references(item, names)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_references(item, names)
+
+
+class WorkflowStep:
+    """流程中的一个步骤"""
+
+    def __init__(self, config: Dict[str, Any], index: int):
+        self.config = config
+        self.step_id = config.get("step_id", index)
+        self.name = config.get("name") or f"步骤 {self.step_id}"
+        self.interface_id = config.get("interface_id")
+        self.request: Dict[str, Any] = dict(config.get("request") or {})
+        self.data_mapping: Dict[str, Any] = config.get("data_mapping") or {}
+        self.extractors: List[Dict[str, Any]] = [e for e in config.get("extract") or [] if isinstance(e, dict) and e.get("name")]
+        self.assertions: List[Dict[str, Any]] = config.get("assertions") or []
+        self.on_error = CONTINUE if config.get("on_error") == CONTINUE else STOP
+        self.cache = config.get("cache", True) is not False
+        self.depends_on: Set[Any] = set(config.get("depends_on") or [])
+        self.produces: Set[str] = {e["name"] for e in self.extractors}
+        self.data_flow: Dict[str, str] = {}  # 变量名 -> 提取路径（来自 data_flow 中 from 为本步骤的项）
+        self._template: Optional[Template] = None
+
+    @property
+    def references(self) -> Set[str]:
+        names: Set[str] = set()
+        _collect_references(self.request, names)
+        _collect_references(self.data_mapping, names)
+        _collect_references(self.assertions, names)
+        return names
+
+    @property
+    def template(self) -> Template:
+        if self._template is None:
+            self._template = Template(self.request)
+        return self._template
+
+
+class WorkflowDefinition:
+    """解析后的流程：步骤、依赖关系与变量来源"""
+
+    def __init__(self, workflow: Dict[str, Any]):
+        if not isinstance(workflow, dict) or not isinstance(workflow.get("steps"), list) or not workflow["steps"]:
+            raise WorkflowError("流程编排缺少 steps")
+        self.steps: List[WorkflowStep] = [
+            WorkflowStep(step, index) for index, step in enumerate(workflow["steps"], start=1) if isinstance(step, dict)
+        ]
+        self.by_id: Dict[Any, WorkflowStep] = {}
+        for step in self.steps:
+            if step.step_id in self.by_id:
+                raise WorkflowError(f"步骤ID重复: {step.step_id}")
+            self.by_id[step.step_id] = step
+
+        # data_flow：变量由哪个步骤产出
+        for name, flow in (workflow.get("data_flow") or {}).items():
+            if not isinstance(flow, dict):
+                continue
+            source = self.by_id.get(flow.get("from"))
+            if source is None:
+                raise WorkflowError(f"data_flow 变量 {name} 的来源步骤 {flow.get('from')} 不存在")
+            source.data_flow[name] = flow.get("extract") or ""
+            source.produces.add(name)
+
+        producers: Dict[str, WorkflowStep] = {}
+        for step in self.steps:
+            for name in step.produces:
+                producers[name] = step
+
+        previous: Optional[WorkflowStep] = None
+        for step in self.steps:
+            for dep in step.depends_on:
+                if dep not in self.by_id:
+                    raise WorkflowError(f"步骤 {step.step_id} 依赖的步骤 {dep} 不存在")
+            # 引用了其他步骤产出的变量时自动依赖该步骤
+            for name in step.references:
+                producer = producers.get(name)
+                if producer is not None and producer is not step:
+                    step.depends_on.add(producer.step_id)
+            if workflow.get("mode") == "sequential" and previous is not None:
+                step.depends_on.add(previous.step_id)
+            step.depends_on.discard(step.step_id)
+            previous = step
+        self._check_cycles()
+
+    def _check_cycles(self):
+        remaining = {step.step_id: set(step.depends_on) for step in self.steps}
+        while remaining:
+            ready = [step_id for step_id, deps in remaining.items() if not deps]
+            if not ready:
+                raise WorkflowError(f"步骤之间存在循环依赖: {sorted(map(str, remaining))}")
+            for step_id in ready:
+                del remaining[step_id]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    @property
+    def interface_ids(self) -> Set[int]:
+        return {step.interface_id for step in self.steps if step.interface_id and not step.request.get("path")}
+
+    async def load_interfaces(self, db):
+        """一次查询加载步骤引用的接口，补全步骤的请求配置（步骤中的 request 字段优先）"""
+        ids = self.interface_ids
+        if not ids:
+            return
+        result = await db.execute(select(Interface).where(Interface.id.in_(ids)))
+        interfaces = {interface.id: interface for interface in result.scalars().all()}
+        for step in self.steps:
+            interface = interfaces.get(step.interface_id)
+            if interface is None or step.request.get("path"):
+                continue
+            method = interface.method.value if hasattr(interface.method, "value") else interface.method
+            step.request = {
+                "method": method,
+                "path": interface.path,
+                "headers": interface.headers or {},
+                "params": interface.query_params or {},
+                "path_params": interface.path_params or {},
+                "body": interface.body_params or interface.form_params or None,
+                **step.request,
+            }
+            step._template = None
+
+
+def _resolve_mapping_value(value: Any, variables: Dict[str, Any]) -> Any:
+    if isinstance(value, str):
+        match = _VAR_REF.match(value.strip())
+        if match:
+            return variables.get(match.group(1))
+    return render(value, variables)
+
+
+def _set_path(target: Dict[str, Any], dotted: List[str], value: Any):
+    for key in dotted[:-1]:
+        child = target.get(key)
+        if not isinstance(child, dict):
+            child = {}
+            target[key] = child
+        target = child
+    target[dotted[-1]] = value
+
+
+class WorkflowRun:
+    """一次流程运行（数据驱动时每行数据一次）"""
+
+    def __init__(
+        self,
+        definition: WorkflowDefinition,
+        base_url: str,
+        variables: Dict[str, Any],
+        http_clients: HttpClientRegistry,
+        evaluate_assertions: Optional[AssertionFunc] = None,
+        lines: Optional[List[str]] = None,
+        label: str = "",
+    ):
+        self.definition = definition
+        self.base_url = base_url
+        self.variables = dict(variables)
+        self.http_clients = http_clients
+        self.evaluate_assertions = evaluate_assertions
+        self.lines = lines if lines is not None else []
+        self.label = label
+        self.results: Dict[Any, Dict[str, Any]] = {}
+        self.cache_hits = 0
+        self._response_cache: Dict[str, asyncio.Future] = {}
+
+    def _log(self, message: str):
+        self.lines.append(f"{self.label}{message}")
+
+    # ------------------------------------------------------------------
+    # 请求
+    # ------------------------------------------------------------------
+
+    def _build_request(self, step: WorkflowStep) -> Dict[str, Any]:
+        request = step.template.render(self.variables) or {}
+        if step.data_mapping:
+            # 渲染结果会复用模板中的静态子树，修改前先复制
+            request = copy.deepcopy(request)
+        mapped_vars: Dict[str, Any] = {}
+        for target, value in step.data_mapping.items():
+            resolved = _resolve_mapping_value(value, self.variables)
+            parts = str(target).split(".")
+            if len(parts) > 1 and parts[0] in ("body", "params", "headers", "path_params"):
+                if not isinstance(request.get(parts[0]), dict):
+                    request[parts[0]] = {}
+                _set_path(request[parts[0]], parts[1:], resolved)
+                continue
+            mapped_vars[target] = resolved
+            # 与接口参数同名时直接替换参数值
+            for section in ("body", "params", "path_params"):
+                if isinstance(request.get(section), dict) and target in request[section]:
+                    request[section][target] = resolved
+        if mapped_vars:
+            request = render(request, {**self.variables, **mapped_vars})
+
+        path = str(request.get("path") or "")
+        path_params = request.get("path_params") or {}
+        if path_params:
+            path = _PATH_PARAM.sub(lambda m: str(path_params.get(m.group(1), m.group(0))), path)
+        url = path if path.startswith("http") or not self.base_url else f"{self.base_url}{path}"
+        return {
+            "method": str(request.get("method") or "GET").upper(),
+            "url": url,
+            "headers": {k: str(v) for k, v in (request.get("headers") or {}).items() if v is not None},
+            "params": request.get("params") or {},
+            "body": request.get("body"),
+        }
+
+    async def _send(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        client = self.http_clients.get_client(verify=False)
+        kwargs: Dict[str, Any] = {"headers": request["headers"], "params": request["params"]}
+        if request["method"] not in ("GET", "DELETE", "HEAD") and request["body"] is not None:
+            kwargs["json"] = request["body"]
+        started = time.monotonic()
+        resp = await client.request(request["method"], request["url"], **kwargs)
+        latency_ms = int((time.monotonic() - started) * 1000)
+        try:
+            body_json = resp.json()
+        except ValueError:
+            body_json = None
+        return {
+            "status_code": resp.status_code,
+            "latency_ms": latency_ms,
+            "body_json": body_json,
+            "body_text": resp.text,
+        }
+
+    async def _send_cached(self, step: WorkflowStep, request: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """幂等请求在同一次运行内只发送一次（并发的相同请求等待同一个结果）"""
+        if not step.cache or request["method"] not in _CACHEABLE_METHODS:
+            return await self._send(request), False
+        key = json.dumps([request["method"], request["url"], request["params"], request["headers"]], sort_keys=True, default=str)
+        future = self._response_cache.get(key)
+        if future is not None:
+            self.cache_hits += 1
+            return await asyncio.shield(future), True
+        future = asyncio.get_running_loop().create_future()
+        self._response_cache[key] = future
+        try:
+            response = await self._send(request)
+        except BaseException as e:
+            # 失败的请求不缓存
+            self._response_cache.pop(key, None)
+            future.set_exception(e)
+            future.exception()
+            raise
+        future.set_result(response)
+        return response, False
+
+    # ------------------------------------------------------------------
+    # 步骤
+    # ------------------------------------------------------------------
+
+    async def _run_step(self, step: WorkflowStep) -> Dict[str, Any]:
+        started = time.monotonic()
+        detail: Dict[str, Any] = {"step_id": step.step_id, "name": step.name, "status": FAILED}
+        try:
+            request = self._build_request(step)
+            detail["request"] = request
+            response, cached = await self._send_cached(step, request)
+            detail["response"] = {**response, "cached": cached}
+            self._log(f"[{step.name}] {request['method']} {request['url']} -> {response['status_code']}"
+                      f"{'（复用缓存响应）' if cached else ''}")
+
+            extracted: Dict[str, Any] = {}
+            body_json = response.get("body_json")
+            for name, path in step.data_flow.items():
+                extracted[name] = json_path.extract(body_json, path) if path else body_json
+            for extractor in step.extractors:
+                extracted[extractor["name"]] = json_path.extract(body_json, extractor.get("path") or "")
+            detail["extracted"] = extracted
+
+            passed = response["status_code"] < 400
+            assertion_results: List[Dict[str, Any]] = []
+            if step.assertions and self.evaluate_assertions is not None:
+                passed, assertion_results = self.evaluate_assertions(
+                    step.assertions, response["status_code"], body_json, {**self.variables, **extracted}
+                )
+            detail["assertions"] = assertion_results
+            detail["status"] = PASSED if passed else FAILED
+            detail["variables"] = extracted
+        except Exception as e:
+            detail["error"] = str(e)
+            self._log(f"[{step.name}] 执行出错: {e}")
+        detail["elapsed_ms"] = int((time.monotonic() - started) * 1000)
+        return detail
+
+    async def run(self) -> Dict[str, Any]:
+        """按 DAG 执行所有步骤，返回 {status, steps, variables, elapsed_ms, cache_hits}"""
+        started = time.monotonic()
+        steps = self.definition.steps
+        waiting = {step.step_id: set(step.depends_on) for step in steps}
+        running: Dict[asyncio.Task, WorkflowStep] = {}
+        stopped = False
+
+        def launch_ready():
+            for step in steps:
+                if step.step_id in waiting and not waiting[step.step_id]:
+                    del waiting[step.step_id]
+                    running[asyncio.create_task(self._run_step(step))] = step
+
+        try:
+            launch_ready()
+            while running:
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step = running.pop(task)
+                    detail = task.result()
+                    self.results[step.step_id] = detail
+                    if detail["status"] == PASSED or step.on_error == CONTINUE:
+                        self.variables.update(detail.get("variables") or {})
+                        for deps in waiting.values():
+                            deps.discard(step.step_id)
+                    if detail["status"] != PASSED and step.on_error == STOP:
+                        stopped = True
+                if not stopped:
+                    launch_ready()
+        finally:
+            for task in running:
+                task.cancel()
+
+        # 未执行的步骤（前置步骤失败或流程已停止）
+        for step in steps:
+            if step.step_id not in self.results:
+                self.results[step.step_id] = {"step_id": step.step_id, "name": step.name, "status": SKIPPED}
+
+        ordered = [self.results[step.step_id] for step in steps]
+        status = PASSED if all(result["status"] == PASSED for result in ordered) else FAILED
+        return {
+            "status": status,
+            "steps": ordered,
+            "variables": self.variables,
+            "elapsed_ms": int((time.monotonic() - started) * 1000),
+            "serial_ms": sum(result.get("elapsed_ms") or 0 for result in ordered),
+            "cache_hits": self.cache_hits,
+        }
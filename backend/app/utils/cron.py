@@ -0,0 +1,228 @@
+"""
+Cron 表达式解析与下次触发时间计算
+
+支持的语法：
+- 5 段 `分 时 日 月 周`，或 6 段 `秒 分 时 日 月 周`
+- `*`、`?`（同 `*`）、列表 `1,3,5`、范围 `1-5`、步长 `*/15`、`10-50/10`
+- 月份与星期可以使用英文缩写（JAN-DEC、SUN-SAT），星期 0 和 7 都表示周日
+- 宏：@yearly / @annually、@monthly、@weekly、@daily / @midnight、@hourly
+- 日与周同时限定时按 Vixie cron 的规则取并集（任一匹配即触发）
+
+表达式只解析一次并缓存；计算下次触发时间时逐个字段跳到下一个允许的值，
+而不是按秒 / 分钟逐个尝试。时间按指定时区的本地时间匹配：夏令时跳过的
+本地时间不触发，重复的本地时间只触发第一次。
+"""
+import calendar
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+class CronError(ValueError):
+    """Cron 表达式或时区无效"""
+
+
+_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+_MONTH_NAMES = {
+    name: index + 1
+    for index, name in enumerate(["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"])
+}
+_DAY_NAMES = {"SUN": 0, "MON": 1, "TUE": 2, "WED": 3, "THU": 4, "FRI": 5, "SAT": 6}
+
+# (字段名, 最小值, 最大值, 名称映射)
+_SECOND = ("秒", 0, 59, None)
+_MINUTE = ("分", 0, 59, None)
+_HOUR = ("时", 0, 23, None)
+_DAY = ("日", 1, 31, None)
+_MONTH = ("月", 1, 12, _MONTH_NAMES)
+_WEEKDAY = ("周", 0, 7, _DAY_NAMES)
+
+# 找不到触发时间时最多向后搜索的年数（如 `0 0 30 2 *`）
+_MAX_YEARS = 8
+
+
+def _parse_value(token: str, field) -> int:
+    name, low, high, names = field
+    token = token.strip().upper()
+    if names and token in names:
+        return names[token]
+    try:
+        value = int(token)
+    except ValueError:
+        raise CronError(f"{name}字段的值无效: {token}")
+    if not low <= value <= high:
+        raise CronError(f"{name}字段的值超出范围 {low}-{high}: {value}")
+    return value
+
+
+def _parse_field(text: str, field) -> Tuple[List[int], bool]:
+    """解析一个字段，返回 (允许的值（升序）, 是否为 `*`)"""
+    name, low, high, _ = field
+    if text in ("*", "?"):
+        return list(range(low, high + 1)), True
+    values = set()
+    for part in text.split(","):
+        if not part:
+            raise CronError(f"{name}字段为空: {text}")
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            try:
+                step = int(step_text)
+            except ValueError:
+                raise CronError(f"{name}字段的步长无效: {step_text}")
+            if step <= 0:
+                raise CronError(f"{name}字段的步长必须大于0: {step}")
+        if part in ("*", "?"):
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = _parse_value(start_text, field), _parse_value(end_text, field)
+            if start > end:
+                raise CronError(f"{name}字段的范围无效: {part}")
+        else:
+            start = _parse_value(part, field)
+            # `5/15` 表示从 5 开始每 15 个单位
+            end = high if step > 1 else start
+        values.update(range(start, end + 1, step))
+    return sorted(values), False
+
+
+class CronExpression:
+    """编译后的 Cron 表达式"""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        text = expression.strip()
+        text = _MACROS.get(text.lower(), text)
+        fields = text.split()
+        if len(fields) == 5:
+            fields.insert(0, "0")
+        if len(fields) != 6:
+            raise CronError(f"Cron 表达式应为 5 段或 6 段: {expression}")
+
+        self.seconds, _ = _parse_field(fields[0], _SECOND)
+        self.minutes, _ = _parse_field(fields[1], _MINUTE)
+        self.hours, _ = _parse_field(fields[2], _HOUR)
+        self.days, days_any = _parse_field(fields[3], _DAY)
+        self.months, _ = _parse_field(fields[4], _MONTH)
+        weekdays, weekdays_any = _parse_field(fields[5], _WEEKDAY)
+        self.weekdays = {0 if day == 7 else day for day in weekdays}
+        self._days_set = set(self.days)
+        self._months_set = set(self.months)
+        # 日与周都限定时取并集，只限定其一时以限定的为准
+        self._union = not days_any and not weekdays_any
+        self._days_any = days_any
+        self._weekdays_any = weekdays_any
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
+
+    def _day_matches(self, value: datetime) -> bool:
+        day_ok = value.day in self._days_set
+        # Python 的 weekday() 周一为 0，cron 周日为 0
+        weekday_ok = (value.weekday() + 1) % 7 in self.weekdays
+        if self._union:
+            return day_ok or weekday_ok
+        return (self._days_any or day_ok) and (self._weekdays_any or weekday_ok)
+
+    def _next_local(self, start: datetime) -> Optional[datetime]:
+        """不早于 start 的第一个匹配的本地时间（不带时区）"""
+        value = start
+        limit_year = start.year + _MAX_YEARS
+        while value.year <= limit_year:
+            if value.month not in self._months_set:
+                index = bisect_left(self.months, value.month)
+                if index < len(self.months):
+                    value = value.replace(month=self.months[index], day=1, hour=0, minute=0, second=0)
+                else:
+                    value = value.replace(year=value.year + 1, month=self.months[0], day=1, hour=0, minute=0, second=0)
+                continue
+            if not self._day_matches(value):
+                if self._weekdays_any:
+                    # 只限定日期：直接跳到本月下一个允许的日期
+                    index = bisect_left(self.days, value.day)
+                    last_day = calendar.monthrange(value.year, value.month)[1]
+                    if index < len(self.days) and self.days[index] <= last_day:
+                        value = value.replace(day=self.days[index], hour=0, minute=0, second=0)
+                        continue
+                    value = value.replace(day=last_day)
+                value = (value + timedelta(days=1)).replace(hour=0, minute=0, second=0)
+                continue
+            if value.hour not in self.hours:
+                index = bisect_left(self.hours, value.hour)
+                if index < len(self.hours):
+                    value = value.replace(hour=self.hours[index], minute=0, second=0)
+                else:
+                    value = (value + timedelta(days=1)).replace(hour=0, minute=0, second=0)
+                continue
+            if value.minute not in self.minutes:
+                index = bisect_left(self.minutes, value.minute)
+                if index < len(self.minutes):
+                    value = value.replace(minute=self.minutes[index], second=0)
+                else:
+                    value = (value + timedelta(hours=1)).replace(minute=0, second=0)
+                continue
+            if value.second not in self.seconds:
+                index = bisect_left(self.seconds, value.second)
+                if index < len(self.seconds):
+                    value = value.replace(second=self.seconds[index])
+                else:
+                    value = (value + timedelta(minutes=1)).replace(second=0)
+                continue
+            return value
+        return None
+
+    def next_after(self, after: datetime, tz: "ZoneInfo") -> Optional[datetime]:
+        """after（带时区）之后的下一次触发时间（UTC），不存在时返回 None"""
+        after = after.astimezone(timezone.utc)
+        local = after.astimezone(tz).replace(tzinfo=None, microsecond=0) + timedelta(seconds=1)
+        while True:
+            candidate = self._next_local(local)
+            if candidate is None:
+                return None
+            aware = candidate.replace(tzinfo=tz)
+            fire_at = aware.astimezone(timezone.utc)
+            # 夏令时跳过的本地时间换算回来不一致，不触发；重复的本地时间只取第一次
+            if fire_at.astimezone(tz).replace(tzinfo=None) == candidate and fire_at > after:
+                return fire_at
+            local = candidate + timedelta(seconds=1)
+
+    def iter_after(self, after: datetime, tz: "ZoneInfo") -> Iterator[datetime]:
+        """依次产出 after 之后的触发时间（UTC）"""
+        while True:
+            after = self.next_after(after, tz)
+            if after is None:
+                return
+            yield after
+
+
+@lru_cache(maxsize=1024)
+def parse_cron(expression: str) -> CronExpression:
+    """解析 Cron 表达式（缓存编译结果），无效时抛出 CronError"""
+    return CronExpression(expression)
+
+
+@lru_cache(maxsize=128)
+def get_timezone(name: str) -> ZoneInfo:
+    """按 IANA 名称获取时区，无效时抛出 CronError"""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise CronError(f"未知的时区: {name}")
+
+
+def next_fire_time(expression: str, after: datetime, timezone_name: str) -> Optional[datetime]:
+    """计算 after 之后的下一次触发时间（UTC）"""
+    return parse_cron(expression).next_after(after, get_timezone(timezone_name))
@@ -0,0 +1,164 @@
+"""
+HDR 风格的延迟直方图
+
+按「对数分段 + 段内线性」把值映射到桶（与 HdrHistogram 相同的编码）：
+- 每个 2 的幂区间分成 SUB_BUCKET_HALF_COUNT 个等宽子桶，相对误差不超过 1/128（约 0.8%）
+- 只记录非零桶（稀疏字典），内存只与出现过的桶数有关（最多几千个），与记录次数无关
+- 同样参数的直方图可以直接按桶相加合并（多个压测进程 / 时间段）
+- 可序列化为紧凑的 dict，跨进程传递或落库
+
+值为非负整数，单位由调用方决定（性能测试使用微秒）。
+"""
+from typing import Any, Dict, Iterable, Optional
+
+# 子桶数 256（每个 2 的幂区间 128 个有效子桶），保证 2 位有效数字
+_SUB_BUCKET_HALF_COUNT_MAGNITUDE = 7
+SUB_BUCKET_HALF_COUNT = 1 << _SUB_BUCKET_HALF_COUNT_MAGNITUDE
+_SUB_BUCKET_MASK = (SUB_BUCKET_HALF_COUNT << 1) - 1
+
+# 默认可记录的最大值：1 小时（微秒）
+DEFAULT_MAX_VALUE = 3_600_000_000
+
+# 常用分位数
+DEFAULT_PERCENTILES = (50.0, 90.0, 95.0, 99.0, 99.9)
+
+
+def _bucket_index(value: int) -> int:
+    """值 → 桶下标"""
+    bucket = (value | _SUB_BUCKET_MASK).bit_length() - (_SUB_BUCKET_HALF_COUNT_MAGNITUDE + 1)
+    sub_bucket = value >> bucket
+    return ((bucket + 1) << _SUB_BUCKET_HALF_COUNT_MAGNITUDE) + sub_bucket - SUB_BUCKET_HALF_COUNT
+
+
+def _bucket_range(index: int):
+    """桶下标 → (桶内最小值, 桶内最大值)"""
+    bucket = (index >> _SUB_BUCKET_HALF_COUNT_MAGNITUDE) - 1
+    sub_bucket = (index & (SUB_BUCKET_HALF_COUNT - 1)) + SUB_BUCKET_HALF_COUNT
+    if bucket < 0:
+        bucket, sub_bucket = 0, index
+    lowest = sub_bucket << bucket
+    return lowest, lowest + (1 << bucket) - 1
+
+
+def percentile_key(percentile: float) -> str:
+    """分位数的展示名：50 → p50，99.9 → p99.9"""
+    return f"p{percentile:g}"
+
+
+class Histogram:
+    """可合并的延迟直方图"""
+
+    __slots__ = ("max_value", "count", "total", "min", "max", "overflow", "_counts")
+
+    def __init__(self, max_value: int = DEFAULT_MAX_VALUE):
+        self.max_value = max_value
+        self.count = 0
+        self.total = 0  # 记录值之和（精确，用于平均值）
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self.overflow = 0  # 超过 max_value 被截断的次数
+        self._counts: Dict[int, int] = {}
+
+    def record(self, value: int, count: int = 1):
+        """记录一个值（负数按 0，超过 max_value 的按 max_value 记录并计入 overflow）"""
+        value = int(value)
+        if value < 0:
+            value = 0
+        elif value > self.max_value:
+            value = self.max_value
+            self.overflow += count
+        index = _bucket_index(value)
+        self._counts[index] = self._counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram"):
+        """合并另一个直方图（按桶相加）"""
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.overflow += other.overflow
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percentile: float) -> Optional[int]:
+        """分位数（0-100），返回所在桶的最大值（不超过实际最大值）"""
+        return self.percentiles([percentile])[percentile_key(percentile)]
+
+    def percentiles(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, Optional[int]]:
+        """一次遍历计算多个分位数，返回 {"p50": 值, ...}"""
+        wanted = sorted(percentiles)
+        result: Dict[str, Optional[int]] = {percentile_key(p): None for p in wanted}
+        if not self.count:
+            return result
+        targets = [(p, max(1, -(-self.count * p // 100))) for p in wanted]
+        seen = 0
+        position = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            while position < len(targets) and seen >= targets[position][1]:
+                _, highest = _bucket_range(index)
+                result[percentile_key(targets[position][0])] = min(highest, self.max)
+                position += 1
+            if position == len(targets):
+                break
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """紧凑的可序列化形式（非零桶按下标排序，[下标, 次数] 列表）"""
+        return {
+            "max_value": self.max_value,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "overflow": self.overflow,
+            "counts": [[index, self._counts[index]] for index in sorted(self._counts)],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Histogram":
+        histogram = cls(data.get("max_value", DEFAULT_MAX_VALUE))
+        histogram.count = data.get("count", 0)
+        histogram.total = data.get("total", 0)
+        histogram.min = data.get("min")
+        histogram.max = data.get("max")
+        histogram.overflow = data.get("overflow", 0)
+        histogram._counts = {int(index): int(count) for index, count in data.get("counts", [])}
+        return histogram
+
+    @classmethod
+    def merged(cls, histograms: Iterable["Histogram"]) -> "Histogram":
+        result: Optional[Histogram] = None
+        for histogram in histograms:
+            if result is None:
+                result = cls(histogram.max_value)
+            result.merge(histogram)
+        return result if result is not None else cls()
+
+    def bucket_count(self) -> int:
+        """非零桶数（内存占用）"""
+        return len(self._counts)
+
+    def __repr__(self) -> str:
+        return f"Histogram(count={self.count}, min={self.min}, max={self.max}, buckets={len(self._counts)})"
+
+
+def percentiles_in_ms(histogram: Histogram, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, Optional[float]]:
+    """微秒直方图的分位数换算为毫秒（保留 3 位小数）"""
+    return {
+        key: round(value / 1000, 3) if value is not None else None
+        for key, value in histogram.percentiles(percentiles).items()
+    }
+
@@ -0,0 +1,658 @@
+"""
+JSONPath 解析与求值
+
+路径只编译一次并缓存为访问器对象，之后对每个响应只做遍历。支持的语法：
+
+- `$.a.b`、`$['a']['b']`、`a.b`（省略 `$`）
+- 数组下标 `[0]`、负下标 `[-1]`、切片 `[1:3]`、`[::2]`
+- 通配符 `.*`、`[*]`
+- 递归下降 `$..name`、`$..*`、`$..[0]`
+- 联合 `[0,2]`、`['a','b']`
+- 过滤 `[?(@.price < 10 && @.type == 'book')]`，支持 `== != < <= > >= =~`、
+  `&& || !`、括号，以及仅判断存在性的 `[?(@.isbn)]`
+
+`extract_many` 可以在一次遍历中求多个路径的值：公共前缀（包括递归下降
+收集到的后代节点）只求值一次。
+"""
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+class JsonPathError(ValueError):
+    """JSONPath 语法错误"""
+
+
+_MISSING = object()
+
+
+# ----------------------------------------------------------------------
+# 选择器
+# ----------------------------------------------------------------------
+
+class _Step:
+    """路径中的一步：输入一个节点，产出零个或多个子节点"""
+
+    key: Tuple = ()
+    definite = False  # 是否最多只产出一个节点
+
+    def apply(self, node: Any) -> Iterator[Any]:
+        raise NotImplementedError
+
+
+class _Child(_Step):
+    definite = True
+
+    def __init__(self, name: str):
+        self.name = name
+        self.key = ("child", name)
+
+    def apply(self, node):
+        if isinstance(node, dict) and self.name in node:
+            yield node[self.name]
+
+    def get(self, node):
+        if isinstance(node, dict):
+            return node.get(self.name, _MISSING)
+        return _MISSING
+
+
+class _Index(_Step):
+    definite = True
+
+    def __init__(self, index: int):
+        self.index = index
+        self.key = ("index", index)
+
+    def apply(self, node):
+        if isinstance(node, list):
+            try:
+                yield node[self.index]
+            except IndexError:
+                pass
+
+    def get(self, node):
+        if isinstance(node, list):
+            try:
+                return node[self.index]
+            except IndexError:
+                pass
+        return _MISSING
+
+
+class _Wildcard(_Step):
+    key = ("wildcard",)
+
+    def apply(self, node):
+        if isinstance(node, dict):
+            yield from node.values()
+        elif isinstance(node, list):
+            yield from node
+
+
+class _Slice(_Step):
+    def __init__(self, start: Optional[int], end: Optional[int], step: Optional[int]):
+        if step == 0:
+            raise JsonPathError("切片步长不能为 0")
+        self.slice = slice(start, end, step)
+        self.key = ("slice", start, end, step)
+
+    def apply(self, node):
+        if isinstance(node, list):
+            yield from node[self.slice]
+
+
+class _Union(_Step):
+    def __init__(self, steps: List[_Step]):
+        self.steps = steps
+        self.key = ("union",) + tuple(step.key for step in steps)
+
+    def apply(self, node):
+        for step in self.steps:
+            yield from step.apply(node)
+
+
+class _Filter(_Step):
+    def __init__(self, predicate: Callable[[Any], bool], source: str):
+        self.predicate = predicate
+        self.key = ("filter", source)
+
+    def apply(self, node):
+        if isinstance(node, dict):
+            children: Iterable[Any] = node.values()
+        elif isinstance(node, list):
+            children = node
+        else:
+            return
+        for child in children:
+            try:
+                if self.predicate(child):
+                    yield child
+            except TypeError:
+                # 类型不可比较（如 None < 1）视为不匹配
+                continue
+
+
+class _Descendants(_Step):
+    """递归下降：产出自身及所有后代节点（先序），`..name` 编译为该步骤加 `name`"""
+
+    key = ("descendants",)
+
+    def apply(self, node):
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            yield current
+            if isinstance(current, dict):
+                stack.extend(reversed(list(current.values())))
+            elif isinstance(current, list):
+                stack.extend(reversed(current))
+
+
+# ----------------------------------------------------------------------
+# 编译后的路径
+# ----------------------------------------------------------------------
+
+class JsonPath:
+    """编译后的 JSONPath"""
+
+    def __init__(self, expression: str, steps: Sequence[_Step]):
+        self.expression = expression
+        self.steps = tuple(steps)
+        # 只包含名称/下标的路径最多只有一个结果
+        self.definite = all(step.definite for step in self.steps)
+
+    def __repr__(self) -> str:
+        return f"JsonPath({self.expression!r})"
+
+    def iter_matches(self, data: Any) -> Iterator[Any]:
+        """惰性产出所有匹配的节点"""
+        if self.definite:
+            value = self._get(data)
+            if value is not _MISSING:
+                yield value
+            return
+        nodes: Iterable[Any] = (data,)
+        for step in self.steps:
+            nodes = _chain_apply(step, nodes)
+        yield from nodes
+
+    def _get(self, data: Any) -> Any:
+        current = data
+        for step in self.steps:
+            current = step.get(current)
+            if current is _MISSING:
+                return _MISSING
+        return current
+
+    def find(self, data: Any) -> List[Any]:
+        """返回所有匹配的节点"""
+        return list(self.iter_matches(data))
+
+    def first(self, data: Any, default: Any = None) -> Any:
+        """返回第一个匹配的节点"""
+        if self.definite:
+            value = self._get(data)
+            return default if value is _MISSING else value
+        return next(self.iter_matches(data), default)
+
+    def extract(self, data: Any) -> Any:
+        """单值路径返回该值，多值路径返回匹配列表；没有匹配时返回 None"""
+        if self.definite:
+            value = self._get(data)
+            return None if value is _MISSING else value
+        matches = self.find(data)
+        return matches if matches else None
+
+
+def _chain_apply(step: _Step, nodes: Iterable[Any]) -> Iterator[Any]:
+    for node in nodes:
+        yield from step.apply(node)
+
+
+# ----------------------------------------------------------------------
+# 路径解析
+# ----------------------------------------------------------------------
+
+_NAME_PATTERN = re.compile(r'[^.\[\]]+')
+_INT_PATTERN = re.compile(r'-?\d+')
+
+
+class _Parser:
+    def __init__(self, expression: str, root: str = "$"):
+        self.text = expression
+        self.pos = 0
+        self.root = root
+
+    def error(self, message: str) -> JsonPathError:
+        return JsonPathError(f"JSONPath 语法错误（位置 {self.pos}）: {message}: {self.text!r}")
+
+    def peek(self, n: int = 1) -> str:
+        return self.text[self.pos:self.pos + n]
+
+    def skip_spaces(self):
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def parse(self) -> List[_Step]:
+        text = self.text.strip()
+        self.text = text
+        if text.startswith(self.root):
+            self.pos = 1
+        elif text and text[0] not in ".[":
+            # 省略 $ 的相对写法：a.b[0]
+            return self._parse_segments(leading_name=True)
+        return self._parse_segments()
+
+    def _parse_segments(self, leading_name: bool = False) -> List[_Step]:
+        steps: List[_Step] = []
+        if leading_name:
+            steps.append(self._parse_name())
+        while self.pos < len(self.text):
+            ch = self.peek()
+            if self.peek(2) == "..":
+                self.pos += 2
+                steps.append(_Descendants())
+                if self.peek() == "[":
+                    steps.append(self._parse_bracket())
+                elif self.peek() == "*":
+                    self.pos += 1
+                    steps.append(_Wildcard())
+                else:
+                    steps.append(self._parse_name())
+            elif ch == ".":
+                self.pos += 1
+                if self.peek() == "*":
+                    self.pos += 1
+                    steps.append(_Wildcard())
+                else:
+                    steps.append(self._parse_name())
+            elif ch == "[":
+                steps.append(self._parse_bracket())
+            else:
+                raise self.error(f"无法识别的字符 {ch!r}")
+        return steps
+
+    def _parse_name(self) -> _Child:
+        match = _NAME_PATTERN.match(self.text, self.pos)
+        if not match:
+            raise self.error("缺少字段名")
+        self.pos = match.end()
+        return _Child(match.group(0))
+
+    def _parse_bracket(self) -> _Step:
+        self.pos += 1  # [
+        self.skip_spaces()
+        if self.peek() == "*":
+            self.pos += 1
+            step: _Step = _Wildcard()
+        elif self.peek() == "?":
+            step = self._parse_filter()
+        else:
+            step = self._parse_union_or_slice()
+        self.skip_spaces()
+        if self.peek() != "]":
+            raise self.error("缺少 ]")
+        self.pos += 1
+        return step
+
+    def _parse_union_or_slice(self) -> _Step:
+        items: List[_Step] = []
+        while True:
+            self.skip_spaces()
+            ch = self.peek()
+            if ch in ("'", '"'):
+                items.append(_Child(self._parse_quoted()))
+            else:
+                start = self.pos
+                while self.pos < len(self.text) and self.text[self.pos] not in ",]":
+                    self.pos += 1
+                token = self.text[start:self.pos].strip()
+                if ":" in token:
+                    if items:
+                        raise self.error("切片不能出现在联合中")
+                    return self._make_slice(token)
+                if not _INT_PATTERN.fullmatch(token):
+                    raise self.error(f"无效的下标 {token!r}")
+                items.append(_Index(int(token)))
+            self.skip_spaces()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            break
+        return items[0] if len(items) == 1 else _Union(items)
+
+    def _make_slice(self, token: str) -> _Slice:
+        parts = [p.strip() for p in token.split(":")]
+        if len(parts) > 3:
+            raise self.error(f"无效的切片 {token!r}")
+        values: List[Optional[int]] = []
+        for part in parts:
+            if part == "":
+                values.append(None)
+            elif _INT_PATTERN.fullmatch(part):
+                values.append(int(part))
+            else:
+                raise self.error(f"无效的切片 {token!r}")
+        while len(values) < 3:
+            values.append(None)
+        return _Slice(*values)
+
+    def _parse_quoted(self) -> str:
+        quote = self.peek()
+        self.pos += 1
+        chars = []
+        while self.pos < len(self.text):
+            ch = self.text[self.pos]
+            if ch == "\\" and self.pos + 1 < len(self.text):
+                chars.append(self.text[self.pos + 1])
+                self.pos += 2
+                continue
+            if ch == quote:
+                self.pos += 1
+                return "".join(chars)
+            chars.append(ch)
+            self.pos += 1
+        raise self.error("字符串缺少结束引号")
+
+    def _parse_filter(self) -> _Filter:
+        self.pos += 1  # ?
+        self.skip_spaces()
+        if self.peek() != "(":
+            raise self.error("过滤表达式需要以 ?( 开头")
+        start = self.pos
+        depth = 0
+        quote = None
+        while self.pos < len(self.text):
+            ch = self.text[self.pos]
+            if quote:
+                if ch == "\\":
+                    self.pos += 1
+                elif ch == quote:
+                    quote = None
+            elif ch in ("'", '"'):
+                quote = ch
+            elif ch == "(":
+                depth += 1
+            elif ch == ")":
+                depth -= 1
+                if depth == 0:
+                    break
+            self.pos += 1
+        if depth != 0:
+            raise self.error("过滤表达式括号不匹配")
+        source = self.text[start + 1:self.pos]
+        self.pos += 1  # )
+        return _Filter(_FilterParser(source).parse(), source)
+
+
+# ----------------------------------------------------------------------
+# 过滤表达式
+# ----------------------------------------------------------------------
+
+_FILTER_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<op>==|!=|<=|>=|=~|<|>|&&|\|\||!|\(|\))
+      | (?P<str>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<num>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+      | (?P<regex>/(?:[^/\\]|\\.)*/[a-z]*)
+      | (?P<path>[@$](?:\.\.?[^\s.\[\]()=!<>&|]+|\.\*|\[(?:'[^']*'|"[^"]*"|[^\]])*\])*)
+      | (?P<word>true|false|null)
+    )""", re.VERBOSE)
+
+_COMPARATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+class _FilterParser:
+    """过滤表达式解析：or_expr := and_expr ('||' and_expr)*"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = self._tokenize(source)
+        self.pos = 0
+
+    def _tokenize(self, source: str) -> List[Tuple[str, str]]:
+        tokens = []
+        pos = 0
+        while pos < len(source):
+            if source[pos:].strip() == "":
+                break
+            match = _FILTER_TOKEN.match(source, pos)
+            if not match or match.end() == pos:
+                raise JsonPathError(f"过滤表达式语法错误: {source!r}")
+            kind = match.lastgroup
+            tokens.append((kind, match.group(kind)))
+            pos = match.end()
+        return tokens
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise JsonPathError(f"过滤表达式不完整: {self.source!r}")
+        self.pos += 1
+        return token
+
+    def parse(self) -> Callable[[Any], bool]:
+        predicate = self._or()
+        if self.peek() is not None:
+            raise JsonPathError(f"过滤表达式存在多余内容: {self.source!r}")
+        return predicate
+
+    def _or(self):
+        left = self._and()
+        while self.peek() == ("op", "||"):
+            self.take()
+            right = self._and()
+            left = (lambda l, r: lambda node: l(node) or r(node))(left, right)
+        return left
+
+    def _and(self):
+        left = self._not()
+        while self.peek() == ("op", "&&"):
+            self.take()
+            right = self._not()
+            left = (lambda l, r: lambda node: l(node) and r(node))(left, right)
+        return left
+
+    def _not(self):
+        if self.peek() == ("op", "!"):
+            self.take()
+            inner = self._not()
+            return lambda node: not inner(node)
+        return self._comparison()
+
+    def _comparison(self):
+        if self.peek() == ("op", "("):
+            self.take()
+            inner = self._or()
+            if self.take() != ("op", ")"):
+                raise JsonPathError(f"过滤表达式括号不匹配: {self.source!r}")
+            return inner
+
+        left = self._operand()
+        token = self.peek()
+        if token and token[0] == "op" and (token[1] in _COMPARATORS or token[1] == "=~"):
+            self.take()
+            if token[1] == "=~":
+                kind, value = self.take()
+                if kind == "regex":
+                    body, _, flags = value[1:].rpartition("/")
+                    pattern = re.compile(body, re.IGNORECASE if "i" in flags else 0)
+                elif kind == "str":
+                    pattern = re.compile(_unquote(value))
+                else:
+                    raise JsonPathError(f"=~ 右侧需要正则表达式: {self.source!r}")
+                return lambda node: _regex_match(pattern, left(node))
+            compare = _COMPARATORS[token[1]]
+            right = self._operand()
+
+            def predicate(node):
+                a, b = left(node), right(node)
+                if a is _MISSING or b is _MISSING:
+                    return False
+                return compare(a, b)
+            return predicate
+
+        # 没有比较运算符：判断存在性 / 真值
+        return lambda node: _truthy(left(node))
+
+    def _operand(self) -> Callable[[Any], Any]:
+        kind, value = self.take()
+        if kind == "str":
+            literal = _unquote(value)
+            return lambda node: literal
+        if kind == "num":
+            literal_num = float(value) if any(c in value for c in ".eE") else int(value)
+            return lambda node: literal_num
+        if kind == "word":
+            literal_word = {"true": True, "false": False, "null": None}[value]
+            return lambda node: literal_word
+        if kind == "path":
+            path = JsonPath(value, _Parser(value, root=value[0]).parse())
+            if value[0] == "@":
+                return lambda node: path.first(node, _MISSING)
+            raise JsonPathError(f"过滤表达式暂不支持引用根节点 $: {self.source!r}")
+        raise JsonPathError(f"过滤表达式中出现意外的 {value!r}: {self.source!r}")
+
+
+def _unquote(value: str) -> str:
+    return re.sub(r"\\(.)", r"\1", value[1:-1])
+
+
+def _regex_match(pattern, value) -> bool:
+    return isinstance(value, str) and pattern.search(value) is not None
+
+
+def _truthy(value) -> bool:
+    return value is not _MISSING and value is not None and value is not False
+
+
+# ----------------------------------------------------------------------
+# 对外接口
+# ----------------------------------------------------------------------
+
+@lru_cache(maxsize=2048)
+def compile_path(expression: str) -> JsonPath:
+    """编译 JSONPath（结果会被缓存）
+
+    Raises:
+        JsonPathError: 语法错误
+    """
+    return JsonPath(expression, _Parser(expression).parse())
+
+
+def extract(data: Any, expression: str) -> Any:
+    """按路径取值，路径无效或没有匹配时返回 None
+
+    单值路径（只包含字段名和下标）返回该值；包含通配符、过滤、切片、
+    递归下降或联合的路径返回匹配列表。
+    """
+    if not expression or not isinstance(data, (dict, list)):
+        return None
+    try:
+        path = compile_path(expression)
+    except JsonPathError:
+        return None
+    return path.extract(data)
+
+
+def find_first(data: Any, field_name: str) -> Any:
+    """递归搜索字段（等价于 `$..field_name`），返回第一个非 None 的值"""
+    for node in _Descendants().apply(data):
+        if isinstance(node, dict):
+            value = node.get(field_name)
+            if value is not None:
+                return value
+    return None
+
+
+class _TrieNode:
+    __slots__ = ("step", "children", "paths")
+
+    def __init__(self, step: Optional[_Step] = None):
+        self.step = step
+        self.children: Dict[Tuple, "_TrieNode"] = {}
+        self.paths: List[JsonPath] = []
+
+
+class _PathSet:
+    """按步骤组成前缀树的一组路径，公共前缀只求值一次"""
+
+    def __init__(self, expressions: Tuple[str, ...]):
+        self.expressions = tuple(dict.fromkeys(e for e in expressions if e))
+        self.root = _TrieNode()
+        # 只含名称/下标的路径直接逐步取值（预先取出各步骤的 get），比走前缀树和逐个 extract 都快
+        self.definite_getters: List[Tuple[str, Tuple[Callable[[Any], Any], ...]]] = []
+        for expression in self.expressions:
+            try:
+                path = compile_path(expression)
+            except JsonPathError:
+                continue
+            if path.definite:
+                self.definite_getters.append((expression, tuple(step.get for step in path.steps)))
+                continue
+            node = self.root
+            for step in path.steps:
+                child = node.children.get(step.key)
+                if child is None:
+                    child = _TrieNode(step)
+                    node.children[step.key] = child
+                node = child
+            node.paths.append(path)
+
+    def evaluate(self, data: Any) -> Dict[str, Any]:
+        results: Dict[str, Any] = dict.fromkeys(self.expressions)
+        if isinstance(data, (dict, list)):
+            for expression, getters in self.definite_getters:
+                value = data
+                for get in getters:
+                    value = get(value)
+                    if value is _MISSING:
+                        break
+                else:
+                    results[expression] = value
+            if self.root.children:
+                _walk_trie(self.root, [data], results)
+        return results
+
+
+@lru_cache(maxsize=512)
+def _compile_path_set(expressions: Tuple[str, ...]) -> _PathSet:
+    return _PathSet(expressions)
+
+
+def extract_many(data: Any, expressions: Iterable[str]) -> Dict[str, Any]:
+    """在一次遍历中对同一响应求多个路径的值
+
+    路径按步骤组成前缀树（按路径组合缓存），公共前缀只求值一次。
+    返回值与 `extract` 一致，无效路径的结果为 None。
+    """
+    key = expressions if isinstance(expressions, tuple) else tuple(expressions)
+    return _compile_path_set(key).evaluate(data)
+
+
+def _walk_trie(trie: _TrieNode, nodes: List[Any], results: Dict[str, Any]):
+    for path in trie.paths:
+        results[path.expression] = list(nodes)
+    for child in trie.children.values():
+        step = child.step
+        if step.definite:
+            matched = []
+            for node in nodes:
+                value = step.get(node)
+                if value is not _MISSING:
+                    matched.append(value)
+        else:
+            matched = list(_chain_apply(step, nodes))
+        if matched:
+            _walk_trie(child, matched, results)
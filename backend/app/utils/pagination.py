@@ -0,0 +1,36 @@
+"""
+键集（keyset）分页
+
+按 (created_at, id) 倒序翻页：游标记录上一页最后一条的 created_at 与 id，
+下一页查询 `(created_at, id) < (游标值)`，配合联合索引，翻到多深都只扫描一页数据，
+不像 offset 那样需要先跳过前面所有行。
+"""
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    """生成游标（URL 安全的 base64）"""
+    raw = f"{created_at.isoformat() if created_at else ''}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """解析游标，格式错误时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at_str, row_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").rsplit("|", 1)
+        return (datetime.fromisoformat(created_at_str) if created_at_str else None), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+def keyset_before(created_at_column, id_column, cursor: str):
+    """倒序翻页条件：排在游标之后（更早）的行"""
+    created_at, row_id = decode_cursor(cursor)
+    if created_at is None:
+        return id_column < row_id
+    return tuple_(created_at_column, id_column) < tuple_(created_at, row_id)
@@ -0,0 +1,194 @@
+"""
+`${var}` 模板渲染
+
+模板只解析一次：字符串预先切分为「字面量 / 变量」片段，dict/list 编译为节点树，
+不含占位符的子树在渲染时原样返回（不复制），其余部分直接构建新的输出结构，
+不需要先深拷贝模板再原地替换。
+
+替换规则：
+- 变量不存在或值为 None 时保留占位符原文
+- 整个字符串就是一个变量（如 "${user_ids}"）时，默认保留变量值的类型；
+  `typed=False` 时与部分替换一样转为字符串
+- 部分替换（如 "user_${id}"）时，dict/list 转为 JSON 字符串，其他值用 str()
+
+渲染结果可能与模板共享不含占位符的子结构，调用方不得原地修改。
+"""
+import re
+import json
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+VAR_PATTERN = re.compile(r'\$\{(\w+)\}')
+
+Converter = Optional[Callable[[Any], Any]]
+
+
+def stringify(value: Any) -> str:
+    """部分替换时变量值转为字符串的规则"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+class _Node:
+    """模板节点"""
+
+    static = False
+
+    def render(self, variables: Mapping[str, Any], typed: bool, convert: Converter) -> Any:
+        raise NotImplementedError
+
+
+class _Const(_Node):
+    """不含占位符的值，渲染时原样返回"""
+
+    static = True
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def render(self, variables, typed, convert):
+        return self.value
+
+
+class _String(_Node):
+    """含占位符的字符串：literal 与变量名交替排列"""
+
+    __slots__ = ("source", "parts", "whole_var")
+
+    def __init__(self, source: str, parts: Tuple[Tuple[bool, str], ...]):
+        self.source = source
+        self.parts = parts  # ((是否变量, 字面量或变量名), ...)
+        self.whole_var = parts[0][1] if len(parts) == 1 and parts[0][0] else None
+
+    def render(self, variables, typed, convert):
+        if self.whole_var is not None:
+            value = variables.get(self.whole_var)
+            if value is None:
+                return self.source
+            if not typed:
+                return stringify(value)
+            return convert(value) if convert else value
+
+        pieces = []
+        for is_var, text in self.parts:
+            if is_var:
+                value = variables.get(text)
+                pieces.append("${" + text + "}" if value is None else stringify(value))
+            else:
+                pieces.append(text)
+        return "".join(pieces)
+
+
+class _Dict(_Node):
+    __slots__ = ("items",)
+
+    def __init__(self, items: List[Tuple[Any, _Node]]):
+        self.items = items
+
+    def render(self, variables, typed, convert):
+        return {key: node.render(variables, typed, convert) for key, node in self.items}
+
+
+class _List(_Node):
+    __slots__ = ("nodes",)
+
+    def __init__(self, nodes: List[_Node]):
+        self.nodes = nodes
+
+    def render(self, variables, typed, convert):
+        return [node.render(variables, typed, convert) for node in self.nodes]
+
+
+@lru_cache(maxsize=4096)
+def _compile_string(source: str) -> _Node:
+    if "${" not in source:
+        return _Const(source)
+    parts: List[Tuple[bool, str]] = []
+    pos = 0
+    for match in VAR_PATTERN.finditer(source):
+        if match.start() > pos:
+            parts.append((False, source[pos:match.start()]))
+        parts.append((True, match.group(1)))
+        pos = match.end()
+    if not parts:
+        return _Const(source)
+    if pos < len(source):
+        parts.append((False, source[pos:]))
+    return _String(source, tuple(parts))
+
+
+def _compile(value: Any, variables: Set[str]) -> _Node:
+    if isinstance(value, str):
+        node = _compile_string(value)
+        if isinstance(node, _String):
+            variables.update(text for is_var, text in node.parts if is_var)
+        return node
+    if isinstance(value, dict):
+        items = [(key, _compile(child, variables)) for key, child in value.items()]
+        if all(node.static for _, node in items):
+            return _Const(value)
+        return _Dict(items)
+    if isinstance(value, list):
+        nodes = [_compile(child, variables) for child in value]
+        if all(node.static for node in nodes):
+            return _Const(value)
+        return _List(nodes)
+    return _Const(value)
+
+
+class Template:
+    """编译后的模板"""
+
+    __slots__ = ("source", "variables", "_root")
+
+    def __init__(self, source: Any):
+        self.source = source
+        self.variables: Set[str] = set()  # 模板中引用的变量名
+        self._root = _compile(source, self.variables)
+
+    @property
+    def is_static(self) -> bool:
+        """模板是否不含任何占位符"""
+        return self._root.static
+
+    def render(self, variables: Optional[Mapping[str, Any]], typed: bool = True, convert: Converter = None) -> Any:
+        """渲染模板
+
+        Args:
+            variables: 变量表
+            typed: 整值占位符是否保留变量值的类型（False 时统一转为字符串）
+            convert: 整值占位符取到变量值后的类型转换函数（仅 typed=True 时生效）
+        """
+        if self._root.static or not variables:
+            return self.source
+        return self._root.render(variables, typed, convert)
+
+
+def render_string(source: str, variables: Optional[Mapping[str, Any]], typed: bool = False) -> Any:
+    """渲染单个字符串（编译结果按字符串缓存）"""
+    if not isinstance(source, str) or "${" not in source or not variables:
+        return source
+    return _compile_string(source).render(variables, typed, None)
+
+
+def render(value: Any, variables: Optional[Mapping[str, Any]], typed: bool = True, convert: Converter = None) -> Any:
+    """一次性渲染任意值（字符串走缓存；dict/list 需要重复渲染时应持有 Template 对象）"""
+    if isinstance(value, str):
+        if not variables:
+            return value
+        return _compile_string(value).render(variables, typed, convert)
+    if not isinstance(value, (dict, list)) or not variables:
+        return value
+    return Template(value).render(variables, typed, convert)
+
+
+def has_placeholders(value: Any) -> bool:
+    """字符串中是否含有 ${var} 占位符"""
+    return isinstance(value, str) and VAR_PATTERN.search(value) is not None
+
+
+def find_unresolved(values: Dict[str, Any]) -> List[str]:
+    """返回仍含有占位符的字段名（用于日志提示）"""
+    return [k for k, v in values.items() if has_placeholders(v)]
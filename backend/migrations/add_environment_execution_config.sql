@@ -0,0 +1,4 @@
+-- 环境执行配置（并发控制等）
+ALTER TABLE environments ADD COLUMN IF NOT EXISTS execution_config JSONB;
+
+COMMENT ON COLUMN environments.execution_config IS '执行配置，如并发控制 {"concurrency": {"initial": 10, "max": 50, "per_host": 20, "rps": 100}}';
@@ -0,0 +1,17 @@
+-- 定时计划：错过触发策略、触发抖动与延迟记录
+
+ALTER TABLE schedules ADD COLUMN IF NOT EXISTS misfire_policy VARCHAR(20);
+ALTER TABLE schedules ADD COLUMN IF NOT EXISTS misfire_grace_seconds INTEGER;
+ALTER TABLE schedules ADD COLUMN IF NOT EXISTS jitter_seconds INTEGER;
+ALTER TABLE schedules ADD COLUMN IF NOT EXISTS next_fire_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE schedules ADD COLUMN IF NOT EXISTS last_lag_seconds DOUBLE PRECISION;
+
+-- 已有计划的 next_run_at 即为 Cron 时间（此前没有抖动）
+UPDATE schedules SET next_fire_at = next_run_at WHERE next_fire_at IS NULL AND next_run_at IS NOT NULL;
+
+COMMENT ON COLUMN schedules.misfire_policy IS '错过触发的处理：run_once 合并补执行一次 / skip 跳过 / run_all 逐个补执行（限速），为空使用系统配置';
+COMMENT ON COLUMN schedules.misfire_grace_seconds IS '超过触发时间多少秒视为错过触发，为空使用系统配置';
+COMMENT ON COLUMN schedules.jitter_seconds IS '触发抖动窗口（秒），按计划ID在窗口内固定偏移，分散同一时刻到期的计划';
+COMMENT ON COLUMN schedules.next_fire_at IS '下次触发对应的 Cron 时间（UTC）';
+COMMENT ON COLUMN schedules.next_run_at IS '下次实际派发时间（UTC）：Cron 时间 + 抖动，补执行限速时顺延';
+COMMENT ON COLUMN schedules.last_lag_seconds IS '上次触发相对 Cron 时间的延迟（秒）';
@@ -0,0 +1,12 @@
+-- 定时调度：下次执行时间列 + 到期时间索引
+
+-- 定时执行的下次执行时间（UTC），由 config.scheduling 计算；
+-- 历史数据由调度器启动时回填（weekly 等类型需要按创建时间推算，不在 SQL 中计算）
+ALTER TABLE test_executions ADD COLUMN IF NOT EXISTS next_run_at TIMESTAMP WITH TIME ZONE;
+
+-- 调度器启动时按到期时间加载待执行的定时任务
+CREATE INDEX IF NOT EXISTS idx_test_executions_pending_next_run_at
+    ON test_executions(next_run_at)
+    WHERE status = 'PENDING' AND next_run_at IS NOT NULL;
+
+COMMENT ON COLUMN test_executions.next_run_at IS '定时执行的下次执行时间（UTC），调度器按此时间触发';
@@ -0,0 +1,27 @@
+-- 测试执行列表优化：结果摘要列 + 键集分页索引
+
+-- 结果摘要（执行结束时写入），列表查询不再读取 result / logs 大字段
+-- 与模型一致使用 JSON（test_executions 的 result / config 也是 JSON）；早先按 JSONB 建列的库在这里转换
+ALTER TABLE test_executions ADD COLUMN IF NOT EXISTS summary JSON;
+ALTER TABLE test_executions ALTER COLUMN summary TYPE JSON USING summary::json;
+
+-- 回填历史数据
+UPDATE test_executions
+SET summary = json_build_object(
+        'total', COALESCE((result::jsonb->'summary'->>'total')::int, 1),
+        'passed', COALESCE((result::jsonb->'summary'->>'passed')::int, CASE WHEN status = 'PASSED' THEN 1 ELSE 0 END),
+        'failed', COALESCE((result::jsonb->'summary'->>'failed')::int, CASE WHEN status IN ('FAILED', 'ERROR') THEN 1 ELSE 0 END),
+        'skipped', COALESCE((result::jsonb->'summary'->>'skipped')::int, 0),
+        'duration_ms', CASE
+            WHEN started_at IS NOT NULL AND finished_at IS NOT NULL
+            THEN (EXTRACT(EPOCH FROM (finished_at - started_at)) * 1000)::bigint
+        END
+    )
+WHERE summary IS NULL
+  AND status IN ('PASSED', 'FAILED', 'ERROR', 'CANCELLED');
+
+-- 键集分页索引：(created_at, id) 倒序翻页
+CREATE INDEX IF NOT EXISTS idx_test_executions_created_at_id ON test_executions(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_test_executions_project_created_at_id ON test_executions(project_id, created_at, id);
+
+COMMENT ON COLUMN test_executions.summary IS '结果摘要：total/passed/failed/skipped/duration_ms';
@@ -0,0 +1,82 @@
+-- 测试执行日汇总：仪表盘按 项目 / 日期 / 状态 读取执行次数与耗时，不再扫描 test_executions
+
+CREATE TABLE IF NOT EXISTS execution_daily_rollups (
+    id SERIAL PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    status executionstatus NOT NULL,
+    execution_count INTEGER NOT NULL DEFAULT 0,
+    timed_count INTEGER NOT NULL DEFAULT 0,
+    duration_sum_ms BIGINT NOT NULL DEFAULT 0,
+    duration_max_ms INTEGER,
+    duration_buckets INTEGER[],
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT uq_execution_daily_rollups_project_day_status UNIQUE (project_id, day, status)
+);
+
+CREATE INDEX IF NOT EXISTS ix_execution_daily_rollups_id ON execution_daily_rollups(id);
+CREATE INDEX IF NOT EXISTS idx_execution_daily_rollups_day ON execution_daily_rollups(day);
+
+-- 已计入日汇总的执行，避免重复计数
+ALTER TABLE test_executions ADD COLUMN IF NOT EXISTS rolled_up_at TIMESTAMP WITH TIME ZONE;
+
+-- 回填升级前已结束的执行（分桶上界与 app/services/execution_rollup.py 的 DURATION_BUCKETS_MS 一致）
+INSERT INTO execution_daily_rollups (
+    project_id, day, status, execution_count, timed_count, duration_sum_ms, duration_max_ms, duration_buckets, updated_at
+)
+SELECT
+    project_id,
+    (finished_at AT TIME ZONE 'UTC')::date,
+    status,
+    COUNT(*),
+    COUNT(duration_ms),
+    COALESCE(SUM(duration_ms), 0),
+    MAX(duration_ms),
+    ARRAY[
+        COUNT(*) FILTER (WHERE duration_ms <= 50),
+        COUNT(*) FILTER (WHERE duration_ms > 50 AND duration_ms <= 100),
+        COUNT(*) FILTER (WHERE duration_ms > 100 AND duration_ms <= 200),
+        COUNT(*) FILTER (WHERE duration_ms > 200 AND duration_ms <= 500),
+        COUNT(*) FILTER (WHERE duration_ms > 500 AND duration_ms <= 1000),
+        COUNT(*) FILTER (WHERE duration_ms > 1000 AND duration_ms <= 2000),
+        COUNT(*) FILTER (WHERE duration_ms > 2000 AND duration_ms <= 5000),
+        COUNT(*) FILTER (WHERE duration_ms > 5000 AND duration_ms <= 10000),
+        COUNT(*) FILTER (WHERE duration_ms > 10000 AND duration_ms <= 30000),
+        COUNT(*) FILTER (WHERE duration_ms > 30000 AND duration_ms <= 60000),
+        COUNT(*) FILTER (WHERE duration_ms > 60000 AND duration_ms <= 300000),
+        COUNT(*) FILTER (WHERE duration_ms > 300000)
+    ]::INTEGER[],
+    NOW()
+FROM (
+    SELECT
+        project_id,
+        finished_at,
+        status,
+        GREATEST(0, (summary->>'duration_ms')::BIGINT) AS duration_ms
+    FROM test_executions
+    WHERE status IN ('PASSED', 'FAILED', 'ERROR', 'CANCELLED')
+      AND finished_at IS NOT NULL
+      AND rolled_up_at IS NULL
+) finished
+GROUP BY 1, 2, 3
+ON CONFLICT (project_id, day, status) DO UPDATE SET
+    execution_count = execution_daily_rollups.execution_count + EXCLUDED.execution_count,
+    timed_count = execution_daily_rollups.timed_count + EXCLUDED.timed_count,
+    duration_sum_ms = execution_daily_rollups.duration_sum_ms + EXCLUDED.duration_sum_ms,
+    duration_max_ms = GREATEST(execution_daily_rollups.duration_max_ms, EXCLUDED.duration_max_ms),
+    duration_buckets = ARRAY(
+        SELECT COALESCE(a, 0) + COALESCE(b, 0)
+        FROM unnest(execution_daily_rollups.duration_buckets, EXCLUDED.duration_buckets) AS t(a, b)
+    ),
+    updated_at = NOW();
+
+UPDATE test_executions
+SET rolled_up_at = NOW()
+WHERE status IN ('PASSED', 'FAILED', 'ERROR', 'CANCELLED')
+  AND finished_at IS NOT NULL
+  AND rolled_up_at IS NULL;
+
+COMMENT ON TABLE execution_daily_rollups IS '测试执行日汇总：按项目、结束日期（UTC）、状态累计执行次数与耗时，执行结束时增量更新';
+COMMENT ON COLUMN execution_daily_rollups.timed_count IS '有耗时（开始、结束时间都有）的执行次数';
+COMMENT ON COLUMN execution_daily_rollups.duration_buckets IS '耗时分桶计数，上界（毫秒）：50,100,200,500,1000,2000,5000,10000,30000,60000,300000,+∞';
+COMMENT ON COLUMN test_executions.rolled_up_at IS '计入执行日汇总的时间，非空表示已计入';
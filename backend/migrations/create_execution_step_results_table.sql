@@ -0,0 +1,38 @@
+-- 创建执行步骤结果表
+CREATE TABLE IF NOT EXISTS execution_step_results (
+    id BIGSERIAL PRIMARY KEY,
+    execution_id INTEGER NOT NULL,
+    step_index INTEGER NOT NULL,
+    name VARCHAR(200),
+    status VARCHAR(20) NOT NULL,
+    method VARCHAR(10),
+    url TEXT,
+    status_code INTEGER,
+    latency_ms INTEGER,
+    response_size INTEGER,
+    request_body_hash VARCHAR(64),
+    response_body_hash VARCHAR(64),
+    assertions_total INTEGER DEFAULT 0,
+    assertions_failed INTEGER DEFAULT 0,
+    error TEXT,
+    payload BYTEA,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT fk_execution_step_results_execution FOREIGN KEY (execution_id)
+        REFERENCES test_executions(id) ON DELETE CASCADE
+);
+
+-- 创建索引
+CREATE UNIQUE INDEX IF NOT EXISTS uq_execution_step_results_execution_step ON execution_step_results(execution_id, step_index);
+CREATE INDEX IF NOT EXISTS idx_execution_step_results_execution_status ON execution_step_results(execution_id, status);
+
+-- 添加注释
+COMMENT ON TABLE execution_step_results IS '执行步骤结果表（摘要列 + 压缩的完整明细）';
+COMMENT ON COLUMN execution_step_results.step_index IS '步骤序号，数据驱动时为数据行序号';
+COMMENT ON COLUMN execution_step_results.status IS '步骤状态：passed/failed';
+COMMENT ON COLUMN execution_step_results.status_code IS 'HTTP状态码';
+COMMENT ON COLUMN execution_step_results.latency_ms IS '请求耗时（毫秒）';
+COMMENT ON COLUMN execution_step_results.response_size IS '响应体大小（字节）';
+COMMENT ON COLUMN execution_step_results.request_body_hash IS '请求体 SHA-256';
+COMMENT ON COLUMN execution_step_results.response_body_hash IS '响应体 SHA-256';
+COMMENT ON COLUMN execution_step_results.payload IS 'zlib 压缩的完整步骤明细（请求、响应、断言）';
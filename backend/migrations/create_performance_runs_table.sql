@@ -0,0 +1,27 @@
+-- 性能测试运行记录：按 (用例, 环境) 保存每次压测的汇总指标与延迟直方图，作为滚动基线做回归判定
+
+CREATE TABLE IF NOT EXISTS performance_runs (
+    id SERIAL PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    test_case_id INTEGER NOT NULL REFERENCES test_cases(id) ON DELETE CASCADE,
+    execution_id INTEGER REFERENCES test_executions(id) ON DELETE SET NULL,
+    environment VARCHAR(100),
+    status VARCHAR(20) NOT NULL,
+    summary JSON NOT NULL,
+    histogram JSON,
+    verdict JSON,
+    include_in_baseline BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_performance_runs_id ON performance_runs(id);
+CREATE INDEX IF NOT EXISTS idx_performance_runs_case_env ON performance_runs(test_case_id, environment, id);
+CREATE INDEX IF NOT EXISTS idx_performance_runs_execution ON performance_runs(execution_id);
+
+COMMENT ON TABLE performance_runs IS '性能测试运行记录：每次压测的紧凑结果，按用例与环境形成时间序列';
+COMMENT ON COLUMN performance_runs.environment IS '环境标识，为空表示未指定环境';
+COMMENT ON COLUMN performance_runs.status IS '压测结果：passed / failed / error';
+COMMENT ON COLUMN performance_runs.summary IS '汇总指标：请求数、错误率、吞吐量、平均 / 最大延迟、延迟分位数（毫秒）';
+COMMENT ON COLUMN performance_runs.histogram IS '合并后的延迟直方图（微秒，稀疏桶）';
+COMMENT ON COLUMN performance_runs.verdict IS '与滚动基线对比的回归判定';
+COMMENT ON COLUMN performance_runs.include_in_baseline IS '是否作为后续运行的基线样本（判定为回归的运行默认不计入）';
@@ -0,0 +1,45 @@
+-- 定时计划：Cron 表达式 + 时区，到点时才创建测试执行
+
+CREATE TABLE IF NOT EXISTS schedules (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    description TEXT,
+    project_id INTEGER NOT NULL REFERENCES projects(id),
+    test_case_id INTEGER REFERENCES test_cases(id) ON DELETE CASCADE,
+    test_plan_id INTEGER REFERENCES test_plans(id) ON DELETE CASCADE,
+    environment VARCHAR(100),
+    config JSON,
+    cron_expression VARCHAR(100) NOT NULL,
+    timezone VARCHAR(64) NOT NULL,
+    start_at TIMESTAMP WITH TIME ZONE,
+    end_at TIMESTAMP WITH TIME ZONE,
+    enabled BOOLEAN NOT NULL DEFAULT TRUE,
+    next_run_at TIMESTAMP WITH TIME ZONE,
+    last_run_at TIMESTAMP WITH TIME ZONE,
+    last_execution_id INTEGER,
+    last_plan_run_id INTEGER,
+    created_by INTEGER REFERENCES users(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS ix_schedules_id ON schedules(id);
+CREATE INDEX IF NOT EXISTS idx_schedules_project_id ON schedules(project_id);
+-- 调度器按到期时间加载启用的定时计划
+CREATE INDEX IF NOT EXISTS idx_schedules_enabled_next_run_at
+    ON schedules(next_run_at)
+    WHERE enabled AND next_run_at IS NOT NULL;
+
+-- 测试执行关联触发它的定时计划
+ALTER TABLE test_executions ADD COLUMN IF NOT EXISTS schedule_id INTEGER REFERENCES schedules(id) ON DELETE SET NULL;
+CREATE INDEX IF NOT EXISTS ix_test_executions_schedule_id ON test_executions(schedule_id);
+
+-- 旧版周期定时执行（daily / weekly / time_range 的 PENDING 占位记录）由调度器主节点启动时
+-- 转换为定时计划，占位记录标记为取消
+
+COMMENT ON TABLE schedules IS '定时计划：按 Cron 表达式周期触发测试用例或测试计划';
+COMMENT ON COLUMN schedules.cron_expression IS 'Cron 表达式：分 时 日 月 周，或 秒 分 时 日 月 周';
+COMMENT ON COLUMN schedules.timezone IS 'IANA 时区，Cron 按该时区的本地时间匹配';
+COMMENT ON COLUMN schedules.config IS '触发时传给测试执行的配置（测试计划为运行覆盖配置）';
+COMMENT ON COLUMN schedules.next_run_at IS '下次触发时间（UTC），为空表示不再触发';
+COMMENT ON COLUMN test_executions.schedule_id IS '触发本次执行的定时计划';
@@ -0,0 +1,23 @@
+-- 创建测试执行日志表
+CREATE TABLE IF NOT EXISTS test_execution_logs (
+    id BIGSERIAL PRIMARY KEY,
+    execution_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    level VARCHAR(10) NOT NULL DEFAULT 'INFO',
+    message TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT fk_test_execution_logs_execution FOREIGN KEY (execution_id)
+        REFERENCES test_executions(id) ON DELETE CASCADE
+);
+
+-- 创建索引（分页/追尾读取都按 execution_id + seq 走索引）
+CREATE UNIQUE INDEX IF NOT EXISTS uq_test_execution_logs_execution_seq ON test_execution_logs(execution_id, seq);
+
+-- 添加注释
+COMMENT ON TABLE test_execution_logs IS '测试执行日志表（追加写入）';
+COMMENT ON COLUMN test_execution_logs.execution_id IS '测试执行ID';
+COMMENT ON COLUMN test_execution_logs.seq IS '执行内递增序号，从1开始';
+COMMENT ON COLUMN test_execution_logs.level IS '日志级别：DEBUG/INFO/WARNING/ERROR';
+COMMENT ON COLUMN test_execution_logs.message IS '日志内容（超长时已截断）';
+COMMENT ON COLUMN test_execution_logs.created_at IS '写入时间';
@@ -0,0 +1,29 @@
+-- 测试计划运行记录：计划中的用例并发执行，结果汇总到运行记录
+
+CREATE TABLE IF NOT EXISTS test_plan_runs (
+    id SERIAL PRIMARY KEY,
+    test_plan_id INTEGER NOT NULL REFERENCES test_plans(id) ON DELETE CASCADE,
+    project_id INTEGER NOT NULL REFERENCES projects(id),
+    status executionstatus DEFAULT 'PENDING',
+    environment VARCHAR(100),
+    config JSON,
+    case_states JSON,
+    summary JSON,
+    executed_by INTEGER REFERENCES users(id),
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_test_plan_runs_id ON test_plan_runs(id);
+CREATE INDEX IF NOT EXISTS idx_test_plan_runs_plan_created_at ON test_plan_runs(test_plan_id, created_at);
+
+-- 测试执行关联所属的计划运行
+ALTER TABLE test_executions ADD COLUMN IF NOT EXISTS plan_run_id INTEGER REFERENCES test_plan_runs(id) ON DELETE SET NULL;
+CREATE INDEX IF NOT EXISTS ix_test_executions_plan_run_id ON test_executions(plan_run_id);
+
+COMMENT ON TABLE test_plan_runs IS '测试计划运行记录';
+COMMENT ON COLUMN test_plan_runs.config IS '运行配置快照：max_parallel/fail_fast/dependencies';
+COMMENT ON COLUMN test_plan_runs.case_states IS '用例状态列表：test_case_id/execution_id/status/depends_on';
+COMMENT ON COLUMN test_plan_runs.summary IS '汇总结果：total/passed/failed/error/skipped/cancelled/duration_ms';
+COMMENT ON COLUMN test_executions.plan_run_id IS '所属测试计划运行';
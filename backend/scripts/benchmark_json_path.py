@@ -0,0 +1,157 @@
+"""
+JSONPath 性能基准
+
+对比旧的 `_extract_json_path`（每次调用都重新拆分路径字符串）与
+app.utils.json_path（路径编译缓存 + 多路径单次遍历）。
+
+用法：
+    python scripts/benchmark_json_path.py [--iterations 20000]
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Any
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils import json_path
+
+
+def _legacy_extract_json_path(data: Any, path: str) -> Any:
+    """旧实现（原 test_executions._extract_json_path），仅用于对比"""
+    if not path or not isinstance(data, (dict, list)):
+        return None
+    if path.startswith("$."):
+        path = path[2:]
+    elif path.startswith("$["):
+        path = path[1:]
+    parts = path.split(".")
+    current: Any = data
+    for part in parts:
+        if current is None:
+            return None
+        if "[" in part and part.endswith("]"):
+            name, index_part = part.split("[", 1)
+            index_str = index_part[:-1]
+            if name:
+                if not isinstance(current, dict) or name not in current:
+                    return None
+                current = current.get(name)
+            if not isinstance(current, list):
+                return None
+            try:
+                idx = int(index_str)
+            except ValueError:
+                return None
+            if idx < 0 or idx >= len(current):
+                return None
+            current = current[idx]
+        else:
+            if not isinstance(current, dict) or part not in current:
+                return None
+            current = current.get(part)
+    return current
+
+
+RESPONSE = {
+    "code": 0,
+    "message": "ok",
+    "data": {
+        "user": {"id": 1001, "name": "tester", "roles": ["admin", "qa"]},
+        "token": "eyJhbGciOiJIUzI1NiJ9.payload.signature",
+        "items": [{"id": i, "name": f"item-{i}", "price": i * 1.5} for i in range(50)],
+    },
+    "ItemResultDict": {
+        "OrthoDiagnosis": {
+            "PassedRules": [{"RuleName": f"rule-{i}", "Score": i} for i in range(20)],
+        },
+    },
+}
+
+PATHS = [
+    "$.code",
+    "$.message",
+    "$.data.token",
+    "$.data.user.id",
+    "$.data.user.name",
+    "$.data.user.roles[1]",
+    "$.data.items[10].name",
+    "$.data.items[49].price",
+    "$.ItemResultDict.OrthoDiagnosis.PassedRules[0].RuleName",
+    "$.ItemResultDict.OrthoDiagnosis.PassedRules[19].Score",
+]
+
+
+# 旧实现不支持的多值路径：递归下降与过滤共享同一次遍历
+SEARCH_PATHS = [
+    "$..RuleName",
+    "$..Score",
+    "$..price",
+    "$..token",
+    "$.data.items[?(@.price > 60)].name",
+    "$.data.items[?(@.price > 60)].id",
+]
+
+
+def _timeit(label: str, func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / iterations * 1e6
+    print(f"{label:<40} {elapsed:8.3f}s  {per_call:8.2f}µs/响应")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONPath 性能基准")
+    parser.add_argument("--iterations", type=int, default=20000, help="每种实现处理的响应数")
+    args = parser.parse_args()
+
+    # 结果一致性检查
+    for path in PATHS:
+        assert _legacy_extract_json_path(RESPONSE, path) == json_path.extract(RESPONSE, path), path
+    assert json_path.extract_many(RESPONSE, PATHS) == {p: json_path.extract(RESPONSE, p) for p in PATHS}
+
+    print(f"每个响应求 {len(PATHS)} 个路径，共 {args.iterations} 个响应\n")
+    legacy = _timeit(
+        "旧实现 _extract_json_path",
+        lambda: [_legacy_extract_json_path(RESPONSE, p) for p in PATHS],
+        args.iterations,
+    )
+    compiled = _timeit(
+        "json_path.extract（编译缓存）",
+        lambda: [json_path.extract(RESPONSE, p) for p in PATHS],
+        args.iterations,
+    )
+    many = _timeit(
+        "json_path.extract_many（单次遍历）",
+        lambda: json_path.extract_many(RESPONSE, PATHS),
+        args.iterations,
+    )
+    print(f"\n编译缓存加速: {legacy / compiled:.2f}x，单次遍历加速: {legacy / many:.2f}x")
+
+    assert json_path.extract_many(RESPONSE, SEARCH_PATHS) == {p: json_path.extract(RESPONSE, p) for p in SEARCH_PATHS}
+    print(f"\n每个响应求 {len(SEARCH_PATHS)} 个递归下降/过滤路径（旧实现不支持）\n")
+    separate = _timeit(
+        "json_path.extract（逐个遍历）",
+        lambda: [json_path.extract(RESPONSE, p) for p in SEARCH_PATHS],
+        args.iterations // 10,
+    )
+    shared = _timeit(
+        "json_path.extract_many（共享遍历）",
+        lambda: json_path.extract_many(RESPONSE, SEARCH_PATHS),
+        args.iterations // 10,
+    )
+    print(f"\n共享遍历加速: {separate / shared:.2f}x")
+
+    # 旧实现不支持的表达式
+    print("\n扩展语法示例:")
+    for path in ["$.data.items[?(@.price > 70)].name", "$..RuleName", "$.data.items[-2:].id", "$.data.user['id','name']"]:
+        print(f"  {path} -> {json_path.extract(RESPONSE, path)}")
+
+
+if __name__ == "__main__":
+    main()
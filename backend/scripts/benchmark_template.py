@@ -0,0 +1,122 @@
+"""
+${var} 模板渲染性能基准
+
+对比旧实现（每行先深拷贝模板，再逐个字符串做正则替换）与
+app.utils.template（模板只编译一次，静态子树直接复用）。
+
+用法：
+    python scripts/benchmark_template.py [--rows 10000]
+"""
+import re
+import sys
+import copy
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Dict
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.template import Template, render_string
+
+
+def _legacy_replace_template_variables(template: Any, test_data: Dict[str, Any]) -> Any:
+    """旧实现（原 test_executions._replace_template_variables），仅用于对比"""
+    def replace_value(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {k: replace_value(v) for k, v in value.items()}
+        elif isinstance(value, list):
+            return [replace_value(item) for item in value]
+        elif isinstance(value, str) and "${" in value:
+            def replacer(match):
+                var_value = test_data.get(match.group(1))
+                if var_value is None:
+                    return match.group(0)
+                if isinstance(var_value, (dict, list)):
+                    return json.dumps(var_value, ensure_ascii=False)
+                return str(var_value)
+            return re.sub(r'\$\{(\w+)\}', replacer, value)
+        return value
+
+    return replace_value(copy.deepcopy(template))
+
+
+TEMPLATE = {
+    "method": "POST",
+    "path": "/api/v1/users/${user_id}/orders",
+    "headers": {
+        "Authorization": "Bearer ${token}",
+        "Content-Type": "application/json",
+        "X-Request-Id": "req-${row}",
+    },
+    "params": {"page": "${page}", "size": 20, "sort": "created_at,desc"},
+    "body": {
+        "order": {
+            "sku": "${sku}",
+            "quantity": "${quantity}",
+            "remark": "用户 ${user_id} 的第 ${row} 笔订单",
+        },
+        "address": {
+            "province": "浙江省",
+            "city": "杭州市",
+            "detail": "文三路 ${row} 号",
+        },
+        # 不含占位符的大块静态配置：旧实现每行都要深拷贝
+        "options": {
+            "flags": [f"flag-{i}" for i in range(50)],
+            "matrix": [[i * j for j in range(10)] for i in range(10)],
+            "labels": {f"label_{i}": f"值 {i}" for i in range(30)},
+        },
+        "tags": ["${tag}", "benchmark", "template"],
+    },
+}
+
+
+def _rows(count: int):
+    return [
+        {
+            "row": i,
+            "user_id": 10000 + i,
+            "token": f"token-{i:08d}",
+            "page": i % 10 + 1,
+            "sku": f"SKU-{i % 97}",
+            "quantity": i % 5 + 1,
+            "tag": f"tag-{i % 7}",
+        }
+        for i in range(count)
+    ]
+
+
+def _timeit(label: str, func, rows) -> float:
+    start = time.perf_counter()
+    for row in rows:
+        func(row)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed:8.3f}s  {elapsed / len(rows) * 1e6:8.2f}µs/行")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="${var} 模板渲染性能基准")
+    parser.add_argument("--rows", type=int, default=10000, help="数据行数")
+    args = parser.parse_args()
+
+    rows = _rows(args.rows)
+    template = Template(TEMPLATE)
+
+    # 结果一致性检查（字符串模式与旧实现语义一致）
+    for row in rows[:100]:
+        assert template.render(row, typed=False) == _legacy_replace_template_variables(TEMPLATE, row)
+        assert render_string(TEMPLATE["path"], row) == _legacy_replace_template_variables(TEMPLATE["path"], row)
+
+    print(f"模板引用变量: {sorted(template.variables)}，共 {len(rows)} 行\n")
+    legacy = _timeit("旧实现（深拷贝 + 正则替换）", lambda row: _legacy_replace_template_variables(TEMPLATE, row), rows)
+    compiled = _timeit("Template.render（预编译）", lambda row: template.render(row, typed=False), rows)
+    _timeit("Template.render（保留类型）", lambda row: template.render(row), rows)
+    print(f"\n加速: {legacy / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
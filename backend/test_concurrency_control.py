@@ -0,0 +1,167 @@
+"""
+并发控制单元测试：run_worker_pool 执行池与自适应并发控制器
+"""
+import asyncio
+
+import pytest
+
+from app.services.concurrency_control import AdaptiveConcurrencyController, ConcurrencyConfig, run_worker_pool
+
+
+class _Rows:
+    """模拟 TestDataRows：可迭代对象，每次迭代返回新的异步生成器"""
+
+    def __init__(self, count):
+        self.count = count
+
+    async def __aiter__(self):
+        for index in range(self.count):
+            yield index
+
+
+def _run(coro, timeout=5):
+    return asyncio.run(asyncio.wait_for(coro, timeout))
+
+
+def test_worker_pool_handles_every_item():
+    handled = []
+
+    async def handler(item):
+        await asyncio.sleep(0)
+        handled.append(item)
+
+    _run(run_worker_pool(_Rows(100), handler, workers=4, queue_size=2))
+    assert sorted(handled) == list(range(100))
+
+
+def test_worker_pool_raises_handler_error_without_hanging():
+    rows = _Rows(1000)
+
+    async def handler(item):
+        await asyncio.sleep(0)
+        if item == 10:
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        _run(run_worker_pool(rows, handler, workers=4, queue_size=2))
+
+
+def test_worker_pool_closes_source_on_error():
+    async def scenario():
+        iterator_closed = []
+
+        async def rows():
+            try:
+                for index in range(1000):
+                    yield index
+            finally:
+                iterator_closed.append(True)
+
+        async def handler(item):
+            raise ValueError(item)
+
+        with pytest.raises(ValueError):
+            await run_worker_pool(rows(), handler, workers=2, queue_size=1)
+        return iterator_closed
+
+    assert _run(scenario()) == [True]
+
+
+def test_worker_pool_cancelled_from_outside():
+    async def scenario():
+        running = asyncio.Event()
+
+        async def handler(item):
+            running.set()
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(run_worker_pool(_Rows(1000), handler, workers=2, queue_size=1))
+        await running.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    _run(scenario())
+
+
+def test_worker_pool_empty_source():
+    async def handler(item):
+        raise AssertionError("不应被调用")
+
+    _run(run_worker_pool(_Rows(0), handler, workers=3))
+
+
+def _controller(**override):
+    cfg = ConcurrencyConfig.resolve({"per_host": 0, "rps": 0, **override})
+    return AdaptiveConcurrencyController(cfg)
+
+
+async def _burst(controller, count, status_code, latency_ms=10):
+    """同时占用 count 个名额，全部返回后再统一记录结果（模拟同一批在途请求）"""
+    slots = [controller.slot("example.com") for _ in range(count)]
+    for slot in slots:
+        await slot.__aenter__()
+    for slot in slots:
+        slot.record(latency_ms, status_code)
+        await slot.__aexit__(None, None, None)
+
+
+def test_controller_throttle_burst_decreases_once():
+    controller = _controller(initial=32, min=1, max=64)
+    _run(_burst(controller, 32, 429))
+    assert controller.current_limit == 16
+    assert controller.adjustments == 1
+
+
+def test_controller_throttle_after_decrease_decreases_again():
+    controller = _controller(initial=32, min=1, max=64)
+
+    async def scenario():
+        await _burst(controller, 32, 429)
+        await _burst(controller, 4, 429)
+
+    _run(scenario())
+    assert controller.current_limit == 8
+
+
+def test_controller_increases_after_healthy_window():
+    controller = _controller(initial=8, min=1, max=64)
+    _run(_burst(controller, 8, 200))
+    assert controller.current_limit == 9
+
+
+def test_controller_error_rate_decreases():
+    controller = _controller(initial=10, min=1, max=64, decrease_factor=0.5, error_rate_threshold=0.2)
+    _run(_burst(controller, 10, 500))
+    assert controller.current_limit == 5
+
+
+def test_controller_fixed_concurrency_never_changes():
+    controller = _controller(initial=4, min=4, max=4)
+
+    async def scenario():
+        await _burst(controller, 4, 429)
+        await _burst(controller, 4, 200)
+
+    _run(scenario())
+    assert controller.current_limit == 4
+    assert controller.adjustments == 0
+
+
+def test_controller_limits_in_flight():
+    controller = _controller(initial=3, min=3, max=3)
+    peak = {"current": 0, "max": 0}
+
+    async def request(_):
+        async with controller.slot("example.com") as slot:
+            peak["current"] += 1
+            peak["max"] = max(peak["max"], peak["current"])
+            await asyncio.sleep(0.001)
+            peak["current"] -= 1
+            slot.record(1, 200)
+
+    async def scenario():
+        await asyncio.gather(*(request(i) for i in range(20)))
+
+    _run(scenario())
+    assert peak["max"] == 3
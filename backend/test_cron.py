@@ -0,0 +1,81 @@
+"""
+Cron 表达式单元测试：日/周并集、月末、夏令时
+"""
+from datetime import datetime, timezone
+from itertools import islice
+
+import pytest
+
+from app.utils.cron import CronError, get_timezone, next_fire_time, parse_cron
+
+UTC = get_timezone("UTC")
+NEW_YORK = get_timezone("America/New_York")
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def _fire_times(expression, after, tz=UTC, count=4):
+    return list(islice(parse_cron(expression).iter_after(after, tz), count))
+
+
+def test_every_minute_is_strictly_after():
+    assert next_fire_time("* * * * *", _utc(2024, 1, 1, 0, 0, 0), "UTC") == _utc(2024, 1, 1, 0, 1)
+    assert next_fire_time("* * * * *", _utc(2024, 1, 1, 0, 0, 30), "UTC") == _utc(2024, 1, 1, 0, 1)
+
+
+def test_day_and_weekday_union():
+    # 日与周同时限定时取并集：每月 13 日或每个周五（2024-10-13 是周日）
+    days = [t.day for t in _fire_times("0 0 13 * 5", _utc(2024, 10, 1))]
+    assert days == [4, 11, 13, 18]
+
+
+def test_weekday_only_and_sunday_aliases():
+    assert _fire_times("0 9 * * 1-5", _utc(2024, 10, 4, 10), count=2) == [_utc(2024, 10, 7, 9), _utc(2024, 10, 8, 9)]
+    assert _fire_times("0 0 * * 0", _utc(2024, 10, 1), count=1) == _fire_times("0 0 * * 7", _utc(2024, 10, 1), count=1)
+    assert _fire_times("0 0 * * SUN", _utc(2024, 10, 1), count=1) == [_utc(2024, 10, 6)]
+
+
+def test_day_only_skips_short_months():
+    assert _fire_times("0 0 31 * *", _utc(2024, 4, 1), count=2) == [_utc(2024, 5, 31), _utc(2024, 7, 31)]
+    assert _fire_times("0 0 29 2 *", _utc(2024, 3, 1), count=1) == [_utc(2028, 2, 29)]
+
+
+def test_steps_ranges_and_seconds():
+    assert _fire_times("*/15 * * * *", _utc(2024, 1, 1, 0, 7), count=3) == [
+        _utc(2024, 1, 1, 0, 15), _utc(2024, 1, 1, 0, 30), _utc(2024, 1, 1, 0, 45),
+    ]
+    assert _fire_times("30 0 0 * * *", _utc(2024, 1, 1), count=1) == [_utc(2024, 1, 1, 0, 0, 30)]
+    assert _fire_times("@daily", _utc(2024, 1, 1, 12), count=1) == [_utc(2024, 1, 2)]
+
+
+def test_dst_spring_forward_skips_missing_local_time():
+    # 2024-03-10 纽约 02:00 跳到 03:00，02:30 不存在，当天不触发
+    assert _fire_times("30 2 * * *", _utc(2024, 3, 9, 8), NEW_YORK, count=2) == [
+        _utc(2024, 3, 11, 6, 30), _utc(2024, 3, 12, 6, 30),
+    ]
+
+
+def test_dst_fall_back_fires_repeated_local_time_once():
+    # 2024-11-03 纽约 01:00-02:00 重复一次，01:30 只在第一次（EDT）触发
+    assert _fire_times("30 1 * * *", _utc(2024, 11, 3, 4), NEW_YORK, count=2) == [
+        _utc(2024, 11, 3, 5, 30), _utc(2024, 11, 4, 6, 30),
+    ]
+
+
+def test_dst_hourly_skips_repeated_hour():
+    # 重复的 01:00（EST，06:00 UTC）不再触发
+    fire_times = _fire_times("0 * * * *", _utc(2024, 11, 3, 4, 30), NEW_YORK, count=3)
+    assert fire_times == [_utc(2024, 11, 3, 5), _utc(2024, 11, 3, 7), _utc(2024, 11, 3, 8)]
+
+
+@pytest.mark.parametrize("expression", ["", "* * * *", "60 * * * *", "* 24 * * *", "* * 0 * *", "* * * 13 *", "a b c d e"])
+def test_invalid_expression(expression):
+    with pytest.raises(CronError):
+        parse_cron(expression)
+
+
+def test_unknown_timezone():
+    with pytest.raises(CronError):
+        get_timezone("Mars/Olympus")
@@ -0,0 +1,98 @@
+"""
+延迟直方图单元测试：分位数精度、合并、序列化
+"""
+import math
+import random
+
+import pytest
+
+from app.utils.histogram import Histogram, percentiles_in_ms
+
+
+def _exact_percentile(values, percentile):
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * percentile / 100))
+    return ordered[rank - 1]
+
+
+def _random_latencies(seed, count=20000):
+    rng = random.Random(seed)
+    return [int(rng.lognormvariate(10, 1)) for _ in range(count)]
+
+
+def test_bucket_boundaries():
+    # 值所在桶的上界不小于该值，且桶宽不超过值的 1/128
+    for value in [0, 1, 127, 128, 255, 256, 257, 1000, 65535, 65536, 10 ** 6, 3_600_000_000 - 1]:
+        histogram = Histogram()
+        histogram.record(value)
+        histogram.record(3_600_000_000)
+        upper = histogram.percentile(50)
+        assert value <= upper <= value + value / 128
+
+
+@pytest.mark.parametrize("percentile", [50.0, 90.0, 99.0, 99.9])
+def test_percentile_relative_error(percentile):
+    values = _random_latencies(1)
+    histogram = Histogram()
+    for value in values:
+        histogram.record(value)
+    exact = _exact_percentile(values, percentile)
+    estimate = histogram.percentile(percentile)
+    assert estimate >= exact
+    assert estimate - exact <= exact / 128 + 1
+
+
+def test_small_values_are_exact():
+    histogram = Histogram()
+    for value in range(1, 101):
+        histogram.record(value)
+    assert histogram.percentiles([50, 90, 100]) == {"p50": 50, "p90": 90, "p100": 100}
+    assert histogram.mean == 50.5
+    assert (histogram.min, histogram.max) == (1, 100)
+
+
+def test_merge_equals_recording_everything():
+    first, second = _random_latencies(2, 5000), _random_latencies(3, 7000)
+    left, right, combined = Histogram(), Histogram(), Histogram()
+    for value in first:
+        left.record(value)
+        combined.record(value)
+    for value in second:
+        right.record(value)
+        combined.record(value)
+
+    merged = Histogram.merged([left, right])
+    assert merged.to_dict() == combined.to_dict()
+    assert merged.percentiles() == combined.percentiles()
+
+
+def test_serialization_round_trip():
+    histogram = Histogram()
+    for value in _random_latencies(4, 1000):
+        histogram.record(value)
+    restored = Histogram.from_dict(histogram.to_dict())
+    assert restored.to_dict() == histogram.to_dict()
+    assert restored.percentiles() == histogram.percentiles()
+
+
+def test_clamping_and_overflow():
+    histogram = Histogram(max_value=1000)
+    histogram.record(-5)
+    histogram.record(5000, count=3)
+    assert histogram.count == 4
+    assert histogram.overflow == 3
+    assert histogram.min == 0
+    assert histogram.max == 1000
+
+
+def test_empty_histogram():
+    histogram = Histogram()
+    assert histogram.mean is None
+    assert histogram.percentile(99) is None
+    assert Histogram.merged([]).count == 0
+
+
+def test_percentiles_in_ms():
+    histogram = Histogram()
+    histogram.record(1500)
+    assert percentiles_in_ms(histogram, [50]) == {"p50": 1.5}
@@ -0,0 +1,114 @@
+"""
+JSONPath 单元测试：与旧实现（原 test_executions._extract_json_path）的结果对比，以及扩展语法
+"""
+from typing import Any
+
+import pytest
+
+from app.utils import json_path
+
+
+def _legacy_extract_json_path(data: Any, path: str) -> Any:
+    """旧实现，仅用于对比（同 scripts/benchmark_json_path.py）"""
+    if not path or not isinstance(data, (dict, list)):
+        return None
+    if path.startswith("$."):
+        path = path[2:]
+    elif path.startswith("$["):
+        path = path[1:]
+    parts = path.split(".")
+    current: Any = data
+    for part in parts:
+        if current is None:
+            return None
+        if "[" in part and part.endswith("]"):
+            name, index_part = part.split("[", 1)
+            index_str = index_part[:-1]
+            if name:
+                if not isinstance(current, dict) or name not in current:
+                    return None
+                current = current.get(name)
+            if not isinstance(current, list):
+                return None
+            try:
+                idx = int(index_str)
+            except ValueError:
+                return None
+            if idx < 0 or idx >= len(current):
+                return None
+            current = current[idx]
+        else:
+            if not isinstance(current, dict) or part not in current:
+                return None
+            current = current.get(part)
+    return current
+
+
+RESPONSE = {
+    "code": 0,
+    "message": "ok",
+    "empty": None,
+    "data": {
+        "user": {"id": 1001, "name": "tester", "roles": ["admin", "qa"]},
+        "token": "abc",
+        "items": [{"id": i, "name": f"item-{i}", "price": i * 1.5, "type": "book" if i % 2 else "pen"} for i in range(10)],
+    },
+    "ItemResultDict": {"OrthoDiagnosis": {"PassedRules": [{"RuleName": "r0", "Score": 0}, {"RuleName": "r1", "Score": 1}]}},
+}
+
+LEGACY_PATHS = [
+    "$.code",
+    "$.message",
+    "$.empty",
+    "$.data.token",
+    "$.data.user.id",
+    "$.data.user.roles[1]",
+    "$.data.user.roles[2]",
+    "$.data.items[9].name",
+    "$.data.missing",
+    "$.data.missing.deeper",
+    "$.code.deeper",
+    "$.data.user[0]",
+    "data.user.name",
+    "$.ItemResultDict.OrthoDiagnosis.PassedRules[1].RuleName",
+]
+
+
+@pytest.mark.parametrize("path", LEGACY_PATHS)
+def test_extract_matches_legacy(path):
+    assert json_path.extract(RESPONSE, path) == _legacy_extract_json_path(RESPONSE, path)
+
+
+def test_extract_many_matches_extract():
+    paths = LEGACY_PATHS + ["$..RuleName", "$.data.items[?(@.price > 10)].id", "$.data.items[*].id", "$[", ""]
+    results = json_path.extract_many(RESPONSE, paths)
+    for path in paths:
+        if path:
+            assert results[path] == json_path.extract(RESPONSE, path), path
+
+
+def test_extract_negative_index():
+    # 旧实现不支持负下标（返回 None），新实现按 Python 语义取值
+    assert json_path.extract(RESPONSE, "$.data.user.roles[-1]") == "qa"
+
+
+def test_extract_multi_value_paths():
+    assert json_path.extract(RESPONSE, "$..RuleName") == ["r0", "r1"]
+    assert json_path.extract(RESPONSE, "$.data.items[0:3].id") == [0, 1, 2]
+    assert json_path.extract(RESPONSE, "$.data.items[?(@.price > 10 && @.type == 'book')].id") == [7, 9]
+    assert json_path.extract(RESPONSE, "$.data.user['id','name']") == [1001, "tester"]
+
+
+def test_extract_invalid_path_returns_none():
+    assert json_path.extract(RESPONSE, "$.data[") is None
+    assert json_path.extract("not json", "$.code") is None
+
+
+def test_compile_path_raises_on_syntax_error():
+    with pytest.raises(json_path.JsonPathError):
+        json_path.compile_path("$.data[?(@.price >")
+
+
+def test_find_first():
+    assert json_path.find_first(RESPONSE, "RuleName") == "r0"
+    assert json_path.find_first(RESPONSE, "missing") is None
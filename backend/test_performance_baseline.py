@@ -0,0 +1,139 @@
+"""
+性能基线回归判定单元测试：延迟分位数、错误率、吞吐量的判定结果
+"""
+import random
+
+from app.models.performance_run import PerformanceRun
+from app.services.performance_baseline import (
+    COMPARED_PERCENTILES,
+    IMPROVEMENT,
+    INSUFFICIENT_BASELINE,
+    NO_CHANGE,
+    REGRESSION,
+    compare_with_baseline,
+)
+from app.utils.histogram import Histogram, percentiles_in_ms
+
+
+def _run_data(seed, scale=1.0, count=5000, failed=0, rps=100.0):
+    """生成一次运行的 (汇总, 直方图)，延迟为对数正态分布（微秒）"""
+    rng = random.Random(seed)
+    histogram = Histogram()
+    for _ in range(count):
+        histogram.record(int(rng.lognormvariate(10, 0.5) * scale))
+    summary = {
+        "total_requests": count,
+        "failed_requests": failed,
+        "error_rate": failed / count,
+        "rps": rps,
+        "percentiles": percentiles_in_ms(histogram, COMPARED_PERCENTILES),
+    }
+    return summary, histogram.to_dict()
+
+
+def _baseline(scales=(1.0, 1.0, 1.0, 1.0, 1.0), rps=(100.0, 101.0, 99.0, 100.0, 100.5)):
+    runs = []
+    for index, (scale, run_rps) in enumerate(zip(scales, rps)):
+        summary, histogram = _run_data(index, scale, rps=run_rps)
+        runs.append(PerformanceRun(id=index + 1, summary=summary, histogram=histogram))
+    return runs
+
+
+def _verdicts(result):
+    return {metric["metric"]: metric["verdict"] for metric in result["metrics"]}
+
+
+def test_insufficient_baseline():
+    summary, histogram = _run_data(100, scale=2.0)
+    result = compare_with_baseline(summary, histogram, _baseline()[:2])
+    assert result["verdict"] == INSUFFICIENT_BASELINE
+    assert result["metrics"] == []
+    assert result["baseline_run_ids"] == [1, 2]
+
+
+def test_same_distribution_is_no_change():
+    summary, histogram = _run_data(100, rps=100.2)
+    result = compare_with_baseline(summary, histogram, _baseline())
+    assert result["verdict"] == NO_CHANGE
+    assert set(_verdicts(result)) == {"p50_ms", "p95_ms", "p99_ms", "error_rate", "rps"}
+    assert set(_verdicts(result).values()) == {NO_CHANGE}
+
+
+def test_latency_regression():
+    summary, histogram = _run_data(100, scale=1.5, rps=100.2)
+    result = compare_with_baseline(summary, histogram, _baseline())
+    assert result["verdict"] == REGRESSION
+    verdicts = _verdicts(result)
+    assert verdicts["p50_ms"] == verdicts["p95_ms"] == verdicts["p99_ms"] == REGRESSION
+    assert verdicts["error_rate"] == verdicts["rps"] == NO_CHANGE
+
+
+def test_latency_improvement():
+    summary, histogram = _run_data(100, scale=0.6, rps=100.2)
+    result = compare_with_baseline(summary, histogram, _baseline())
+    assert result["verdict"] == IMPROVEMENT
+    assert _verdicts(result)["p50_ms"] == IMPROVEMENT
+
+
+def test_change_below_threshold_is_no_change():
+    summary, histogram = _run_data(100, scale=1.05, rps=100.2)
+    result = compare_with_baseline(summary, histogram, _baseline())
+    assert result["verdict"] == NO_CHANGE
+
+
+def test_change_within_noisy_baseline_is_no_change():
+    # 超过阈值，但基线各次运行本身波动很大，仍在预测区间内
+    baseline = _baseline(scales=(0.6, 1.4, 1.0, 0.7, 1.3))
+    summary, histogram = _run_data(100, scale=1.2, rps=100.2)
+    result = compare_with_baseline(summary, histogram, baseline)
+    assert _verdicts(result)["p50_ms"] == NO_CHANGE
+    assert result["verdict"] == NO_CHANGE
+
+
+def test_latency_judged_without_histograms():
+    baseline = _baseline()
+    for run in baseline:
+        run.histogram = None
+    summary, _ = _run_data(100, scale=1.5, rps=100.2)
+    result = compare_with_baseline(summary, None, baseline)
+    assert result["verdict"] == REGRESSION
+    p50 = next(metric for metric in result["metrics"] if metric["metric"] == "p50_ms")
+    assert p50["current_interval"] is None and p50["baseline_interval"] is None
+
+
+def test_error_rate_regression():
+    summary, histogram = _run_data(100, failed=250, rps=100.2)
+    result = compare_with_baseline(summary, histogram, _baseline())
+    assert result["verdict"] == REGRESSION
+    assert _verdicts(result)["error_rate"] == REGRESSION
+    assert _verdicts(result)["p50_ms"] == NO_CHANGE
+
+
+def test_small_error_rate_increase_is_no_change():
+    # 绝对升幅未超过 PERF_BASELINE_ERROR_RATE_DELTA
+    summary, histogram = _run_data(100, failed=25, rps=100.2)
+    result = compare_with_baseline(summary, histogram, _baseline())
+    assert _verdicts(result)["error_rate"] == NO_CHANGE
+
+
+def test_throughput_regression():
+    summary, histogram = _run_data(100, rps=70.0)
+    result = compare_with_baseline(summary, histogram, _baseline())
+    assert result["verdict"] == REGRESSION
+    assert _verdicts(result)["rps"] == REGRESSION
+
+
+def test_regression_takes_precedence_over_improvement():
+    summary, histogram = _run_data(100, scale=0.6, rps=70.0)
+    result = compare_with_baseline(summary, histogram, _baseline())
+    verdicts = _verdicts(result)
+    assert verdicts["p50_ms"] == IMPROVEMENT
+    assert verdicts["rps"] == REGRESSION
+    assert result["verdict"] == REGRESSION
+
+
+def test_explicit_threshold():
+    summary, histogram = _run_data(100, scale=1.5, rps=100.2)
+    result = compare_with_baseline(summary, histogram, _baseline(), threshold=0.8)
+    assert result["threshold"] == 0.8
+    assert result["verdict"] == NO_CHANGE
@@ -0,0 +1,100 @@
+"""
+${var} 模板渲染单元测试：与旧实现（原 _replace_template_variables）的结果对比，以及类型保留规则
+"""
+import copy
+import json
+import re
+from typing import Any, Dict
+
+import pytest
+
+from app.utils.template import Template, render, render_string, find_unresolved
+
+
+def _legacy_replace(template: Any, test_data: Dict[str, Any]) -> Any:
+    """旧实现，仅用于对比"""
+
+    def replace_value(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {k: replace_value(v) for k, v in value.items()}
+        elif isinstance(value, list):
+            return [replace_value(item) for item in value]
+        elif isinstance(value, str) and "${" in value:
+            def replacer(match):
+                var_value = test_data.get(match.group(1))
+                if var_value is None:
+                    return match.group(0)
+                if isinstance(var_value, (dict, list)):
+                    return json.dumps(var_value, ensure_ascii=False)
+                return str(var_value)
+            return re.sub(r'\$\{(\w+)\}', replacer, value)
+        return value
+
+    return replace_value(copy.deepcopy(template))
+
+
+VARIABLES = {
+    "id": 7,
+    "name": "张三",
+    "flag": True,
+    "ids": [1, 2],
+    "profile": {"age": 18},
+    "empty": None,
+}
+
+TEMPLATES = [
+    "plain",
+    "${id}",
+    "user_${id}_${name}",
+    "${missing}",
+    "prefix ${empty} suffix",
+    "${ids}",
+    "json=${profile}",
+    "$id {id} ${ id }",
+    {"path": "/users/${id}", "body": {"name": "${name}", "tags": ["${flag}", "static", 3]}, "n": None},
+    ["${id}", {"k": "${missing}"}, 1.5],
+]
+
+
+@pytest.mark.parametrize("template", TEMPLATES)
+def test_string_mode_matches_legacy(template):
+    assert render(template, VARIABLES, typed=False) == _legacy_replace(template, VARIABLES)
+
+
+def test_typed_whole_placeholder_keeps_type():
+    assert render("${id}", VARIABLES) == 7
+    assert render("${ids}", VARIABLES) == [1, 2]
+    assert render({"v": "${flag}"}, VARIABLES) == {"v": True}
+    # 部分替换始终是字符串
+    assert render("n=${id}", VARIABLES) == "n=7"
+
+
+def test_typed_convert_applies_to_whole_placeholder_only():
+    assert render("${id}", VARIABLES, convert=str) == "7"
+    assert render("x${id}", VARIABLES, convert=lambda v: v * 2) == "x7"
+
+
+def test_render_does_not_modify_template():
+    source = {"a": {"b": ["${id}", "keep"]}, "static": {"x": 1}}
+    snapshot = copy.deepcopy(source)
+    rendered = Template(source).render(VARIABLES)
+    assert rendered == {"a": {"b": [7, "keep"]}, "static": {"x": 1}}
+    assert source == snapshot
+
+
+def test_static_template_returns_source():
+    source = {"a": [1, 2], "b": "text"}
+    template = Template(source)
+    assert template.is_static
+    assert template.render(VARIABLES) is source
+
+
+def test_template_variables():
+    assert Template({"a": "${id}-${name}", "b": ["${flag}"]}).variables == {"id", "name", "flag"}
+
+
+def test_render_string_and_unresolved():
+    assert render_string("${id}", VARIABLES) == "7"
+    assert render_string("${id}", VARIABLES, typed=True) == 7
+    assert render_string("${id}", None) == "${id}"
+    assert find_unresolved({"a": "${missing}", "b": "ok"}) == ["a"]
@@ -0,0 +1,244 @@
+import React, { useEffect, useState } from 'react'
+import { Table, Tag, Select, Space, Spin, Row, Col, Card, Input, message } from 'antd'
+import { testExecutionService, type ExecutionStep } from '../store/services/testExecution'
+
+const { TextArea } = Input
+const { Option } = Select
+
+interface ExecutionStepsProps {
+  executionId: number
+  // 步骤结果表上线前的历史执行：明细直接保存在 result.details 中
+  legacyDetails?: any[]
+}
+
+// 把历史执行的明细转换为步骤摘要，字段与 /steps 接口一致
+const legacyStep = (detail: any, index: number): ExecutionStep => {
+  const assertions = Array.isArray(detail?.assertions) ? detail.assertions : []
+  return {
+    step_index: detail?.data_index ?? detail?.step ?? index,
+    name: detail?.name,
+    status: detail?.status || 'failed',
+    method: detail?.request?.method,
+    url: detail?.request?.url,
+    status_code: detail?.response?.status_code,
+    latency_ms: detail?.response?.latency_ms,
+    assertions_total: assertions.length,
+    assertions_failed: assertions.filter((a: any) => a && !a.passed).length,
+    error: detail?.error || detail?.response?.error,
+  }
+}
+
+const jsonBlock = (value: any) => (
+  <TextArea
+    readOnly
+    value={JSON.stringify(value ?? {}, null, 2)}
+    autoSize={{ minRows: 4, maxRows: 15 }}
+    style={{ fontFamily: 'Consolas, "Courier New", monospace', fontSize: 12, backgroundColor: '#f5f5f5' }}
+  />
+)
+
+const ExecutionSteps: React.FC<ExecutionStepsProps> = ({ executionId, legacyDetails }) => {
+  const [steps, setSteps] = useState<ExecutionStep[]>([])
+  const [total, setTotal] = useState(0)
+  const [loading, setLoading] = useState(false)
+  const [page, setPage] = useState(1)
+  const [pageSize, setPageSize] = useState(20)
+  const [statusFilter, setStatusFilter] = useState<string | undefined>(undefined)
+  const [legacy, setLegacy] = useState(false)
+  // 已展开步骤的完整明细（按 step_index 缓存，展开时才请求）
+  const [details, setDetails] = useState<Record<number, any>>({})
+  const [loadingDetails, setLoadingDetails] = useState<Record<number, boolean>>({})
+
+  useEffect(() => {
+    setPage(1)
+    setDetails({})
+    setLegacy(false)
+  }, [executionId])
+
+  useEffect(() => {
+    loadSteps()
+  }, [executionId, page, pageSize, statusFilter])
+
+  const loadSteps = async () => {
+    try {
+      setLoading(true)
+      const data = await testExecutionService.getExecutionSteps(executionId, {
+        status: statusFilter,
+        skip: (page - 1) * pageSize,
+        limit: pageSize,
+      })
+      if (data.total === 0 && !statusFilter && Array.isArray(legacyDetails) && legacyDetails.length > 0) {
+        // 历史执行没有步骤记录，直接使用报告中的明细
+        const legacySteps = legacyDetails.map(legacyStep)
+        const legacyMap: Record<number, any> = {}
+        legacyDetails.forEach((detail, index) => {
+          legacyMap[legacySteps[index].step_index] = detail
+        })
+        setLegacy(true)
+        setDetails(legacyMap)
+        setSteps(legacySteps)
+        setTotal(legacySteps.length)
+        return
+      }
+      setSteps(data.items || [])
+      setTotal(data.total || 0)
+    } catch (error: any) {
+      message.error('加载执行步骤失败: ' + (error.response?.data?.detail || error.message))
+      setSteps([])
+      setTotal(0)
+    } finally {
+      setLoading(false)
+    }
+  }
+
+  const loadDetail = async (stepIndex: number) => {
+    if (details[stepIndex] || loadingDetails[stepIndex]) {
+      return
+    }
+    setLoadingDetails(prev => ({ ...prev, [stepIndex]: true }))
+    try {
+      const data = await testExecutionService.getExecutionStepDetail(executionId, stepIndex)
+      setDetails(prev => ({ ...prev, [stepIndex]: data.detail }))
+    } catch (error: any) {
+      message.error('加载步骤明细失败: ' + (error.response?.data?.detail || error.message))
+    } finally {
+      setLoadingDetails(prev => ({ ...prev, [stepIndex]: false }))
+    }
+  }
+
+  const columns = [
+    {
+      title: '序号',
+      dataIndex: 'step_index',
+      key: 'step_index',
+      width: 70,
+    },
+    {
+      title: '名称',
+      dataIndex: 'name',
+      key: 'name',
+      render: (name?: string | null) => name || '-',
+    },
+    {
+      title: '状态',
+      dataIndex: 'status',
+      key: 'status',
+      width: 80,
+      render: (status: string) => (
+        <Tag color={status === 'passed' ? 'success' : 'error'}>{status === 'passed' ? '通过' : '失败'}</Tag>
+      ),
+    },
+    {
+      title: '请求',
+      key: 'request',
+      ellipsis: true,
+      render: (_: any, record: ExecutionStep) =>
+        record.url ? `${record.method || ''} ${record.url}`.trim() : '-',
+    },
+    {
+      title: '状态码',
+      dataIndex: 'status_code',
+      key: 'status_code',
+      width: 80,
+      render: (code?: number | null) => code ?? '-',
+    },
+    {
+      title: '耗时(ms)',
+      dataIndex: 'latency_ms',
+      key: 'latency_ms',
+      width: 90,
+      render: (latency?: number | null) => latency ?? '-',
+    },
+    {
+      title: '断言',
+      key: 'assertions',
+      width: 90,
+      render: (_: any, record: ExecutionStep) =>
+        record.assertions_total ? `${record.assertions_total - record.assertions_failed}/${record.assertions_total}` : '-',
+    },
+    {
+      title: '错误',
+      dataIndex: 'error',
+      key: 'error',
+      ellipsis: true,
+      render: (error?: string | null) => error || '-',
+    },
+  ]
+
+  const renderDetail = (record: ExecutionStep) => {
+    const detail = details[record.step_index]
+    if (!detail) {
+      return loadingDetails[record.step_index] ? <Spin size="small" /> : <span>暂无明细</span>
+    }
+    return (
+      <Space direction="vertical" style={{ width: '100%' }}>
+        {detail.test_data && <Card size="small" title="测试数据">{jsonBlock(detail.test_data)}</Card>}
+        <Row gutter={16}>
+          <Col span={12}>
+            <Card size="small" title="请求信息">{jsonBlock(detail.request)}</Card>
+          </Col>
+          <Col span={12}>
+            <Card size="small" title="响应信息">{jsonBlock(detail.response)}</Card>
+          </Col>
+        </Row>
+        {Array.isArray(detail.assertions) && detail.assertions.length > 0 && (
+          <Card size="small" title="断言结果">{jsonBlock(detail.assertions)}</Card>
+        )}
+        {Array.isArray(detail.steps) && detail.steps.length > 0 && (
+          <Card size="small" title="流程步骤">{jsonBlock(detail.steps)}</Card>
+        )}
+      </Space>
+    )
+  }
+
+  return (
+    <div>
+      <Space style={{ marginBottom: 12 }}>
+        <Select
+          allowClear
+          placeholder="按状态筛选"
+          style={{ width: 140 }}
+          value={statusFilter}
+          disabled={legacy}
+          onChange={(value) => {
+            setStatusFilter(value)
+            setPage(1)
+          }}
+        >
+          <Option value="passed">通过</Option>
+          <Option value="failed">失败</Option>
+        </Select>
+        <span style={{ color: '#666' }}>共 {total} 个步骤，展开行查看请求/响应明细</span>
+      </Space>
+      <Table
+        size="small"
+        rowKey="step_index"
+        columns={columns}
+        dataSource={legacy ? steps.slice((page - 1) * pageSize, page * pageSize) : steps}
+        loading={loading}
+        scroll={{ x: 'max-content' }}
+        expandable={{
+          expandedRowRender: renderDetail,
+          onExpand: (expanded, record) => {
+            if (expanded) {
+              loadDetail(record.step_index)
+            }
+          },
+        }}
+        pagination={{
+          current: page,
+          pageSize,
+          total,
+          showSizeChanger: true,
+          pageSizeOptions: ['20', '50', '100'],
+          onChange: (p, size) => {
+            setPage(p)
+            setPageSize(size || 20)
+          },
+        }}
+      />
+    </div>
+  )
+}
+
+export default ExecutionSteps
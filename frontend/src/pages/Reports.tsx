@@ -2,6 +2,7 @@ import { useEffect, useState, useRef } from 'react'
 import { Table, Button, Tag, Modal, message, Card, Row, Col, Statistic, Tabs, Dropdown, Input, Popconfirm, Space } from 'antd'
 import { DownloadOutlined, EyeOutlined, ShareAltOutlined, DownOutlined, DeleteOutlined } from '@ant-design/icons'
 import { reportService, ReportSummary, ReportDetail } from '../store/services/report'
+import ExecutionSteps from '../components/ExecutionSteps'
 import dayjs from 'dayjs'
 
 const { TextArea } = Input
@@ -843,6 +844,7 @@ const Reports: React.FC = () => {
         {currentReport && (
           <Tabs
             defaultActiveKey="overview"
+            destroyInactiveTabPane
             items={[
               {
                 key: 'overview',
@@ -988,6 +990,16 @@ const Reports: React.FC = () => {
                   <p>当前报告尚未包含请求/响应明细。</p>
                 ),
               },
+              {
+                key: 'steps',
+                label: '步骤明细',
+                children: (
+                  <ExecutionSteps
+                    executionId={currentReport.execution_id}
+                    legacyDetails={(currentReport as any)?.result?.details}
+                  />
+                ),
+              },
             ]}
           />
         )}
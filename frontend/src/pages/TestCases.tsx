@@ -1047,14 +1047,14 @@ const TestCases: React.FC = () => {
   const handleExecute = async (testCase: TestCase) => {
     try {
       message.loading('正在执行测试用例...', 0)
-      const execution = await testExecutionService.createTestExecution({
+      const { execution } = await testExecutionService.createTestExecution({
         test_case_id: testCase.id,
         project_id: testCase.project_id,
         environment: 'default',
         config: {},
       })
       message.destroy()
-      message.success('测试用例执行已启动，执行ID: ' + execution.id)
+      message.success('测试用例执行已启动，执行ID: ' + execution?.id)
       // 可以跳转到测试执行页面查看结果
       // window.location.href = `/api-testing/test-executions?execution_id=${execution.id}`
     } catch (error: any) {
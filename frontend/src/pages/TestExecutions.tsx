@@ -1,7 +1,8 @@
 import { useState, useEffect, useRef, useMemo } from 'react'
-import { Table, Tag, Button, Space, Modal, Form, Select, message, Card, Tabs, Statistic, Row, Col, Radio, InputNumber, Input, DatePicker, Popconfirm } from 'antd'
-import { PlayCircleOutlined, EyeOutlined, DeleteOutlined } from '@ant-design/icons'
+import { Table, Tag, Button, Space, Modal, Form, Select, message, Card, Tabs, Statistic, Row, Col, Radio, InputNumber, Input, DatePicker, Popconfirm, Switch } from 'antd'
+import { PlayCircleOutlined, EyeOutlined, DeleteOutlined, EditOutlined } from '@ant-design/icons'
 import { testExecutionService, TestExecution, TestExecutionCreate } from '../store/services/testExecution'
+import { scheduleService, type Schedule } from '../store/services/schedule'
 import { testCaseService } from '../store/services/testCase'
 import { projectService } from '../store/services/project'
 import { testCaseCollectionService, type TestCaseCollection } from '../store/services/testCaseCollection'
@@ -21,6 +22,7 @@ const TestExecutions: React.FC = () => {
   const [logModalVisible, setLogModalVisible] = useState(false)
   const [selectedExecution, setSelectedExecution] = useState<TestExecution | null>(null)
   const [logs, setLogs] = useState('')
+  const [rawLogs, setRawLogs] = useState('')
   const [form] = Form.useForm()
   const [projects, setProjects] = useState<any[]>([])
   const [testCases, setTestCases] = useState<any[]>([])
@@ -45,6 +47,10 @@ const TestExecutions: React.FC = () => {
   const [pageSize, setPageSize] = useState(20)
   const [selectedRowKeys, setSelectedRowKeys] = useState<React.Key[]>([])
   const searchTimeoutRef = useRef<NodeJS.Timeout | null>(null)
+  const [schedules, setSchedules] = useState<Schedule[]>([])
+  const [schedulesLoading, setSchedulesLoading] = useState(false)
+  const [editingSchedule, setEditingSchedule] = useState<Schedule | null>(null)
+  const [scheduleForm] = Form.useForm()
 
   useEffect(() => {
     loadProjects()
@@ -261,6 +267,81 @@ const TestExecutions: React.FC = () => {
     }
   }
 
+  const loadSchedules = async () => {
+    try {
+      setSchedulesLoading(true)
+      const data = await scheduleService.getSchedules(projectFilter ? { project_id: projectFilter } : undefined)
+      setSchedules(data)
+    } catch (error: any) {
+      message.error('加载定时计划失败: ' + (error.response?.data?.detail || error.message))
+      setSchedules([])
+    } finally {
+      setSchedulesLoading(false)
+    }
+  }
+
+  useEffect(() => {
+    if (activeTab === 'tasks') {
+      loadSchedules()
+    }
+  }, [activeTab, projectFilter])
+
+  const handleToggleSchedule = async (schedule: Schedule, enabled: boolean) => {
+    try {
+      await scheduleService.updateSchedule(schedule.id, { enabled })
+      message.success(enabled ? '定时计划已启用' : '定时计划已停用')
+      loadSchedules()
+    } catch (error: any) {
+      message.error('更新定时计划失败: ' + (error.response?.data?.detail || error.message))
+    }
+  }
+
+  const handleRunSchedule = async (schedule: Schedule) => {
+    try {
+      await scheduleService.runSchedule(schedule.id)
+      message.success('已触发一次执行')
+      loadSchedules()
+    } catch (error: any) {
+      message.error('触发定时计划失败: ' + (error.response?.data?.detail || error.message))
+    }
+  }
+
+  const handleDeleteSchedule = async (id: number) => {
+    try {
+      await scheduleService.deleteSchedule(id)
+      message.success('删除成功')
+      loadSchedules()
+    } catch (error: any) {
+      message.error('删除定时计划失败: ' + (error.response?.data?.detail || error.message))
+    }
+  }
+
+  const handleEditSchedule = (schedule: Schedule) => {
+    setEditingSchedule(schedule)
+    scheduleForm.setFieldsValue({
+      name: schedule.name,
+      cron_expression: schedule.cron_expression,
+      timezone: schedule.timezone,
+      environment: schedule.environment,
+    })
+  }
+
+  const handleScheduleSubmit = async () => {
+    if (!editingSchedule) return
+    try {
+      const values = await scheduleForm.validateFields()
+      await scheduleService.updateSchedule(editingSchedule.id, values)
+      message.success('定时计划已更新')
+      setEditingSchedule(null)
+      loadSchedules()
+    } catch (error: any) {
+      if (error.errorFields) {
+        return
+      }
+      message.error('更新定时计划失败: ' + (error.response?.data?.detail || error.message))
+    }
+  }
+
   // 当分页参数、筛选条件变化时立即加载
   useEffect(() => {
     // 清除搜索防抖定时器
@@ -563,16 +644,25 @@ const TestExecutions: React.FC = () => {
         return
       }
 
-      await Promise.all(
+      const results = await Promise.all(
         executionsToCreate.map(data => testExecutionService.createTestExecution(data)),
       )
 
-      message.success(`已启动 ${executionsToCreate.length} 条测试执行`)
+      // 周期定时（每天/每周/时间段）创建的是定时计划，在「任务管理」中查看和维护
+      const scheduleCount = results.filter(result => result.schedule).length
+      if (scheduleCount > 0) {
+        message.success(`已创建 ${scheduleCount} 个定时计划，可在「任务管理」中查看`)
+      } else {
+        message.success(`已启动 ${executionsToCreate.length} 条测试执行`)
+      }
       setModalVisible(false)
       form.resetFields()
       setExecutionMode('immediate')
       setScheduleType('once')
       loadExecutions()
+      if (scheduleCount > 0) {
+        loadSchedules()
+      }
     } catch (error: any) {
       if (error.errorFields) {
         return
@@ -584,7 +674,8 @@ const TestExecutions: React.FC = () => {
   const handleViewLogs = async (execution: TestExecution) => {
     try {
       setSelectedExecution(execution)
-      const logData = await testExecutionService.getExecutionLogs(execution.id)
+      const logData = await testExecutionService.getAllExecutionLogs(execution.id)
+      setRawLogs(logData.logs || '')
       setLogs(logData.logs || '暂无日志')
       setLogModalVisible(true)
     } catch (error: any) {
@@ -835,6 +926,84 @@ const TestExecutions: React.FC = () => {
     },
   ]
 
+  const scheduleColumns = [
+    {
+      title: '计划ID',
+      dataIndex: 'id',
+      key: 'id',
+      width: 80,
+    },
+    {
+      title: '名称',
+      dataIndex: 'name',
+      key: 'name',
+    },
+    {
+      title: '执行目标',
+      key: 'target',
+      render: (_: any, record: Schedule) =>
+        record.test_case_id ? `测试用例 #${record.test_case_id}` : `测试计划 #${record.test_plan_id}`,
+    },
+    {
+      title: 'Cron 表达式',
+      dataIndex: 'cron_expression',
+      key: 'cron_expression',
+      render: (cron: string, record: Schedule) => `${cron}（${record.timezone}）`,
+    },
+    {
+      title: '环境',
+      dataIndex: 'environment',
+      key: 'environment',
+      render: (environment?: string | null) => environment || '-',
+    },
+    {
+      title: '下次执行时间',
+      dataIndex: 'next_run_at',
+      key: 'next_run_at',
+      render: (time?: string | null) => (time ? dayjs(time).format('YYYY/MM/DD HH:mm:ss') : '-'),
+    },
+    {
+      title: '上次执行时间',
+      dataIndex: 'last_run_at',
+      key: 'last_run_at',
+      render: (time?: string | null) => (time ? dayjs(time).format('YYYY/MM/DD HH:mm:ss') : '-'),
+    },
+    {
+      title: '启用',
+      dataIndex: 'enabled',
+      key: 'enabled',
+      width: 80,
+      render: (enabled: boolean, record: Schedule) => (
+        <Switch size="small" checked={enabled} onChange={(checked) => handleToggleSchedule(record, checked)} />
+      ),
+    },
+    {
+      title: '操作',
+      key: 'action',
+      width: 240,
+      render: (_: any, record: Schedule) => (
+        <Space size="middle">
+          <Button type="link" icon={<PlayCircleOutlined />} onClick={() => handleRunSchedule(record)}>
+            立即执行
+          </Button>
+          <Button type="link" icon={<EditOutlined />} onClick={() => handleEditSchedule(record)}>
+            编辑
+          </Button>
+          <Popconfirm
+            title="确定要删除这个定时计划吗？已创建的测试执行会保留"
+            onConfirm={() => handleDeleteSchedule(record.id)}
+            okText="确定"
+            cancelText="取消"
+          >
+            <Button type="link" danger icon={<DeleteOutlined />}>
+              删除
+            </Button>
+          </Popconfirm>
+        </Space>
+      ),
+    },
+  ]
+
   const totalCount = Array.isArray(executions) ? executions.length : 0
   const statusCount = (status: string) =>
     Array.isArray(executions) ? executions.filter(e => e.status === status).length : 0
@@ -978,6 +1147,29 @@ const TestExecutions: React.FC = () => {
     </div>
   )
 
+  // 任务管理：周期定时计划 + 单次定时执行（待执行）
+  const tasksPanel = (
+    <>
+      <Card
+        title="定时计划"
+        size="small"
+        style={{ marginBottom: 16 }}
+        extra={<Button onClick={loadSchedules}>刷新</Button>}
+      >
+        <Table
+          columns={scheduleColumns}
+          dataSource={schedules}
+          rowKey="id"
+          loading={schedulesLoading}
+          size="small"
+          scroll={{ x: 'max-content' }}
+          pagination={{ pageSize: 10, hideOnSinglePage: true }}
+        />
+      </Card>
+      {executionTable}
+    </>
+  )
+
   const monitorPanel = (
     <Row gutter={16}>
       <Col span={6}>
@@ -1031,7 +1223,7 @@ const TestExecutions: React.FC = () => {
           {
             key: 'tasks',
             label: '任务管理',
-            children: executionTable,
+            children: tasksPanel,
           },
           {
             key: 'monitor',
@@ -1065,6 +1257,39 @@ const TestExecutions: React.FC = () => {
           },
         ]}
       />
+      <Modal
+        title="编辑定时计划"
+        open={!!editingSchedule}
+        onOk={handleScheduleSubmit}
+        onCancel={() => setEditingSchedule(null)}
+        width={480}
+      >
+        <Form form={scheduleForm} layout="vertical">
+          <Form.Item name="name" label="名称" rules={[{ required: true, message: '请输入名称' }]}>
+            <Input />
+          </Form.Item>
+          <Form.Item
+            name="cron_expression"
+            label="Cron 表达式"
+            rules={[{ required: true, message: '请输入 Cron 表达式' }]}
+            extra="分 时 日 月 周，例如 0 9 * * 1-5 表示工作日 9:00"
+          >
+            <Input />
+          </Form.Item>
+          <Form.Item name="timezone" label="时区" rules={[{ required: true, message: '请输入时区' }]}>
+            <Input placeholder="Asia/Shanghai" />
+          </Form.Item>
+          <Form.Item name="environment" label="执行环境">
+            <Select allowClear placeholder="选择执行环境">
+              {environments.map(env => (
+                <Option key={env.key} value={env.key}>
+                  {env.name}
+                </Option>
+              ))}
+            </Select>
+          </Form.Item>
+        </Form>
+      </Modal>
       <Modal
         title="执行测试"
         open={modalVisible}
@@ -1466,10 +1691,10 @@ const TestExecutions: React.FC = () => {
               style={{ width: 220 }}
               onChange={(level) => {
                 if (!level) {
-                  setLogs(selectedExecution?.logs || logs)
+                  setLogs(rawLogs || '暂无日志')
                   return
                 }
-                const raw = selectedExecution?.logs || logs || ''
+                const raw = rawLogs
                 const filtered = raw
                   .split('\n')
                   .filter(line => line.toUpperCase().includes(String(level).toUpperCase()))
@@ -1486,7 +1711,7 @@ const TestExecutions: React.FC = () => {
               placeholder="搜索日志关键字"
               style={{ width: 260 }}
               onSearch={(keyword) => {
-                const raw = selectedExecution?.logs || logs || ''
+                const raw = rawLogs
                 if (!keyword) {
                   setLogs(raw)
                   return
@@ -121,8 +121,15 @@ const UIExecutions: React.FC = () => {
   }
 
   const handleViewDetail = async (execution: TestExecution) => {
+    // 列表只返回摘要字段，结果、截图与日志需要读取执行详情
     setSelectedExecution(execution)
     setDetailModalVisible(true)
+    try {
+      const detail = await testExecutionService.getTestExecution(execution.id)
+      setSelectedExecution(detail)
+    } catch (error: any) {
+      message.error('加载执行详情失败: ' + (error.response?.data?.detail || error.message))
+    }
   }
 
   const handleRetry = async (execution: TestExecution) => {
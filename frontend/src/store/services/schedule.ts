@@ -0,0 +1,70 @@
+import { api } from './api'
+
+export interface Schedule {
+  id: number
+  name: string
+  description?: string
+  project_id: number
+  test_case_id?: number | null
+  test_plan_id?: number | null
+  environment?: string | null
+  config?: Record<string, any> | null
+  cron_expression: string
+  timezone: string
+  start_at?: string | null
+  end_at?: string | null
+  enabled: boolean
+  misfire_policy?: string | null
+  misfire_grace_seconds?: number | null
+  jitter_seconds?: number | null
+  next_fire_at?: string | null
+  next_run_at?: string | null
+  last_run_at?: string | null
+  last_lag_seconds?: number | null
+  last_execution_id?: number | null
+  last_plan_run_id?: number | null
+  created_by?: number | null
+  created_at?: string
+  updated_at?: string
+}
+
+export interface ScheduleUpdate {
+  name?: string
+  description?: string
+  environment?: string
+  config?: Record<string, any>
+  cron_expression?: string
+  timezone?: string
+  start_at?: string | null
+  end_at?: string | null
+  enabled?: boolean
+}
+
+export interface ScheduleListParams {
+  project_id?: number
+  enabled?: boolean
+  skip?: number
+  limit?: number
+}
+
+export const scheduleService = {
+  async getSchedules(params?: ScheduleListParams): Promise<Schedule[]> {
+    const response = await api.get<Schedule[]>('/schedules', { params })
+    return Array.isArray(response.data) ? response.data : []
+  },
+
+  async updateSchedule(id: number, data: ScheduleUpdate): Promise<Schedule> {
+    const response = await api.put<Schedule>(`/schedules/${id}`, data)
+    return response.data
+  },
+
+  async deleteSchedule(id: number): Promise<void> {
+    await api.delete(`/schedules/${id}`)
+  },
+
+  // 立即触发一次，不影响下次触发时间
+  async runSchedule(id: number): Promise<Schedule> {
+    const response = await api.post<Schedule>(`/schedules/${id}/run`)
+    return response.data
+  },
+}
@@ -1,4 +1,5 @@
 import { api } from './api'
+import type { Schedule } from './schedule'
 
 export interface TestExecution {
   id: number
@@ -21,6 +22,12 @@ export interface TestExecutionCreate {
   environment?: string
 }
 
+// 创建结果：立即/单次定时执行返回 execution，周期定时（每天/每周/时间段）返回 schedule
+export interface TestExecutionCreateResult {
+  execution?: TestExecution | null
+  schedule?: Schedule | null
+}
+
 export interface TestExecutionListParams {
   project_id?: number
   test_case_id?: number
@@ -30,6 +37,65 @@ export interface TestExecutionListParams {
   limit?: number
 }
 
+export interface ExecutionLogEntry {
+  seq: number
+  level: string
+  message: string
+  created_at?: string
+}
+
+export interface ExecutionLogParams {
+  after?: number
+  limit?: number
+  tail?: number
+  level?: string
+}
+
+export interface ExecutionLogPage {
+  execution_id: number
+  logs: string
+  status: string
+  entries: ExecutionLogEntry[]
+  next_seq: number
+  has_more: boolean
+  has_earlier: boolean
+}
+
+// 步骤摘要（不含请求/响应明细，明细按需通过 getExecutionStepDetail 加载）
+export interface ExecutionStep {
+  step_index: number
+  name?: string | null
+  status: string
+  method?: string | null
+  url?: string | null
+  status_code?: number | null
+  latency_ms?: number | null
+  response_size?: number | null
+  request_body_hash?: string | null
+  response_body_hash?: string | null
+  assertions_total: number
+  assertions_failed: number
+  error?: string | null
+}
+
+export interface ExecutionStepParams {
+  status?: string
+  skip?: number
+  limit?: number
+}
+
+export interface ExecutionStepPage {
+  execution_id: number
+  total: number
+  items: ExecutionStep[]
+}
+
+export interface ExecutionStepDetail {
+  execution_id: number
+  step_index: number
+  detail: Record<string, any>
+}
+
 export interface TestExecutionListResponse {
   items: TestExecution[]
   total: number
@@ -83,17 +149,52 @@ export const testExecutionService = {
   },
 
   // 创建测试执行
-  async createTestExecution(data: TestExecutionCreate): Promise<TestExecution> {
-    const response = await api.post<TestExecution>('/test-executions', data)
+  async createTestExecution(data: TestExecutionCreate): Promise<TestExecutionCreateResult> {
+    const response = await api.post<TestExecutionCreateResult>('/test-executions', data)
     return response.data
   },
 
-  // 获取执行日志
-  async getExecutionLogs(id: number): Promise<{ execution_id: number; logs: string; status: string }> {
-    const response = await api.get(`/test-executions/${id}/logs`)
+  // 分页获取执行步骤摘要
+  async getExecutionSteps(id: number, params?: ExecutionStepParams): Promise<ExecutionStepPage> {
+    const response = await api.get<ExecutionStepPage>(`/test-executions/${id}/steps`, { params })
     return response.data
   },
 
+  // 获取单个步骤的完整明细（请求、响应、断言）
+  async getExecutionStepDetail(id: number, stepIndex: number): Promise<ExecutionStepDetail> {
+    const response = await api.get<ExecutionStepDetail>(`/test-executions/${id}/steps/${stepIndex}`)
+    return response.data
+  },
+
+  // 获取执行日志（不传参数时返回最近的日志，has_earlier 表示还有更早的日志）
+  async getExecutionLogs(id: number, params?: ExecutionLogParams): Promise<ExecutionLogPage> {
+    const response = await api.get<ExecutionLogPage>(`/test-executions/${id}/logs`, { params })
+    return response.data
+  },
+
+  // 获取完整执行日志：从第一条起按 next_seq 分页读取
+  async getAllExecutionLogs(id: number): Promise<ExecutionLogPage> {
+    const pageSize = 5000
+    const first = await this.getExecutionLogs(id, { after: 0, limit: pageSize })
+    if (!first.entries?.length) {
+      // 日志表上线前的历史执行：只有 logs 字段
+      return first.logs ? first : await this.getExecutionLogs(id)
+    }
+    const entries = [...first.entries]
+    let page = first
+    while (page.has_more) {
+      page = await this.getExecutionLogs(id, { after: page.next_seq, limit: pageSize })
+      entries.push(...(page.entries || []))
+    }
+    return {
+      ...page,
+      entries,
+      logs: entries.map(entry => entry.message).join('\n'),
+      has_more: false,
+      has_earlier: false,
+    }
+  },
+
   // 删除单个测试执行
   async deleteTestExecution(id: number): Promise<void> {
     await api.delete(`/test-executions/${id}`)